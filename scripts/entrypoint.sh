@@ -1,8 +1,11 @@
 #!/bin/bash
 
 # FastAPI recommends running a single process service per docker container instance as below,
-# and scaling via adding more containers. If we need to run multiple processes, use guvicorn as
-# a process manger as described in the FastAPI docs
+# and scaling via adding more containers. To run several worker processes per container, set WEB_CONCURRENCY.
+# With more than one worker or container, set LEADER_ELECTION_ENABLED=true so the background controllers
+# only run in one of them, see the README.
+# Set FORWARDED_ALLOW_IPS to the IPs of the ingress controller so the rate limits see the client IPs, it is required
+# to enable rate limits keyed by ip.
 
 
-PYTHONPATH=.:src exec uvicorn --host 0.0.0.0 --port 5000 --factory factory:create_app
+PYTHONPATH=.:src exec uvicorn --host 0.0.0.0 --port 5000 --workers "${WEB_CONCURRENCY:-1}" --forwarded-allow-ips "${FORWARDED_ALLOW_IPS:-127.0.0.1}" --factory factory:create_app
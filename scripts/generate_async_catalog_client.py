@@ -0,0 +1,63 @@
+"""
+Generate src/clients/AsyncCatalogClient.py from the KBase SDK generated src/clients/CatalogClient.py.
+
+AsyncCatalog has the same methods as Catalog, as coroutines that call the Catalog through AsyncBaseClient.
+Run it again whenever CatalogClient.py is regenerated:
+
+    python scripts/generate_async_catalog_client.py
+"""
+
+import re
+import sys
+from pathlib import Path
+
+CLIENTS = Path(__file__).resolve().parent.parent / "src" / "clients"
+
+_CLOSE = """
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+"""
+
+
+def _replace(source: str, old: str, new: str) -> str:
+    if source.count(old) != 1:
+        raise ValueError(f"Expected one {old!r} in CatalogClient.py, the generator needs to be updated")
+    return source.replace(old, new)
+
+
+def generate(source: str) -> str:
+    """
+    :param source: The source of CatalogClient.py
+    :return: The source of AsyncCatalogClient.py
+    """
+    source = _replace(
+        source,
+        "# Autogenerated by the KBase type compiler -\n",
+        "# Generated from CatalogClient.py by scripts/generate_async_catalog_client.py -\n",
+    )
+    source = _replace(source, "from .baseclient import BaseClient as _BaseClient", "from .async_baseclient import AsyncBaseClient as _BaseClient")
+    source = _replace(source, "from baseclient import BaseClient as _BaseClient", "from async_baseclient import AsyncBaseClient as _BaseClient")
+    source = _replace(source, "class Catalog(object):", "class AsyncCatalog(object):")
+    source = _replace(source, "        call_timeout=None,\n    ):", "        call_timeout=None,\n        max_connections=100,\n    ):")
+    source = _replace(
+        source, "            call_timeout=call_timeout,\n        )", "            call_timeout=call_timeout,\n            max_connections=max_connections,\n        )"
+    )
+    source = re.sub(r"^    def (?!__init__)", "    async def ", source, flags=re.MULTILINE)
+    source = source.replace("return self._client.call_method(", "return await self._client.call_method(")
+    return source + _CLOSE
+
+
+def main() -> int:
+    source = (CLIENTS / "CatalogClient.py").read_text()
+    (CLIENTS / "AsyncCatalogClient.py").write_text(generate(source))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,10 @@ import requests
 from cacheout import LRUCache
 from fastapi import HTTPException
 
+from clients import deadline
+from clients.bulkhead import Bulkhead
+from clients.caches import build_cache
+from clients.circuit_breaker import FAIL_FAST_ERRORS, CircuitBreaker
 from configs.settings import Settings, get_settings
 
 
@@ -27,12 +31,14 @@ class CachedAuthClient:
         """
         Initialize the CachedAuthClient
         :param settings: The settings to use, or use the default settings if not provided
-        :param valid_tokens_cache: The cache to use for valid tokens, or use a new LRUCache if not provided
+        :param valid_tokens_cache: The cache to use for valid tokens, or build one from the "auth_valid_tokens" cache policy if not provided
         """
         self.settings = get_settings() if settings is None else settings
-        self.valid_tokens = LRUCache(ttl=10) if valid_tokens_cache is None else valid_tokens_cache
+        self.valid_tokens = build_cache("auth_valid_tokens", self.settings.cache_policy("auth_valid_tokens")) if valid_tokens_cache is None else valid_tokens_cache
         self.auth_url = self.settings.auth_service_url
         self.admin_roles = self.settings.admin_roles
+        self.bulkhead = Bulkhead("auth", self.settings.bulkhead_policy("auth"))
+        self.breaker = CircuitBreaker("auth", self.settings.circuit_breaker_policy("auth"))
 
     def is_authorized(self, token: str) -> bool:
         """
@@ -85,7 +91,12 @@ class CachedAuthClient:
         :raises: HTTPException if the token is invalid, expired, or the auth service is down or the auth URL is incorrect
         """
         try:
-            response = requests.get(url=self.auth_url, headers={"Authorization": token})
+            with self.breaker.guard(), self.bulkhead.limit(), deadline.bound("auth"):
+                response = requests.get(url=self.auth_url, headers={"Authorization": token}, timeout=deadline.call_timeout(self.breaker.policy.call_timeout, "auth"))
+                if response.status_code >= 500:
+                    response.raise_for_status()
+        except FAIL_FAST_ERRORS as e:
+            raise HTTPException(status_code=503, detail=e.message)
         except Exception:
             raise HTTPException(status_code=500, detail="Auth service is down or bad request")
         if response.status_code == 200:
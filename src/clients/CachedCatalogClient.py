@@ -1,10 +1,30 @@
 import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from types import MappingProxyType
+from typing import Mapping
 
-from cacheout import LRUCache
+import requests
+from prometheus_client import Counter
 
+from clients import deadline
 from clients.CatalogClient import Catalog
+from clients.bulkhead import Bulkhead
+from clients.caches import build_cache, InstrumentedLRUCache
+from clients.circuit_breaker import CircuitBreaker, CircuitOpenError
+from clients.hedging import Hedger
+from clients.metrics import get_or_create_metric
 from configs.settings import Settings, get_settings
 
+GIT_COMMIT_HASH_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+
+stale_reads_total = get_or_create_metric(
+    Counter, "service_wizard_catalog_stale_reads_total", "Module versions resolved from the stale cache while the catalog circuit breaker was open"
+)
+
 
 def get_module_name_hash(module_name: str) -> str:
     """
@@ -28,17 +48,121 @@ def _get_key(module_name: str, version: str = "release") -> str:
     return str(module_name) + "-" + str(_clean_version(version))
 
 
+def is_git_commit_hash(version: str | int | None) -> bool:
+    """
+    Check if a requested version is a full git commit hash rather than a tag such as "release", "beta" or "dev".
+    """
+    return bool(GIT_COMMIT_HASH_PATTERN.match(_clean_version(version)))
+
+
 class CachedCatalogClient:
-    module_info_cache = LRUCache(ttl=10)
-    module_volume_mount_cache = LRUCache(ttl=10)
-    secure_config_cache = LRUCache(ttl=10)
-    module_hash_mappings_cache = LRUCache(ttl=10)
+    """
+    A two level cache in front of the KBase Catalog.
+
+    The first level maps a requested version tag (release, beta, dev, or a semantic version) to a git commit hash and has
+    a short TTL, so tag changes are picked up quickly. The second level holds module info, volume mounts and secure
+    params keyed by module name and git commit hash, so the payloads are shared by every tag that points at that commit.
+    Module info for a commit never changes and does not expire by default. Volume mounts and secure params are editable
+    by catalog admins, so they still expire. Requesting a full git commit hash skips the first level entirely.
+
+    Each instance owns its caches, sized by the cache policies in the settings, so memory use is bounded per worker.
+    Concurrent catalog calls are bounded by the "catalog" bulkhead policy. Catalog calls time out and stop being made
+    after repeated failures according to the "catalog" circuit breaker policy. While the breaker is open, tags are
+    resolved to the last commit they were seen pointing to, so status lookups of modules seen before keep working.
+    Slow read calls are hedged with a second call according to the catalog hedge policies, which are off by default.
+    """
 
     cc: Catalog
+    module_tag_cache: InstrumentedLRUCache
+    module_info_cache: InstrumentedLRUCache
+    module_volume_mount_cache: InstrumentedLRUCache
+    secure_config_cache: InstrumentedLRUCache
+    stale_module_tag_cache: InstrumentedLRUCache
+    bulkhead: Bulkhead
+    breaker: CircuitBreaker
+    hedger: Hedger
 
     def __init__(self, settings: Settings, catalog: Catalog | None = None):
         settings = get_settings() if not settings else settings
-        self.cc = Catalog(url=settings.catalog_url, token=settings.catalog_admin_token) if not catalog else catalog
+        breaker_policy = settings.circuit_breaker_policy("catalog")
+        if not catalog:
+            catalog = Catalog(
+                url=settings.catalog_url,
+                token=settings.catalog_admin_token,
+                timeout=math.ceil(breaker_policy.call_timeout),
+                call_timeout=lambda: deadline.call_timeout(breaker_policy.call_timeout, "catalog"),
+            )
+        self.cc = catalog
+        self.module_tag_cache = build_cache("catalog_module_tags", settings.cache_policy("catalog_module_tags"))
+        self.module_info_cache = build_cache("catalog_module_info", settings.cache_policy("catalog_module_info"))
+        self.module_volume_mount_cache = build_cache("catalog_volume_mounts", settings.cache_policy("catalog_volume_mounts"))
+        self.secure_config_cache = build_cache("catalog_secure_config", settings.cache_policy("catalog_secure_config"))
+        self.stale_module_tag_cache = build_cache("catalog_stale_module_tags", settings.cache_policy("catalog_stale_module_tags"))
+        self.bulkhead = Bulkhead("catalog", settings.bulkhead_policy("catalog"))
+        # Errors returned by the catalog, e.g. for an unknown module, mean it is up
+        self.breaker = CircuitBreaker("catalog", breaker_policy, is_failure=lambda e: isinstance(e, requests.RequestException))
+        # Enough threads for every call the bulkhead admits and its hedge
+        bulkhead_policy = settings.bulkhead_policy("catalog")
+        self.hedger = Hedger("catalog", settings.catalog_hedge_policies, max_workers=2 * (bulkhead_policy.max_concurrency + bulkhead_policy.max_queue))
+        self.dynamic_service_modules_refresh_seconds = settings.dynamic_service_modules_refresh_seconds
+        # (module names, time.monotonic() of the refresh) is replaced as a whole so readers never see a partial update
+        self._dynamic_service_modules: tuple[frozenset[str], float] | None = None
+        self._dynamic_service_modules_lock = threading.Lock()
+        self._hash_to_name_mappings: tuple[frozenset[str], Mapping[str, str]] | None = None
+
+    def _call_catalog(self, method, *args, **kwargs):
+        """
+        Call a Catalog client method within the concurrency limit and circuit breaker of the catalog, and the request deadline.
+        Slow calls of the methods with a hedge budget are made twice, each within these limits.
+        :raises BulkheadFullError: If too many catalog calls are in flight and queued
+        :raises CircuitOpenError: If the recent catalog calls failed
+        :raises DeadlineExceededError: If the request deadline passed
+        """
+
+        def call():
+            with self.breaker.guard(), self.bulkhead.limit(), deadline.bound("catalog"):
+                return method(*args, **kwargs)
+
+        return self.hedger.call(getattr(method, "__name__", ""), call)
+
+    def _fetch_module_version(self, module_name: str, version: str | int | None) -> dict:
+        """
+        Look up a module version in the catalog and refresh both cache levels with the result.
+        The owners are only looked up if this commit is not cached yet.
+        """
+        module_version = self._call_catalog(self.cc.get_module_version, {"module_name": module_name, "version": _clean_version(version)})
+        git_commit_hash = module_version["git_commit_hash"]
+        info_key = _get_key(module_name, git_commit_hash)
+        cached_module_info = self.module_info_cache.get(key=info_key, default=None)
+        if cached_module_info:
+            module_version["owners"] = cached_module_info["owners"]
+        else:
+            module_version["owners"] = self._call_catalog(self.cc.get_module_info, {"module_name": module_name})["owners"]
+        self.module_info_cache.set(key=info_key, value=module_version)
+        if not is_git_commit_hash(version):
+            self.module_tag_cache.set(key=_get_key(module_name, version), value=git_commit_hash)
+            self.stale_module_tag_cache.set(key=_get_key(module_name, version), value=git_commit_hash)
+        return module_version
+
+    def resolve_git_commit_hash(self, module_name: str, version: str | int | None = "release") -> str:
+        """
+        Resolve a requested version to the git commit hash it currently points to.
+        :param module_name: The name of the module.
+        :param version: A tag such as release, beta or dev, a semantic version, or a git commit hash.
+        :return: The git commit hash
+        """
+        if is_git_commit_hash(version):
+            return _clean_version(version)
+        git_commit_hash = self.module_tag_cache.get(key=_get_key(module_name, version), default=None)
+        if not git_commit_hash:
+            try:
+                git_commit_hash = self._fetch_module_version(module_name, version)["git_commit_hash"]
+            except CircuitOpenError:
+                git_commit_hash = self.stale_module_tag_cache.get(key=_get_key(module_name, version), default=None)
+                if not git_commit_hash:
+                    raise
+                stale_reads_total.inc()
+        return git_commit_hash
 
     def get_combined_module_info(self, module_name: str, version: str = "release") -> dict:
         """
@@ -52,12 +176,10 @@ class CachedCatalogClient:
         :param version:       The version of the module.
         :return: The module info from the KBase Catalog
         """
-        key = _get_key(module_name, version)
-        combined_module_info = self.module_info_cache.get(key=key, default=None)
+        git_commit_hash = self.resolve_git_commit_hash(module_name, version)
+        combined_module_info = self.module_info_cache.get(key=_get_key(module_name, git_commit_hash), default=None)
         if not combined_module_info:
-            combined_module_info = self.cc.get_module_version({"module_name": module_name, "version": _clean_version(version)})
-            combined_module_info["owners"] = self.cc.get_module_info({"module_name": module_name})["owners"]
-            self.module_info_cache.set(key=key, value=combined_module_info)
+            combined_module_info = self._fetch_module_version(module_name, version)
         if combined_module_info.get("dynamic_service") != 1:
             module_info_str = f'{combined_module_info["module_name"]}-{combined_module_info["git_commit_hash"]}'
             raise ValueError(f"Specified module is not marked as a dynamic service. ({module_info_str})")
@@ -70,10 +192,14 @@ class CachedCatalogClient:
         :param version: The version of the module.
         :return: A list of volume mounts for the service.
         """
-        key = _get_key(module_name, version)
+        # Fetched for the commit the version resolves to, which is what they are cached under
+        git_commit_hash = self.resolve_git_commit_hash(module_name, version)
+        key = _get_key(module_name, git_commit_hash)
         mounts = self.module_volume_mount_cache.get(key=key, default=None)
-        if not mounts:
-            mounts_list = self.cc.list_volume_mounts(filter={"module_name": module_name, "version": _clean_version(version), "client_group": "service", "function_name": "service"})
+        if mounts is None:
+            mounts_list = self._call_catalog(
+                self.cc.list_volume_mounts, filter={"module_name": module_name, "version": git_commit_hash, "client_group": "service", "function_name": "service"}
+            )
             mounts = []
             if len(mounts_list) > 0:
                 mounts = mounts_list[0]["volume_mounts"]
@@ -87,29 +213,66 @@ class CachedCatalogClient:
         :param version: The version of the module.
         :return: A dictionary of secure config parameters for the module.
         """
-        key = _get_key(module_name, version)
+        git_commit_hash = self.resolve_git_commit_hash(module_name, version)
+        key = _get_key(module_name, git_commit_hash)
         secure_config_params = self.secure_config_cache.get(key=key, default=None)
-        if not secure_config_params:
-            secure_config_params = self.cc.get_secure_config_params({"module_name": module_name, "version": _clean_version(version)})
+        if secure_config_params is None:
+            secure_config_params = self._call_catalog(self.cc.get_secure_config_params, {"module_name": module_name, "version": git_commit_hash})
             self.secure_config_cache.set(key=key, value=secure_config_params)
         return secure_config_params
 
-    def get_hash_to_name_mappings(self) -> dict[str, dict]:
+    def _refresh_dynamic_service_modules(self) -> frozenset[str]:
+        """
+        Fetch the names of all released and unreleased dynamic service modules from the catalog and publish them.
+        Callers must hold the _dynamic_service_modules_lock.
+        """
+        basic_module_info = self._call_catalog(self.cc.list_basic_module_info, {"include_released": 1, "include_unreleased": 1})
+        module_names = frozenset(m["module_name"] for m in basic_module_info if m.get("dynamic_service") == 1)
+        self._dynamic_service_modules = (module_names, time.monotonic())
+        return module_names
+
+    def _refresh_dynamic_service_modules_in_background(self):
+        def refresh():
+            try:
+                self._refresh_dynamic_service_modules()
+            except Exception:
+                logging.exception("Failed to refresh the dynamic service modules, keeping the previous list")
+            finally:
+                self._dynamic_service_modules_lock.release()
+
+        # Only one refresh at a time, if one is already running the current list is still good enough
+        if self._dynamic_service_modules_lock.acquire(blocking=False):
+            threading.Thread(target=refresh, name="dynamic-service-modules-refresh", daemon=True).start()
+
+    def get_dynamic_service_module_names(self) -> frozenset[str]:
+        """
+        Retrieve the names of the dynamic service modules registered in the catalog.
+        The set is shared by all requests. Only the first call waits for the catalog, after that a stale set is returned
+        immediately while it is refreshed in a background thread every dynamic_service_modules_refresh_seconds.
+        :return: The names of the dynamic service modules
+        """
+        current = self._dynamic_service_modules
+        if current is None:
+            with self._dynamic_service_modules_lock:
+                current = self._dynamic_service_modules
+                if current is None:
+                    return self._refresh_dynamic_service_modules()
+        module_names, refreshed_at = current
+        if time.monotonic() - refreshed_at >= self.dynamic_service_modules_refresh_seconds:
+            self._refresh_dynamic_service_modules_in_background()
+        return module_names
+
+    def get_hash_to_name_mappings(self) -> Mapping[str, str]:
         """
         Retrieve the hashes of dynamic service modules from the catalog.
-        Connects to the catalog using the provided request, retrieves the list of basic module
-        information, filters for dynamic service modules, and returns a dictionary mapping module name hashes
-        to their corresponding module names.
-
-        :return: A dictionary mapping module name hashes to their corresponding module names.
-        """
-        key = "module_hash_mappings"
-        module_hash_mapppings = self.module_hash_mappings_cache.get(key=key, default={})
-        if not module_hash_mapppings:
-            basic_module_info = self.cc.list_basic_module_info({"include_released": 1, "include_unreleased": 1})
-            for m in basic_module_info:
-                if "dynamic_service" not in m or m["dynamic_service"] != 1:
-                    continue
-                module_hash_mapppings[get_module_name_hash(m["module_name"])] = m["module_name"]
-            self.module_hash_mappings_cache.set(key=key, value=module_hash_mapppings)
-        return module_hash_mapppings
+        This is kept for compatibility, use get_dynamic_service_module_names instead.
+        The mapping is only rebuilt when the set of module names changes, and is returned read-only.
+
+        :return: A read-only mapping of module name hashes to their corresponding module names.
+        """
+        module_names = self.get_dynamic_service_module_names()
+        current = self._hash_to_name_mappings
+        if current is None or current[0] is not module_names:
+            current = (module_names, MappingProxyType({get_module_name_hash(name): name for name in module_names}))
+            self._hash_to_name_mappings = current
+        return current[1]
@@ -29,6 +29,7 @@ class Catalog(object):
         ignore_authrc=False,
         trust_all_ssl_certificates=False,
         auth_svc="https://ci.kbase.us/services/auth/api/legacy/KBase/Sessions/Login",
+        call_timeout=None,
     ):
         if url is None:
             raise ValueError("A url is required")
@@ -42,6 +43,7 @@ class Catalog(object):
             ignore_authrc=ignore_authrc,
             trust_all_ssl_certificates=trust_all_ssl_certificates,
             auth_svc=auth_svc,
+            call_timeout=call_timeout,
         )
 
     def version(self, context=None):
@@ -1,86 +1,184 @@
 import logging
-from typing import Optional
+import threading
+from contextlib import contextmanager
+from typing import Optional, TYPE_CHECKING
 
 from cacheout import LRUCache
 from fastapi.requests import Request
-from kubernetes import config
-from kubernetes.client import CoreV1Api, AppsV1Api, NetworkingV1Api, V1Deployment
 
+from clients import deadline
+from clients.bulkhead import Bulkhead, limit_k8s_api_client
+from clients.caches import build_cache
+from clients.circuit_breaker import CircuitBreaker
 from configs.settings import Settings
+from models import DeploymentRecord
+
+if TYPE_CHECKING:
+    from kubernetes.client import CoreV1Api, AppsV1Api, NetworkingV1Api, CustomObjectsApi, CoordinationV1Api
+
+
+def is_k8s_failure(e: Exception) -> bool:
+    """
+    Whether a kubernetes API call failed because the API server is unavailable, rather than because of the request,
+    e.g. a missing deployment or a conflicting update.
+    """
+    import urllib3
+    from kubernetes.client import ApiException
+
+    if isinstance(e, ApiException):
+        return not e.status or e.status >= 500 or e.status == 429
+    return isinstance(e, urllib3.exceptions.HTTPError)
 
 
 class K8sClients:
-    app_client: AppsV1Api
-    core_client: CoreV1Api
-    network_client: NetworkingV1Api
-    service_status_cache: LRUCache
-    all_service_status_cache: LRUCache
+    service_status_cache: LRUCache  # DeploymentRecord, or None if there is no deployment, by label selector
+    all_service_status_cache: LRUCache  # List of DeploymentRecord by label selector
+    bulkheads: dict[str, Bulkhead]  # Concurrency limits of the kubernetes API calls, by API group
+    circuit_breakers: dict[str, CircuitBreaker]  # Circuit breakers of the kubernetes API calls, by API group
 
     def __init__(
         self,
         settings: Settings,
-        k8s_core_client: Optional[CoreV1Api] = None,
-        k8s_app_client: Optional[AppsV1Api] = None,
-        k8s_network_client: Optional[NetworkingV1Api] = None,
+        k8s_core_client: Optional["CoreV1Api"] = None,
+        k8s_app_client: Optional["AppsV1Api"] = None,
+        k8s_network_client: Optional["NetworkingV1Api"] = None,
+        k8s_custom_objects_client: Optional["CustomObjectsApi"] = None,
+        k8s_coordination_client: Optional["CoordinationV1Api"] = None,
     ):
         """
         Setup Kubernetes clients.
+        If no clients are provided, the k8s config is loaded and the clients are built on first use, so that creating
+        the app neither reads the kubeconfig nor imports the kubernetes client package.
 
         Parameters:
             settings (Settings): The settings object containing configuration details.
             k8s_core_client (Optional[client.CoreV1Api]): Optional preconfigured CoreV1Api client.
             k8s_app_client (Optional[client.AppsV1Api]): Optional preconfigured AppsV1Api client.
             k8s_network_client (Optional[client.NetworkingV1Api]): Optional preconfigured NetworkingV1Api client.
-
-        Returns:
-            Tuple[client.CoreV1Api, client.AppsV1Api, client.NetworkingV1Api]: The Kubernetes clients.
+            k8s_custom_objects_client (Optional[client.CustomObjectsApi]): Optional preconfigured CustomObjectsApi client,
+                defaults to one sharing the api client of the CoreV1Api client.
+            k8s_coordination_client (Optional[client.CoordinationV1Api]): Optional preconfigured CoordinationV1Api client for
+                the leader election Lease, defaults to one sharing the api client of the CoreV1Api client.
 
         Raises:
             ValueError: If more than one Kubernetes client is provided or if none are provided.
         """
 
-        clients_and_types = [(k8s_core_client, CoreV1Api), (k8s_app_client, AppsV1Api), (k8s_network_client, NetworkingV1Api)]
-
         num_clients_provided = sum(x is not None for x in [k8s_core_client, k8s_app_client, k8s_network_client])
         if num_clients_provided not in [0, 3]:
             raise ValueError("All k8s_clients should either be all None or all provided")
 
-        for client, expected_type in clients_and_types:
-            if client is not None and not isinstance(client, expected_type):
-                raise TypeError(f"Expected client of type {expected_type}, but got {type(client)}")
-
-        if k8s_core_client is None:
-            if settings.use_incluster_config is True:
-                # Use a service account token if running in a k8s cluster
-                logging.info("Loading in-cluster k8s config")
-                config.load_incluster_config()
-            else:
-                # Use the kubeconfig file, useful for local development and testing
-                logging.info(f"Loading k8s config from {settings.kubeconfig}")
-                config.load_kube_config(config_file=settings.kubeconfig)
-            k8s_core_client = CoreV1Api()
-            k8s_app_client = AppsV1Api()
-            k8s_network_client = NetworkingV1Api()
-
-        self.app_client = k8s_app_client
-        self.core_client = k8s_core_client
-        self.network_client = k8s_network_client
-        self.service_status_cache = LRUCache(ttl=10)
-        self.all_service_status_cache = LRUCache(ttl=10)
-
-
-def get_k8s_core_client(request: Request) -> CoreV1Api:
+        self._settings = settings
+        self.bulkheads = {}
+        self.circuit_breakers = {}
+        self._guards_lock = threading.Lock()
+        self._clients: tuple["CoreV1Api", "AppsV1Api", "NetworkingV1Api", "CustomObjectsApi", "CoordinationV1Api"] | None = None
+        self._clients_lock = threading.Lock()
+        if k8s_core_client is not None:
+            from kubernetes.client import CoreV1Api, AppsV1Api, NetworkingV1Api, CustomObjectsApi, CoordinationV1Api
+
+            for client, expected_type in [(k8s_core_client, CoreV1Api), (k8s_app_client, AppsV1Api), (k8s_network_client, NetworkingV1Api)]:
+                if not isinstance(client, expected_type):
+                    raise TypeError(f"Expected client of type {expected_type}, but got {type(client)}")
+            api_client = getattr(k8s_core_client, "api_client", None)
+            custom_objects_client = k8s_custom_objects_client or CustomObjectsApi(api_client)
+            coordination_client = k8s_coordination_client or CoordinationV1Api(api_client)
+            self._clients = (k8s_core_client, k8s_app_client, k8s_network_client, custom_objects_client, coordination_client)
+            self._limit_concurrency(self._clients)
+        self.service_status_cache = build_cache("k8s_service_status", settings.cache_policy("k8s_service_status"))
+        self.all_service_status_cache = build_cache("k8s_all_service_status", settings.cache_policy("k8s_all_service_status"))
+
+    def _load_clients(self) -> tuple["CoreV1Api", "AppsV1Api", "NetworkingV1Api", "CustomObjectsApi", "CoordinationV1Api"]:
+        from kubernetes import client, config
+
+        if self._settings.use_incluster_config is True:
+            # Use a service account token if running in a k8s cluster
+            logging.info("Loading in-cluster k8s config")
+            config.load_incluster_config()
+        else:
+            # Use the kubeconfig file, useful for local development and testing
+            logging.info(f"Loading k8s config from {self._settings.kubeconfig}")
+            config.load_kube_config(config_file=self._settings.kubeconfig)
+        core_client = client.CoreV1Api()
+        api_client = getattr(core_client, "api_client", None)
+        clients = (core_client, client.AppsV1Api(), client.NetworkingV1Api(), client.CustomObjectsApi(api_client), client.CoordinationV1Api(api_client))
+        self._limit_concurrency(clients)
+        return clients
+
+    @contextmanager
+    def _guard(self, name: str):
+        """
+        The circuit breaker and bulkhead of an API group, created on its first call, and the request deadline.
+        """
+        breaker, bulkhead = self.circuit_breakers.get(name), self.bulkheads.get(name)
+        if breaker is None or bulkhead is None:
+            with self._guards_lock:
+                breaker = self.circuit_breakers.setdefault(name, CircuitBreaker(name, self._settings.circuit_breaker_policy(name), is_failure=is_k8s_failure))
+                bulkhead = self.bulkheads.setdefault(name, Bulkhead(name, self._settings.bulkhead_policy(name)))
+        with breaker.guard(), bulkhead.limit(), deadline.bound(name):
+            yield
+
+    def _limit_concurrency(self, clients: tuple):
+        """
+        Route the calls of the kubernetes API clients through a circuit breaker and bulkhead per API group, with the call
+        timeout of the group, see clients.bulkhead and clients.circuit_breaker.
+        """
+        from kubernetes.client import ApiClient
+
+        api_clients = {id(c.api_client): c.api_client for c in clients if isinstance(getattr(c, "api_client", None), ApiClient)}
+        for api_client in api_clients.values():
+            limit_k8s_api_client(api_client, self._guard, lambda name: self._settings.circuit_breaker_policy(name).call_timeout)
+
+    def _get_clients(self) -> tuple["CoreV1Api", "AppsV1Api", "NetworkingV1Api", "CustomObjectsApi", "CoordinationV1Api"]:
+        clients = self._clients
+        if clients is None:
+            with self._clients_lock:
+                if self._clients is None:
+                    self._clients = self._load_clients()
+                clients = self._clients
+        return clients
+
+    @property
+    def core_client(self) -> "CoreV1Api":
+        return self._get_clients()[0]
+
+    @property
+    def app_client(self) -> "AppsV1Api":
+        return self._get_clients()[1]
+
+    @property
+    def network_client(self) -> "NetworkingV1Api":
+        return self._get_clients()[2]
+
+    @property
+    def custom_objects_client(self) -> "CustomObjectsApi":
+        return self._get_clients()[3]
+
+    @property
+    def coordination_client(self) -> "CoordinationV1Api":
+        return self._get_clients()[4]
+
+
+def get_k8s_core_client(request: Request) -> "CoreV1Api":
     return request.app.state.k8s_clients.core_client
 
 
-def get_k8s_app_client(request: Request) -> AppsV1Api:
+def get_k8s_app_client(request: Request) -> "AppsV1Api":
     return request.app.state.k8s_clients.app_client
 
 
-def get_k8s_networking_client(request: Request) -> NetworkingV1Api:
+def get_k8s_networking_client(request: Request) -> "NetworkingV1Api":
     return request.app.state.k8s_clients.network_client
 
 
+def get_k8s_custom_objects_client(request: Request) -> "CustomObjectsApi":
+    return request.app.state.k8s_clients.custom_objects_client
+
+
+def get_k8s_coordination_client(request: Request) -> "CoordinationV1Api":
+    return request.app.state.k8s_clients.coordination_client
+
+
 def get_k8s_service_status_cache(request: Request) -> LRUCache:
     return request.app.state.k8s_clients.service_status_cache
 
@@ -89,10 +187,10 @@ def get_k8s_all_service_status_cache(request: Request) -> LRUCache:
     return request.app.state.k8s_clients.all_service_status_cache
 
 
-def check_service_status_cache(request: Request, label_selector_text: str) -> V1Deployment:
+def check_service_status_cache(request: Request, label_selector_text: str) -> DeploymentRecord | None:
     cache = get_k8s_service_status_cache(request)
     return cache.get(label_selector_text, None)
 
 
-def populate_service_status_cache(request: Request, label_selector_text: str, data: V1Deployment):
+def populate_service_status_cache(request: Request, label_selector_text: str, data: DeploymentRecord | None):
     get_k8s_service_status_cache(request).set(label_selector_text, data)
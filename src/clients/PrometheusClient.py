@@ -0,0 +1,29 @@
+import requests
+
+
+class PrometheusClient:
+    def __init__(self, prometheus_url: str, timeout: float = 10):
+        """
+        Initialize the PrometheusClient
+        :param prometheus_url: The base URL of the Prometheus server, e.g. http://prometheus:9090
+        :param timeout: The timeout in seconds for each query
+        """
+        self.prometheus_url = prometheus_url.rstrip("/")
+        self.timeout = timeout
+
+    def query(self, query: str) -> list[dict]:
+        """
+        Run an instant query.
+        :param query: The PromQL query
+        :return: The result vector, a list of {"metric": {label: value}, "value": [timestamp, "value"]}
+        :raises requests.RequestException: If Prometheus can't be queried
+        """
+        response = requests.get(f"{self.prometheus_url}/api/v1/query", params={"query": query}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["data"]["result"]
+
+    def query_by_label(self, query: str, label: str) -> dict[str, float]:
+        """
+        Run an instant query and map each series' `label` value to its sample value. Series without the label are dropped.
+        """
+        return {r["metric"][label]: float(r["value"][1]) for r in self.query(query) if r["metric"].get(label)}
@@ -0,0 +1,119 @@
+import os as _os
+
+import httpx
+
+from clients.baseclient import _AJ, _CT, _URL_SCHEME, ServerError, _dumps, _get_token, _ids, _loads, _read_inifile
+
+
+class AsyncBaseClient:
+    """
+    An asyncio counterpart of the KBase BaseClient, for JSON-RPC 1.1 calls to standard services such as the Catalog.
+    Calls share a pool of keep-alive connections of one httpx.AsyncClient, so many calls can be in flight at once with
+    asyncio.gather without a thread per call. Dynamic service lookup (lookup_url) and async jobs (run_job) are not supported.
+
+    The arguments are the same as those of BaseClient, plus the size of the connection pool. Each call times out after
+    `timeout` seconds, or after the seconds returned by the `call_timeout` function if it is set, or after the `timeout`
+    passed to call_method. Close the client with aclose(), or use it as an async context manager.
+    """
+
+    def __init__(
+        self,
+        url=None,
+        timeout=30 * 60,
+        user_id=None,
+        password=None,
+        token=None,
+        ignore_authrc=False,
+        trust_all_ssl_certificates=False,
+        auth_svc="https://kbase.us/services/auth/api/legacy/KBase/Sessions/Login",
+        max_connections=100,
+        max_keepalive_connections=20,
+        call_timeout=None,
+    ):
+        if url is None:
+            raise ValueError("A url is required")
+        if httpx.URL(url).scheme not in _URL_SCHEME:
+            raise ValueError(url + " isn't a valid http url")
+        self.url = url
+        self.timeout = int(timeout)
+        if self.timeout < 1:
+            raise ValueError("Timeout value must be at least 1 second")
+        self.call_timeout = call_timeout
+        self.trust_all_ssl_certificates = trust_all_ssl_certificates
+        headers = {}
+        # token overrides user_id and password
+        if token is not None:
+            headers["AUTHORIZATION"] = token
+        elif user_id is not None and password is not None:
+            headers["AUTHORIZATION"] = _get_token(user_id, password, auth_svc)
+        elif "KB_AUTH_TOKEN" in _os.environ:
+            headers["AUTHORIZATION"] = _os.environ.get("KB_AUTH_TOKEN")
+        elif not ignore_authrc:
+            authdata = _read_inifile()
+            if authdata is not None:
+                if authdata.get("token") is not None:
+                    headers["AUTHORIZATION"] = authdata["token"]
+                elif authdata.get("user_id") is not None and authdata.get("password") is not None:
+                    headers["AUTHORIZATION"] = _get_token(authdata["user_id"], authdata["password"], auth_svc)
+        self._http = httpx.AsyncClient(
+            headers=headers,
+            timeout=self.timeout,
+            verify=not trust_all_ssl_certificates,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+        )
+
+    async def _call(self, url, method, params, context=None, timeout=None):
+        arg_hash = {
+            "method": method,
+            "params": params,
+            "version": "1.1",
+            "id": str(next(_ids)),
+        }
+        if context:
+            if type(context) is not dict:
+                raise ValueError("context is not type dict as required.")
+            arg_hash["context"] = context
+
+        if timeout is None:
+            timeout = self.call_timeout() if self.call_timeout else self.timeout
+        ret = await self._http.post(url, content=_dumps(arg_hash), timeout=timeout)
+        if ret.status_code == 500:
+            if ret.headers.get(_CT) == _AJ:
+                err = _loads(ret.content)
+                if "error" in err:
+                    raise ServerError(**err["error"])
+            raise ServerError("Unknown", 0, ret.text)
+        ret.raise_for_status()
+        resp = _loads(ret.content)
+        if "result" not in resp:
+            raise ServerError("Unknown", 0, "An unknown server error occurred")
+        if not resp["result"]:
+            return
+        if len(resp["result"]) == 1:
+            return resp["result"][0]
+        return resp["result"]
+
+    async def call_method(self, service_method, args, service_ver=None, context=None, timeout=None):
+        """
+        Call a standard service method.
+        Required arguments:
+        service_method - the service and method to run, e.g. myserv.mymeth.
+        args - a list of arguments to the method.
+        Optional arguments:
+        service_ver - the version of the service to run, e.g. a git hash
+            or dev/beta/release.
+        context - the rpc context dict.
+        timeout - the timeout of this call in seconds.
+        """
+        if service_ver:
+            context = dict(context or {}, service_ver=service_ver)
+        return await self._call(self.url, service_method, args, context, timeout)
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
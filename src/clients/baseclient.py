@@ -7,9 +7,9 @@
 
 from __future__ import print_function
 
+import itertools as _itertools
 import json as _json
 import os as _os
-import random as _random
 import traceback as _traceback
 
 import requests as _requests
@@ -27,6 +27,12 @@ except ImportError:
     from urlparse import urlparse as _urlparse  # py2
 import time
 
+try:
+    # Optional, encodes and decodes large catalog responses faster than json, see test/benchmarks/catalog_codec.py
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
 _CT = "content-type"
 _AJ = "application/json"
 _URL_SCHEME = frozenset(["http", "https"])
@@ -97,6 +103,30 @@ class _JSONObjectEncoder(_json.JSONEncoder):
         return _json.JSONEncoder.default(self, obj)
 
 
+def _orjson_default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+
+def _dumps(obj):
+    """Encode a request body to UTF-8 JSON bytes, with orjson if it is installed"""
+    if _orjson is not None:
+        return _orjson.dumps(obj, default=_orjson_default, option=_orjson.OPT_NON_STR_KEYS)
+    return _json.dumps(obj, cls=_JSONObjectEncoder).encode("utf-8")
+
+
+def _loads(content):
+    """Decode a UTF-8 JSON response body, with orjson if it is installed"""
+    if _orjson is not None:
+        return _orjson.loads(content)
+    return _json.loads(content)
+
+
+# Request ids are only echoed back by the server, a counter is cheaper than formatting a random float
+_ids = _itertools.count(1)
+
+
 class BaseClient(object):
     """
     The KBase base client.
@@ -120,6 +150,8 @@ class BaseClient(object):
     lookup_url - set to true when contacting KBase dynamic services.
     async_job_check_time_ms - the wait time between checking job state for
         asynchronous jobs run with the run_job method.
+    call_timeout - optionally a function that returns the timeout of each call
+        in seconds instead of timeout, e.g. shortened to a request deadline.
     """
 
     def __init__(
@@ -136,6 +168,7 @@ class BaseClient(object):
         async_job_check_time_ms=100,
         async_job_check_time_scale_percent=150,
         async_job_check_max_time_ms=300000,
+        call_timeout=None,
     ):
         if url is None:
             raise ValueError("A url is required")
@@ -144,6 +177,7 @@ class BaseClient(object):
             raise ValueError(url + " isn't a valid http url")
         self.url = url
         self.timeout = int(timeout)
+        self.call_timeout = call_timeout
         self._headers = dict()
         self.trust_all_ssl_certificates = trust_all_ssl_certificates
         self.lookup_url = lookup_url
@@ -172,41 +206,39 @@ class BaseClient(object):
             "method": method,
             "params": params,
             "version": "1.1",
-            "id": str(_random.random())[2:],
+            "id": str(next(_ids)),
         }
         if context:
             if type(context) is not dict:
                 raise ValueError("context is not type dict as required.")
             arg_hash["context"] = context
 
-        body = _json.dumps(arg_hash, cls=_JSONObjectEncoder)
         ret = _requests.post(
             url,
-            data=body,
+            data=_dumps(arg_hash),
             headers=self._headers,
-            timeout=self.timeout,
+            timeout=self.call_timeout() if self.call_timeout else self.timeout,
             verify=not self.trust_all_ssl_certificates,
         )
         ret.encoding = "utf-8"
+        # The body is decoded once, from the raw bytes
         if ret.status_code == 500:
             if ret.headers.get(_CT) == _AJ:
-                err = ret.json()
+                err = _loads(ret.content)
                 if "error" in err:
                     raise ServerError(**err["error"])
-                else:
-                    raise ServerError("Unknown", 0, ret.text)
-            else:
-                raise ServerError("Unknown", 0, ret.text)
+            raise ServerError("Unknown", 0, ret.text)
         if not ret.ok:
             ret.raise_for_status()
-        resp = ret.json()
+        resp = _loads(ret.content)
         if "result" not in resp:
             raise ServerError("Unknown", 0, "An unknown server error occurred")
-        if not resp["result"]:
+        result = resp["result"]
+        if not result:
             return
-        if len(resp["result"]) == 1:
-            return resp["result"][0]
-        return resp["result"]
+        if len(result) == 1:
+            return result[0]
+        return result
 
     def _get_service_url(self, service_method, service_version):
         if not self.lookup_url:
@@ -0,0 +1,122 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, ContextManager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from clients import deadline
+from clients.baseclient import ServerError
+from clients.metrics import get_or_create_metric
+from configs.settings import BulkheadPolicy
+
+# JSON-RPC server error code for calls that were not made because an upstream is saturated, clients can retry them later
+UPSTREAM_BUSY_CODE = -32001
+
+queue_wait_seconds = get_or_create_metric(
+    Histogram,
+    "service_wizard_upstream_queue_wait_seconds",
+    "How long calls to an upstream waited for a free concurrency slot",
+    ("upstream",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+in_flight = get_or_create_metric(Gauge, "service_wizard_upstream_in_flight", "Calls to an upstream in flight", ("upstream",))
+queued = get_or_create_metric(Gauge, "service_wizard_upstream_queued", "Calls to an upstream waiting for a free concurrency slot", ("upstream",))
+rejected_total = get_or_create_metric(
+    Counter, "service_wizard_upstream_rejected_total", "Calls to an upstream rejected because its queue was full or the wait timed out", ("upstream", "reason")
+)
+
+
+class BulkheadFullError(ServerError):
+    """
+    Raised instead of calling an upstream when all its concurrency slots are taken and its queue is full, or when the
+    call waited for a slot longer than the queue timeout.
+    """
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(name="Upstream busy", code=UPSTREAM_BUSY_CODE, message=f"Too many concurrent requests to {upstream} ({reason}), try again later")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class Bulkhead:
+    """
+    Bounds the concurrent calls to one upstream, so a burst of requests can not exhaust the upstream or the worker
+    threads of the service wizard. Calls beyond `max_concurrency` wait in a queue of at most `max_queue` calls for up
+    to `queue_timeout` seconds, or until the request deadline, and fail fast with a BulkheadFullError after that.
+    """
+
+    def __init__(self, name: str, policy: BulkheadPolicy):
+        self.name = name
+        self.policy = policy
+        self._slots = threading.BoundedSemaphore(policy.max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    def _reject(self, reason: str):
+        rejected_total.labels(self.name, reason).inc()
+        raise BulkheadFullError(self.name, reason)
+
+    @contextmanager
+    def limit(self):
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self._waiting >= self.policy.max_queue:
+                    self._reject("queue full")
+                self._waiting += 1
+            queued.labels(self.name).inc()
+            try:
+                acquired = self._slots.acquire(timeout=deadline.call_timeout(self.policy.queue_timeout, self.name))
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+                queued.labels(self.name).dec()
+            if not acquired:
+                deadline.check(self.name)
+                self._reject("queue timeout")
+        queue_wait_seconds.labels(self.name).observe(time.monotonic() - started)
+        in_flight.labels(self.name).inc()
+        try:
+            yield
+        finally:
+            in_flight.labels(self.name).dec()
+            self._slots.release()
+
+
+_K8S_API_GROUP = re.compile(r"^/apis/(?P<group>[^/]+)/")
+
+
+def k8s_bulkhead_name(resource_path: str) -> str:
+    """
+    The name of the bulkhead for a kubernetes API path, by API group, e.g. k8s_core for /api/v1/... and k8s_networking
+    for /apis/networking.k8s.io/v1/...
+    """
+    match = _K8S_API_GROUP.match(resource_path)
+    return f"k8s_{match.group('group').split('.')[0]}" if match else "k8s_core"
+
+
+def limit_k8s_api_client(api_client, guard: Callable[[str], ContextManager], call_timeout: Callable[[str], float]) -> None:
+    """
+    Route every call of a kubernetes ApiClient through the guard of its API group, e.g. its bulkhead. Watches and other
+    streamed responses only hold the guard until the response headers arrived, as they are not preloaded, and keep the
+    timeout of the caller. Other calls without a timeout get the call timeout of their API group, shortened to the
+    request deadline.
+    :param api_client: The kubernetes ApiClient shared by the API objects
+    :param guard: Returns the context manager to make a call of an API group in, by name
+    :param call_timeout: Returns the timeout in seconds of the calls of an API group, by name
+    """
+    if getattr(api_client, "_limited", False):
+        return
+    call_api = api_client.call_api
+
+    def limited_call_api(resource_path, method, *args, **kwargs):
+        name = k8s_bulkhead_name(resource_path)
+        with guard(name):
+            if kwargs.get("_preload_content", True) and kwargs.get("_request_timeout") is None:
+                kwargs["_request_timeout"] = deadline.call_timeout(call_timeout(name), name)
+            return call_api(resource_path, method, *args, **kwargs)
+
+    api_client.call_api = limited_call_api
+    api_client._limited = True
@@ -0,0 +1,74 @@
+import weakref
+from typing import Any, Hashable
+
+from cacheout import LRUCache
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+
+from configs.settings import CachePolicy
+
+_MISSING = object()
+
+
+class InstrumentedLRUCache(LRUCache):
+    """
+    An LRUCache that counts hits and misses so that size and hit ratio can be exported as metrics.
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: int = 0, **kwargs):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        super().__init__(maxsize=maxsize, ttl=ttl, **kwargs)
+        _live_caches.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = super().get(key, default=_MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+_live_caches = weakref.WeakSet()
+
+
+def build_cache(name: str, policy: CachePolicy) -> InstrumentedLRUCache:
+    """
+    Create a cache for the given policy. The cache is reported under `name` in the cache metrics.
+    :param name: The name of the cache, e.g. "catalog_module_info"
+    :param policy: The TTL and maxsize to use
+    :return: A new cache
+    """
+    return InstrumentedLRUCache(name=name, maxsize=policy.maxsize, ttl=policy.ttl)
+
+
+class CacheMetricsCollector:
+    """
+    Prometheus collector reporting the size and hit ratio of every live InstrumentedLRUCache, summed by cache name.
+    """
+
+    def collect(self):
+        size = GaugeMetricFamily("service_wizard_cache_size", "Number of entries in the cache", labels=["cache"])
+        hit_ratio = GaugeMetricFamily("service_wizard_cache_hit_ratio", "Fraction of cache lookups that were hits", labels=["cache"])
+        totals = {}
+        for cache in list(_live_caches):
+            entries, hits, misses = totals.get(cache.name, (0, 0, 0))
+            totals[cache.name] = (entries + cache.size(), hits + cache.hits, misses + cache.misses)
+        for name, (entries, hits, misses) in sorted(totals.items()):
+            size.add_metric([name], entries)
+            hit_ratio.add_metric([name], hits / (hits + misses) if hits + misses else 0.0)
+        yield size
+        yield hit_ratio
+
+
+try:
+    REGISTRY.register(CacheMetricsCollector())
+except ValueError:  # pragma: no cover
+    # Already registered, e.g. when this module is imported under both `clients` and `src.clients`
+    pass
@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from prometheus_client import Counter, Gauge
+
+from clients.baseclient import ServerError
+from clients.bulkhead import BulkheadFullError
+from clients.deadline import DeadlineExceededError
+from clients.metrics import get_or_create_metric
+from configs.settings import CircuitBreakerPolicy
+
+# JSON-RPC server error code for calls that were not made because an upstream failed repeatedly, clients can retry them later
+UPSTREAM_UNAVAILABLE_CODE = -32003
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+state_gauge = get_or_create_metric(Gauge, "service_wizard_circuit_breaker_state", "State of the circuit breaker of an upstream, 0 closed, 1 half open, 2 open", ("upstream",))
+transitions_total = get_or_create_metric(
+    Counter, "service_wizard_circuit_breaker_transitions_total", "Times the circuit breaker of an upstream changed to a state", ("upstream", "state")
+)
+breaker_rejected_total = get_or_create_metric(
+    Counter, "service_wizard_circuit_breaker_rejected_total", "Calls to an upstream rejected because its circuit breaker was open", ("upstream",)
+)
+
+
+class CircuitOpenError(ServerError):
+    """
+    Raised instead of calling an upstream while its circuit breaker is open, because the recent calls to it failed.
+    """
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            name="Upstream unavailable",
+            code=UPSTREAM_UNAVAILABLE_CODE,
+            message=f"{upstream} is unavailable after repeated failures, try again in {max(retry_after, 1):.0f} seconds",
+        )
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+# Calls rejected before they reached the upstream by a bulkhead or a circuit breaker, or abandoned at the request deadline
+FAIL_FAST_ERRORS = (BulkheadFullError, CircuitOpenError, DeadlineExceededError)
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing, so requests fail fast instead of tying up worker threads until the
+    call timeout. After `failure_threshold` consecutive failed calls the breaker opens and rejects every call with a
+    CircuitOpenError for `reset_timeout` seconds. It then lets a single trial call through (half open), and closes again
+    if that call succeeds or opens for another `reset_timeout` if it fails.
+
+    Only exceptions for which `is_failure` is true count as failures, e.g. timeouts and connection errors but not a
+    "module not found" error from the upstream. Calls rejected by a bulkhead or another breaker, or abandoned at the
+    request deadline, count as neither.
+    """
+
+    def __init__(self, name: str, policy: CircuitBreakerPolicy, is_failure: Callable[[Exception], bool] = lambda e: True):
+        self.name = name
+        self.policy = policy
+        self.is_failure = is_failure
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        state_gauge.labels(name).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logging.warning(f"The circuit breaker of {self.name} changed from {self._state} to {state}")
+            self._state = state
+            state_gauge.labels(self.name).set(_STATE_VALUES[state])
+            transitions_total.labels(self.name, state).inc()
+
+    def _reject(self, retry_after: float):
+        breaker_rejected_total.labels(self.name).inc()
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _before_call(self) -> bool:
+        """
+        :return: True if the call is the trial call of a half open breaker
+        :raises CircuitOpenError: If the breaker is open, or half open with its trial call in flight
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            if self._state == OPEN:
+                remaining = self._opened_at + self.policy.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self._reject(remaining)
+                self._set_state(HALF_OPEN)
+            if self._trial_in_flight:
+                self._reject(self.policy.reset_timeout)
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.policy.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    @contextmanager
+    def guard(self):
+        trial = self._before_call()
+        try:
+            yield
+        except FAIL_FAST_ERRORS:
+            if trial:
+                with self._lock:
+                    self._trial_in_flight = False
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
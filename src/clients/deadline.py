@@ -0,0 +1,95 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter
+
+from clients.baseclient import ServerError
+from clients.metrics import get_or_create_metric
+
+# JSON-RPC server error code for requests abandoned because their deadline passed
+DEADLINE_EXCEEDED_CODE = -32004
+
+deadline_exceeded_total = get_or_create_metric(Counter, "service_wizard_deadline_exceeded_total", "Requests abandoned because their deadline passed, by where", ("where",))
+
+# The time.monotonic() by which the current request must be done and its timeout in seconds, None if it has no deadline
+_deadline: ContextVar[tuple[float, float] | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(ServerError):
+    """
+    Raised instead of calling an upstream or waiting any longer once the deadline of the request passed, as the caller
+    gave up on the response by then.
+    """
+
+    def __init__(self, timeout: float, where: str):
+        super().__init__(name="Deadline exceeded", code=DEADLINE_EXCEEDED_CODE, message=f"The request deadline of {timeout:g} seconds passed before {where}")
+        self.where = where
+
+
+@contextmanager
+def deadline_scope(timeout: float | None):
+    """
+    Run the calls in the block, in this thread, with a deadline `timeout` seconds from now. None means no deadline.
+    """
+    token = _deadline.set(None if timeout is None else (time.monotonic() + timeout, timeout))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """
+    :return: The seconds left until the deadline of the current request, or None if it has no deadline
+    """
+    deadline = _deadline.get()
+    return None if deadline is None else deadline[0] - time.monotonic()
+
+
+def expired() -> bool:
+    """
+    :return: True if the deadline of the current request passed
+    """
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline[0]
+
+
+def check(where: str):
+    """
+    :raises DeadlineExceededError: If the deadline of the current request passed
+    """
+    if expired():
+        deadline_exceeded_total.labels(where).inc()
+        raise DeadlineExceededError(_deadline.get()[1], where)
+
+
+def call_timeout(timeout: float, where: str) -> float:
+    """
+    The timeout of a call to an upstream, shortened to the time left until the deadline of the current request.
+    :param timeout: The timeout of the call without a deadline
+    :param where: What is called, for the error
+    :raises DeadlineExceededError: If the deadline of the current request passed
+    """
+    check(where)
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+@contextmanager
+def bound(where: str):
+    """
+    Make a call to an upstream within the deadline of the current request. Fails without calling if the deadline passed,
+    and turns the errors of a call that ran out of time into a DeadlineExceededError, so a timeout caused by the
+    deadline is not taken for a failure of the upstream.
+    """
+    check(where)
+    try:
+        yield
+    except DeadlineExceededError:
+        raise
+    except Exception as e:
+        if expired():
+            deadline_exceeded_total.labels(where).inc()
+            raise DeadlineExceededError(_deadline.get()[1], where) from e
+        raise
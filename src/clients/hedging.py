@@ -0,0 +1,151 @@
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+from clients.metrics import get_or_create_metric
+from configs.settings import HedgePolicy
+
+T = TypeVar("T")
+
+hedged_requests_total = get_or_create_metric(
+    Counter,
+    "service_wizard_hedged_requests_total",
+    "Hedged requests sent to an upstream, by whether the hedge won, lost to the first call or failed",
+    ("upstream", "method", "outcome"),
+)
+hedge_delay_seconds = get_or_create_metric(Gauge, "service_wizard_hedge_delay_seconds", "Seconds a call waits before it is hedged", ("upstream", "method"))
+
+# Hedges saved up while calls are fast, so a short burst of slow calls can all be hedged
+MAX_HEDGE_TOKENS = 10.0
+# How often the hedge delay is recomputed from the recent latencies, in successful calls
+_RECOMPUTE_EVERY = 16
+
+
+class _MethodStats:
+    """
+    The recent latencies of the successful calls of one method, the hedge delay computed from them and the hedges left
+    in the budget. Only used under the lock of the Hedger.
+    """
+
+    def __init__(self, window: int):
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.since_recompute = 0
+        self.delay: float | None = None
+        self.tokens = 0.0
+
+
+class Hedger:
+    """
+    Sends a second, hedged request for read-only calls to an upstream that have not returned after the `quantile` latency
+    of the recent calls of their method, and returns whichever response comes first. This cuts the latency of the slow
+    tail of calls at the cost of a few more calls to the upstream.
+
+    The extra calls are bounded per method by the budget of its policy: every call earns `budget` hedges, up to
+    MAX_HEDGE_TOKENS, and every hedge spends one, so a budget of 0.05 sends at most about 5% more calls. Methods without a
+    budget, methods with fewer than `min_samples` recent successful calls, and calls made while the budget has no hedge
+    left are called directly in the calling thread.
+
+    Hedged calls run in a thread pool of `max_workers` threads, in a copy of the context of the caller so the request
+    deadline applies to them. The call that loses keeps running until it returns, its result is dropped.
+    """
+
+    def __init__(self, upstream: str, policies: dict[str, HedgePolicy], max_workers: int, window: int = 256, min_samples: int = 20):
+        self.upstream = upstream
+        self.policies = policies
+        self.max_workers = max_workers
+        self.window = window
+        self.min_samples = min_samples
+        self._stats: dict[str, _MethodStats] = {}
+        self._lock = threading.Lock()
+        self._pool: ThreadPoolExecutor | None = None
+
+    def enabled(self, method: str) -> bool:
+        policy = self.policies.get(method)
+        return policy is not None and policy.budget > 0
+
+    def delay(self, method: str) -> float | None:
+        """
+        :return: The seconds a call of the method waits before it is hedged, None if there are not enough samples yet
+        """
+        stats = self._stats.get(method)
+        return stats.delay if stats else None
+
+    def _record(self, method: str, stats: _MethodStats, latency: float):
+        policy = self.policies[method]
+        with self._lock:
+            stats.latencies.append(latency)
+            stats.since_recompute += 1
+            if len(stats.latencies) >= self.min_samples and (stats.delay is None or stats.since_recompute >= _RECOMPUTE_EVERY):
+                latencies = sorted(stats.latencies)
+                stats.delay = max(policy.min_delay, latencies[min(len(latencies) - 1, math.ceil(policy.quantile * len(latencies)) - 1)])
+                stats.since_recompute = 0
+                hedge_delay_seconds.labels(self.upstream, method).set(stats.delay)
+
+    def _timed(self, method: str, stats: _MethodStats, fn: Callable[[], T]) -> T:
+        start = time.monotonic()
+        result = fn()
+        self._record(method, stats, time.monotonic() - start)
+        return result
+
+    def _submit(self, method: str, stats: _MethodStats, fn: Callable[[], T]) -> Future:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"{self.upstream}-hedge")
+        return self._pool.submit(contextvars.copy_context().run, self._timed, method, stats, fn)
+
+    def call(self, method: str, fn: Callable[[], T]) -> T:
+        """
+        Call `fn`, and call it again if it is slow and the budget of the method allows a hedge.
+        :param method: The name of the upstream method, to look up its policy and latencies
+        :param fn: Makes the call, must be safe to call twice concurrently
+        :return: The result of the call that returned first
+        :raises Exception: The error of the first call, if both calls failed
+        """
+        if not self.enabled(method):
+            return fn()
+        with self._lock:
+            stats = self._stats.get(method)
+            if stats is None:
+                stats = self._stats[method] = _MethodStats(self.window)
+            stats.tokens = min(MAX_HEDGE_TOKENS, stats.tokens + self.policies[method].budget)
+            delay = stats.delay
+            # Only hand the call to the pool if it could be hedged, the token is spent once it is slow
+            can_hedge = stats.tokens >= 1
+        if delay is None or not can_hedge:
+            return self._timed(method, stats, fn)
+
+        primary = self._submit(method, stats, fn)
+        if wait([primary], timeout=delay).done or not self._spend(stats):
+            return primary.result()
+
+        hedge = self._submit(method, stats, fn)
+        pending, hedge_failed = {primary, hedge}, False
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # The first call wins a tie
+            for future in sorted(done, key=lambda f: f is hedge):
+                if future.exception() is None:
+                    if not hedge_failed:
+                        hedged_requests_total.labels(self.upstream, method, "won" if future is hedge else "lost").inc()
+                    return future.result()
+                if future is hedge:
+                    hedge_failed = True
+                    hedged_requests_total.labels(self.upstream, method, "failed").inc()
+        return primary.result()
+
+    def _spend(self, stats: _MethodStats) -> bool:
+        """
+        :return: True if the budget of the method had a hedge left, which is then spent
+        """
+        with self._lock:
+            if stats.tokens < 1:
+                return False
+            stats.tokens -= 1
+            return True
@@ -0,0 +1,17 @@
+from prometheus_client import REGISTRY
+
+
+def get_or_create_metric(metric_cls, name: str, documentation: str, labelnames: tuple[str, ...] = (), **kwargs):
+    """
+    Create a prometheus metric in the default registry, or return the existing one with the same name.
+    Modules can be imported under both `x` and `src.x` (e.g. by the test fixtures) which would otherwise register twice.
+    :param metric_cls: Counter, Gauge, Histogram or Summary
+    :param name: The metric name
+    :param documentation: The metric help text
+    :param labelnames: The label names
+    :return: The metric
+    """
+    try:
+        return metric_cls(name, documentation, labelnames=labelnames, **kwargs)
+    except ValueError:
+        return REGISTRY._names_to_collectors[name]
@@ -0,0 +1,171 @@
+import dataclasses
+from dataclasses import dataclass, field
+
+import yaml
+
+# Name of the secure config param admins can set in the KBase Catalog to pick the sizing profile of a module
+SIZING_PROFILE_SECURE_PARAM = "SERVICE_WIZARD_SIZING_PROFILE"
+# Deployment annotation recording the sizing profile a dynamic service was deployed with
+SIZING_PROFILE_ANNOTATION = "us.kbase.dynamicservice/sizing-profile"
+PROBE_KINDS = ("readiness", "liveness")
+
+
+@dataclass(frozen=True)
+class ProbeSpec:
+    """
+    A readiness or liveness probe of a dynamic service container: an HTTP GET of `path`, or a TCP connection, on `port`.
+    """
+
+    type: str
+    path: str = "/"
+    port: int = 5000
+    initial_delay_seconds: int = 0
+    period_seconds: int = 10
+    timeout_seconds: int = 1
+    failure_threshold: int = 3
+
+
+# Without configuration, a service is ready once its SDK server listens on port 5000, and is never restarted by a liveness probe
+DEFAULT_PROBES: dict[str, ProbeSpec | None] = {"readiness": ProbeSpec(type="tcp"), "liveness": None}
+
+
+@dataclass(frozen=True)
+class ModuleProfile:
+    """
+    How a dynamic service container is sized: the CPU and memory it requests from the scheduler and its limits,
+    as kubernetes quantities such as {"cpu": "250m", "memory": "512Mi"}.
+    """
+
+    name: str
+    requests: dict[str, str] = field(default_factory=dict)
+    limits: dict[str, str] = field(default_factory=dict)
+    probes: dict[str, ProbeSpec | None] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ModuleProfiles:
+    """
+    The sizing profiles and probes of dynamic services, read from the MODULE_PROFILES_FILE. Module names are not case-sensitive.
+    """
+
+    profiles: dict[str, ModuleProfile] = field(default_factory=dict)
+    modules: dict[str, str] = field(default_factory=dict)
+    default_profile: str | None = None
+    probes: dict[str, ProbeSpec | None] = field(default_factory=dict)
+    module_probes: dict[str, dict[str, ProbeSpec | None]] = field(default_factory=dict)
+
+    def profile_for(self, module_name: str, catalog_profile: str | None = None) -> ModuleProfile | None:
+        """
+        Pick the profile of a module: the one selected in the catalog, else the one mapped to the module in the
+        profiles file, else the default profile. Unknown catalog selections fall through to the next choice.
+        :param module_name: The module name
+        :param catalog_profile: The profile selected for the module in the catalog, if any
+        :return: The profile, or None if no profile applies and the container should not be sized
+        """
+        for name in (catalog_profile, self.modules.get(module_name.lower()), self.default_profile):
+            if name in self.profiles:
+                return self.profiles[name]
+        return None
+
+    def probes_for(self, module_name: str, profile: ModuleProfile | None = None) -> dict[str, ProbeSpec | None]:
+        """
+        Pick the probes of a module. The built-in defaults are overridden by the probes of the file, then by the probes
+        of the module's profile, then by the probes set for the module itself.
+        :param module_name: The module name
+        :param profile: The profile of the module, if any
+        :return: The readiness and liveness probes, None for probes that should not be set
+        """
+        return {**DEFAULT_PROBES, **self.probes, **(profile.probes if profile else {}), **self.module_probes.get(module_name.lower(), {})}
+
+
+def _parse_probes(owner: str, probes) -> dict[str, ProbeSpec | None]:
+    if probes is None:
+        return {}
+    if not isinstance(probes, dict) or set(probes) - set(PROBE_KINDS):
+        raise ValueError(f"{owner} probes must be a mapping with readiness and/or liveness, got {probes}")
+    parsed = {}
+    for kind, probe in probes.items():
+        if probe is None or probe == "none":
+            parsed[kind] = None
+            continue
+        try:
+            parsed[kind] = ProbeSpec(**probe)
+        except TypeError:
+            raise ValueError(f"{owner} {kind} probe has unknown fields, got {probe}")
+        if parsed[kind].type not in ("http", "tcp"):
+            raise ValueError(f"{owner} {kind} probe type must be http or tcp, got {parsed[kind].type}")
+        numbers = [v for k, v in dataclasses.asdict(parsed[kind]).items() if k not in ("type", "path")]
+        if not all(isinstance(v, int) and v >= 0 for v in numbers):
+            raise ValueError(f"{owner} {kind} probe port, delay, period, timeout and threshold must be non-negative integers, got {probe}")
+    return parsed
+
+
+def _parse_amounts(profile_name: str, kind: str, amounts) -> dict[str, str]:
+    from kubernetes.utils import parse_quantity
+
+    if amounts is None:
+        return {}
+    if not isinstance(amounts, dict) or set(amounts) - {"cpu", "memory"}:
+        raise ValueError(f"Profile '{profile_name}' {kind} must be a mapping with cpu and/or memory, got {amounts}")
+    for resource, quantity in amounts.items():
+        try:
+            parse_quantity(quantity)
+        except ValueError:
+            raise ValueError(f"Profile '{profile_name}' {kind}.{resource} is not a valid quantity, got {quantity}")
+    return {resource: str(quantity) for resource, quantity in amounts.items()}
+
+
+def parse_module_profiles(document: dict | None) -> ModuleProfiles:
+    """
+    Parse and validate a profiles document, see the README.md file for the format.
+    :raises ValueError: If the document is not valid
+    """
+    from kubernetes.utils import parse_quantity
+
+    document = document or {}
+    profiles = {}
+    for name, profile in (document.get("profiles") or {}).items():
+        profile = profile or {}
+        requests = _parse_amounts(name, "requests", profile.get("requests"))
+        limits = _parse_amounts(name, "limits", profile.get("limits"))
+        for resource in set(requests) & set(limits):
+            if parse_quantity(requests[resource]) > parse_quantity(limits[resource]):
+                raise ValueError(f"Profile '{name}' requests more {resource} than its limit")
+        profiles[name] = ModuleProfile(name=name, requests=requests, limits=limits, probes=_parse_probes(f"Profile '{name}'", profile.get("probes")))
+
+    # A module maps to a profile name, or to a mapping with an optional profile and probes of its own
+    modules, module_probes = {}, {}
+    for module_name, module in (document.get("modules") or {}).items():
+        if isinstance(module, dict):
+            if module.get("profile"):
+                modules[module_name.lower()] = module["profile"]
+            module_probes[module_name.lower()] = _parse_probes(f"Module '{module_name}'", module.get("probes"))
+        else:
+            modules[module_name.lower()] = module
+    default_profile = document.get("default_profile")
+    for profile_name in [*modules.values(), *([default_profile] if default_profile else [])]:
+        if profile_name not in profiles:
+            raise ValueError(f"Profile '{profile_name}' is used but not defined")
+    return ModuleProfiles(
+        profiles=profiles,
+        modules=modules,
+        default_profile=default_profile,
+        probes=_parse_probes("The", document.get("probes")),
+        module_probes=module_probes,
+    )
+
+
+def load_module_profiles(path: str | None) -> ModuleProfiles:
+    """
+    Load the sizing profiles and probes from a YAML (or JSON) file, typically mounted from a ConfigMap.
+    :param path: The path of the file, no profiles are used if it is not set
+    :raises ValueError: If the file cannot be read or is not valid
+    """
+    if not path:
+        return ModuleProfiles()
+    try:
+        with open(path) as f:
+            document = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        raise ValueError(f"Could not read module profiles from {path}: {e}")
+    return parse_module_profiles(document)
@@ -1,7 +1,9 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import lru_cache
 
+from configs.module_profiles import ModuleProfiles, load_module_profiles
+
 
 class EnvironmentVariableError(Exception):
     """
@@ -11,6 +13,180 @@ class EnvironmentVariableError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    The TTL (in seconds, 0 means entries never expire) and maximum number of entries for a cache.
+    """
+
+    ttl: int = 10
+    maxsize: int = 256
+
+
+def default_cache_policies() -> dict[str, CachePolicy]:
+    """
+    The default policies for every cache in the service wizard, keyed by cache name.
+    Each can be overridden with the CACHE_<NAME>_TTL and CACHE_<NAME>_MAXSIZE environment variables.
+    """
+    return {
+        "catalog_module_tags": CachePolicy(),
+        # The last known commit of each tag, only read while the catalog circuit breaker is open
+        "catalog_stale_module_tags": CachePolicy(ttl=24 * 60 * 60, maxsize=1024),
+        # Keyed by git commit hash. Module info for a commit never changes, mounts and secure params can be edited by admins
+        "catalog_module_info": CachePolicy(ttl=0, maxsize=1024),
+        "catalog_volume_mounts": CachePolicy(ttl=300, maxsize=1024),
+        "catalog_secure_config": CachePolicy(ttl=300, maxsize=1024),
+        "auth_valid_tokens": CachePolicy(),
+        "k8s_service_status": CachePolicy(),
+        "k8s_all_service_status": CachePolicy(maxsize=16),
+    }
+
+
+@dataclass(frozen=True)
+class BulkheadPolicy:
+    """
+    The maximum number of concurrent calls to an upstream, how many more calls may queue for a free slot, and how long
+    (in seconds) a queued call waits before it fails.
+    """
+
+    max_concurrency: int = 16
+    max_queue: int = 64
+    queue_timeout: float = 10.0
+
+
+def default_bulkhead_policies() -> dict[str, BulkheadPolicy]:
+    """
+    The default bulkhead policies for every upstream of the service wizard, keyed by upstream name. The kubernetes API
+    is split by API group. Each can be overridden with the BULKHEAD_<NAME>_MAX_CONCURRENCY, BULKHEAD_<NAME>_MAX_QUEUE
+    and BULKHEAD_<NAME>_QUEUE_TIMEOUT environment variables.
+    """
+    return {
+        "catalog": BulkheadPolicy(),
+        "auth": BulkheadPolicy(),
+        "k8s_core": BulkheadPolicy(),
+        "k8s_apps": BulkheadPolicy(),
+        "k8s_networking": BulkheadPolicy(max_concurrency=8),
+        "k8s_metrics": BulkheadPolicy(max_concurrency=4, max_queue=16),
+        "k8s_coordination": BulkheadPolicy(max_concurrency=2, max_queue=4),
+    }
+
+
+@dataclass(frozen=True)
+class CircuitBreakerPolicy:
+    """
+    How many consecutive failed calls open the circuit breaker of an upstream, how long (in seconds) it stays open
+    before a trial call, and the timeout (in seconds) of each call to the upstream.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    call_timeout: float = 10.0
+
+
+def default_circuit_breaker_policies() -> dict[str, CircuitBreakerPolicy]:
+    """
+    The default circuit breaker policies for every upstream of the service wizard, keyed by the same upstream names as
+    the bulkhead policies. Each can be overridden with the CIRCUIT_BREAKER_<NAME>_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_<NAME>_RESET_TIMEOUT and CIRCUIT_BREAKER_<NAME>_CALL_TIMEOUT environment variables.
+    """
+    return {
+        # list_basic_module_info returns every module in the catalog
+        "catalog": CircuitBreakerPolicy(call_timeout=15.0),
+        "auth": CircuitBreakerPolicy(call_timeout=5.0),
+        "k8s_core": CircuitBreakerPolicy(reset_timeout=15.0),
+        "k8s_apps": CircuitBreakerPolicy(reset_timeout=15.0),
+        "k8s_networking": CircuitBreakerPolicy(reset_timeout=15.0),
+        "k8s_metrics": CircuitBreakerPolicy(failure_threshold=3, reset_timeout=60.0, call_timeout=5.0),
+        # Must fail well before the leader election lease expires
+        "k8s_coordination": CircuitBreakerPolicy(reset_timeout=5.0, call_timeout=5.0),
+    }
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """
+    A token bucket for one RPC method: the sustained requests per second (0 means unlimited), the burst of requests
+    allowed on top of that, and what the buckets are keyed by, any of "token", "ip" and "module".
+    """
+
+    rate: float = 0.0
+    burst: int = 1
+    key: tuple[str, ...] = ("ip",)
+
+
+RATE_LIMIT_KEYS = ("token", "ip", "module")
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """
+    Hedged requests for one read-only catalog method: the fraction of calls that may send a second, hedged request
+    (0 disables hedging), the quantile of the recent call latencies after which the hedged request is sent, and the
+    least number of seconds to wait for the first call before hedging it.
+    """
+
+    budget: float = 0.0
+    quantile: float = 0.95
+    min_delay: float = 0.05
+
+
+def default_catalog_hedge_policies() -> dict[str, HedgePolicy]:
+    """
+    The default hedge policies of the read-only catalog methods, keyed by Catalog method name. Hedging is off unless
+    a budget is set with the CATALOG_HEDGE_<METHOD>_BUDGET environment variable. CATALOG_HEDGE_<METHOD>_QUANTILE and
+    CATALOG_HEDGE_<METHOD>_MIN_DELAY override the other fields.
+    """
+    return {
+        "get_module_version": HedgePolicy(),
+        "get_module_info": HedgePolicy(),
+        "list_volume_mounts": HedgePolicy(),
+        "get_secure_config_params": HedgePolicy(),
+        # Returns every module in the catalog, a hedge doubles a large response
+        "list_basic_module_info": HedgePolicy(quantile=0.99, min_delay=1.0),
+    }
+
+
+def default_request_deadlines() -> dict[str, float]:
+    """
+    The default deadline in seconds of each RPC method, keyed by method name without the ServiceWizard. prefix. Each can
+    be overridden with the REQUEST_DEADLINE_<METHOD>_SECONDS environment variable, 0 means no deadline.
+    """
+    return {
+        # Starting or waking up a module waits up to WAKE_TIMEOUT_SECONDS for it to become available
+        "start": 120,
+        "get_service_status": 120,
+        "get_service_status_without_restart": 30,
+        "list_service_status": 60,
+        "list_service_status_page": 30,
+        "get_service_log": 60,
+        "stop": 60,
+        "get_resource_usage": 30,
+        "status": 10,
+        "version": 10,
+    }
+
+
+def default_rate_limit_policies() -> dict[str, RateLimitPolicy]:
+    """
+    The default rate limits of the RPC methods, keyed by method name without the ServiceWizard. prefix. Each can be
+    overridden with the RATE_LIMIT_<METHOD>_RATE, RATE_LIMIT_<METHOD>_BURST and RATE_LIMIT_<METHOD>_KEY environment
+    variables. status and version are cheap and not limited.
+
+    The rates are 0, so nothing is limited until a rate is set: behind the ingress, limits keyed by "ip" need
+    FORWARDED_ALLOW_IPS, otherwise all clients share the bucket of the ingress.
+    """
+    return {
+        "start": RateLimitPolicy(burst=20, key=("ip", "module")),
+        "get_service_status": RateLimitPolicy(burst=20, key=("ip", "module")),
+        "get_service_status_without_restart": RateLimitPolicy(burst=40, key=("ip", "module")),
+        "list_service_status": RateLimitPolicy(burst=10),
+        "list_service_status_page": RateLimitPolicy(burst=20),
+        "get_service_log": RateLimitPolicy(burst=10, key=("ip", "module")),
+        "stop": RateLimitPolicy(burst=10, key=("ip", "module")),
+        "get_resource_usage": RateLimitPolicy(burst=10, key=("ip", "module")),
+    }
+
+
 @dataclass
 class Settings:
     """
@@ -33,6 +209,190 @@ class Settings:
     root_path: str
     use_incluster_config: bool
     vcs_ref: str
+    cache_policies: dict[str, CachePolicy] = field(default_factory=default_cache_policies)
+    prometheus_url: str | None = None
+    dynamic_service_modules_refresh_seconds: int = 60
+    idle_reaper_enabled: bool = False
+    idle_reaper_idle_seconds: int = 7 * 24 * 60 * 60
+    idle_reaper_interval_seconds: int = 300
+    wake_timeout_seconds: int = 60
+    autoscaler_enabled: bool = False
+    autoscaler_interval_seconds: int = 30
+    autoscaler_metrics_window_seconds: int = 120
+    autoscaler_scale_up_window_seconds: int = 0
+    autoscaler_scale_down_window_seconds: int = 300
+    autoscaler_target_requests_per_second: float = 10.0
+    autoscaler_target_latency_seconds: float = 1.0
+    autoscaler_min_replicas: int = 1
+    autoscaler_max_replicas: int = 3
+    autoscaler_module_replica_bounds: dict[str, tuple[int, int]] = field(default_factory=dict)
+    module_profiles: ModuleProfiles = field(default_factory=ModuleProfiles)
+    image_prepull_enabled: bool = False
+    image_prepull_interval_seconds: int = 300
+    image_prepull_window_seconds: int = 7 * 24 * 60 * 60
+    image_prepull_min_starts: int = 2
+    image_prepull_max_images: int = 20
+    image_prepull_pause_image: str = "registry.k8s.io/pause:3.9"
+    release_watcher_enabled: bool = False
+    release_watcher_interval_seconds: int = 300
+    release_watcher_tags: tuple[str, ...] = ("release", "beta")
+    release_watcher_drain_seconds: int = 3600
+    k8s_list_page_size: int = 100
+    warmup_enabled: bool = False
+    warmup_deadline_seconds: int = 60
+    leader_election_enabled: bool = False
+    leader_election_lease_name: str = "service-wizard2-leader"
+    leader_election_lease_seconds: int = 15
+    leader_election_renew_seconds: int = 5
+    bulkhead_policies: dict[str, BulkheadPolicy] = field(default_factory=default_bulkhead_policies)
+    rate_limit_policies: dict[str, RateLimitPolicy] = field(default_factory=default_rate_limit_policies)
+    rate_limit_max_keys: int = 10000
+    circuit_breaker_policies: dict[str, CircuitBreakerPolicy] = field(default_factory=default_circuit_breaker_policies)
+    request_deadlines: dict[str, float] = field(default_factory=default_request_deadlines)
+    request_deadline_max_seconds: float = 300
+    catalog_hedge_policies: dict[str, HedgePolicy] = field(default_factory=default_catalog_hedge_policies)
+
+    def cache_policy(self, name: str) -> CachePolicy:
+        return self.cache_policies.get(name, CachePolicy())
+
+    def bulkhead_policy(self, name: str) -> BulkheadPolicy:
+        return self.bulkhead_policies.get(name, BulkheadPolicy())
+
+    def circuit_breaker_policy(self, name: str) -> CircuitBreakerPolicy:
+        return self.circuit_breaker_policies.get(name, CircuitBreakerPolicy())
+
+    def rate_limit_policy(self, method: str) -> RateLimitPolicy:
+        return self.rate_limit_policies.get(method.removeprefix("ServiceWizard."), RateLimitPolicy())
+
+    def request_deadline(self, method: str) -> float | None:
+        return self.request_deadlines.get(method.removeprefix("ServiceWizard.")) or None
+
+    def catalog_hedge_policy(self, method: str) -> HedgePolicy:
+        return self.catalog_hedge_policies.get(method, HedgePolicy())
+
+    def autoscaler_replica_bounds(self, module_name: str) -> tuple[int, int]:
+        return self.autoscaler_module_replica_bounds.get(module_name.lower(), (self.autoscaler_min_replicas, self.autoscaler_max_replicas))
+
+
+def _get_int_env(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise EnvironmentVariableError(f"{name} must be an integer, got {value}")
+
+
+def _get_float_env(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise EnvironmentVariableError(f"{name} must be a number, got {value}")
+
+
+def _get_module_replica_bounds(name: str) -> dict[str, tuple[int, int]]:
+    """
+    Parse per-module replica bounds in the form "ModuleA=1:4,ModuleB=2:2". Module names are not case-sensitive.
+    """
+    bounds = {}
+    for entry in filter(None, (part.strip() for part in os.environ.get(name, "").split(","))):
+        module_name, _, min_max = entry.partition("=")
+        minimum, _, maximum = min_max.partition(":")
+        try:
+            minimum, maximum = int(minimum), int(maximum)
+        except ValueError:
+            minimum, maximum = 1, 0
+        if not module_name.strip() or minimum > maximum:
+            raise EnvironmentVariableError(f"{name} entries must look like ModuleName=min:max with min <= max, got {entry}")
+        bounds[module_name.strip().lower()] = (minimum, maximum)
+    return bounds
+
+
+def _get_cache_policies() -> dict[str, CachePolicy]:
+    policies = {}
+    for name, default in default_cache_policies().items():
+        prefix = f"CACHE_{name.upper()}"
+        policies[name] = CachePolicy(ttl=_get_int_env(f"{prefix}_TTL", default.ttl), maxsize=_get_int_env(f"{prefix}_MAXSIZE", default.maxsize))
+    return policies
+
+
+def _get_bulkhead_policies() -> dict[str, BulkheadPolicy]:
+    policies = {}
+    for name, default in default_bulkhead_policies().items():
+        prefix = f"BULKHEAD_{name.upper()}"
+        policy = BulkheadPolicy(
+            max_concurrency=_get_int_env(f"{prefix}_MAX_CONCURRENCY", default.max_concurrency),
+            max_queue=_get_int_env(f"{prefix}_MAX_QUEUE", default.max_queue),
+            queue_timeout=_get_float_env(f"{prefix}_QUEUE_TIMEOUT", default.queue_timeout),
+        )
+        if policy.max_concurrency < 1 or policy.max_queue < 0 or policy.queue_timeout < 0:
+            raise EnvironmentVariableError(f"{prefix}_MAX_CONCURRENCY must be at least 1, and {prefix}_MAX_QUEUE and {prefix}_QUEUE_TIMEOUT must not be negative")
+        policies[name] = policy
+    return policies
+
+
+def _get_circuit_breaker_policies() -> dict[str, CircuitBreakerPolicy]:
+    policies = {}
+    for name, default in default_circuit_breaker_policies().items():
+        prefix = f"CIRCUIT_BREAKER_{name.upper()}"
+        policy = CircuitBreakerPolicy(
+            failure_threshold=_get_int_env(f"{prefix}_FAILURE_THRESHOLD", default.failure_threshold),
+            reset_timeout=_get_float_env(f"{prefix}_RESET_TIMEOUT", default.reset_timeout),
+            call_timeout=_get_float_env(f"{prefix}_CALL_TIMEOUT", default.call_timeout),
+        )
+        if policy.failure_threshold < 1 or policy.reset_timeout < 0 or policy.call_timeout <= 0:
+            raise EnvironmentVariableError(f"{prefix}_FAILURE_THRESHOLD must be at least 1, {prefix}_RESET_TIMEOUT must not be negative and {prefix}_CALL_TIMEOUT must be positive")
+        policies[name] = policy
+    return policies
+
+
+def _get_request_deadlines() -> dict[str, float]:
+    deadlines = {}
+    for name, default in default_request_deadlines().items():
+        seconds = _get_float_env(f"REQUEST_DEADLINE_{name.upper()}_SECONDS", default)
+        if seconds < 0:
+            raise EnvironmentVariableError(f"REQUEST_DEADLINE_{name.upper()}_SECONDS must not be negative")
+        deadlines[name] = seconds
+    return deadlines
+
+
+def _get_rate_limit_policies() -> dict[str, RateLimitPolicy]:
+    policies = {}
+    for name, default in default_rate_limit_policies().items():
+        prefix = f"RATE_LIMIT_{name.upper()}"
+        key = os.environ.get(f"{prefix}_KEY")
+        policy = RateLimitPolicy(
+            rate=_get_float_env(f"{prefix}_RATE", default.rate),
+            burst=_get_int_env(f"{prefix}_BURST", default.burst),
+            key=tuple(part.strip() for part in key.split(",") if part.strip()) if key else default.key,
+        )
+        if policy.rate < 0 or policy.burst < 1:
+            raise EnvironmentVariableError(f"{prefix}_RATE must not be negative and {prefix}_BURST must be at least 1")
+        if not policy.key or not set(policy.key) <= set(RATE_LIMIT_KEYS):
+            raise EnvironmentVariableError(f"{prefix}_KEY must be a comma separated list of {', '.join(RATE_LIMIT_KEYS)}, got {key}")
+        if policy.rate > 0 and "ip" in policy.key and not os.environ.get("FORWARDED_ALLOW_IPS"):
+            raise EnvironmentVariableError(f"FORWARDED_ALLOW_IPS must be set to the IPs of the ingress controller when {prefix}_KEY includes ip")
+        policies[name] = policy
+    return policies
+
+
+def _get_catalog_hedge_policies() -> dict[str, HedgePolicy]:
+    policies = {}
+    for name, default in default_catalog_hedge_policies().items():
+        prefix = f"CATALOG_HEDGE_{name.upper()}"
+        policy = HedgePolicy(
+            budget=_get_float_env(f"{prefix}_BUDGET", default.budget),
+            quantile=_get_float_env(f"{prefix}_QUANTILE", default.quantile),
+            min_delay=_get_float_env(f"{prefix}_MIN_DELAY", default.min_delay),
+        )
+        if not 0 <= policy.budget <= 1 or not 0 < policy.quantile < 1 or policy.min_delay < 0:
+            raise EnvironmentVariableError(f"{prefix}_BUDGET must be between 0 and 1, {prefix}_QUANTILE between 0 and 1 exclusive and {prefix}_MIN_DELAY must not be negative")
+        policies[name] = policy
+    return policies
 
 
 @lru_cache(maxsize=None)
@@ -76,6 +436,25 @@ def get_settings() -> Settings:
     if "KUBECONFIG" not in os.environ and "USE_INCLUSTER_CONFIG" not in os.environ:
         raise EnvironmentVariableError("At least one of the environment variables 'KUBECONFIG' or 'USE_INCLUSTER_CONFIG' must be set")
 
+    if os.environ.get("AUTOSCALER_ENABLED", "").lower() == "true" and not os.environ.get("PROMETHEUS_URL"):
+        raise EnvironmentVariableError("PROMETHEUS_URL must be set to read request metrics when AUTOSCALER_ENABLED is true")
+
+    leader_election_lease_seconds = _get_int_env("LEADER_ELECTION_LEASE_SECONDS", 15)
+    leader_election_renew_seconds = _get_int_env("LEADER_ELECTION_RENEW_SECONDS", 5)
+    if not 0 < leader_election_renew_seconds < leader_election_lease_seconds:
+        raise EnvironmentVariableError("LEADER_ELECTION_RENEW_SECONDS must be positive and less than LEADER_ELECTION_LEASE_SECONDS")
+
+    # The wizard request activity is kept per process, so with several workers or replicas the leader only sees part of it
+    if os.environ.get("LEADER_ELECTION_ENABLED", "").lower() == "true" or _get_int_env("WEB_CONCURRENCY", 1) > 1:
+        for controller in ("IDLE_REAPER_ENABLED", "RELEASE_WATCHER_ENABLED"):
+            if os.environ.get(controller, "").lower() == "true" and not os.environ.get("PROMETHEUS_URL"):
+                raise EnvironmentVariableError(f"PROMETHEUS_URL must be set to read request metrics when {controller} is true with LEADER_ELECTION_ENABLED or WEB_CONCURRENCY > 1")
+
+    try:
+        module_profiles = load_module_profiles(os.environ.get("MODULE_PROFILES_FILE"))
+    except ValueError as e:
+        raise EnvironmentVariableError(f"MODULE_PROFILES_FILE is not valid: {e}")
+
     return Settings(
         admin_roles=admin_roles,
         auth_service_url=os.environ.get("AUTH_SERVICE_URL"),
@@ -92,4 +471,46 @@ def get_settings() -> Settings:
         root_path=os.environ.get("ROOT_PATH"),
         use_incluster_config=os.environ.get("USE_INCLUSTER_CONFIG", "").lower() == "true",
         vcs_ref=os.environ.get("GIT_COMMIT_HASH", "unknown"),
+        cache_policies=_get_cache_policies(),
+        prometheus_url=os.environ.get("PROMETHEUS_URL") or None,
+        dynamic_service_modules_refresh_seconds=_get_int_env("CATALOG_DYNAMIC_SERVICE_MODULES_REFRESH_SECONDS", 60),
+        idle_reaper_enabled=os.environ.get("IDLE_REAPER_ENABLED", "").lower() == "true",
+        idle_reaper_idle_seconds=_get_int_env("IDLE_REAPER_IDLE_SECONDS", 7 * 24 * 60 * 60),
+        idle_reaper_interval_seconds=_get_int_env("IDLE_REAPER_INTERVAL_SECONDS", 300),
+        wake_timeout_seconds=_get_int_env("WAKE_TIMEOUT_SECONDS", 60),
+        autoscaler_enabled=os.environ.get("AUTOSCALER_ENABLED", "").lower() == "true",
+        autoscaler_interval_seconds=_get_int_env("AUTOSCALER_INTERVAL_SECONDS", 30),
+        autoscaler_metrics_window_seconds=_get_int_env("AUTOSCALER_METRICS_WINDOW_SECONDS", 120),
+        autoscaler_scale_up_window_seconds=_get_int_env("AUTOSCALER_SCALE_UP_WINDOW_SECONDS", 0),
+        autoscaler_scale_down_window_seconds=_get_int_env("AUTOSCALER_SCALE_DOWN_WINDOW_SECONDS", 300),
+        autoscaler_target_requests_per_second=_get_float_env("AUTOSCALER_TARGET_REQUESTS_PER_SECOND", 10.0),
+        autoscaler_target_latency_seconds=_get_float_env("AUTOSCALER_TARGET_LATENCY_SECONDS", 1.0),
+        autoscaler_min_replicas=_get_int_env("AUTOSCALER_MIN_REPLICAS", 1),
+        autoscaler_max_replicas=_get_int_env("AUTOSCALER_MAX_REPLICAS", 3),
+        autoscaler_module_replica_bounds=_get_module_replica_bounds("AUTOSCALER_MODULE_REPLICA_BOUNDS"),
+        module_profiles=module_profiles,
+        image_prepull_enabled=os.environ.get("IMAGE_PREPULL_ENABLED", "").lower() == "true",
+        image_prepull_interval_seconds=_get_int_env("IMAGE_PREPULL_INTERVAL_SECONDS", 300),
+        image_prepull_window_seconds=_get_int_env("IMAGE_PREPULL_WINDOW_SECONDS", 7 * 24 * 60 * 60),
+        image_prepull_min_starts=_get_int_env("IMAGE_PREPULL_MIN_STARTS", 2),
+        image_prepull_max_images=_get_int_env("IMAGE_PREPULL_MAX_IMAGES", 20),
+        image_prepull_pause_image=os.environ.get("IMAGE_PREPULL_PAUSE_IMAGE") or "registry.k8s.io/pause:3.9",
+        release_watcher_enabled=os.environ.get("RELEASE_WATCHER_ENABLED", "").lower() == "true",
+        release_watcher_interval_seconds=_get_int_env("RELEASE_WATCHER_INTERVAL_SECONDS", 300),
+        release_watcher_tags=tuple(tag.strip() for tag in os.environ.get("RELEASE_WATCHER_TAGS", "release,beta").split(",") if tag.strip()),
+        release_watcher_drain_seconds=_get_int_env("RELEASE_WATCHER_DRAIN_SECONDS", 3600),
+        k8s_list_page_size=_get_int_env("K8S_LIST_PAGE_SIZE", 100),
+        warmup_enabled=os.environ.get("WARMUP_ENABLED", "").lower() == "true",
+        warmup_deadline_seconds=_get_int_env("WARMUP_DEADLINE_SECONDS", 60),
+        leader_election_enabled=os.environ.get("LEADER_ELECTION_ENABLED", "").lower() == "true",
+        leader_election_lease_name=os.environ.get("LEADER_ELECTION_LEASE_NAME") or "service-wizard2-leader",
+        leader_election_lease_seconds=leader_election_lease_seconds,
+        leader_election_renew_seconds=leader_election_renew_seconds,
+        bulkhead_policies=_get_bulkhead_policies(),
+        rate_limit_policies=_get_rate_limit_policies(),
+        rate_limit_max_keys=_get_int_env("RATE_LIMIT_MAX_KEYS", 10000),
+        circuit_breaker_policies=_get_circuit_breaker_policies(),
+        request_deadlines=_get_request_deadlines(),
+        request_deadline_max_seconds=_get_float_env("REQUEST_DEADLINE_MAX_SECONDS", 300),
+        catalog_hedge_policies=_get_catalog_hedge_policies(),
     )
@@ -0,0 +1,185 @@
+import logging
+import math
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI
+from prometheus_client import Counter, Gauge
+
+from clients.PrometheusClient import PrometheusClient
+from clients.metrics import get_or_create_metric
+from configs.settings import Settings
+from dependencies.background import PeriodicTask, background_request
+from dependencies.k8_wrapper import iter_k8s_deployments, scale_listed_deployment
+
+if TYPE_CHECKING:
+    from kubernetes.client import V1Deployment
+
+scaling_decisions_total = get_or_create_metric(Counter, "service_wizard_autoscaler_decisions_total", "Replica changes made by the autoscaler", ("module", "direction"))
+desired_replicas = get_or_create_metric(Gauge, "service_wizard_autoscaler_desired_replicas", "Replicas the autoscaler wants for a dynamic service", ("module",))
+observed_requests_per_second = get_or_create_metric(
+    Gauge, "service_wizard_autoscaler_requests_per_second", "Request rate of a dynamic service as seen by the autoscaler", ("module",)
+)
+
+
+@dataclass(frozen=True)
+class ServiceLoad:
+    requests_per_second: float
+    latency_seconds: float | None = None  # 95th percentile, None if unknown
+
+
+class RequestMetricsSource:
+    """
+    Where the autoscaler gets the load of each dynamic service from. Subclass this to plug in another source.
+    """
+
+    def sample(self, window_seconds: int) -> dict[str, ServiceLoad]:  # pragma: no cover
+        """
+        :param window_seconds: The window to average the load over
+        :return: The load of each dynamic service that received requests, keyed by kubernetes service name
+        """
+        raise NotImplementedError
+
+
+class PrometheusIngressMetricsSource(RequestMetricsSource):
+    """
+    Reads the request rate and 95th percentile latency of each dynamic service from the ingress-nginx metrics in Prometheus.
+    """
+
+    def __init__(self, prometheus_client: PrometheusClient, namespace: str):
+        self.prometheus_client = prometheus_client
+        self.namespace = namespace
+
+    def sample(self, window_seconds: int) -> dict[str, ServiceLoad]:
+        selector = f'{{exported_namespace="{self.namespace}"}}'
+        rates = self.prometheus_client.query_by_label(f"sum by (service) (rate(nginx_ingress_controller_requests{selector}[{window_seconds}s]))", "service")
+        latencies = self.prometheus_client.query_by_label(
+            f"histogram_quantile(0.95, sum by (service, le) (rate(nginx_ingress_controller_request_duration_seconds_bucket{selector}[{window_seconds}s])))", "service"
+        )
+        return {
+            service: ServiceLoad(requests_per_second=rate, latency_seconds=None if math.isnan(latencies.get(service, math.nan)) else latencies[service])
+            for service, rate in rates.items()
+        }
+
+
+@dataclass(frozen=True)
+class ScalingDecision:
+    deployment_name: str
+    module_name: str
+    current_replicas: int
+    desired_replicas: int
+    requests_per_second: float
+    latency_seconds: float | None
+
+
+class Autoscaler(PeriodicTask):
+    """
+    Scales running dynamic services between their minimum and maximum replicas based on their request rate and latency.
+
+    Each run computes the replicas a service needs to stay under the target requests per second per replica, adding a
+    replica while the 95th percentile latency is above the target. Like the kubernetes HPA, recommendations are
+    stabilized: a service is only scaled up to the lowest recommendation of the scale-up window, and only scaled down to
+    the highest recommendation of the scale-down window.
+    Services scaled to 0 are left alone, waking them up is up to start and get_service_status.
+    """
+
+    name = "autoscaler"
+
+    def __init__(self, app: FastAPI, settings: Settings, metrics_source: RequestMetricsSource | None = None):
+        super().__init__(interval_seconds=settings.autoscaler_interval_seconds)
+        self.app = app
+        self.settings = settings
+        self.metrics_source = metrics_source or PrometheusIngressMetricsSource(PrometheusClient(settings.prometheus_url), settings.namespace)
+        self._recommendations: dict[str, deque[tuple[float, int]]] = defaultdict(deque)
+
+    def recommend(self, module_name: str, current_replicas: int, load: ServiceLoad | None) -> int:
+        """
+        :return: The replicas the service needs for `load`, within the module's bounds
+        """
+        minimum, maximum = self.settings.autoscaler_replica_bounds(module_name)
+        minimum = max(minimum, 1)
+        if load is None:
+            return minimum
+        wanted = math.ceil(load.requests_per_second / self.settings.autoscaler_target_requests_per_second)
+        if load.requests_per_second > 0 and load.latency_seconds is not None and load.latency_seconds > self.settings.autoscaler_target_latency_seconds:
+            wanted = max(wanted, current_replicas + 1)
+        return min(max(wanted, minimum), maximum)
+
+    def stabilize(self, deployment_name: str, current_replicas: int, recommendation: int, now: float) -> int:
+        """
+        Record a recommendation and return the replicas to scale to, taking the scale-up and scale-down windows into account.
+        A service is only scaled once recommendations have been seen for the whole window.
+        """
+        history = self._recommendations[deployment_name]
+        history.append((now, recommendation))
+        up_window, down_window = self.settings.autoscaler_scale_up_window_seconds, self.settings.autoscaler_scale_down_window_seconds
+        # Keep the newest recommendation from before the longest window, it shows whether the history covers the window
+        oldest = now - max(up_window, down_window)
+        while len(history) > 1 and history[1][0] <= oldest:
+            history.popleft()
+
+        def window(seconds: int) -> list[int] | None:
+            # None until there are recommendations for the whole window, e.g. right after the service wizard started
+            if seconds and history[0][0] > now - seconds:
+                return None
+            return [r for t, r in history if t >= now - seconds]
+
+        scale_up_window, scale_down_window = window(up_window), window(down_window)
+        if scale_up_window and min(scale_up_window) > current_replicas:
+            return min(scale_up_window)
+        if scale_down_window and max(scale_down_window) < current_replicas:
+            return max(scale_down_window)
+        return current_replicas
+
+    def _running_deployments(self, request) -> list["V1Deployment"]:
+        return [
+            d
+            for d in iter_k8s_deployments(request)
+            if d.spec.replicas and (d.metadata.annotations or {}).get("module_name") and (d.metadata.annotations or {}).get("git_commit_hash")
+        ]
+
+    def run_once(self, now: float | None = None) -> list[ScalingDecision]:
+        """
+        Sample the load of every running dynamic service and scale the ones that need it.
+        :return: The scaling decisions that were applied
+        """
+        now = time.monotonic() if now is None else now
+        try:
+            loads = self.metrics_source.sample(self.settings.autoscaler_metrics_window_seconds)
+        except Exception:
+            logging.exception("Failed to sample dynamic service load, skipping this autoscaler run")
+            return []
+
+        request = background_request(self.app)
+        decisions = []
+        running = self._running_deployments(request)
+        # Forget services that were stopped or deleted, they start over with a fresh history
+        for deployment_name in set(self._recommendations) - {d.metadata.name for d in running}:
+            del self._recommendations[deployment_name]
+        for deployment in running:
+            if self.stopping:
+                break
+            annotations = deployment.metadata.annotations
+            module_name, current = annotations["module_name"], deployment.spec.replicas
+            load = loads.get(annotations.get("k8s_service_name"))
+            target = self.stabilize(deployment.metadata.name, current, self.recommend(module_name, current, load), now)
+            desired_replicas.labels(module_name).set(target)
+            observed_requests_per_second.labels(module_name).set(load.requests_per_second if load else 0)
+            if target == current:
+                continue
+
+            decision = ScalingDecision(deployment.metadata.name, module_name, current, target, load.requests_per_second if load else 0.0, load.latency_seconds if load else None)
+            logging.info(
+                f"Autoscaler scaling {decision.deployment_name} from {current} to {target} replicas "
+                f"({decision.requests_per_second:.2f} requests/s, p95 latency {decision.latency_seconds}s)"
+            )
+            try:
+                scale_listed_deployment(request, deployment, replicas=target)
+            except Exception:
+                logging.exception(f"Failed to scale {decision.deployment_name} to {target} replicas")
+                continue
+            scaling_decisions_total.labels(module_name, "up" if target > current else "down").inc()
+            decisions.append(decision)
+        return decisions
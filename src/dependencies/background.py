@@ -0,0 +1,71 @@
+import logging
+import threading
+
+from fastapi import FastAPI, Request
+
+
+def background_request(app: FastAPI) -> Request:
+    """
+    Build a request that is not tied to a client connection, for background tasks that reuse the dependency functions.
+    They only read `request.app.state`.
+    :param app: The app whose state holds the settings and clients
+    :return: A request for the app
+    """
+    return Request({"type": "http", "app": app, "headers": [], "method": "GET", "path": "/", "query_string": b""})
+
+
+class PeriodicTask:
+    """
+    Runs `run_once` every `interval_seconds` in a daemon thread until stopped.
+    Exceptions are logged and do not stop the task. A task that is started again while its thread is still finishing a
+    run after stop() keeps that thread, so there is never more than one run at a time.
+    """
+
+    name = "periodic-task"
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def stopping(self) -> bool:
+        """Whether the task was asked to stop, runs that act on many items check it between items"""
+        return self._stopped.is_set()
+
+    def run_once(self):  # pragma: no cover
+        raise NotImplementedError
+
+    def _run(self):
+        while True:
+            if self._stopped.wait(self.interval_seconds):
+                with self._lock:
+                    # start() may have resumed the task while it was finishing a run
+                    if self._stopped.is_set():
+                        self._thread = None
+                        return
+                continue
+            try:
+                self.run_once()
+            except Exception:
+                logging.exception(f"{self.name} failed")
+
+    def start(self):
+        with self._lock:
+            self._stopped.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float | None = 5):
+        """
+        Stop the task and wait for its current run to finish.
+        :param timeout: How long to wait, the thread is kept and stops after its run if it takes longer
+        """
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout)
+            if thread.is_alive():
+                logging.warning(f"{self.name} is still running after {timeout} seconds, it stops after its current run")
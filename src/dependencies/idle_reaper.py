@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI, Request
+from prometheus_client import Counter, Gauge
+
+from clients.PrometheusClient import PrometheusClient
+from clients.metrics import get_or_create_metric
+from configs.settings import Settings
+from dependencies.background import PeriodicTask, background_request
+from dependencies.k8_wrapper import iter_k8s_deployments, sanitize_deployment_name, scale_listed_deployment
+
+if TYPE_CHECKING:
+    from kubernetes.client import V1Deployment
+
+scaled_to_zero_total = get_or_create_metric(Counter, "service_wizard_idle_reaper_scaled_to_zero_total", "Dynamic services scaled to 0 by the idle reaper")
+reclaimed_cpu_cores_total = get_or_create_metric(
+    Counter, "service_wizard_idle_reaper_reclaimed_cpu_cores_total", "CPU cores requested by the dynamic services the idle reaper scaled to 0"
+)
+reclaimed_memory_bytes_total = get_or_create_metric(
+    Counter, "service_wizard_idle_reaper_reclaimed_memory_bytes_total", "Memory bytes requested by the dynamic services the idle reaper scaled to 0"
+)
+idle_services = get_or_create_metric(Gauge, "service_wizard_idle_reaper_idle_services", "Running dynamic services that were idle at the last idle reaper run")
+
+
+class ActivityTracker:
+    """
+    Remembers when each dynamic service deployment was last requested through the service wizard.
+    """
+
+    def __init__(self):
+        self._last_requested: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, deployment_name: str, when: float | None = None):
+        with self._lock:
+            self._last_requested[deployment_name] = time.time() if when is None else when
+
+    def last_requested(self, deployment_name: str) -> float | None:
+        return self._last_requested.get(deployment_name)
+
+
+def record_module_activity(request: Request, module_name: str, git_commit_hash: str):
+    """
+    Record that a dynamic service was requested, so that the idle reaper leaves it running.
+    :param request: The request object
+    :param module_name: The module name
+    :param git_commit_hash: The git commit hash of the module version that was requested
+    """
+    deployment_name, _ = sanitize_deployment_name(module_name, git_commit_hash)
+    request.app.state.activity_tracker.record(deployment_name)
+
+
+class PrometheusIngressActivitySource:
+    """
+    Reads ingress-nginx request counts from Prometheus, to catch traffic that goes straight to the dynamic services
+    through the ingress instead of through the service wizard.
+    """
+
+    def __init__(self, prometheus_client: PrometheusClient, namespace: str):
+        self.prometheus_client = prometheus_client
+        self.namespace = namespace
+
+    def active_services(self, window_seconds: int) -> set[str]:
+        """
+        :param window_seconds: How far back to look for requests
+        :return: The names of the kubernetes services that received requests in the window
+        :raises requests.RequestException: If Prometheus can't be queried
+        """
+        query = f'sum by (service) (increase(nginx_ingress_controller_requests{{exported_namespace="{self.namespace}"}}[{window_seconds}s]))'
+        return {service for service, requests in self.prometheus_client.query_by_label(query, "service").items() if requests > 0}
+
+
+@dataclass(frozen=True)
+class ReclaimedService:
+    deployment_name: str
+    module_name: str
+    git_commit_hash: str
+    idle_seconds: float
+    cpu_cores: Decimal
+    memory_bytes: Decimal
+
+
+def requested_resources(deployment: "V1Deployment") -> tuple[Decimal, Decimal]:
+    """
+    Sum the CPU cores and memory bytes requested by all replicas of a deployment, falling back to the limits
+    for containers without requests.
+    :param deployment: The deployment
+    :return: CPU cores, memory bytes
+    """
+    from kubernetes.utils import parse_quantity
+
+    cpu, memory = Decimal(0), Decimal(0)
+    for container in deployment.spec.template.spec.containers or []:
+        resources = container.resources
+        amounts = {**((resources and resources.limits) or {}), **((resources and resources.requests) or {})}
+        cpu += parse_quantity(amounts.get("cpu", 0))
+        memory += parse_quantity(amounts.get("memory", 0))
+    replicas = deployment.spec.replicas or 0
+    return cpu * replicas, memory * replicas
+
+
+class IdleReaper(PeriodicTask):
+    """
+    Scales running dynamic services to 0 once they have not been requested for `idle_seconds`.
+    A service counts as requested when it was looked up through the service wizard (see ActivityTracker), or, if
+    a Prometheus URL is configured, when ingress-nginx served requests for it.
+    Deployments are never idle for less than `idle_seconds` after they were created or after the reaper started,
+    as the activity of the previous service wizard process is not known.
+    """
+
+    name = "idle-reaper"
+
+    def __init__(self, app: FastAPI, settings: Settings, activity_source: PrometheusIngressActivitySource | None = None):
+        super().__init__(interval_seconds=settings.idle_reaper_interval_seconds)
+        self.app = app
+        self.settings = settings
+        self.idle_seconds = settings.idle_reaper_idle_seconds
+        self.activity_source = activity_source
+        if activity_source is None and settings.prometheus_url:
+            self.activity_source = PrometheusIngressActivitySource(PrometheusClient(settings.prometheus_url), settings.namespace)
+        self.started_at = time.time()
+
+    def _last_active(self, deployment: "V1Deployment", active_services: set[str]) -> float:
+        annotations = deployment.metadata.annotations or {}
+        if annotations.get("k8s_service_name") in active_services:
+            return time.time()
+        candidates = [self.started_at, self.app.state.activity_tracker.last_requested(deployment.metadata.name) or 0]
+        if deployment.metadata.creation_timestamp is not None:
+            candidates.append(deployment.metadata.creation_timestamp.timestamp())
+        return max(candidates)
+
+    def run_once(self) -> list[ReclaimedService]:
+        """
+        Scale every idle dynamic service to 0.
+        :return: The services that were scaled down and the resources they had requested
+        """
+        run_started = time.time()
+        if self.activity_source is not None:
+            try:
+                active_services = self.activity_source.active_services(self.idle_seconds)
+            except Exception:
+                # Without the ingress metrics we can't tell whether a service is in use, so don't scale anything down
+                logging.exception("Failed to read ingress activity, skipping this idle reaper run")
+                return []
+        else:
+            active_services = set()
+
+        request = background_request(self.app)
+        now = time.time()
+        idle = []
+        for deployment in iter_k8s_deployments(request):
+            annotations = deployment.metadata.annotations or {}
+            if not deployment.spec.replicas or not annotations.get("module_name") or not annotations.get("git_commit_hash"):
+                continue
+            idle_for = now - self._last_active(deployment, active_services)
+            if idle_for >= self.idle_seconds:
+                idle.append((deployment, idle_for))
+        idle_services.set(len(idle))
+
+        reclaimed = []
+        for deployment, idle_for in idle:
+            if self.stopping:
+                break
+            # The listing and the ingress activity are from the start of the run, the service may have been requested since
+            if (self.app.state.activity_tracker.last_requested(deployment.metadata.name) or 0) >= run_started:
+                continue
+            annotations = deployment.metadata.annotations
+            cpu, memory = requested_resources(deployment)
+            try:
+                scale_listed_deployment(request, deployment, replicas=0)
+            except Exception:
+                logging.exception(f"Failed to scale idle deployment {deployment.metadata.name} to 0")
+                continue
+            scaled_to_zero_total.inc()
+            reclaimed_cpu_cores_total.inc(float(cpu))
+            reclaimed_memory_bytes_total.inc(float(memory))
+            reclaimed.append(ReclaimedService(deployment.metadata.name, annotations["module_name"], annotations["git_commit_hash"], idle_for, cpu, memory))
+
+        if reclaimed:
+            logging.info(
+                f"Idle reaper scaled {len(reclaimed)} dynamic services to 0, reclaiming {sum(r.cpu_cores for r in reclaimed)} CPU cores and "
+                f"{sum(r.memory_bytes for r in reclaimed)} bytes of memory: {', '.join(r.deployment_name for r in reclaimed)}"
+            )
+        return reclaimed
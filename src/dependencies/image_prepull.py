@@ -0,0 +1,205 @@
+import bisect
+import logging
+import threading
+import time
+from collections import Counter as StartCounter, defaultdict, deque
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI, Request
+from prometheus_client import Counter, Gauge
+
+from clients.KubernetesClients import get_k8s_app_client
+from clients.metrics import get_or_create_metric
+from configs.settings import Settings
+from dependencies.background import PeriodicTask, background_request
+from dependencies.k8_wrapper import iter_k8s_deployments
+from dependencies.wakeup import START_REQUESTED_AT_ANNOTATION
+
+if TYPE_CHECKING:
+    from kubernetes import client
+
+PREPULLER_NAME = "service-wizard-image-prepuller"
+PREPULLER_LABELS = {"app.kubernetes.io/name": PREPULLER_NAME, "app.kubernetes.io/managed-by": "service-wizard2"}
+
+image_starts_total = get_or_create_metric(
+    Counter, "service_wizard_image_prepull_starts_total", "Dynamic service starts, by whether their image was kept pulled by the image pre-puller", ("result",)
+)
+prepulled_images = get_or_create_metric(Gauge, "service_wizard_image_prepull_images", "Images the image pre-puller keeps pulled on the dynamic service nodes")
+
+
+class ImageStartTracker:
+    """
+    Remembers when the image of each dynamic service was started, and which images the image pre-puller currently keeps pulled.
+    """
+
+    def __init__(self):
+        self._starts: dict[str, deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        # None until the image pre-puller has run, starts are not counted as hits or misses before that
+        self.prepulled: frozenset[str] | None = None
+
+    def record(self, image: str, when: float | None = None):
+        with self._lock:
+            # Starts are seen out of order across deployments, keep them sorted so the old ones can be dropped from the left
+            bisect.insort(self._starts[image], time.time() if when is None else when)
+        if self.prepulled is not None:
+            image_starts_total.labels("hit" if image in self.prepulled else "miss").inc()
+
+    def hot_images(self, window_seconds: int, min_starts: int, limit: int, now: float | None = None) -> list[str]:
+        """
+        Forget starts older than the window and return the most started images.
+        :param window_seconds: How far back to count starts
+        :param min_starts: How many times an image must have been started in the window to be hot
+        :param limit: The maximum number of images to return
+        :param now: The current time, defaults to time.time()
+        :return: The hot images, most started first
+        """
+        cutoff = (time.time() if now is None else now) - window_seconds
+        counts = StartCounter()
+        with self._lock:
+            for image in list(self._starts):
+                starts = self._starts[image]
+                while starts and starts[0] < cutoff:
+                    starts.popleft()
+                if not starts:
+                    del self._starts[image]
+                elif len(starts) >= min_starts:
+                    counts[image] = len(starts)
+        return [image for image, _ in counts.most_common(limit)]
+
+
+def deployment_starts(deployment: "client.V1Deployment") -> list[float]:
+    """
+    The times the pods of a dynamic service deployment were started from nothing, which is when the image is pulled on a
+    node that does not have it: when the deployment was created, and when it was last woken up from 0 replicas.
+    """
+    starts = []
+    if deployment.metadata.creation_timestamp:
+        starts.append(deployment.metadata.creation_timestamp.timestamp())
+    woken_at = (deployment.metadata.annotations or {}).get(START_REQUESTED_AT_ANNOTATION)
+    if woken_at:
+        try:
+            starts.append(datetime.strptime(woken_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp())
+        except ValueError:
+            logging.warning(f"Ignoring the {START_REQUESTED_AT_ANNOTATION} annotation of deployment {deployment.metadata.name}: {woken_at!r}")
+    return starts
+
+
+def prepuller_daemonset(settings: Settings, images: list[str]) -> "client.V1DaemonSet":
+    """
+    Build a DaemonSet that pulls `images` on every node dynamic services can be scheduled on. Each image is pulled by an
+    init container that exits right away, the pod then idles in a pause container so the images are not garbage collected.
+    """
+    from kubernetes import client
+
+    init_containers = [
+        client.V1Container(
+            name=f"pull-{i}",
+            image=image,
+            image_pull_policy="IfNotPresent",
+            command=["sh", "-c", "exit 0"],
+            resources=client.V1ResourceRequirements(requests={"cpu": "10m", "memory": "16Mi"}, limits={"cpu": "100m", "memory": "64Mi"}),
+        )
+        for i, image in enumerate(images)
+    ]
+    pause = client.V1Container(
+        name="pause", image=settings.image_prepull_pause_image, resources=client.V1ResourceRequirements(requests={"cpu": "1m", "memory": "8Mi"}, limits={"memory": "16Mi"})
+    )
+    # The same toleration as the dynamic services, so the images are pulled on the nodes they run on
+    toleration = client.V1Toleration(effect="NoSchedule", key=settings.namespace, operator="Exists")
+    template = client.V1PodTemplateSpec(
+        metadata=client.V1ObjectMeta(labels=PREPULLER_LABELS),
+        spec=client.V1PodSpec(init_containers=init_containers, containers=[pause], tolerations=[toleration], termination_grace_period_seconds=0),
+    )
+    spec = client.V1DaemonSetSpec(selector=client.V1LabelSelector(match_labels=PREPULLER_LABELS), template=template)
+    return client.V1DaemonSet(api_version="apps/v1", kind="DaemonSet", metadata=client.V1ObjectMeta(name=PREPULLER_NAME, labels=PREPULLER_LABELS), spec=spec)
+
+
+def daemonset_images(daemonset: "client.V1DaemonSet | None") -> list[str]:
+    if daemonset is None:
+        return []
+    return [container.image for container in daemonset.spec.template.spec.init_containers or []]
+
+
+class ImagePrePuller(PeriodicTask):
+    """
+    Keeps the images of frequently started dynamic services pulled on the dynamic service nodes, so that starting them
+    on a node does not wait for a registry pull of several GB.
+
+    Starts are read from the dynamic service deployments, so they are seen the same way whichever worker or replica
+    started the service: each run counts the creations and wake-ups it has not counted yet. A deployment only keeps its
+    last wake-up, so wake-ups of the same deployment less than an interval apart are counted once.
+    Each run then picks the images that were started at least `min_starts` times in the window, up to `max_images`, and
+    updates the pre-puller DaemonSet when they changed. The DaemonSet is deleted when no image is hot.
+    Past wake-ups are only remembered in memory, so after a restart the images of the existing DaemonSet are kept for one window.
+    """
+
+    name = "image pre-puller"
+
+    def __init__(self, app: FastAPI, settings: Settings):
+        super().__init__(interval_seconds=settings.image_prepull_interval_seconds)
+        self.app = app
+        self.settings = settings
+        self.tracker: ImageStartTracker = app.state.image_tracker
+        self._seeded = False
+        # The (deployment name, start time) of the starts in the window that were already recorded
+        self._counted: set[tuple[str, float]] = set()
+
+    def _read_daemonset(self, request: Request) -> "client.V1DaemonSet | None":
+        from kubernetes.client import ApiException
+
+        try:
+            return get_k8s_app_client(request).read_namespaced_daemon_set(name=PREPULLER_NAME, namespace=self.settings.namespace)
+        except ApiException as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def _record_deployment_starts(self, request: Request, now: float):
+        cutoff = now - self.settings.image_prepull_window_seconds
+        counted = set()
+        for deployment in iter_k8s_deployments(request):
+            image = deployment.spec.template.spec.containers[0].image
+            for started in deployment_starts(deployment):
+                key = (deployment.metadata.name, started)
+                if started < cutoff:
+                    continue
+                if key not in self._counted:
+                    self.tracker.record(image, when=started)
+                counted.add(key)
+        self._counted = counted
+
+    def run_once(self, now: float | None = None) -> list[str]:
+        """
+        Update the pre-puller DaemonSet to pull the hot images.
+        :return: The images that are kept pulled
+        """
+        now = time.time() if now is None else now
+        request = background_request(self.app)
+        apps_v1_api = get_k8s_app_client(request)
+        namespace = self.settings.namespace
+        existing = self._read_daemonset(request)
+        if not self._seeded:
+            for image in daemonset_images(existing):
+                for _ in range(self.settings.image_prepull_min_starts):
+                    self.tracker.record(image, when=now)
+            self._seeded = True
+        self._record_deployment_starts(request, now)
+
+        images = sorted(self.tracker.hot_images(self.settings.image_prepull_window_seconds, self.settings.image_prepull_min_starts, self.settings.image_prepull_max_images, now))
+        if images != daemonset_images(existing):
+            if not images:
+                logging.info(f"No hot dynamic service images, deleting the {PREPULLER_NAME} DaemonSet")
+                apps_v1_api.delete_namespaced_daemon_set(name=PREPULLER_NAME, namespace=namespace)
+            elif existing is None:
+                logging.info(f"Creating the {PREPULLER_NAME} DaemonSet to pull {images}")
+                apps_v1_api.create_namespaced_daemon_set(namespace=namespace, body=prepuller_daemonset(self.settings, images))
+            else:
+                logging.info(f"Updating the {PREPULLER_NAME} DaemonSet to pull {images}")
+                body = prepuller_daemonset(self.settings, images)
+                body.metadata.resource_version = existing.metadata.resource_version
+                apps_v1_api.replace_namespaced_daemon_set(name=PREPULLER_NAME, namespace=namespace, body=body)
+        self.tracker.prepulled = frozenset(images)
+        prepulled_images.set(len(images))
+        return images
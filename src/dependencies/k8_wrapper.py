@@ -1,23 +1,11 @@
+import json
 import re
 import time
-from typing import Optional, List
+from typing import Iterator, Optional, List, TYPE_CHECKING
 
 from fastapi import Request
-from kubernetes import client
-from kubernetes.client import (
-    V1Service,
-    V1ServiceSpec,
-    V1ServicePort,
-    V1Ingress,
-    V1IngressSpec,
-    V1IngressRule,
-    ApiException,
-    V1HTTPIngressPath,
-    V1IngressBackend,
-    V1HTTPIngressRuleValue,
-    V1Toleration,
-)
 
+from clients import deadline
 from clients.KubernetesClients import (
     get_k8s_core_client,
     get_k8s_app_client,
@@ -26,14 +14,23 @@ from clients.KubernetesClients import (
     check_service_status_cache,
     populate_service_status_cache,
 )
+from configs.module_profiles import ProbeSpec
 from configs.settings import get_settings
+from models import DeploymentRecord
+
+if TYPE_CHECKING:
+    from kubernetes import client
+
+# Ask the API server for a Table of deployments with only the metadata of each row instead of the full objects,
+# falling back to the regular list if the server or a proxy in front of it does not support Table
+DEPLOYMENT_TABLE_ACCEPT = "application/json;as=Table;v=v1;g=meta.k8s.io,application/json"
 
 
 def get_pods_in_namespace(
-    k8s_client: client.CoreV1Api,
+    k8s_client: "client.CoreV1Api",
     field_selector: str | None = None,
     label_selector: str = "dynamic-service=true",
-) -> client.V1PodList:
+) -> "client.V1PodList":
     """
     Retrieve a list of pods in a specific namespace based on the provided field and label selectors.
     :param k8s_client: k8s_client (client.CoreV1Api): The Kubernetes CoreV1Api client instance.
@@ -46,7 +43,9 @@ def get_pods_in_namespace(
     return pod_list
 
 
-def v1_volume_mount_factory(mounts: List[str]) -> tuple[list[client.V1Volume], list[client.V1VolumeMount]]:
+def v1_volume_mount_factory(mounts: List[str]) -> tuple[list["client.V1Volume"], list["client.V1VolumeMount"]]:
+    from kubernetes import client
+
     volumes = []
     volume_mounts = []
 
@@ -71,6 +70,21 @@ def v1_volume_mount_factory(mounts: List[str]) -> tuple[list[client.V1Volume], l
     return volumes, volume_mounts
 
 
+def v1_probe_factory(probe: ProbeSpec | None) -> "client.V1Probe | None":
+    from kubernetes import client
+
+    if probe is None:
+        return None
+    return client.V1Probe(
+        http_get=client.V1HTTPGetAction(path=probe.path, port=probe.port) if probe.type == "http" else None,
+        tcp_socket=client.V1TCPSocketAction(port=probe.port) if probe.type == "tcp" else None,
+        initial_delay_seconds=probe.initial_delay_seconds,
+        period_seconds=probe.period_seconds,
+        timeout_seconds=probe.timeout_seconds,
+        failure_threshold=probe.failure_threshold,
+    )
+
+
 def sanitize_deployment_name(module_name: str, module_git_commit_hash: str) -> tuple[str, str]:
     """
     Create a deployment name based on the module name and git commit hash.
@@ -89,34 +103,40 @@ def sanitize_deployment_name(module_name: str, module_git_commit_hash: str) -> t
     return deployment_name, service_name
 
 
-def create_clusterip_service(request: Request, module_name: str, module_git_commit_hash: str, labels: dict[str, str]) -> client.V1Service:
+def create_clusterip_service(request: Request, module_name: str, module_git_commit_hash: str, labels: dict[str, str]) -> "client.V1Service":
+    from kubernetes import client
+
     core_v1_api = get_k8s_core_client(request)
     deployment_name, service_name = sanitize_deployment_name(module_name, module_git_commit_hash)
 
     # Define the service
-    service = V1Service(
+    service = client.V1Service(
         api_version="v1",
         kind="Service",
         metadata=client.V1ObjectMeta(
             name=service_name,
             labels=labels,
         ),
-        spec=V1ServiceSpec(
+        spec=client.V1ServiceSpec(
             selector=labels,
-            ports=[V1ServicePort(port=5000, target_port=5000)],
+            ports=[client.V1ServicePort(port=5000, target_port=5000)],
             type="ClusterIP",
         ),
     )
     return core_v1_api.create_namespaced_service(namespace=get_settings().namespace, body=service)
 
 
-def _ensure_ingress_exists(request: Request) -> V1Ingress:
+def _ensure_ingress_exists(request: Request) -> "client.V1Ingress":
     # This ensures that the main service wizard ingress exists, and if it doesn't, creates it.
     # This should only ever be called once, or if in case someone deletes the ingress for it
+    from kubernetes import client
+
     settings = request.app.state.settings
     networking_v1_api = get_k8s_networking_client(request)
-    ingress_spec = V1IngressSpec(rules=[V1IngressRule(host=settings.kbase_root_endpoint.replace("https://", "").replace("https://", ""), http=None)])  # no paths specified
-    ingress = V1Ingress(
+    ingress_spec = client.V1IngressSpec(
+        rules=[client.V1IngressRule(host=settings.kbase_root_endpoint.replace("https://", "").replace("https://", ""), http=None)]
+    )  # no paths specified
+    ingress = client.V1Ingress(
         api_version="networking.k8s.io/v1",
         kind="Ingress",
         metadata=client.V1ObjectMeta(
@@ -129,32 +149,34 @@ def _ensure_ingress_exists(request: Request) -> V1Ingress:
     )
     try:
         return networking_v1_api.read_namespaced_ingress(name="dynamic-services", namespace=settings.namespace)
-    except ApiException as e:
+    except client.ApiException as e:
         if e.status == 404:  # Ingress Not Found
             return networking_v1_api.create_namespaced_ingress(namespace=settings.namespace, body=ingress)
         raise
 
 
-def path_exists_in_ingress(ingress: V1Ingress, path: str) -> bool:
+def path_exists_in_ingress(ingress: "client.V1Ingress", path: str) -> bool:
     """Check if a path already exists in an ingress with one rule only"""
     if ingress.spec.rules and ingress.spec.rules[0].http:
         return any(existing_path.path == path for existing_path in ingress.spec.rules[0].http.paths)
     return False
 
 
-def _update_ingress_with_retries(request: Request, new_path: V1HTTPIngressPath, namespace: str, retries: int = 3):
+def _update_ingress_with_retries(request: Request, new_path: "client.V1HTTPIngressPath", namespace: str, retries: int = 3):
+    from kubernetes import client
+
     for attempt in range(retries):
         try:
             ingress = _ensure_ingress_exists(request)
             # Initialize http attribute with an empty paths list if it is None
             if ingress.spec.rules[0].http is None:
-                ingress.spec.rules[0].http = V1HTTPIngressRuleValue(paths=[])
+                ingress.spec.rules[0].http = client.V1HTTPIngressRuleValue(paths=[])
             # Only append the path if it doesn't exist already
             if not path_exists_in_ingress(ingress, new_path.path):
                 ingress.spec.rules[0].http.paths.append(new_path)
             get_k8s_networking_client(request).replace_namespaced_ingress(name=ingress.metadata.name, namespace=namespace, body=ingress)
             break  # if the operation was successful, break the retry loop
-        except ApiException as e:
+        except client.ApiException as e:
             if e.status in {409, 422} and attempt < retries - 1:
                 # Sleep and retry if the error is a conflict, and we haven't reached the max retries
                 time.sleep(1)
@@ -163,18 +185,32 @@ def _update_ingress_with_retries(request: Request, new_path: V1HTTPIngressPath,
 
 
 def update_ingress_to_point_to_service(request: Request, module_name: str, git_commit_hash: str):
+    from kubernetes import client
+
     settings = request.app.state.settings
     namespace = settings.namespace
     deployment_name, service_name = sanitize_deployment_name(module_name, git_commit_hash)
     # Need to sync this with Status methods
     path = f"/{settings.external_ds_url.split('/')[-1]}/{module_name}.{git_commit_hash}(/|$)(.*)"
-    new_path = V1HTTPIngressPath(path=path, path_type="ImplementationSpecific", backend=V1IngressBackend(service={"name": service_name, "port": {"number": 5000}}))
+    new_path = client.V1HTTPIngressPath(path=path, path_type="ImplementationSpecific", backend=client.V1IngressBackend(service={"name": service_name, "port": {"number": 5000}}))
     _update_ingress_with_retries(request=request, new_path=new_path, namespace=namespace)
 
 
 def create_and_launch_deployment(
-    request: Request, module_name: str, module_git_commit_hash: str, image: str, labels: list, annotations: dict, env: dict, mounts: list
-) -> client.V1LabelSelector:
+    request: Request,
+    module_name: str,
+    module_git_commit_hash: str,
+    image: str,
+    labels: list,
+    annotations: dict,
+    env: dict,
+    mounts: list,
+    resources: Optional["client.V1ResourceRequirements"] = None,
+    readiness_probe: Optional["client.V1Probe"] = None,
+    liveness_probe: Optional["client.V1Probe"] = None,
+) -> "client.V1LabelSelector":
+    from kubernetes import client
+
     deployment_name, service_name = sanitize_deployment_name(module_name, module_git_commit_hash)
     namespace = request.app.state.settings.namespace
 
@@ -188,9 +224,12 @@ def create_and_launch_deployment(
         image=image,
         env=[client.V1EnvVar(name=k, value=v) for k, v in env.items()],
         volume_mounts=volume_mounts,
+        resources=resources,
+        readiness_probe=readiness_probe,
+        liveness_probe=liveness_probe,
     )
 
-    toleration = V1Toleration(effect="NoSchedule", key=namespace, operator="Exists")
+    toleration = client.V1Toleration(effect="NoSchedule", key=namespace, operator="Exists")
 
     template = client.V1PodTemplateSpec(metadata=metadata, spec=client.V1PodSpec(containers=[container], volumes=volumes, tolerations=[toleration]))
     selector = client.V1LabelSelector(match_labels={"us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": module_git_commit_hash})
@@ -204,7 +243,7 @@ class DuplicateLabelsException(Exception):
     pass
 
 
-def _get_deployment_status(request: Request, label_selector_text: str) -> Optional[client.V1Deployment]:
+def _get_deployment_status(request: Request, label_selector_text: str) -> Optional[DeploymentRecord]:
     deployment_status = check_service_status_cache(request, label_selector_text)
     if deployment_status is not None:
         return deployment_status
@@ -216,7 +255,7 @@ def _get_deployment_status(request: Request, label_selector_text: str) -> Option
     # Raise exception if multiple deployments exist with the same labels, else set deployment_status
     if len(deployment_statuses) > 1:
         raise DuplicateLabelsException("Too many deployments with the same labels.")
-    deployment_status = None if len(deployment_statuses) == 0 else deployment_statuses[0]
+    deployment_status = None if len(deployment_statuses) == 0 else deployment_record_from_model(deployment_statuses[0])
 
     # Update the cache
     populate_service_status_cache(request=request, label_selector_text=label_selector_text, data=deployment_status)
@@ -224,35 +263,171 @@ def _get_deployment_status(request: Request, label_selector_text: str) -> Option
     return deployment_status
 
 
-def query_k8s_deployment_status(request: Request, module_name: str, module_git_commit_hash: str) -> client.V1Deployment:
-    label_selector_text = f"us.kbase.module.module_name={module_name.lower()}," + f"us.kbase.module.git_commit_hash={module_git_commit_hash}"
-    return _get_deployment_status(request, label_selector_text)
+def deployment_label_selector(module_name: str, module_git_commit_hash: str) -> str:
+    return f"us.kbase.module.module_name={module_name.lower()}," + f"us.kbase.module.git_commit_hash={module_git_commit_hash}"
+
 
+def query_k8s_deployment_status(request: Request, module_name: str, module_git_commit_hash: str) -> Optional[DeploymentRecord]:
+    return _get_deployment_status(request, deployment_label_selector(module_name, module_git_commit_hash))
 
-def get_k8s_deployment_status_from_label(request: Request, label_selector: client.V1LabelSelector) -> client.V1Deployment:
+
+def get_k8s_deployment_status_from_label(request: Request, label_selector: "client.V1LabelSelector") -> Optional[DeploymentRecord]:
     label_selector_text = ",".join([f"{key}={value}" for key, value in label_selector.match_labels.items()])
     return _get_deployment_status(request, label_selector_text)
 
 
-def get_k8s_deployments(request: Request, label_selector: str = "us.kbase.dynamicservice=true") -> List[client.V1Deployment]:
+def list_k8s_deployments_page(
+    request: Request, label_selector: str = "us.kbase.dynamicservice=true", limit: int | None = None, cursor: str | None = None
+) -> tuple[List["client.V1Deployment"], str | None]:
     """
-    Get all deployments with the given label selector. This is cached for 5 minutes.
+    Get one page of the deployments with the given label selector from the API server.
     :param request: Request object
     :param label_selector: The label selector to use. Defaults to "us.kbase.dynamicservice=true"
-    :return: A list of deployments
+    :param limit: The maximum number of deployments in the page, defaults to the K8S_LIST_PAGE_SIZE setting
+    :param cursor: The cursor returned with the previous page, None for the first page
+    :return: The deployments, and the cursor of the next page or None if this was the last page
+    :raises ApiException: With status 410 if the cursor expired, the list has to be started over
     """
+    limit = limit or request.app.state.settings.k8s_list_page_size
+    deployment_list = get_k8s_app_client(request).list_namespaced_deployment(request.app.state.settings.namespace, label_selector=label_selector, limit=limit, _continue=cursor)
+    return deployment_list.items, deployment_list.metadata._continue or None
 
-    cache = get_k8s_all_service_status_cache(request)
-    cached_deployments = cache.get(label_selector, None)
-    if cached_deployments is not None:
-        return cached_deployments
 
-    apps_v1_api = get_k8s_app_client(request)
-    deployments = apps_v1_api.list_namespaced_deployment(get_settings().namespace, label_selector=label_selector).items
+def iter_k8s_deployments(request: Request, label_selector: str = "us.kbase.dynamicservice=true") -> Iterator["client.V1Deployment"]:
+    """
+    Iterate over all deployments with the given label selector, fetching them from the API server one page at a time.
+    :param request: Request object
+    :param label_selector: The label selector to use. Defaults to "us.kbase.dynamicservice=true"
+    """
+    cursor = None
+    while True:
+        deployments, cursor = list_k8s_deployments_page(request, label_selector=label_selector, cursor=cursor)
+        yield from deployments
+        if cursor is None:
+            return
 
-    cache.set(label_selector, deployments)
 
-    return deployments
+def deployment_record_from_table_row(columns: List[str], row: dict) -> DeploymentRecord:
+    """
+    Build a deployment record from a row of a deployment Table listed with includeObject=Metadata.
+    The Ready column is "ready/desired", deployments have no unavailable column so it is derived from the desired and available replicas.
+    """
+    cells = dict(zip(columns, row["cells"]))
+    metadata = (row.get("object") or {}).get("metadata") or {}
+    annotations = metadata.get("annotations") or {}
+    ready, _, replicas = str(cells.get("Ready") or "0/0").partition("/")
+    replicas, available = int(replicas or 0), int(cells.get("Available") or 0)
+    return DeploymentRecord(
+        name=metadata.get("name") or cells["Name"],
+        module_name=annotations.get("module_name"),
+        git_commit_hash=annotations.get("git_commit_hash"),
+        replicas=replicas,
+        updated_replicas=int(cells.get("Up-to-date") or 0),
+        ready_replicas=int(ready or 0),
+        available_replicas=available,
+        unavailable_replicas=max(replicas - available, 0),
+        resource_version=metadata.get("resourceVersion"),
+    )
+
+
+def deployment_record_from_dict(deployment: dict) -> DeploymentRecord:
+    """
+    Build a deployment record from a deployment as returned by the API server, without deserializing it into a V1Deployment.
+    """
+    metadata, status = deployment.get("metadata") or {}, deployment.get("status") or {}
+    annotations = metadata.get("annotations") or {}
+    return DeploymentRecord(
+        name=metadata["name"],
+        module_name=annotations.get("module_name"),
+        git_commit_hash=annotations.get("git_commit_hash"),
+        replicas=(deployment.get("spec") or {}).get("replicas") or 0,
+        updated_replicas=status.get("updatedReplicas") or 0,
+        ready_replicas=status.get("readyReplicas") or 0,
+        available_replicas=status.get("availableReplicas") or 0,
+        unavailable_replicas=status.get("unavailableReplicas") or 0,
+        resource_version=metadata.get("resourceVersion"),
+    )
+
+
+def deployment_record_from_model(deployment: "client.V1Deployment") -> DeploymentRecord:
+    """
+    Take a snapshot of a deployment returned by the kubernetes client, so the rest of the object graph can be garbage collected.
+    """
+    from kubernetes import client
+
+    annotations = deployment.metadata.annotations or {}
+    status = deployment.status or client.V1DeploymentStatus()
+    return DeploymentRecord(
+        name=deployment.metadata.name,
+        module_name=annotations.get("module_name"),
+        git_commit_hash=annotations.get("git_commit_hash"),
+        replicas=deployment.spec.replicas or 0,
+        updated_replicas=status.updated_replicas or 0,
+        ready_replicas=status.ready_replicas or 0,
+        available_replicas=status.available_replicas or 0,
+        unavailable_replicas=status.unavailable_replicas or 0,
+        resource_version=deployment.metadata.resource_version,
+    )
+
+
+def list_k8s_deployment_records_page(
+    request: Request, label_selector: str = "us.kbase.dynamicservice=true", limit: int | None = None, cursor: str | None = None
+) -> tuple[List[DeploymentRecord], str | None]:
+    """
+    Get one page of the deployments with the given label selector as compact records, for the status listings.
+    The deployments are listed as a Table projection, so the API server only sends their metadata and replica counts
+    instead of the pod templates, env and volumes of each deployment.
+    :param request: Request object
+    :param label_selector: The label selector to use. Defaults to "us.kbase.dynamicservice=true"
+    :param limit: The maximum number of deployments in the page, defaults to the K8S_LIST_PAGE_SIZE setting
+    :param cursor: The cursor returned with the previous page, None for the first page
+    :return: The deployment records, and the cursor of the next page or None if this was the last page
+    :raises ApiException: With status 410 if the cursor expired, the list has to be started over
+    """
+    settings = request.app.state.settings
+    query_params = [("labelSelector", label_selector), ("limit", limit or settings.k8s_list_page_size), ("includeObject", "Metadata")]
+    if cursor:
+        query_params.append(("continue", cursor))
+    response = get_k8s_app_client(request).api_client.call_api(
+        "/apis/apps/v1/namespaces/{namespace}/deployments",
+        "GET",
+        path_params={"namespace": settings.namespace},
+        query_params=query_params,
+        header_params={"Accept": DEPLOYMENT_TABLE_ACCEPT},
+        auth_settings=["BearerToken"],
+        _return_http_data_only=True,
+        _preload_content=False,
+        # Not preloaded, so the API client guard leaves the timeout to us, shortened to the request deadline
+        _request_timeout=deadline.call_timeout(settings.circuit_breaker_policy("k8s_apps").call_timeout, "k8s_apps"),
+    )
+    body = json.loads(response.data)
+    if body.get("kind") == "Table":
+        columns = [column["name"] for column in body.get("columnDefinitions") or []]
+        records = [deployment_record_from_table_row(columns, row) for row in body.get("rows") or []]
+    else:
+        records = [deployment_record_from_dict(deployment) for deployment in body.get("items") or []]
+    return records, (body.get("metadata") or {}).get("continue") or None
+
+
+def get_k8s_deployment_records(request: Request, label_selector: str = "us.kbase.dynamicservice=true") -> List[DeploymentRecord]:
+    """
+    Get all deployments with the given label selector as compact records. This is cached per the `k8s_all_service_status` cache policy.
+    :param request: Request object
+    :param label_selector: The label selector to use. Defaults to "us.kbase.dynamicservice=true"
+    :return: A list of deployment records
+    """
+    cache = get_k8s_all_service_status_cache(request)
+    cached_records = cache.get(label_selector, None)
+    if cached_records is not None:
+        return cached_records
+
+    records, cursor = list_k8s_deployment_records_page(request, label_selector=label_selector)
+    while cursor is not None:
+        page, cursor = list_k8s_deployment_records_page(request, label_selector=label_selector, cursor=cursor)
+        records.extend(page)
+
+    cache.set(label_selector, records)
+    return records
 
 
 def delete_deployment(request: Request, module_name: str, module_git_commit_hash: str) -> str:
@@ -262,17 +437,34 @@ def delete_deployment(request: Request, module_name: str, module_git_commit_hash
     return deployment_name
 
 
-def scale_replicas(request: Request, module_name: str, module_git_commit_hash: str, replicas: int) -> client.V1Deployment:
+def scale_replicas(request: Request, module_name: str, module_git_commit_hash: str, replicas: int) -> DeploymentRecord:
     deployment = query_k8s_deployment_status(request, module_name, module_git_commit_hash)
     namespace = request.app.state.settings.namespace
-    deployment.spec.replicas = replicas
-    return get_k8s_app_client(request).replace_namespaced_deployment(name=deployment.metadata.name, namespace=namespace, body=deployment)
+    scaled = get_k8s_app_client(request).patch_namespaced_deployment(name=deployment.name, namespace=namespace, body={"spec": {"replicas": replicas}})
+    return deployment_record_from_model(scaled)
+
+
+def scale_listed_deployment(request: Request, deployment: "client.V1Deployment", replicas: int) -> DeploymentRecord:
+    """
+    Scale a deployment that was just listed or read, for background tasks that should not act on a stale cached deployment.
+    The service status cache is updated with the scaled deployment.
+    :param request: Request object
+    :param deployment: A dynamic service deployment with module_name and git_commit_hash annotations
+    :param replicas: The number of replicas to scale to
+    :return: The scaled deployment
+    """
+    module_name, module_git_commit_hash = deployment.metadata.annotations["module_name"], deployment.metadata.annotations["git_commit_hash"]
+    label_selector_text = deployment_label_selector(module_name, module_git_commit_hash)
+    populate_service_status_cache(request=request, label_selector_text=label_selector_text, data=deployment_record_from_model(deployment))
+    scaled = scale_replicas(request=request, module_name=module_name, module_git_commit_hash=module_git_commit_hash, replicas=replicas)
+    populate_service_status_cache(request=request, label_selector_text=label_selector_text, data=scaled)
+    return scaled
 
 
 def get_logs_for_first_pod_in_deployment(request: Request, module_name: str, module_git_commit_hash: str) -> tuple[str, str] | tuple[str, list[str]]:
     deployment_name, _ = sanitize_deployment_name(module_name, module_git_commit_hash)
     namespace = request.app.state.settings.namespace
-    label_selector_text = f"us.kbase.module.module_name={module_name.lower()}," + f"us.kbase.module.git_commit_hash={module_git_commit_hash}"
+    label_selector_text = deployment_label_selector(module_name, module_git_commit_hash)
 
     pod_list = get_k8s_core_client(request).list_namespaced_pod(namespace, label_selector=label_selector_text)
 
@@ -0,0 +1,191 @@
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from fastapi import FastAPI
+from prometheus_client import Counter, Gauge
+
+from clients.KubernetesClients import get_k8s_coordination_client
+from clients.metrics import get_or_create_metric
+from configs.settings import Settings
+from dependencies.background import background_request
+
+LEASE_LABELS = {"app.kubernetes.io/name": "service-wizard2", "app.kubernetes.io/managed-by": "service-wizard2"}
+
+leading = get_or_create_metric(Gauge, "service_wizard_leader", "1 while this service wizard process is the leader that runs the background controllers")
+leadership_changes_total = get_or_create_metric(Counter, "service_wizard_leadership_changes_total", "Times this service wizard process started or stopped leading", ("direction",))
+
+
+def default_identity() -> str:
+    """
+    The identity of this process in the leader election. The hostname is the pod name in kubernetes, the process id
+    tells the uvicorn workers of a pod apart.
+    """
+    return f"{socket.gethostname()}_{os.getpid()}"
+
+
+class LeaderElector:
+    """
+    Elects one leader among all service wizard processes, across the workers of a pod and the replicas of the
+    deployment, through a coordination.k8s.io Lease in the dynamic services namespace. The background controllers,
+    which must not run twice, are started when this process becomes the leader and stopped when it stops leading.
+
+    Like the client-go leader election, a lease held by another process is only taken over once it was not renewed for
+    its duration, measured with the local clock from when the lease was last seen changing, so clock skew between pods
+    does not matter. The leader stops leading when it fails to renew the lease for `lease_seconds - renew_seconds`,
+    before any other process can take it over, and releases the lease on shutdown so the next leader does not wait.
+    """
+
+    def __init__(
+        self,
+        app: FastAPI,
+        settings: Settings,
+        on_started_leading: Callable[[], None],
+        on_stopped_leading: Callable[[], None],
+        identity: str | None = None,
+    ):
+        self.app = app
+        self.settings = settings
+        self.on_started_leading = on_started_leading
+        self.on_stopped_leading = on_stopped_leading
+        self.identity = identity or default_identity()
+        self._leading = False
+        self._observed: tuple | None = None  # Holder and renew time of the lease when it was last seen changing
+        self._observed_at = 0.0
+        self._renewed_at = 0.0
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def is_leader(self) -> bool:
+        return self._leading
+
+    def try_acquire_or_renew(self) -> bool:
+        """
+        Take the lease if it is free or expired, or renew it if this process holds it.
+        :return: True if this process holds the lease now, False if another process holds it
+        """
+        from kubernetes import client
+
+        api = get_k8s_coordination_client(background_request(self.app))
+        name, namespace = self.settings.leader_election_lease_name, self.settings.namespace
+        now = datetime.now(timezone.utc)
+        try:
+            lease = api.read_namespaced_lease(name=name, namespace=namespace)
+        except client.ApiException as e:
+            if e.status != 404:
+                raise
+            spec = client.V1LeaseSpec(
+                holder_identity=self.identity, lease_duration_seconds=self.settings.leader_election_lease_seconds, acquire_time=now, renew_time=now, lease_transitions=0
+            )
+            try:
+                api.create_namespaced_lease(namespace=namespace, body=client.V1Lease(metadata=client.V1ObjectMeta(name=name, labels=LEASE_LABELS), spec=spec))
+            except client.ApiException as e:
+                if e.status == 409:  # Another process created it first
+                    return False
+                raise
+            return True
+
+        spec = lease.spec or client.V1LeaseSpec()
+        if (spec.holder_identity, spec.renew_time) != self._observed:
+            self._observed, self._observed_at = (spec.holder_identity, spec.renew_time), time.monotonic()
+        if spec.holder_identity and spec.holder_identity != self.identity:
+            if time.monotonic() - self._observed_at < (spec.lease_duration_seconds or self.settings.leader_election_lease_seconds):
+                return False
+            logging.info(f"The leader election lease {name} held by {spec.holder_identity} expired, taking it over")
+        if spec.holder_identity != self.identity:
+            spec.acquire_time = now
+            spec.lease_transitions = (spec.lease_transitions or 0) + 1
+        spec.holder_identity = self.identity
+        spec.lease_duration_seconds = self.settings.leader_election_lease_seconds
+        spec.renew_time = now
+        lease.spec = spec
+        try:
+            # The resource version of the lease that was read makes this fail if another process updated it in between
+            api.replace_namespaced_lease(name=name, namespace=namespace, body=lease)
+        except client.ApiException as e:
+            if e.status == 409:
+                return False
+            raise
+        return True
+
+    def release(self):
+        """
+        Give up the lease if this process holds it, so another process can take it over right away.
+        """
+        from kubernetes import client
+
+        api = get_k8s_coordination_client(background_request(self.app))
+        name, namespace = self.settings.leader_election_lease_name, self.settings.namespace
+        try:
+            lease = api.read_namespaced_lease(name=name, namespace=namespace)
+            if lease.spec is None or lease.spec.holder_identity != self.identity:
+                return
+            lease.spec.holder_identity = None
+            lease.spec.lease_duration_seconds = 1
+            lease.spec.renew_time = datetime.now(timezone.utc)
+            api.replace_namespaced_lease(name=name, namespace=namespace, body=lease)
+        except client.ApiException:
+            logging.exception(f"Failed to release the leader election lease {name}")
+
+    def _start_leading(self):
+        logging.info(f"{self.identity} is now the leader, starting the background controllers")
+        self._leading = True
+        leading.set(1)
+        leadership_changes_total.labels("started").inc()
+        try:
+            self.on_started_leading()
+        except Exception:
+            logging.exception("Failed to start the background controllers")
+
+    def _stop_leading(self):
+        logging.info(f"{self.identity} is no longer the leader, stopping the background controllers")
+        self._leading = False
+        leading.set(0)
+        leadership_changes_total.labels("stopped").inc()
+        try:
+            self.on_stopped_leading()
+        except Exception:
+            logging.exception("Failed to stop the background controllers")
+
+    def run_once(self):
+        """
+        Acquire or renew the lease once, and start or stop leading accordingly.
+        """
+        try:
+            held = self.try_acquire_or_renew()
+        except Exception:
+            logging.exception("Failed to acquire or renew the leader election lease")
+            renew_deadline = self.settings.leader_election_lease_seconds - self.settings.leader_election_renew_seconds
+            if self._leading and time.monotonic() - self._renewed_at >= renew_deadline:
+                self._stop_leading()
+            return
+        if held:
+            self._renewed_at = time.monotonic()
+            if not self._leading:
+                self._start_leading()
+        elif self._leading:
+            self._stop_leading()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.run_once()
+            self._stopped.wait(self.settings.leader_election_renew_seconds)
+        if self._leading:
+            self._stop_leading()
+            self.release()
+
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float | None = 10):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
@@ -5,17 +5,21 @@ from typing import Dict, Tuple
 
 from fastapi import HTTPException
 from fastapi import Request
-from kubernetes.client import ApiException
 
 from clients.baseclient import ServerError
+from configs.module_profiles import SIZING_PROFILE_ANNOTATION, SIZING_PROFILE_SECURE_PARAM, ModuleProfile, ProbeSpec
 from configs.settings import Settings  # noqa: F401
+from dependencies.idle_reaper import record_module_activity
 from dependencies.k8_wrapper import (
     create_and_launch_deployment,
+    v1_probe_factory,
     create_clusterip_service,
     update_ingress_to_point_to_service,
     scale_replicas,
+    query_k8s_deployment_status,
 )
-from dependencies.status import get_service_status_with_retries, lookup_module_info
+from dependencies.status import get_service_status_with_retries, lookup_module_info, get_dynamic_service_status_helper
+from dependencies.wakeup import wake_deployment
 from models import DynamicServiceStatus
 
 
@@ -45,6 +49,22 @@ def get_env(request, module_name, module_version) -> Dict[str, str]:
     return environ_map
 
 
+def get_sizing_profile(request, module_name, module_version) -> ModuleProfile | None:
+    """
+    Get the sizing profile for a module. Admins can pick a profile for a module in the KBase Catalog with the
+    SERVICE_WIZARD_SIZING_PROFILE secure config param, else the profile comes from the MODULE_PROFILES_FILE.
+
+    :param request: The request object
+    :param module_name: The module name
+    :param module_version: The module version, normalization not required
+    :return: The sizing profile, or None if the container should not be sized
+    """
+    settings = request.app.state.settings  # type: Settings
+    secure_param_list = request.app.state.catalog_client.get_secure_params(module_name, module_version)
+    catalog_profile = next((p["param_value"] for p in secure_param_list if p["param_name"] == SIZING_PROFILE_SECURE_PARAM), None)
+    return settings.module_profiles.profile_for(module_name, catalog_profile)
+
+
 def get_volume_mounts(request, module_name, module_version) -> list[str]:
     """
     Get the volume mounts from the KBase Catalog for a module and set it up for the container to use.
@@ -100,6 +120,8 @@ def _create_and_launch_deployment_helper(
     module_name: str,
     mounts: list[str],
     request: Request,
+    profile: ModuleProfile | None = None,
+    probes: dict[str, ProbeSpec | None] | None = None,
 ):
     """
     Helper method to create and launch a deployment.
@@ -108,6 +130,8 @@ def _create_and_launch_deployment_helper(
     Else, it will implicitly return None
     :return:
     """
+    from kubernetes.client import ApiException, V1ResourceRequirements
+
     try:
         create_and_launch_deployment(
             request=request,
@@ -118,6 +142,9 @@ def _create_and_launch_deployment_helper(
             annotations=annotations,
             env=env,
             mounts=mounts,
+            resources=V1ResourceRequirements(requests=profile.requests or None, limits=profile.limits or None) if profile else None,
+            readiness_probe=v1_probe_factory((probes or {}).get("readiness")),
+            liveness_probe=v1_probe_factory((probes or {}).get("liveness")),
         )
         return False
     except ApiException as e:
@@ -133,6 +160,8 @@ def _create_cluster_ip_service_helper(request, module_name, catalog_git_commit_h
     Helper method to create a cluster IP service for a deployment.
     It will attempt to create the service and if it already exists, it will log a warning and continue.
     """
+    from kubernetes.client import ApiException
+
     try:
         create_clusterip_service(request, module_name, catalog_git_commit_hash, labels)
     except ApiException as e:
@@ -148,6 +177,8 @@ def _update_ingress_for_service_helper(request, module_name, git_commit_hash):
     Helper method to update the ingress for a service.
     It will attempt to update the ingress and if it already exists, it will log a warning and continue.
     """
+    from kubernetes.client import ApiException
+
     try:
         update_ingress_to_point_to_service(request, module_name, git_commit_hash)
     except ApiException as e:
@@ -164,7 +195,10 @@ def start_deployment(request: Request, module_name, module_version, replicas=1)
     Then create a service and ingress for it.
     Then return the status of the deployment.
 
-    If the deployment already exists, it will attempt to scale it up to the requested number of replicas, but it is always 1 replica at the moment.
+    If the deployment already exists, e.g. because it was stopped, it is woken up instead: it is scaled up to the requested
+    number of replicas if it has none. Concurrent calls for the same deployment share one wake-up, which waits for the
+    deployment to become available. If the deployment was deleted since it was cached, it is created again. Either way the
+    Service and Ingress are created if they are missing, so a service that was left half created is repaired.
 
     :param request:  The request object
     :param module_name:  The module name
@@ -172,8 +206,11 @@ def start_deployment(request: Request, module_name, module_version, replicas=1)
     :param replicas: Number of replicas to start, no way to set it from the API at the moment.
     :return:
     """
+    from kubernetes.client import ApiException
 
     module_info = request.app.state.catalog_client.get_combined_module_info(module_name, module_version)
+    record_module_activity(request, module_name, module_info["git_commit_hash"])
+
     labels, annotations = _setup_metadata(
         module_name=module_name,
         requested_module_version=module_version,
@@ -182,8 +219,24 @@ def start_deployment(request: Request, module_name, module_version, replicas=1)
         git_url=module_info["git_url"],
     )
 
+    existing_deployment = query_k8s_deployment_status(request, module_name=module_name, module_git_commit_hash=module_info["git_commit_hash"])
+    if existing_deployment is not None:
+        try:
+            wake_deployment(request, module_name, module_info["git_commit_hash"], existing_deployment, replicas=replicas)
+        except ApiException as e:
+            if e.status != 404:
+                raise
+            logging.warning(f"Deployment {existing_deployment.name} was deleted since it was cached, creating it again")
+        else:
+            _create_cluster_ip_service_helper(request, module_name, module_info["git_commit_hash"], labels)
+            _update_ingress_for_service_helper(request, module_name, module_info["git_commit_hash"])
+            return get_dynamic_service_status_helper(request, module_name, module_version)
+
     mounts = get_volume_mounts(request, module_name, module_version)
     env = get_env(request, module_name, module_version)
+    profile = get_sizing_profile(request, module_name, module_version)
+    if profile:
+        annotations[SIZING_PROFILE_ANNOTATION] = profile.name
 
     deployment_already_exists = _create_and_launch_deployment_helper(
         annotations=annotations,
@@ -194,6 +247,8 @@ def start_deployment(request: Request, module_name, module_version, replicas=1)
         module_name=module_name,
         mounts=mounts,
         request=request,
+        profile=profile,
+        probes=request.app.state.settings.module_profiles.probes_for(module_name, profile),
     )
 
     if deployment_already_exists:
@@ -228,10 +283,10 @@ def stop_deployment(request: Request, module_name, module_version) -> DynamicSer
         module_name=module_info.module_name,
         release_tags=module_info.release_tags,
         git_commit_hash=module_info.git_commit_hash,
-        deployment_name=deployment.metadata.name,
-        replicas=deployment.spec.replicas,
-        updated_replicas=deployment.status.updated_replicas,
-        ready_replicas=deployment.status.ready_replicas,
-        available_replicas=deployment.status.available_replicas,
-        unavailable_replicas=deployment.status.unavailable_replicas,
+        deployment_name=deployment.name,
+        replicas=deployment.replicas,
+        updated_replicas=deployment.updated_replicas,
+        ready_replicas=deployment.ready_replicas,
+        available_replicas=deployment.available_replicas,
+        unavailable_replicas=deployment.unavailable_replicas,
     )
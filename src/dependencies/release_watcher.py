@@ -0,0 +1,142 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI, Request
+from prometheus_client import Counter
+
+from clients.PrometheusClient import PrometheusClient
+from clients.metrics import get_or_create_metric
+from configs.settings import Settings
+from dependencies.background import PeriodicTask, background_request
+from dependencies.idle_reaper import PrometheusIngressActivitySource
+from dependencies.k8_wrapper import deployment_record_from_model, iter_k8s_deployments, scale_listed_deployment
+from dependencies.lifecycle import start_deployment
+from dependencies.wakeup import is_available
+
+if TYPE_CHECKING:
+    from kubernetes.client import V1Deployment
+
+predeploys_total = get_or_create_metric(Counter, "service_wizard_release_watcher_predeploys_total", "New release or beta versions deployed ahead of their first request", ("tag",))
+superseded_reaped_total = get_or_create_metric(
+    Counter, "service_wizard_release_watcher_reaped_total", "Superseded release or beta versions scaled to 0 after their traffic moved to the new version", ("tag",)
+)
+
+
+@dataclass(frozen=True)
+class ReleaseChange:
+    module_name: str
+    tag: str
+    old_git_commit_hash: str
+    new_git_commit_hash: str
+
+
+class ReleaseWatcher(PeriodicTask):
+    """
+    Deploys new release and beta versions of running dynamic services before they are first requested, and scales the
+    versions they replaced to 0 once their traffic moved over.
+
+    A running deployment that was started for a watched tag is superseded when the tag now points to another commit.
+    The new commit is started like a regular start request. The superseded deployment is scaled to 0 once it has not been
+    requested through the service wizard, or through the ingress if a Prometheus URL is configured, for `drain_seconds`
+    since it was found to be superseded, and the new version is available.
+    """
+
+    name = "release watcher"
+
+    def __init__(self, app: FastAPI, settings: Settings, activity_source: PrometheusIngressActivitySource | None = None):
+        super().__init__(interval_seconds=settings.release_watcher_interval_seconds)
+        self.app = app
+        self.settings = settings
+        if activity_source is None and settings.prometheus_url:
+            activity_source = PrometheusIngressActivitySource(PrometheusClient(settings.prometheus_url), settings.namespace)
+        self.activity_source = activity_source
+        self._superseded_at: dict[str, float] = {}
+
+    def _running_deployments(self, request: Request) -> list["V1Deployment"]:
+        return [
+            d
+            for d in iter_k8s_deployments(request)
+            if d.spec.replicas and (d.metadata.annotations or {}).get("module_name") and (d.metadata.annotations or {}).get("git_commit_hash")
+        ]
+
+    def _current_git_commit_hash(self, request: Request, module_name: str, tag: str) -> str | None:
+        try:
+            return request.app.state.catalog_client.resolve_git_commit_hash(module_name, tag)
+        except Exception:
+            logging.exception(f"Failed to look up the {tag} version of {module_name}")
+            return None
+
+    def _predeploy(self, request: Request, change: ReleaseChange):
+        logging.info(f"Deploying the new {change.tag} version {change.new_git_commit_hash} of {change.module_name}, replacing {change.old_git_commit_hash}")
+        try:
+            start_deployment(request, change.module_name, change.tag)
+        except Exception:
+            logging.exception(f"Failed to deploy the new {change.tag} version of {change.module_name}")
+            return
+        predeploys_total.labels(change.tag).inc()
+
+    def _drained(self, deployment: "V1Deployment", active_services: set[str], now: float) -> bool:
+        name = deployment.metadata.name
+        quiet_since = max(self._superseded_at[name], self.app.state.activity_tracker.last_requested(name) or 0)
+        return deployment.metadata.annotations.get("k8s_service_name") not in active_services and now - quiet_since >= self.settings.release_watcher_drain_seconds
+
+    def run_once(self, now: float | None = None) -> list[ReleaseChange]:
+        """
+        Deploy the new versions of the watched tags of running services, and scale the drained superseded versions to 0.
+        :return: The superseded versions that were found
+        """
+        now = time.time() if now is None else now
+        request = background_request(self.app)
+        running = self._running_deployments(request)
+        by_hash = {(d.metadata.annotations["module_name"].lower(), d.metadata.annotations["git_commit_hash"]): d for d in running}
+
+        changes: list[tuple[ReleaseChange, "V1Deployment"]] = []
+        resolved: dict[tuple[str, str], str | None] = {}
+        for deployment in running:
+            annotations = deployment.metadata.annotations
+            tag = annotations.get("module_version_from_request")
+            if tag not in self.settings.release_watcher_tags:
+                continue
+            module_name = annotations["module_name"]
+            key = (module_name.lower(), tag)
+            if key not in resolved:
+                resolved[key] = self._current_git_commit_hash(request, module_name, tag)
+            new_git_commit_hash = resolved[key]
+            if new_git_commit_hash and new_git_commit_hash != annotations["git_commit_hash"]:
+                changes.append((ReleaseChange(module_name, tag, annotations["git_commit_hash"], new_git_commit_hash), deployment))
+
+        # Forget deployments that are no longer superseded, e.g. because they were stopped or the tag moved back
+        superseded_names = {deployment.metadata.name for _, deployment in changes}
+        for name in set(self._superseded_at) - superseded_names:
+            del self._superseded_at[name]
+
+        try:
+            active_services = self.activity_source.active_services(self.settings.release_watcher_drain_seconds) if self.activity_source else set()
+        except Exception:
+            logging.exception("Failed to read ingress activity, not scaling down superseded versions in this release watcher run")
+            active_services = None
+
+        predeployed = set()
+        for change, deployment in changes:
+            if self.stopping:
+                break
+            self._superseded_at.setdefault(deployment.metadata.name, now)
+            new_deployment = by_hash.get((change.module_name.lower(), change.new_git_commit_hash))
+            if new_deployment is None:
+                if (change.module_name.lower(), change.new_git_commit_hash) not in predeployed:
+                    predeployed.add((change.module_name.lower(), change.new_git_commit_hash))
+                    self._predeploy(request, change)
+                continue
+            if active_services is None or not is_available(deployment_record_from_model(new_deployment)) or not self._drained(deployment, active_services, now):
+                continue
+            logging.info(f"Scaling the superseded {change.tag} version {change.old_git_commit_hash} of {change.module_name} to 0")
+            try:
+                scale_listed_deployment(request, deployment, replicas=0)
+            except Exception:
+                logging.exception(f"Failed to scale {deployment.metadata.name} to 0")
+                continue
+            del self._superseded_at[deployment.metadata.name]
+            superseded_reaped_total.labels(change.tag).inc()
+        return [change for change, _ in changes]
@@ -0,0 +1,78 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from fastapi import Request
+
+from clients.KubernetesClients import get_k8s_custom_objects_client
+from clients.baseclient import ServerError
+from configs.module_profiles import SIZING_PROFILE_ANNOTATION
+from dependencies.idle_reaper import requested_resources
+from dependencies.k8_wrapper import iter_k8s_deployments
+from models import DynamicServiceResourceUsage
+
+
+def get_pod_usage(request: Request) -> dict[tuple[str, str], list[tuple[Decimal, Decimal]]]:
+    """
+    Get the CPU cores and memory bytes used by each dynamic service pod from metrics-server (metrics.k8s.io).
+    :param request: The request object
+    :return: The usage of each pod, keyed by lowercase module name and git commit hash
+    """
+    from kubernetes.utils import parse_quantity
+
+    pod_metrics = get_k8s_custom_objects_client(request).list_namespaced_custom_object(
+        group="metrics.k8s.io", version="v1beta1", namespace=request.app.state.settings.namespace, plural="pods", label_selector="us.kbase.dynamicservice=true"
+    )
+    usage = defaultdict(list)
+    for pod in pod_metrics.get("items", []):
+        labels = pod.get("metadata", {}).get("labels") or {}
+        key = (labels.get("us.kbase.module.module_name"), labels.get("us.kbase.module.git_commit_hash"))
+        cpu = sum((parse_quantity(c.get("usage", {}).get("cpu", 0)) for c in pod.get("containers", [])), Decimal(0))
+        memory = sum((parse_quantity(c.get("usage", {}).get("memory", 0)) for c in pod.get("containers", [])), Decimal(0))
+        usage[key].append((cpu, memory))
+    return usage
+
+
+def _ratio(used: Decimal | None, requested: Decimal) -> float | None:
+    return float(used / requested) if used is not None and requested else None
+
+
+def get_resource_usage(request: Request, module_name: str | None = None, module_version: str | None = None) -> list[DynamicServiceResourceUsage]:
+    """
+    Report the CPU and memory each dynamic service uses against what it requests, to right-size the sizing profiles.
+    Only admins can see the report.
+    :param request: The request object
+    :param module_name: Only report the deployments of this module, all deployments if not set
+    :param module_version: Not used, every deployed version of the module is reported
+    :return: The usage of each dynamic service deployment
+    """
+    if not request.state.user_auth_roles.is_admin:
+        raise ServerError(code=-32000, message="Only admins can view resource usage", name="Server Error")
+
+    usage = get_pod_usage(request)
+    report = []
+    # Listed fresh, the service status caches only hold snapshots without the pod templates
+    for deployment in iter_k8s_deployments(request):
+        annotations = deployment.metadata.annotations or {}
+        if not annotations.get("module_name") or (module_name and annotations["module_name"].lower() != module_name.lower()):
+            continue
+        pods = usage.get((annotations["module_name"].lower(), annotations.get("git_commit_hash")), [])
+        cpu_requested, memory_requested = requested_resources(deployment)
+        cpu_used = sum((cpu for cpu, _ in pods), Decimal(0)) if pods else None
+        memory_used = sum((memory for _, memory in pods), Decimal(0)) if pods else None
+        report.append(
+            DynamicServiceResourceUsage(
+                module_name=annotations["module_name"],
+                git_commit_hash=annotations.get("git_commit_hash", ""),
+                deployment_name=deployment.metadata.name,
+                sizing_profile=annotations.get(SIZING_PROFILE_ANNOTATION),
+                replicas=deployment.spec.replicas or 0,
+                pods_with_metrics=len(pods),
+                cpu_requested_cores=float(cpu_requested),
+                cpu_used_cores=None if cpu_used is None else float(cpu_used),
+                memory_requested_bytes=int(memory_requested),
+                memory_used_bytes=None if memory_used is None else int(memory_used),
+                cpu_usage_ratio=_ratio(cpu_used, cpu_requested),
+                memory_usage_ratio=_ratio(memory_used, memory_requested),
+            )
+        )
+    return report
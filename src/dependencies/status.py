@@ -4,10 +4,15 @@ from typing import List, Dict, Optional, Any
 
 from fastapi import Request, HTTPException
 
+from clients import deadline
 from clients.baseclient import ServerError
+from clients.circuit_breaker import FAIL_FAST_ERRORS
 from configs.settings import get_settings
-from dependencies.k8_wrapper import query_k8s_deployment_status, get_k8s_deployments, DuplicateLabelsException
-from models import DynamicServiceStatus, CatalogModuleInfo
+from dependencies.idle_reaper import record_module_activity
+from dependencies.k8_wrapper import query_k8s_deployment_status, get_k8s_deployment_records, list_k8s_deployment_records_page, DuplicateLabelsException
+from models import DeploymentRecord, DynamicServiceStatus, DynamicServiceStatusPage, CatalogModuleInfo
+
+MAX_SERVICE_STATUS_PAGE_SIZE = 500
 
 
 def lookup_module_info(request: Request, module_name: str, git_commit: str) -> CatalogModuleInfo:
@@ -22,6 +27,8 @@ def lookup_module_info(request: Request, module_name: str, git_commit: str) -> C
     settings = request.app.state.settings
     try:
         m_info = request.app.state.catalog_client.get_combined_module_info(module_name, git_commit)
+    except FAIL_FAST_ERRORS:
+        raise
     except ServerError as e:
         raise HTTPException(status_code=500, detail=e)
     except Exception as e:
@@ -64,6 +71,7 @@ def get_service_status_with_retries(request, module_name, version, retries=10) -
     """
     Retrieve the status of a service based on the module version and git commit hash.
     First check the catalog, and cache the results, then check kubernetes.
+    Stops retrying with a DeadlineExceededError once the request deadline passed.
     :param request:
     :param module_name:
     :param version:
@@ -74,6 +82,7 @@ def get_service_status_with_retries(request, module_name, version, retries=10) -
     lookup_module_info(request=request, module_name=module_name, git_commit=version)
     # Then check kubernetes
     for _ in range(retries):
+        deadline.check("get_service_status")
         try:
             status = get_dynamic_service_status_helper(request, module_name, version)
             # The deployment is up
@@ -82,6 +91,8 @@ def get_service_status_with_retries(request, module_name, version, retries=10) -
             # The deployment is stopped
             if status.replicas == 0:
                 return status
+        except FAIL_FAST_ERRORS:
+            raise
         except ServerError as e:
             raise HTTPException(status_code=500, detail=e)
         except DuplicateLabelsException:
@@ -89,7 +100,8 @@ def get_service_status_with_retries(request, module_name, version, retries=10) -
         except Exception:
             # The deployment had more than one replica, but not even one was ready
             pass
-        time.sleep(2)
+        left = deadline.remaining()
+        time.sleep(2 if left is None else max(0.0, min(2.0, left)))
 
     raise Exception("Failed to get service status after maximum retries")
 
@@ -127,6 +139,7 @@ def get_dynamic_service_status_helper(request, module_name, version) -> DynamicS
     """
 
     module_info = lookup_module_info(request=request, module_name=module_name, git_commit=version)
+    record_module_activity(request, module_info.module_name, module_info.git_commit_hash)
 
     deployment = query_k8s_deployment_status(request, module_name=module_name, module_git_commit_hash=module_info.git_commit_hash)
     if deployment:
@@ -136,12 +149,12 @@ def get_dynamic_service_status_helper(request, module_name, version) -> DynamicS
             module_name=module_info.module_name,
             release_tags=module_info.release_tags,
             git_commit_hash=module_info.git_commit_hash,
-            deployment_name=deployment.metadata.name,
-            replicas=deployment.spec.replicas,
-            updated_replicas=deployment.status.updated_replicas,
-            ready_replicas=deployment.status.ready_replicas,
-            available_replicas=deployment.status.available_replicas,
-            unavailable_replicas=deployment.status.unavailable_replicas,
+            deployment_name=deployment.name,
+            replicas=deployment.replicas,
+            updated_replicas=deployment.updated_replicas,
+            ready_replicas=deployment.ready_replicas,
+            available_replicas=deployment.available_replicas,
+            unavailable_replicas=deployment.unavailable_replicas,
         )
 
     else:
@@ -153,14 +166,39 @@ class IncompleteDeploymentAnnotationError(Exception):
         super().__init__(f"Deployment '{deployment_name}' has missing or None 'module_name' or 'git_commit_hash' annotations.")
 
 
+def _deployment_service_status(request: Request, record: DeploymentRecord) -> DynamicServiceStatus | None:
+    """
+    Build the status of a dynamic service deployment, or return None if it is missing the module_name and git_commit_hash annotations.
+    """
+    if not record.module_name or not record.git_commit_hash:
+        # If someone deployed a bad service into this namespace, this will protect this query from failing
+        logging.debug(IncompleteDeploymentAnnotationError(record.name))
+        return None
+
+    module_info = lookup_module_info(request=request, module_name=record.module_name, git_commit=record.git_commit_hash)
+    return DynamicServiceStatus(
+        url=module_info.url,
+        version=module_info.version,
+        module_name=module_info.module_name,
+        release_tags=module_info.release_tags,
+        git_commit_hash=module_info.git_commit_hash,
+        deployment_name=record.name,
+        replicas=record.replicas,
+        updated_replicas=record.updated_replicas,
+        ready_replicas=record.ready_replicas,
+        available_replicas=record.available_replicas,
+        unavailable_replicas=record.unavailable_replicas,
+    )
+
+
 def get_all_dynamic_service_statuses(request: Request, module_name, module_version) -> List[DynamicServiceStatus]:
     if module_name or module_version:
         logging.debug("dropping list_service_status params since SW1 doesn't use them")
 
-    if not request.app.state.catalog_client.get_hash_to_name_mappings():
+    if not request.app.state.catalog_client.get_dynamic_service_module_names():
         raise HTTPException(status_code=404, detail="No dynamic services found in catalog!")
 
-    deployment_statuses = get_k8s_deployments(request)  # type List[V1Deployment]
+    deployment_statuses = get_k8s_deployment_records(request)  # type List[DeploymentRecord]
     if len(deployment_statuses) == 0:
         raise HTTPException(
             status_code=404,
@@ -168,38 +206,10 @@ def get_all_dynamic_service_statuses(request: Request, module_name, module_versi
         )
 
     # TODO see if you need to get the list based on running deployments or based on the catalog
-    dynamic_service_statuses = []
-    for deployment in deployment_statuses:
-        deployment = deployment
-        try:
-            module_name = deployment.metadata.annotations.get("module_name")
-            git_commit = deployment.metadata.annotations.get("git_commit_hash")
-            if not module_name or not git_commit:
-                raise IncompleteDeploymentAnnotationError(deployment.metadata.name)
-        except IncompleteDeploymentAnnotationError:
-            # If someone deployed a bad service into this namespace, this will protect this query from failing
-            continue
-
-        module_info = lookup_module_info(request=request, module_name=module_name, git_commit=git_commit)
-        dynamic_service_statuses.append(
-            DynamicServiceStatus(
-                url=module_info.url,
-                version=module_info.version,
-                module_name=module_info.module_name,
-                release_tags=module_info.release_tags,
-                git_commit_hash=module_info.git_commit_hash,
-                deployment_name=deployment.metadata.name,
-                replicas=deployment.spec.replicas,
-                updated_replicas=deployment.status.updated_replicas,
-                ready_replicas=deployment.status.ready_replicas,
-                available_replicas=deployment.status.available_replicas,
-                unavailable_replicas=deployment.status.unavailable_replicas,
-            )
-        )
+    dynamic_service_statuses = [status for status in (_deployment_service_status(request, record) for record in deployment_statuses) if status is not None]
 
     # Deployments were found, but none of them had the correct annotations, they were missing
-    # deployment.metadata.annotations.get("module_name")
-    # deployment.metadata.annotations.get("git_commit_hash")
+    # the module_name or git_commit_hash annotations
     if len(dynamic_service_statuses) == 0:
         raise HTTPException(
             status_code=404,
@@ -210,6 +220,36 @@ def get_all_dynamic_service_statuses(request: Request, module_name, module_versi
     return dynamic_service_statuses
 
 
+def get_dynamic_service_statuses_page(request: Request, module_name, module_version, cursor: str | None = None, page_size: int | None = None) -> DynamicServiceStatusPage:
+    """
+    Get one page of the statuses of all dynamic services, fetching only that page of deployments from kubernetes.
+    Deployments without module_name and git_commit_hash annotations are skipped, so a page can hold fewer statuses than
+    the page size, and can even be empty while more pages follow.
+
+    :param request: The request object
+    :param module_name: Not used
+    :param module_version: Not used
+    :param cursor: The cursor returned with the previous page, None for the first page
+    :param page_size: The maximum number of deployments in the page, defaults to the K8S_LIST_PAGE_SIZE setting
+    :return: The statuses, and the cursor of the next page or None if this was the last page
+    """
+    from kubernetes.client import ApiException
+
+    if module_name or module_version:
+        logging.debug("dropping list_service_status_page module params, pages always cover all services")
+    if page_size is not None and (not isinstance(page_size, int) or not 1 <= page_size <= MAX_SERVICE_STATUS_PAGE_SIZE):
+        raise ServerError(code=-32000, name="Server Error", message=f"page_size must be an integer between 1 and {MAX_SERVICE_STATUS_PAGE_SIZE}, got {page_size}")
+
+    try:
+        records, next_cursor = list_k8s_deployment_records_page(request, limit=page_size, cursor=cursor or None)
+    except ApiException as e:
+        if e.status == 410:
+            raise ServerError(code=-32000, name="Server Error", message="The cursor expired, list the services again from the first page")
+        raise
+    statuses = [status for status in (_deployment_service_status(request, record) for record in records) if status is not None]
+    return DynamicServiceStatusPage(statuses=statuses, cursor=next_cursor)
+
+
 def get_status(request: Request, module_name: Optional[Any] = None, version: Optional[Any] = None) -> Dict:
     if module_name or version:
         logging.debug("dropping get_status params since SW1 doesn't use them")
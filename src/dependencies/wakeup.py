@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from typing import Callable
+
+from fastapi import Request
+from prometheus_client import Counter, Histogram
+
+from clients import deadline
+from clients.deadline import DeadlineExceededError
+from clients.KubernetesClients import get_k8s_app_client, populate_service_status_cache
+from clients.metrics import get_or_create_metric
+from dependencies.k8_wrapper import deployment_label_selector, deployment_record_from_model
+from models import DeploymentRecord
+
+START_REQUESTED_AT_ANNOTATION = "us.kbase.dynamicservice/start-requested-at"
+
+wakeups_total = get_or_create_metric(Counter, "service_wizard_wakeups_total", "Wake-ups of dynamic services that were scaled to 0 or not yet available", ("outcome",))
+wakeup_waiters_total = get_or_create_metric(Counter, "service_wizard_wakeup_waiters_total", "Callers that waited on a wake-up already in flight for the same deployment")
+wakeup_seconds = get_or_create_metric(
+    Histogram, "service_wizard_wakeup_seconds", "Time from a wake-up request until the deployment was available", buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+)
+
+
+class WakeTimeoutError(Exception):
+    def __init__(self, deployment_name: str, timeout: float):
+        super().__init__(f"Deployment '{deployment_name}' did not become available within {timeout} seconds")
+
+
+class WakeCoordinator:
+    """
+    Makes sure only one wake-up runs per deployment. Callers that ask for a deployment that is already being woken up
+    wait for that wake-up and share its result, or its exception, for up to the wake timeout or until their own request
+    deadline. If the wake-up failed only because the deadline of the caller that ran it passed, a waiter with time left
+    runs the wake-up again.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def run(self, deployment_name: str, wake: Callable[[], DeploymentRecord], timeout: float) -> DeploymentRecord:
+        """
+        Run `wake` for the deployment, or wait for the wake-up of the deployment that is already running.
+        :param deployment_name: The deployment to wake up
+        :param wake: Wakes up the deployment and waits until it is available
+        :param timeout: The wake timeout, how long to wait at most for a wake-up that is already running
+        :return: The available deployment
+        :raises WakeTimeoutError: If the wake-up did not finish within the wake timeout
+        :raises DeadlineExceededError: If the request deadline of the caller passed first
+        """
+        while True:
+            with self._lock:
+                future = self._in_flight.get(deployment_name)
+                leader = future is None
+                if leader:
+                    future = self._in_flight[deployment_name] = Future()
+            if leader:
+                break
+            wakeup_waiters_total.inc()
+            try:
+                return future.result(timeout=deadline.call_timeout(timeout, "wake-up"))
+            except FutureTimeoutError:
+                deadline.check("wake-up")
+                raise WakeTimeoutError(deployment_name, timeout) from None
+            except DeadlineExceededError:
+                # The deadline of the caller that ran the wake-up passed, not necessarily this one
+                deadline.check("wake-up")
+
+        try:
+            future.set_result(wake())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[deployment_name]
+        return future.result()
+
+
+def is_available(deployment: DeploymentRecord) -> bool:
+    return bool(deployment.replicas) and bool(deployment.available_replicas)
+
+
+def _wait_until_available(request: Request, deployment: DeploymentRecord, timeout: float) -> DeploymentRecord:
+    """
+    Watch the deployment until it has an available replica.
+    :raises WakeTimeoutError: If it is not available within `timeout` seconds
+    :raises DeadlineExceededError: If the request deadline passes first
+    """
+    from kubernetes import watch
+    from kubernetes.client import ApiException
+
+    apps_v1_api = get_k8s_app_client(request)
+    namespace = request.app.state.settings.namespace
+    name = deployment.name
+    wake_deadline = time.monotonic() + timeout
+    while not is_available(deployment):
+        deadline.check("wake-up")
+        remaining = wake_deadline - time.monotonic()
+        if remaining <= 0:
+            raise WakeTimeoutError(name, timeout)
+        request_remaining = deadline.remaining()
+        if request_remaining is not None:
+            remaining = min(remaining, request_remaining)
+        w = watch.Watch()
+        try:
+            for event in w.stream(
+                apps_v1_api.list_namespaced_deployment,
+                namespace=namespace,
+                field_selector=f"metadata.name={name}",
+                resource_version=deployment.resource_version,
+                timeout_seconds=max(1, int(remaining)),
+            ):
+                if event["type"] == "DELETED":
+                    raise WakeTimeoutError(name, timeout)
+                deployment = deployment_record_from_model(event["object"])
+                if is_available(deployment) or time.monotonic() >= wake_deadline or deadline.expired():
+                    w.stop()
+        except ApiException as e:
+            if e.status != 410:
+                raise
+            # The resource version is too old to watch from, start again from the current state
+            deployment = deployment_record_from_model(apps_v1_api.read_namespaced_deployment(name=name, namespace=namespace))
+    return deployment
+
+
+def _wake(request: Request, deployment: DeploymentRecord, replicas: int) -> DeploymentRecord:
+    settings = request.app.state.settings
+    started = time.monotonic()
+    if not deployment.replicas:
+        # Record the start intent and scale up in one patch. The pod template, Service and Ingress are left alone.
+        body = {
+            "metadata": {"annotations": {START_REQUESTED_AT_ANNOTATION: datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}},
+            "spec": {"replicas": replicas},
+        }
+        deployment = deployment_record_from_model(get_k8s_app_client(request).patch_namespaced_deployment(name=deployment.name, namespace=settings.namespace, body=body))
+        logging.info(f"Waking up deployment {deployment.name} to {replicas} replicas")
+    try:
+        deployment = _wait_until_available(request, deployment, settings.wake_timeout_seconds)
+    except WakeTimeoutError:
+        wakeups_total.labels("timeout").inc()
+        raise
+    wakeups_total.labels("available").inc()
+    wakeup_seconds.observe(time.monotonic() - started)
+    return deployment
+
+
+def wake_deployment(request: Request, module_name: str, git_commit_hash: str, deployment: DeploymentRecord, replicas: int = 1) -> DeploymentRecord:
+    """
+    Bring an existing deployment up and wait until it has an available replica, reusing its Service and Ingress.
+    Concurrent calls for the same deployment share one wake-up.
+
+    :param request: The request object
+    :param module_name: The module name
+    :param git_commit_hash: The git commit hash of the deployment
+    :param deployment: The existing deployment, possibly scaled to 0
+    :param replicas: Number of replicas to scale to if the deployment is scaled to 0
+    :return: The available deployment
+    :raises WakeTimeoutError: If the deployment is not available within the wake timeout
+    :raises DeadlineExceededError: If the request deadline passes first
+    """
+    if is_available(deployment):
+        return deployment
+
+    coordinator = request.app.state.wake_coordinator
+    deployment = coordinator.run(deployment.name, lambda: _wake(request, deployment, replicas), request.app.state.settings.wake_timeout_seconds)
+    populate_service_status_cache(request=request, label_selector_text=deployment_label_selector(module_name, git_commit_hash), data=deployment)
+    return deployment
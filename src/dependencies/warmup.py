@@ -0,0 +1,113 @@
+import concurrent.futures
+import logging
+import threading
+import time
+
+from fastapi import FastAPI, Request
+from prometheus_client import Gauge
+
+from clients.KubernetesClients import populate_service_status_cache
+from clients.metrics import get_or_create_metric
+from dependencies.background import background_request
+from dependencies.k8_wrapper import deployment_label_selector, get_k8s_deployment_records
+
+# Catalog lookups run in parallel, but not so many that a fresh pod floods the catalog
+WARMUP_CATALOG_WORKERS = 8
+
+warmup_seconds = get_or_create_metric(Gauge, "service_wizard_warmup_seconds", "How long the startup warm-up of the caches took")
+warmup_ready = get_or_create_metric(Gauge, "service_wizard_warmup_ready", "1 once the service wizard reports ready, after the startup warm-up")
+
+
+class WarmUp:
+    """
+    Fills the caches when the service wizard starts, so the first wave of requests after a rollout is not a stampede of
+    cache misses on the Catalog and the kubernetes API server. It preloads the dynamic service module names, the
+    deployment index and the service status of every deployment, and the catalog info of every running deployment.
+
+    The service wizard reports ready once the warm-up finished, or once the deadline passed so a slow or failing
+    dependency does not keep it out of rotation. Failed steps are logged and skipped, requests then fill the caches as usual.
+    """
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self.steps: dict[str, str] = {}  # Step name -> "ok", "skipped" or the error
+        self._done = threading.Event()
+        self._started_at: float | None = None
+        self._thread: threading.Thread | None = None
+
+    def _deadline(self) -> float:
+        return self._started_at + self.app.state.settings.warmup_deadline_seconds
+
+    def _dynamic_service_modules(self, request: Request):
+        request.app.state.catalog_client.get_dynamic_service_module_names()
+
+    def _deployments(self, request: Request):
+        for record in get_k8s_deployment_records(request):
+            if record.module_name and record.git_commit_hash:
+                populate_service_status_cache(request=request, label_selector_text=deployment_label_selector(record.module_name, record.git_commit_hash), data=record)
+
+    def _module_info(self, request: Request):
+        modules = {(r.module_name, r.git_commit_hash) for r in get_k8s_deployment_records(request) if r.module_name and r.git_commit_hash and r.replicas}
+        catalog_client = request.app.state.catalog_client
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=WARMUP_CATALOG_WORKERS, thread_name_prefix="warm-up")
+        futures = [executor.submit(catalog_client.get_combined_module_info, module_name, git_commit_hash) for module_name, git_commit_hash in sorted(modules)]
+        done, not_done = concurrent.futures.wait(futures, timeout=max(self._deadline() - time.monotonic(), 0))
+        # Do not wait for lookups that are still running at the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+        failed = [f for f in done if f.exception() is not None]
+        if failed or not_done:
+            raise RuntimeError(f"{len(failed)} of {len(futures)} module info lookups failed and {len(not_done)} did not finish before the deadline")
+
+    def run(self):
+        """
+        Run the warm-up steps in order, skipping the remaining steps once the deadline passed.
+        """
+        request = background_request(self.app)
+        for name, step in (("dynamic_service_modules", self._dynamic_service_modules), ("deployments", self._deployments), ("module_info", self._module_info)):
+            if time.monotonic() >= self._deadline():
+                self.steps[name] = "skipped"
+                continue
+            try:
+                step(request)
+                self.steps[name] = "ok"
+            except Exception as e:
+                logging.exception(f"Warm-up step {name} failed")
+                self.steps[name] = str(e)
+        warmup_seconds.set(time.monotonic() - self._started_at)
+        logging.info(f"Warm-up finished in {time.monotonic() - self._started_at:.1f}s: {self.steps}")
+        self._done.set()
+
+    def start(self):
+        """
+        Start the warm-up in a daemon thread, or finish right away if it is disabled in the settings.
+        """
+        if self._started_at is not None:
+            return
+        self._started_at = time.monotonic()
+        if not self.app.state.settings.warmup_enabled:
+            self._done.set()
+            return
+        self._thread = threading.Thread(target=self.run, name="warm-up", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def ready(self) -> bool:
+        """
+        :return: True once the warm-up finished or its deadline passed, False before the warm-up was started
+        """
+        ready = self._started_at is not None and (self._done.is_set() or time.monotonic() >= self._deadline())
+        warmup_ready.set(1 if ready else 0)
+        return ready
+
+
+def get_readiness(request: Request) -> tuple[bool, dict]:
+    """
+    Report whether the service wizard is ready for traffic, for the kubernetes readiness probe.
+    :param request: The request object
+    :return: Whether it is ready, and the state of the warm-up steps
+    """
+    warm_up = request.app.state.warm_up
+    ready = warm_up.ready()
+    return ready, {"ready": ready, "warm_up": dict(warm_up.steps)}
@@ -1,8 +1,9 @@
+import asyncio
 import logging
 import os
+from contextlib import asynccontextmanager
 from typing import Optional
 
-import sentry_sdk
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.gzip import GZipMiddleware
@@ -11,10 +12,63 @@ from clients.CachedAuthClient import CachedAuthClient
 from clients.CachedCatalogClient import CachedCatalogClient
 from clients.KubernetesClients import K8sClients
 from configs.settings import get_settings, Settings
+from dependencies.autoscaler import Autoscaler
+from dependencies.idle_reaper import ActivityTracker, IdleReaper
+from dependencies.image_prepull import ImagePrePuller, ImageStartTracker
+from dependencies.leader_election import LeaderElector
+from dependencies.release_watcher import ReleaseWatcher
+from dependencies.wakeup import WakeCoordinator
+from dependencies.warmup import WarmUp
 from routes.authenticated_routes import router as sw2_authenticated_router
 from routes.metrics_routes import router as metrics_router
 from routes.rpc_route import router as sw2_rpc_router
 from routes.unauthenticated_routes import router as sw2_unauthenticated_router
+from rpc.rate_limiter import RateLimiter
+
+
+def start_background_tasks(app: FastAPI):
+    """
+    Start the background tasks that are enabled in the settings.
+    The tasks are created once and restarted each time this process becomes the leader again, so a task that is still
+    finishing a run from its previous leadership is resumed instead of running twice.
+    """
+    settings = app.state.settings
+    if not app.state.background_tasks:
+        if settings.idle_reaper_enabled:
+            app.state.background_tasks.append(IdleReaper(app=app, settings=settings))
+        if settings.autoscaler_enabled:
+            app.state.background_tasks.append(Autoscaler(app=app, settings=settings))
+        if settings.image_prepull_enabled:
+            app.state.background_tasks.append(ImagePrePuller(app=app, settings=settings))
+        if settings.release_watcher_enabled:
+            app.state.background_tasks.append(ReleaseWatcher(app=app, settings=settings))
+    for task in app.state.background_tasks:
+        task.start()
+
+
+def stop_background_tasks(app: FastAPI):
+    for task in app.state.background_tasks:
+        task.stop()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start the cache warm-up and the background tasks, and stop the tasks on shutdown.
+    With leader election enabled, the background tasks only run while this process is the leader.
+    """
+    app.state.warm_up.start()
+    leader_elector = app.state.leader_elector
+    if leader_elector is not None:
+        leader_elector.start()
+    else:
+        start_background_tasks(app)
+    yield
+    # Stopping joins the threads, so it runs off the event loop
+    if leader_elector is not None:
+        await asyncio.to_thread(leader_elector.stop)
+    else:
+        await asyncio.to_thread(stop_background_tasks, app)
 
 
 def create_app(
@@ -41,6 +95,8 @@ def create_app(
         settings = get_settings()
 
     if os.environ.get("SENTRY_DSN"):
+        import sentry_sdk
+
         sentry_sdk.init(
             dsn=os.environ["SENTRY_DSN"],
             traces_sample_rate=1.0,
@@ -48,14 +104,26 @@ def create_app(
             environment=settings.external_ds_url,
         )
 
-    app = FastAPI(root_path=settings.root_path)  # type: FastAPI
+    app = FastAPI(root_path=settings.root_path, lifespan=lifespan)  # type: FastAPI
 
     # Set up the state of the app with various clients.
     # Note, when running multiple threads, these will each have their own cache
     app.state.settings = settings
     app.state.catalog_client = catalog_client or CachedCatalogClient(settings=settings)
+    # The kubernetes config is loaded on first use of the clients, see K8sClients
     app.state.k8s_clients = k8s_clients if k8s_clients else K8sClients(settings=settings)
     app.state.auth_client = auth_client if auth_client else CachedAuthClient(settings=settings)
+    app.state.activity_tracker = ActivityTracker()
+    app.state.image_tracker = ImageStartTracker()
+    app.state.wake_coordinator = WakeCoordinator()
+    app.state.rate_limiter = RateLimiter(settings)
+    app.state.background_tasks = []
+    app.state.warm_up = WarmUp(app)
+    app.state.leader_elector = (
+        LeaderElector(app, settings, on_started_leading=lambda: start_background_tasks(app), on_stopped_leading=lambda: stop_background_tasks(app))
+        if settings.leader_election_enabled
+        else None
+    )
 
     # Add the routes
     app.include_router(sw2_authenticated_router)
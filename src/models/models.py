@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import List, NamedTuple
 
 from pydantic import BaseModel
 
@@ -46,7 +46,7 @@ class DynamicServiceStatus(BaseModel):
     url: str  # URL of the service
     module_name: str  # Name of the service module
     health: ServiceHealth  # Service health based on replica counts
-    up: int  # Indicator of whether the service is up (1) or down (0)
+    up: int  # Indicator of whether the service is up (1) or down (0), available replicas passed their readiness probe
     # New Fields
     deployment_name: str  # Name of the deployment
     replicas: int  # Total number of replicas
@@ -103,3 +103,40 @@ class DynamicServiceStatus(BaseModel):
 
         # Initialize the model using the updated data
         super().__init__(**data)
+
+
+class DeploymentRecord(NamedTuple):
+    """
+    An immutable snapshot of the fields of a dynamic service deployment that its status is built from, without the pod
+    template, env and volumes of the full kubernetes object. The kubernetes status caches hold these.
+    """
+
+    name: str  # Name of the deployment
+    module_name: str | None  # module_name annotation, None if missing
+    git_commit_hash: str | None  # git_commit_hash annotation, None if missing
+    replicas: int = 0  # Desired number of replicas
+    updated_replicas: int = 0
+    ready_replicas: int = 0
+    available_replicas: int = 0
+    unavailable_replicas: int = 0
+    resource_version: str | None = None  # Resource version the snapshot was taken at, to watch the deployment from
+
+
+class DynamicServiceStatusPage(BaseModel):
+    statuses: List[DynamicServiceStatus]  # Statuses of the dynamic services in this page
+    cursor: str | None = None  # Pass this to get the next page, None if this was the last page
+
+
+class DynamicServiceResourceUsage(BaseModel):
+    module_name: str  # Name of the service module
+    git_commit_hash: str  # Git commit hash of the service
+    deployment_name: str  # Name of the deployment
+    sizing_profile: str | None = None  # Sizing profile the deployment was created with, if any
+    replicas: int = 0  # Total number of replicas
+    pods_with_metrics: int = 0  # Number of pods metrics-server reported usage for
+    cpu_requested_cores: float = 0  # CPU requested by all replicas, limits are used for containers without requests
+    cpu_used_cores: float | None = None  # CPU used by all pods, None if no pod had metrics
+    memory_requested_bytes: int = 0  # Memory requested by all replicas, limits are used for containers without requests
+    memory_used_bytes: int | None = None  # Memory used by all pods, None if no pod had metrics
+    cpu_usage_ratio: float | None = None  # CPU used / requested, None if either is unknown or nothing was requested
+    memory_usage_ratio: float | None = None  # Memory used / requested, None if either is unknown or nothing was requested
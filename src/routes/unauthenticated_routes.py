@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
 
 from dependencies.status import get_version, get_status
+from dependencies.warmup import get_readiness
 
 router = APIRouter(
     tags=["unauthenticated"],
@@ -17,3 +19,9 @@ def status(request: Request):
 @router.get("/version")
 def version(request: Request):
     return get_version(request)
+
+
+@router.get("/ready")
+def ready(request: Request):
+    is_ready, readiness = get_readiness(request)
+    return JSONResponse(status_code=200 if is_ready else 503, content=readiness)
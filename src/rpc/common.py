@@ -1,4 +1,5 @@
 import json
+import logging
 import traceback
 from typing import Callable, Any
 
@@ -6,6 +7,7 @@ from fastapi import HTTPException, Request
 
 from clients.CachedAuthClient import UserAuthRoles, CachedAuthClient  # noqa: F401
 from clients.baseclient import ServerError
+from clients.circuit_breaker import FAIL_FAST_ERRORS
 from rpc.error_responses import (
     no_params_passed,
 )
@@ -54,6 +56,30 @@ def validate_rpc_response(response: JSONRPCResponse):
     return response
 
 
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+
+def get_request_deadline(request: Request, method: str) -> float | None:
+    """
+    The deadline of an RPC request, in seconds from now. The caller can set it with the X-Request-Timeout header, up to
+    REQUEST_DEADLINE_MAX_SECONDS, otherwise the default deadline of the method is used.
+    :param request: The request
+    :param method: The RPC method
+    :return: The deadline in seconds, or None if the request has no deadline
+    """
+    settings = request.app.state.settings
+    header = request.headers.get(REQUEST_TIMEOUT_HEADER)
+    if header:
+        try:
+            timeout = float(header)
+        except ValueError:
+            timeout = 0
+        if timeout > 0:
+            return min(timeout, settings.request_deadline_max_seconds)
+        logging.warning(f"Ignoring the invalid {REQUEST_TIMEOUT_HEADER} header {header!r}")
+    return settings.request_deadline(method)
+
+
 def get_user_auth_roles(request: Request, jrpc_id: str, method: str) -> tuple[Any, None] | tuple[None, JSONRPCResponse]:
     authorization = request.headers.get("Authorization")
     kbase_session = request.cookies.get("kbase_session")
@@ -77,6 +103,7 @@ def handle_rpc_request(
     params: list[dict],
     jrpc_id: str,
     action: Callable,  # This is the function that will be called,  with the signature of (request, module_name, module_version)
+    extra_params: tuple[str, ...] = (),  # Params that are passed to the action as keyword arguments when present
 ) -> JSONRPCResponse:
     method_name = action.__name__
     try:
@@ -100,8 +127,11 @@ def handle_rpc_request(
     module_version = service.get("version", first_param.get("version"))
 
     try:
-        result = action(request, module_name, module_version)
+        result = action(request, module_name, module_version, **{name: first_param[name] for name in extra_params if name in first_param})
         return JSONRPCResponse(id=jrpc_id, result=[result])
+    except FAIL_FAST_ERRORS as e:
+        # The call was not made, so there is no traceback worth returning
+        return JSONRPCResponse(id=jrpc_id, error=ErrorResponse(message=e.message, code=e.code, name=e.name))
     except ServerError as e:
         traceback_str = traceback.format_exc()
         return JSONRPCResponse(id=jrpc_id, error=ErrorResponse(message=f"{e.message}", code=-32000, name="Server error", error=f"{traceback_str}"))
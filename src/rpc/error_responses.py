@@ -67,5 +67,17 @@ def token_validation_failed(jrpc_id: object) -> JSONRPCResponse:
     )
 
 
+def rate_limited(method: str, jrpc_id: object, retry_after: float) -> JSONRPCResponse:
+    return JSONRPCResponse(
+        id=jrpc_id,
+        error=ErrorResponse(
+            message=f"Rate limit exceeded for {method}, retry after {retry_after:.2f} seconds",
+            code=-32002,
+            name="Rate limited",
+            error=None,
+        ),
+    )
+
+
 def json_rpc_response_to_exception(content: JSONRPCResponse, status_code: int = 500) -> JSONResponse:
     return JSONResponse(content=content.model_dump(), status_code=status_code)
@@ -1,6 +1,6 @@
 from fastapi import Request
 
-from dependencies import logs
+from dependencies import logs, resource_usage
 from dependencies.lifecycle import stop_deployment
 from rpc.common import handle_rpc_request
 from rpc.models import JSONRPCResponse
@@ -16,3 +16,7 @@ def get_service_log(request: Request, params: list[dict], jrpc_id: str) -> JSONR
 
 def get_service_log_web_socket(request: Request, params: list[dict], jrpc_id: str) -> JSONRPCResponse:
     return handle_rpc_request(request, params, jrpc_id, logs.get_service_log_web_socket)
+
+
+def get_resource_usage(request: Request, params: list[dict], jrpc_id: str) -> JSONRPCResponse:
+    return handle_rpc_request(request, params, jrpc_id, resource_usage.get_resource_usage)
@@ -1,17 +1,20 @@
+import math
 from typing import Callable, Any
 
 from fastapi import Request, Response, HTTPException
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
-from rpc.common import validate_rpc_request, get_user_auth_roles
-from rpc.error_responses import method_not_found
+from clients.deadline import deadline_scope
+from rpc.common import validate_rpc_request, get_user_auth_roles, get_request_deadline
+from rpc.error_responses import method_not_found, rate_limited
 from rpc.handlers import unauthenticated_handlers, authenticated_handlers
 from rpc.models import JSONRPCResponse
 
 # No KBase Token Required
 unauthenticated_routes_mapping = {
     "ServiceWizard.list_service_status": unauthenticated_handlers.list_service_status,
+    "ServiceWizard.list_service_status_page": unauthenticated_handlers.list_service_status_page,
     "ServiceWizard.status": unauthenticated_handlers.status,
     "ServiceWizard.version": unauthenticated_handlers.version,
     "ServiceWizard.get_service_status_without_restart": unauthenticated_handlers.get_service_status_without_restart,
@@ -23,6 +26,7 @@ unauthenticated_routes_mapping = {
 admin_or_owner_required = {
     "ServiceWizard.get_service_log": authenticated_handlers.get_service_log,
     "ServiceWizard.stop": authenticated_handlers.stop,
+    "ServiceWizard.get_resource_usage": authenticated_handlers.get_resource_usage,
 }
 # Use star unpacking to create a mapping of known routes
 known_methods = {**unauthenticated_routes_mapping, **admin_or_owner_required}
@@ -41,14 +45,21 @@ def json_rpc_helper(request: Request, body: bytes) -> Response | HTTPException |
 
     request_function: Callable[[Request, list[dict[Any, Any]], str], JSONRPCResponse] = request_function_candidate
 
-    if function_requires_auth(request_function):
-        user_auth_roles, auth_error = get_user_auth_roles(request, jrpc_id, method)
-        if auth_error:
-            return JSONResponse(content=jsonable_encoder(auth_error), status_code=500)
-        else:
-            request.state.user_auth_roles = user_auth_roles
+    retry_after = request.app.state.rate_limiter.check(request, method, params)
+    if retry_after:
+        # Status 500 like the other JSON-RPC errors, so the KBase SDK clients raise a ServerError with the message
+        return JSONResponse(content=jsonable_encoder(rate_limited(method, jrpc_id, retry_after)), status_code=500, headers={"Retry-After": str(math.ceil(retry_after))})
 
-    valid_response = request_function(request, params, jrpc_id)  # type:JSONRPCResponse
+    # Every upstream call and retry loop of the request gives up once the deadline passes, see clients.deadline
+    with deadline_scope(get_request_deadline(request, method)):
+        if function_requires_auth(request_function):
+            user_auth_roles, auth_error = get_user_auth_roles(request, jrpc_id, method)
+            if auth_error:
+                return JSONResponse(content=jsonable_encoder(auth_error), status_code=500)
+            else:
+                request.state.user_auth_roles = user_auth_roles
+
+        valid_response = request_function(request, params, jrpc_id)  # type:JSONRPCResponse
 
     converted_response = jsonable_encoder(valid_response)
 
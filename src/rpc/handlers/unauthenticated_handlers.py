@@ -1,7 +1,7 @@
 from fastapi.requests import Request
 
 from dependencies.lifecycle import start_deployment
-from dependencies.status import get_all_dynamic_service_statuses, get_service_status_one_try, get_version, get_status
+from dependencies.status import get_all_dynamic_service_statuses, get_dynamic_service_statuses_page, get_service_status_one_try, get_version, get_status
 from rpc.common import handle_rpc_request
 from rpc.models import JSONRPCResponse
 
@@ -10,6 +10,10 @@ def list_service_status(request: Request, params: list[dict], jrpc_id: str) -> J
     return handle_rpc_request(request, params, jrpc_id, get_all_dynamic_service_statuses)
 
 
+def list_service_status_page(request: Request, params: list[dict], jrpc_id: str) -> JSONRPCResponse:
+    return handle_rpc_request(request, params, jrpc_id, get_dynamic_service_statuses_page, extra_params=("cursor", "page_size"))
+
+
 def get_service_status_without_restart(request: Request, params: list[dict], jrpc_id: str) -> JSONRPCResponse:
     return handle_rpc_request(request, params, jrpc_id, get_service_status_one_try)
 
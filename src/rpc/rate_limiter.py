@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from fastapi import Request
+from prometheus_client import Counter
+
+from clients.metrics import get_or_create_metric
+from configs.settings import RateLimitPolicy, Settings
+
+rate_limited_total = get_or_create_metric(Counter, "service_wizard_rate_limited_total", "RPC requests rejected by the rate limiter", ("method",))
+
+
+def rate_limit_key(request: Request, method: str, params: Any, policy: RateLimitPolicy) -> tuple:
+    """
+    The key of the token bucket a request is counted against, from the parts named in the policy.
+    The token is not validated here, so a client can get a new bucket with a made up token. Only key by "token" along
+    with "ip". Requests without a token are keyed by their client IP instead, and tokens by their hash so the buckets
+    do not hold credentials.
+    :param request: The request
+    :param method: The RPC method
+    :param params: The RPC params, the module name is read from the first one, or from its SW1 style "service"
+    :param policy: The rate limit policy of the method
+    :return: The key
+    """
+    ip = request.client.host if request.client else "unknown"
+    key = [method]
+    for part in policy.key:
+        if part == "ip":
+            key.append(ip)
+        elif part == "token":
+            token = request.headers.get("Authorization") or request.cookies.get("kbase_session")
+            key.append(f"token:{hashlib.sha256(token.encode()).hexdigest()}" if token else f"ip:{ip}")
+        elif part == "module":
+            first = params[0] if isinstance(params, list) and params else None
+            module_name = None
+            if isinstance(first, dict):
+                service = first.get("service")
+                module_name = first.get("module_name") or (service.get("module_name") if isinstance(service, dict) else None)
+            key.append(module_name.lower() if isinstance(module_name, str) else None)
+    return tuple(key)
+
+
+class RateLimiter:
+    """
+    Token bucket rate limits for the RPC methods, so a client polling in a tight loop can not drive the catalog and
+    kubernetes calls behind a method over and over. Each bucket holds up to `burst` requests and refills at `rate`
+    requests per second.
+
+    The buckets are kept in memory, per worker process, in an LRU dict bounded to `rate_limit_max_keys` entries. A bucket
+    that was not used for burst / rate seconds is full again, so dropping the least recently used ones only loses state
+    when many more clients than that are active at once.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self.max_keys = settings.rate_limit_max_keys
+        self._buckets: OrderedDict[tuple, list[float]] = OrderedDict()  # Key to [tokens, last updated]
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: tuple, policy: RateLimitPolicy) -> float:
+        """
+        Take one request from the bucket of the key.
+        :return: 0 if the request is allowed, otherwise the seconds until the bucket has a request again
+        """
+        if policy.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [policy.burst, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(policy.burst, bucket[0] + (now - bucket[1]) * policy.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / policy.rate
+
+    def check(self, request: Request, method: str, params: Any) -> float:
+        """
+        Count an RPC request against its rate limit.
+        :return: 0 if the request is allowed, otherwise the seconds the client should wait before retrying
+        """
+        policy = self.settings.rate_limit_policy(method)
+        if policy.rate <= 0:
+            return 0.0
+        retry_after = self.try_acquire(rate_limit_key(request, method, params, policy), policy)
+        if retry_after:
+            rate_limited_total.labels(method).inc()
+        return retry_after
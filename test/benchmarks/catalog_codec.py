@@ -0,0 +1,123 @@
+"""
+Benchmark for decoding real-size catalog responses in BaseClient._call.
+
+Builds a list_basic_module_info response like the one of the production catalog, with thousands of modules and their
+released versions, and compares decoding it the way _call did before (to text, then json), with the json module from
+the raw bytes, and with orjson. Then calls the Catalog through BaseClient against a local server returning that
+response, with each codec.
+
+    PYTHONPATH=.:src python -m test.benchmarks.catalog_codec --modules 5000 --repeat 20
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from test.benchmarks.rpc_load import percentile
+from test.src.fixtures.fake_servers import FakeServer, fake_commit_hash, make_module_names
+
+
+def basic_module_info(module_name: str, versions: int) -> dict:
+    """A BasicModuleInfo of the catalog, with `versions` released versions"""
+    released = [{"timestamp": 1700000000000 + i, "git_commit_hash": fake_commit_hash(module_name, str(i)), "version": f"1.0.{i}"} for i in range(versions)]
+    return {
+        "module_name": module_name,
+        "git_url": f"https://github.com/kbaseapps/{module_name}",
+        "language": "python",
+        "dynamic_service": 1,
+        "owners": ["kbaseapps", f"{module_name.lower()}_dev"],
+        "dev": released[-1],
+        "beta": released[-1],
+        "release": released[-1],
+        "released_version_list": released,
+    }
+
+
+def catalog_response(modules: int, versions: int = 5) -> bytes:
+    result = [basic_module_info(name, versions) for name in make_module_names(modules)]
+    return json.dumps({"version": "1.1", "id": "1", "result": [result]}).encode()
+
+
+class FixedResponseServer(FakeServer):
+    """Returns the same JSON-RPC response to every request"""
+
+    def __init__(self, body: bytes):
+        super().__init__()
+        self.body = body
+
+    def handle(self, handler, verb: str):
+        handler.read_body()
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(self.body)))
+        handler.end_headers()
+        handler.wfile.write(self.body)
+
+
+def _decoders() -> dict:
+    decoders = {"json_text": lambda body: json.loads(body.decode("utf-8")), "json": json.loads}
+    try:
+        import orjson
+
+        decoders["orjson"] = orjson.loads
+    except ImportError:  # pragma: no cover
+        pass
+    return decoders
+
+
+def measure(fn, repeat: int) -> dict:
+    """Time fn `repeat` times, and the peak memory it allocates once"""
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    latencies.sort()
+    return {"p50_ms": round(percentile(latencies, 50), 3), "p95_ms": round(percentile(latencies, 95), 3), "peak_mb": round(peak / 2**20, 2)}
+
+
+def run(modules: int = 5000, versions: int = 5, repeat: int = 20) -> dict[str, dict]:
+    from clients import baseclient
+    from clients.CatalogClient import Catalog
+
+    body = catalog_response(modules, versions)
+    results = {}
+    for name, decode in _decoders().items():
+        results[f"decode_{name}"] = dict(measure(lambda: decode(body), repeat), body_mb=round(len(body) / 2**20, 2))
+
+    orjson = baseclient._orjson
+    with FixedResponseServer(body) as server:
+        catalog = Catalog(url=server.url, token="token")
+        for name, codec in (("json", None), ("orjson", orjson)):
+            if name == "orjson" and orjson is None:  # pragma: no cover
+                continue
+            baseclient._orjson = codec
+            try:
+                results[f"call_{name}"] = dict(measure(lambda: catalog.list_basic_module_info({}), repeat), body_mb=round(len(body) / 2**20, 2))
+            finally:
+                baseclient._orjson = orjson
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=5000)
+    parser.add_argument("--versions", type=int, default=5, help="Released versions per module")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    results = run(args.modules, args.versions, args.repeat)
+    print(f"{'path':<18}{'body MB':>10}{'p50 ms':>10}{'p95 ms':>10}{'peak MB':>10}")
+    for name, r in results.items():
+        print(f"{name:<18}{r['body_mb']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['peak_mb']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
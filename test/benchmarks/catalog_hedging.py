@@ -0,0 +1,88 @@
+"""
+Benchmark for hedged catalog reads against a fake catalog with a long tail of slow get_module_version calls.
+
+Makes the same get_module_version calls through CachedCatalogClient with hedging off and on, and compares the latency
+percentiles and the number of calls that reached the catalog.
+
+    PYTHONPATH=.:src python -m test.benchmarks.catalog_hedging --calls 2000 --concurrency 8 --tail-probability 0.02
+"""
+
+import argparse
+import dataclasses
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from test.benchmarks.rpc_load import build_settings, percentile
+from test.src.fixtures.fake_servers import FakeCatalogServer, long_tail_latency, make_module_names
+
+
+def measure(client, module_names: list[str], calls: int, concurrency: int) -> list[float]:
+    """Call get_module_version `calls` times from `concurrency` threads and return the latencies in milliseconds"""
+
+    def call(i: int) -> float:
+        t0 = time.perf_counter()
+        client._call_catalog(client.cc.get_module_version, {"module_name": module_names[i % len(module_names)], "version": "release"})
+        return (time.perf_counter() - t0) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return sorted(pool.map(call, range(calls)))
+
+
+def run(
+    calls: int = 400,
+    concurrency: int = 8,
+    base_latency: float = 0.005,
+    tail_latency: float = 0.2,
+    tail_probability: float = 0.02,
+    budget: float = 0.1,
+    quantile: float = 0.95,
+) -> dict[str, dict]:
+    """
+    Measure get_module_version latency with hedging off and on. The hedger needs some calls to learn the latencies, so
+    the first `min_samples` calls of each run are made before measuring.
+    """
+    from clients.CachedCatalogClient import CachedCatalogClient
+    from configs.settings import HedgePolicy
+
+    module_names = make_module_names(20)
+    with FakeCatalogServer(module_names=module_names, latency=long_tail_latency(base_latency, tail_latency, tail_probability)) as catalog:
+        base_settings = build_settings(catalog_url=catalog.url, auth_url="http://127.0.0.1:1")
+        results = {}
+        for name, policy in (("no_hedging", HedgePolicy()), ("hedging", HedgePolicy(budget=budget, quantile=quantile, min_delay=base_latency))):
+            client = CachedCatalogClient(settings=dataclasses.replace(base_settings, catalog_hedge_policies={"get_module_version": policy}))
+            measure(client, module_names, client.hedger.min_samples, 1)
+            catalog.calls.clear()
+            latencies = measure(client, module_names, calls, concurrency)
+            results[name] = {
+                "calls": calls,
+                "catalog_calls": catalog.calls["Catalog.get_module_version"],
+                "hedge_delay_ms": round((client.hedger.delay("get_module_version") or 0) * 1000, 3),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "max_ms": round(latencies[-1], 3),
+            }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-latency-ms", type=float, default=5.0)
+    parser.add_argument("--tail-latency-ms", type=float, default=200.0)
+    parser.add_argument("--tail-probability", type=float, default=0.02)
+    parser.add_argument("--budget", type=float, default=0.1, help="Fraction of calls that may be hedged")
+    parser.add_argument("--quantile", type=float, default=0.95, help="Latency quantile after which a call is hedged")
+    args = parser.parse_args(argv)
+
+    results = run(args.calls, args.concurrency, args.base_latency_ms / 1000, args.tail_latency_ms / 1000, args.tail_probability, args.budget, args.quantile)
+    print(f"{'approach':<12}{'calls':>8}{'catalog':>10}{'delay ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['calls']:>8}{r['catalog_calls']:>10}{r['hedge_delay_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
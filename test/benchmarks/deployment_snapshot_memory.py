@@ -0,0 +1,130 @@
+"""
+Benchmark for the memory the kubernetes status caches retain per dynamic service deployment.
+
+Compares caching the V1Deployment object graphs the kubernetes client deserializes, with caching the DeploymentRecord
+snapshots taken from them at ingest. The deployments look like the ones the service wizard creates, with the secure
+config params of the module in the container env.
+
+    PYTHONPATH=.:src python -m test.benchmarks.deployment_snapshot_memory --deployments 2000 --secure-params 20
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+
+
+class _Response:
+    def __init__(self, data: str):
+        self.data = data
+
+
+def make_deployment(i: int, secure_params: int, namespace: str = "staging-dynamic-services") -> dict:
+    """A deployment as the API server returns it for a service wizard dynamic service"""
+    module_name, git_commit_hash = f"BenchmarkModule{i}", f"{i:040x}"
+    name = f"d-benchmarkmodule{i}-{git_commit_hash[:7]}-d"
+    labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+    annotations = {
+        "module_name": module_name,
+        "git_commit_hash": git_commit_hash,
+        "version": "1.0.0",
+        "git_url": f"https://github.com/kbaseapps/{module_name}",
+        "module_version_from_request": "release",
+        "k8s_deployment_name": name,
+        "k8s_service_name": f"s-benchmarkmodule{i}-{git_commit_hash[:7]}-s",
+    }
+    env = [
+        {"name": "KBASE_ENDPOINT", "value": "https://ci.kbase.us/services"},
+        {"name": "AUTH_SERVICE_URL", "value": "https://ci.kbase.us/services/auth/api/legacy/KBase/Sessions/Login"},
+    ]
+    env += [{"name": f"KBASE_SECURE_CONFIG_PARAM_param_{p}", "value": f"secret-value-{i}-{p}-" + "x" * 32} for p in range(secure_params)]
+    return {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "uid": f"{i:032x}",
+            "resourceVersion": str(1000 + i),
+            "generation": 1,
+            "creationTimestamp": "2023-01-01T00:00:00Z",
+            "labels": labels,
+            "annotations": annotations,
+        },
+        "spec": {
+            "replicas": 1,
+            "selector": {"matchLabels": {k: v for k, v in labels.items() if k != "us.kbase.dynamicservice"}},
+            "template": {
+                "metadata": {"labels": labels, "annotations": annotations},
+                "spec": {
+                    "containers": [
+                        {
+                            "name": name,
+                            "image": f"dockerhub-ci.kbase.us/kbase:{module_name.lower()}.{git_commit_hash}",
+                            "env": env,
+                            "resources": {"requests": {"cpu": "250m", "memory": "512Mi"}, "limits": {"cpu": "1", "memory": "2Gi"}},
+                            "readinessProbe": {"tcpSocket": {"port": 5000}, "periodSeconds": 10, "timeoutSeconds": 1, "failureThreshold": 3},
+                            "volumeMounts": [{"name": "data-0", "mountPath": "/data", "readOnly": True}],
+                        }
+                    ],
+                    "volumes": [{"name": "data-0", "hostPath": {"path": "/mnt/data"}}],
+                    "tolerations": [{"effect": "NoSchedule", "key": namespace, "operator": "Exists"}],
+                },
+            },
+        },
+        "status": {"observedGeneration": 1, "replicas": 1, "updatedReplicas": 1, "readyReplicas": 1, "availableReplicas": 1},
+    }
+
+
+def retained_bytes(build) -> tuple[int, int]:
+    """Return the bytes still allocated after build() returned, while its result is alive, and the peak during build()"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def run(deployments: int = 500, secure_params: int = 10) -> dict[str, dict]:
+    """Measure the memory retained by caching each kind of object for `deployments` deployments"""
+    from kubernetes.client import ApiClient
+
+    from dependencies.k8_wrapper import deployment_record_from_model
+
+    api_client = ApiClient()
+    responses = [_Response(json.dumps(make_deployment(i, secure_params))) for i in range(deployments)]
+
+    def deserialize(response: _Response):
+        return api_client.deserialize(response, "V1Deployment")
+
+    results = {}
+    for name, build in (
+        ("V1Deployment", lambda: [deserialize(r) for r in responses]),
+        ("DeploymentRecord", lambda: [deployment_record_from_model(deserialize(r)) for r in responses]),
+    ):
+        current, peak = retained_bytes(build)
+        results[name] = {"deployments": deployments, "retained_bytes": current, "bytes_per_deployment": current // deployments, "peak_bytes": peak}
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deployments", type=int, default=500)
+    parser.add_argument("--secure-params", type=int, default=10, help="Secure config params in the env of each deployment")
+    args = parser.parse_args(argv)
+
+    results = run(args.deployments, args.secure_params)
+    print(f"{'cached type':<20}{'deployments':>12}{'retained KiB':>14}{'bytes each':>12}{'peak KiB':>10}")
+    for name, r in results.items():
+        print(f"{name:<20}{r['deployments']:>12}{r['retained_bytes'] // 1024:>14}{r['bytes_per_deployment']:>12}{r['peak_bytes'] // 1024:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
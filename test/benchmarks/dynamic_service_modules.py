@@ -0,0 +1,80 @@
+"""
+Benchmark for looking up the dynamic service modules against a fake catalog with 2,000 modules.
+
+Compares rebuilding the full hash to name mapping from list_basic_module_info whenever the cache expires
+with the lazily refreshed set of module names that CachedCatalogClient shares across requests.
+
+    PYTHONPATH=.:src python -m test.benchmarks.dynamic_service_modules --modules 2000 --calls 2000
+"""
+
+import argparse
+import dataclasses
+import sys
+import time
+
+from test.benchmarks.rpc_load import build_settings, percentile
+from test.src.fixtures.fake_servers import FakeCatalogServer, make_module_names
+
+
+def rebuild_hash_to_name_mappings(client) -> dict[str, str]:
+    """The previous behavior: a blocking full list_basic_module_info whenever the cached mapping has expired"""
+    from clients.CachedCatalogClient import get_module_name_hash
+
+    basic_module_info = client.cc.list_basic_module_info({"include_released": 1, "include_unreleased": 1})
+    return {get_module_name_hash(m["module_name"]): m["module_name"] for m in basic_module_info if m.get("dynamic_service") == 1}
+
+
+def measure(fn, calls: int, interval: float) -> list[float]:
+    """Call fn `calls` times, `interval` seconds apart, and return the latencies in milliseconds"""
+    latencies = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if interval:
+            time.sleep(interval)
+    return sorted(latencies)
+
+
+def run(modules: int = 2000, calls: int = 200, refresh_seconds: int = 0, catalog_latency: float = 0.0, interval: float = 0.0) -> dict[str, dict]:
+    """
+    Measure per-call latency of both approaches. With refresh_seconds=0 every call is stale, which is the worst case
+    for the lazy set as a background refresh is requested on every call, and matches a full rebuild per call for the old path.
+    """
+    from clients.CachedCatalogClient import CachedCatalogClient
+
+    with FakeCatalogServer(module_names=make_module_names(modules), latency=catalog_latency) as catalog:
+        settings = dataclasses.replace(build_settings(catalog_url=catalog.url, auth_url="http://127.0.0.1:1"), dynamic_service_modules_refresh_seconds=refresh_seconds)
+        client = CachedCatalogClient(settings=settings)
+        results = {}
+        for name, fn in (("full_rebuild", lambda: rebuild_hash_to_name_mappings(client)), ("lazy_module_names", client.get_dynamic_service_module_names)):
+            catalog.calls.clear()
+            latencies = measure(fn, calls, interval)
+            results[name] = {
+                "calls": calls,
+                "catalog_calls": catalog.calls["Catalog.list_basic_module_info"],
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "max_ms": round(latencies[-1], 3),
+            }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--refresh-seconds", type=int, default=0)
+    parser.add_argument("--catalog-latency-ms", type=float, default=0.0)
+    parser.add_argument("--interval-ms", type=float, default=0.0, help="Pause between calls")
+    args = parser.parse_args(argv)
+
+    results = run(args.modules, args.calls, args.refresh_seconds, args.catalog_latency_ms / 1000, args.interval_ms / 1000)
+    print(f"{'approach':<20}{'calls':>8}{'catalog':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<20}{r['calls']:>8}{r['catalog_calls']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
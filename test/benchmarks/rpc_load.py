@@ -0,0 +1,276 @@
+"""
+Load test for the JSON-RPC endpoint.
+
+Starts `factory.create_app` under uvicorn against the fake Catalog, Auth and Kubernetes API servers in
+test/src/fixtures/fake_servers.py, drives a weighted mix of RPC calls from several threads and reports
+RPS and p50/p95/p99 latencies per method. Results can be saved and compared against a previous run.
+
+    PYTHONPATH=.:src python -m test.benchmarks.rpc_load --duration 30 --concurrency 16 --output bench.json
+    PYTHONPATH=.:src python -m test.benchmarks.rpc_load --duration 30 --baseline bench.json
+"""
+
+import argparse
+import dataclasses
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import requests
+import uvicorn
+from dotenv import load_dotenv
+
+from test.src.fixtures.fake_servers import FakeAuthServer, FakeCatalogServer, FakeKubernetesServer, make_module_names
+
+ADMIN_TOKEN = "benchmarkadmintoken"
+
+DEFAULT_MIX = {
+    "ServiceWizard.get_service_status": 60,
+    "ServiceWizard.list_service_status": 20,
+    "ServiceWizard.start": 15,
+    "ServiceWizard.stop": 5,
+}
+
+AUTHENTICATED_METHODS = {"ServiceWizard.stop", "ServiceWizard.get_service_log"}
+
+
+@dataclasses.dataclass
+class BenchmarkEnvironment:
+    url: str
+    catalog: FakeCatalogServer
+    auth: FakeAuthServer
+    k8s: FakeKubernetesServer
+    app: object
+    module_names: list[str]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_settings(catalog_url: str, auth_url: str):
+    from configs.settings import get_settings
+
+    load_dotenv(os.environ.get("DOTENV_FILE_LOCATION", ".env"))
+    get_settings.cache_clear()
+    # The load comes from one client, the rate limits would reject most of it
+    return dataclasses.replace(get_settings(), catalog_url=catalog_url, auth_service_url=auth_url, rate_limit_policies={})
+
+
+def build_app(settings, k8s_server: FakeKubernetesServer):
+    from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api
+
+    from clients.CachedAuthClient import CachedAuthClient
+    from clients.CachedCatalogClient import CachedCatalogClient
+    from clients.KubernetesClients import K8sClients
+    from factory import create_app
+
+    api_client = k8s_server.api_client()
+    k8s_clients = K8sClients(settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    return create_app(catalog_client=CachedCatalogClient(settings=settings), auth_client=CachedAuthClient(settings=settings), k8s_clients=k8s_clients, settings=settings)
+
+
+@contextmanager
+def benchmark_environment(modules: int = 50, catalog_latency: float = 0.0, k8s_latency: float = 0.0, ready_delay: float = 0.0):
+    """
+    Start the fake upstream servers and the app under uvicorn, and yield a BenchmarkEnvironment.
+    """
+    module_names = make_module_names(modules)
+    with FakeCatalogServer(module_names=module_names, latency=catalog_latency) as catalog, FakeAuthServer(
+        tokens={ADMIN_TOKEN: ("benchmark_admin", ["KBASE_ADMIN"])}
+    ) as auth, FakeKubernetesServer(ready_delay=ready_delay, latency=k8s_latency) as k8s:
+        settings = build_settings(catalog_url=catalog.url, auth_url=auth.me_url)
+        app = build_app(settings, k8s)
+        port = _free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.01)
+        try:
+            yield BenchmarkEnvironment(url=f"http://127.0.0.1:{port}", catalog=catalog, auth=auth, k8s=k8s, app=app, module_names=module_names)
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+
+def rpc(session: requests.Session, url: str, method: str, params: list[dict], jrpc_id: int) -> requests.Response:
+    headers = {"Authorization": ADMIN_TOKEN} if method in AUTHENTICATED_METHODS else {}
+    return session.post(f"{url}/rpc", json={"method": method, "params": params, "version": "1.1", "id": jrpc_id}, headers=headers)
+
+
+def _params_for(method: str, module_name: str) -> list[dict]:
+    if method == "ServiceWizard.list_service_status":
+        return [{}]
+    return [{"module_name": module_name, "version": "release"}]
+
+
+def start_all_modules(env: BenchmarkEnvironment):
+    """Start every module once so status, list and stop calls have deployments to look at."""
+    session = requests.Session()
+    for i, module_name in enumerate(env.module_names):
+        rpc(session, env.url, "ServiceWizard.start", _params_for("ServiceWizard.start", module_name), i)
+
+
+def run_load(env: BenchmarkEnvironment, mix: dict[str, int], concurrency: int, duration: float | None = None, requests_total: int | None = None, seed: int = 0) -> dict[str, list]:
+    """
+    Drive the RPC endpoint with `concurrency` threads until `duration` seconds pass or `requests_total` requests are sent.
+    Modules are picked with a skewed (zipf-like) distribution so a few modules are hot.
+    :return: A mapping of method name to a list of (latency_seconds, ok) samples, plus the wall time under the "_elapsed" key
+    """
+    methods, weights = zip(*mix.items())
+    module_weights = [1.0 / (i + 1) for i in range(len(env.module_names))]
+    samples = defaultdict(list)
+    lock = threading.Lock()
+    counter = itertools.count()
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        session = requests.Session()
+        while True:
+            n = next(counter)
+            if requests_total is not None and n >= requests_total:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            method = rng.choices(methods, weights)[0]
+            module_name = rng.choices(env.module_names, module_weights)[0]
+            t0 = time.perf_counter()
+            try:
+                ok = rpc(session, env.url, method, _params_for(method, module_name), n).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - t0
+            with lock:
+                samples[method].append((elapsed, ok))
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    samples["_elapsed"] = [time.perf_counter() - start]
+    return dict(samples)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank method
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: dict[str, list]) -> dict[str, dict]:
+    """
+    Reduce raw samples to count, errors, rps and latency percentiles (in milliseconds) per method and overall.
+    """
+    elapsed = samples["_elapsed"][0]
+    summary = {}
+    everything = []
+    for method, values in sorted(samples.items()):
+        if method == "_elapsed":
+            continue
+        everything.extend(values)
+        summary[method] = _stats(values, elapsed)
+    summary["total"] = _stats(everything, elapsed)
+    return summary
+
+
+def _stats(values: list, elapsed: float) -> dict:
+    latencies = sorted(v[0] * 1000 for v in values)
+    return {
+        "count": len(values),
+        "errors": sum(1 for v in values if not v[1]),
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def format_summary(summary: dict[str, dict]) -> str:
+    header = f"{'method':<42}{'count':>8}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    lines = [header, "-" * len(header)]
+    for method, s in summary.items():
+        lines.append(f"{method:<42}{s['count']:>8}{s['errors']:>8}{s['rps']:>10}{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}")
+    return "\n".join(lines)
+
+
+def find_regressions(summary: dict[str, dict], baseline: dict[str, dict], max_regression: float) -> list[str]:
+    """
+    Compare a summary against a baseline summary. A regression is a p95 latency that grew, or an RPS that shrank,
+    by more than max_regression (a fraction).
+    """
+    regressions = []
+    for method, base in baseline.items():
+        current = summary.get(method)
+        if current is None:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{method}: p95 {base['p95_ms']}ms -> {current['p95_ms']}ms")
+        if base["rps"] and current["rps"] < base["rps"] * (1 - max_regression):
+            regressions.append(f"{method}: rps {base['rps']} -> {current['rps']}")
+    return regressions
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    mix = {}
+    for part in text.split(","):
+        method, _, weight = part.partition("=")
+        mix[method if "." in method else f"ServiceWizard.{method}"] = int(weight)
+    return mix
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run the load for")
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests instead of --duration")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modules", type=int, default=50, help="Number of dynamic service modules in the fake catalog")
+    parser.add_argument("--catalog-latency-ms", type=float, default=0.0)
+    parser.add_argument("--k8s-latency-ms", type=float, default=0.0)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. get_service_status=60,list_service_status=20,start=15,stop=5")
+    parser.add_argument("--output", help="Write the JSON summary to this file")
+    parser.add_argument("--baseline", help="Compare against a JSON summary written by --output")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed fractional regression against the baseline")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    logging.basicConfig(level=os.environ["LOG_LEVEL"])
+    with benchmark_environment(modules=args.modules, catalog_latency=args.catalog_latency_ms / 1000, k8s_latency=args.k8s_latency_ms / 1000) as env:
+        start_all_modules(env)
+        duration = None if args.requests else args.duration
+        summary = summarize(run_load(env, args.mix, args.concurrency, duration=duration, requests_total=args.requests))
+
+    print(format_summary(summary))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(summary, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
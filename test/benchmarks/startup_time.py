@@ -0,0 +1,111 @@
+"""
+Benchmark for the startup time of the service wizard.
+
+Measures, in a fresh interpreter for each run, how long `import factory`, `factory.create_app()` and the first
+`ServiceWizard.get_service_status` request take. The app is created the way it is in production, without injected
+clients, with a kubeconfig pointing to the fake Kubernetes API server and the catalog URL pointing to the fake Catalog
+in test/src/fixtures/fake_servers.py, so the first request includes loading the kubeconfig and importing the
+kubernetes client package.
+
+    PYTHONPATH=.:src python -m test.benchmarks.startup_time --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from dotenv import dotenv_values
+
+from test.src.fixtures.fake_servers import FakeCatalogServer, FakeKubernetesServer, make_module_names
+
+PHASES = ("import", "create_app", "first_request")
+
+_CHILD = """
+import json, sys, time
+
+started = time.perf_counter()
+import factory
+
+imported = time.perf_counter()
+app = factory.create_app()
+created = time.perf_counter()
+modules = sorted(m for m in sys.modules if m.split(".")[0] in ("kubernetes", "sentry_sdk"))
+
+from fastapi.testclient import TestClient
+
+client = TestClient(app)
+requested = time.perf_counter()
+response = client.post("/rpc", json={"method": "ServiceWizard.get_service_status", "params": [{"module_name": "FakeModule0000", "version": "release"}], "version": "1.1", "id": 1})
+response.raise_for_status()
+done = time.perf_counter()
+print(json.dumps({"import": imported - started, "create_app": created - imported, "first_request": done - requested, "heavy_modules_at_create_app": len(modules)}))
+"""
+
+
+def _kubeconfig(server_url: str) -> dict:
+    return {
+        "apiVersion": "v1",
+        "kind": "Config",
+        "clusters": [{"name": "fake", "cluster": {"server": server_url}}],
+        "users": [{"name": "fake", "user": {"token": "fake"}}],
+        "contexts": [{"name": "fake", "context": {"cluster": "fake", "user": "fake"}}],
+        "current-context": "fake",
+    }
+
+
+def measure_once(env: dict[str, str]) -> dict[str, float]:
+    """Start a fresh interpreter and return the seconds each startup phase took in it"""
+    completed = subprocess.run([sys.executable, "-c", _CHILD], env=env, capture_output=True, text=True, check=True, timeout=120)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int = 5, modules: int = 50) -> dict[str, dict]:
+    """Measure the startup phases `runs` times and return the median and max of each, in seconds"""
+    with FakeCatalogServer(module_names=make_module_names(modules)) as catalog, FakeKubernetesServer() as k8s, tempfile.TemporaryDirectory() as tmp:
+        kubeconfig = os.path.join(tmp, "kubeconfig")
+        with open(kubeconfig, "w") as f:
+            json.dump(_kubeconfig(k8s.url), f)  # JSON is valid YAML
+
+        env = {**{k: v for k, v in dotenv_values(os.environ.get("DOTENV_FILE_LOCATION", ".env")).items() if v is not None}, **os.environ}
+        env.update(
+            CATALOG_URL=catalog.url,
+            KUBECONFIG=kubeconfig,
+            USE_INCLUSTER_CONFIG="false",
+            LOG_LEVEL="WARNING",
+            PYTHONPATH=os.pathsep.join(["src", env.get("PYTHONPATH", ".")]),
+        )
+        env.pop("SENTRY_DSN", None)
+        env.pop("DOTENV_FILE_LOCATION", None)
+        samples = [measure_once(env) for _ in range(runs)]
+
+    results = {}
+    for phase in PHASES:
+        values = [s[phase] for s in samples]
+        results[phase] = {"runs": runs, "median_seconds": statistics.median(values), "max_seconds": max(values)}
+    totals = [sum(s[phase] for phase in PHASES) for s in samples]
+    results["total"] = {"runs": runs, "median_seconds": statistics.median(totals), "max_seconds": max(totals)}
+    results["heavy_modules_at_create_app"] = max(s["heavy_modules_at_create_app"] for s in samples)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", type=int, default=50, help="Dynamic service modules in the fake catalog")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.modules)
+    print(f"{'phase':<16}{'median ms':>12}{'max ms':>10}")
+    for phase in (*PHASES, "total"):
+        r = results[phase]
+        print(f"{phase:<16}{r['median_seconds'] * 1000:>12.1f}{r['max_seconds'] * 1000:>10.1f}")
+    print(f"kubernetes and sentry_sdk modules imported by create_app: {results['heavy_modules_at_create_app']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+from clients import baseclient
+from test.benchmarks import catalog_codec
+
+
+def test_catalog_codec_benchmark_smoke():
+    results = catalog_codec.run(modules=50, versions=2, repeat=2)
+    expected = {"decode_json_text", "decode_json", "call_json"}
+    if baseclient._orjson is not None:
+        expected |= {"decode_orjson", "call_orjson"}
+    assert set(results) == expected
+    assert all(r["p50_ms"] > 0 and r["body_mb"] > 0 for r in results.values())
+
+
+def test_catalog_response_is_decoded_the_same_by_every_codec():
+    body = catalog_codec.catalog_response(modules=10, versions=3)
+    decoded = [decode(body) for decode in catalog_codec._decoders().values()]
+    assert len(decoded[0]["result"][0]) == 10
+    assert all(d == decoded[0] for d in decoded)
@@ -0,0 +1,10 @@
+from test.benchmarks import catalog_hedging
+
+
+def test_catalog_hedging_benchmark_smoke():
+    results = catalog_hedging.run(calls=40, concurrency=4, base_latency=0.001, tail_latency=0.05, tail_probability=0.1)
+    assert results["no_hedging"]["catalog_calls"] == 40
+    assert results["no_hedging"]["hedge_delay_ms"] == 0
+    # Hedges are extra calls on top of the measured ones, bounded by the budget
+    assert 40 <= results["hedging"]["catalog_calls"] <= 40 + 10
+    assert results["hedging"]["hedge_delay_ms"] > 0
@@ -0,0 +1,8 @@
+from test.benchmarks import deployment_snapshot_memory
+
+
+def test_deployment_snapshot_memory_benchmark_smoke():
+    results = deployment_snapshot_memory.run(deployments=20, secure_params=5)
+    assert results["V1Deployment"]["deployments"] == 20
+    # The snapshots hold a few strings and ints instead of the whole object graph
+    assert results["DeploymentRecord"]["retained_bytes"] * 5 < results["V1Deployment"]["retained_bytes"]
@@ -0,0 +1,9 @@
+from test.benchmarks import dynamic_service_modules
+
+
+def test_dynamic_service_modules_benchmark_smoke():
+    results = dynamic_service_modules.run(modules=50, calls=10, refresh_seconds=60)
+    assert results["full_rebuild"]["catalog_calls"] == 10
+    # Only the first call goes to the catalog, the rest are served from the shared set
+    assert results["lazy_module_names"]["catalog_calls"] == 1
+    assert results["lazy_module_names"]["p50_ms"] <= results["full_rebuild"]["p50_ms"]
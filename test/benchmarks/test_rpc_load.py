@@ -0,0 +1,33 @@
+from test.benchmarks import rpc_load
+
+
+def test_benchmark_harness_smoke():
+    with rpc_load.benchmark_environment(modules=3) as env:
+        rpc_load.start_all_modules(env)
+        samples = rpc_load.run_load(env, {"ServiceWizard.start": 1, "ServiceWizard.list_service_status": 1}, concurrency=2, requests_total=20)
+        assert env.catalog.calls["Catalog.get_module_version"] > 0
+        assert len(env.k8s.deployments) > 0
+
+    summary = rpc_load.summarize(samples)
+    assert summary["total"]["count"] == 20
+    assert summary["total"]["errors"] == 0
+    assert summary["total"]["p50_ms"] <= summary["total"]["p95_ms"] <= summary["total"]["p99_ms"]
+    assert "ServiceWizard.start" in rpc_load.format_summary(summary)
+
+
+def test_percentile():
+    values = sorted(float(i) for i in range(1, 101))
+    assert rpc_load.percentile(values, 50) == 50.0
+    assert rpc_load.percentile(values, 99) == 99.0
+    assert rpc_load.percentile([], 95) == 0.0
+
+
+def test_find_regressions():
+    baseline = {"total": {"p95_ms": 100.0, "rps": 100.0}}
+    assert rpc_load.find_regressions({"total": {"p95_ms": 110.0, "rps": 95.0}}, baseline, max_regression=0.25) == []
+    regressions = rpc_load.find_regressions({"total": {"p95_ms": 200.0, "rps": 50.0}}, baseline, max_regression=0.25)
+    assert len(regressions) == 2
+
+
+def test_parse_mix():
+    assert rpc_load.parse_mix("start=1,ServiceWizard.stop=2") == {"ServiceWizard.start": 1, "ServiceWizard.stop": 2}
@@ -0,0 +1,9 @@
+from test.benchmarks import startup_time
+
+
+def test_startup_time_benchmark_smoke():
+    results = startup_time.run(runs=1, modules=5)
+    assert results["import"]["runs"] == 1
+    assert results["first_request"]["median_seconds"] > 0
+    # The kubernetes client package and sentry are only imported once they are used
+    assert results["heavy_modules_at_create_app"] == 0
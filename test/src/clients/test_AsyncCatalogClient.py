@@ -0,0 +1,179 @@
+import asyncio
+import inspect
+import json
+import runpy
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from clients.AsyncCatalogClient import AsyncCatalog
+from clients.CatalogClient import Catalog
+from clients.async_baseclient import AsyncBaseClient
+from clients.baseclient import ServerError
+
+
+def _run(coroutine_function, *args):
+    return asyncio.run(coroutine_function(*args))
+
+
+def test_async_catalog_has_the_methods_of_catalog():
+    methods = {name for name, _ in inspect.getmembers(Catalog, inspect.isfunction) if not name.startswith("_")}
+    assert len(methods) == 50
+    for name in methods:
+        assert inspect.iscoroutinefunction(getattr(AsyncCatalog, name)), name
+        assert inspect.signature(getattr(AsyncCatalog, name)) == inspect.signature(getattr(Catalog, name))
+
+
+def test_async_catalog_client_is_up_to_date():
+    generate = runpy.run_path("scripts/generate_async_catalog_client.py")["generate"]
+    with open("src/clients/CatalogClient.py") as catalog, open("src/clients/AsyncCatalogClient.py") as async_catalog:
+        assert generate(catalog.read()) == async_catalog.read()
+
+
+def test_async_catalog_calls(fake_catalog_server):
+    module_name = next(iter(fake_catalog_server.modules))
+
+    async def calls():
+        async with AsyncCatalog(url=fake_catalog_server.url, token="token") as catalog:
+            return (
+                await catalog.version(),
+                await catalog.get_module_version({"module_name": module_name, "version": "release"}),
+                await catalog.list_volume_mounts({"module_name": module_name}),
+            )
+
+    version, module_version, mounts = _run(calls)
+    assert version == "fake"
+    assert module_version["module_name"] == module_name
+    assert mounts == []
+    assert fake_catalog_server.calls["Catalog.get_module_version"] == 1
+
+
+def test_async_catalog_calls_run_concurrently(fake_catalog_server):
+    fake_catalog_server.latency = 0.2
+    module_names = list(fake_catalog_server.modules)[:5]
+
+    async def calls():
+        async with AsyncCatalog(url=fake_catalog_server.url, token="token") as catalog:
+            return await asyncio.gather(*(catalog.get_module_info({"module_name": name}) for name in module_names))
+
+    start = time.monotonic()
+    infos = _run(calls)
+    assert time.monotonic() - start < 0.2 * len(module_names)
+    assert [info["module_name"] for info in infos] == module_names
+
+
+def test_async_catalog_server_error(fake_catalog_server):
+    async def call():
+        async with AsyncCatalog(url=fake_catalog_server.url, token="token") as catalog:
+            await catalog.get_module_version({"module_name": "unknown", "version": "release"})
+
+    with pytest.raises(ServerError, match="Module unknown not found") as e:
+        _run(call)
+    assert e.value.code == -32500
+
+
+def test_async_catalog_call_timeout(fake_catalog_server):
+    fake_catalog_server.latency = 1.0
+
+    async def call(timeout):
+        async with AsyncCatalog(url=fake_catalog_server.url, token="token", call_timeout=lambda: timeout) as catalog:
+            await catalog.version()
+
+    with pytest.raises(httpx.TimeoutException):
+        _run(call, 0.1)
+
+    async def call_method():
+        async with AsyncBaseClient(url=fake_catalog_server.url, token="token") as client:
+            await client.call_method("Catalog.version", [], timeout=0.1)
+
+    with pytest.raises(httpx.TimeoutException):
+        _run(call_method)
+
+
+def test_async_base_client_request(fake_catalog_server):
+    async def call():
+        async with AsyncBaseClient(url=fake_catalog_server.url, token="token") as client:
+            with patch.object(client._http, "post", wraps=client._http.post) as post:
+                await client.call_method("Catalog.version", [], service_ver="beta", context={"x": 1})
+            return post.call_args
+
+    call_args = _run(call)
+    assert call_args.kwargs["timeout"] == 30 * 60
+    assert json.loads(call_args.kwargs["content"])["context"] == {"x": 1, "service_ver": "beta"}
+
+
+@pytest.mark.parametrize(
+    "status, body, content_type, error",
+    [
+        (500, '{"error": {"name": "JSONRPCError", "code": -32601, "message": "no method"}}', "application/json", "JSONRPCError: -32601. no method"),
+        (500, '{"version": "1.1"}', "application/json", "Unknown: 0. "),
+        (500, "Internal Server Error", "text/plain", "Unknown: 0. Internal Server Error"),
+        (200, '{"version": "1.1"}', "application/json", "Unknown: 0. An unknown server error occurred"),
+    ],
+)
+def test_async_base_client_errors(status, body, content_type, error):
+    transport = httpx.MockTransport(lambda request: httpx.Response(status, text=body, headers={"content-type": content_type}))
+
+    async def call():
+        client = AsyncBaseClient(url="http://catalog", token="token")
+        client._http = httpx.AsyncClient(transport=transport)
+        async with client:
+            await client.call_method("Catalog.version", [])
+
+    with pytest.raises(ServerError) as e:
+        _run(call)
+    assert str(e.value).startswith(error)
+
+
+@pytest.mark.parametrize("result, expected", [([], None), (["a"], "a"), (["a", "b"], ["a", "b"])])
+def test_async_base_client_results(result, expected):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"version": "1.1", "result": result}))
+
+    async def call():
+        client = AsyncBaseClient(url="http://catalog", token="token")
+        client._http = httpx.AsyncClient(transport=transport)
+        async with client:
+            return await client.call_method("Catalog.version", [])
+
+    assert _run(call) == expected
+
+
+def test_async_base_client_http_error():
+    transport = httpx.MockTransport(lambda request: httpx.Response(502, text="Bad Gateway"))
+
+    async def call():
+        client = AsyncBaseClient(url="http://catalog", token="token")
+        client._http = httpx.AsyncClient(transport=transport)
+        async with client:
+            await client.call_method("Catalog.version", [])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _run(call)
+
+
+@patch("clients.async_baseclient._read_inifile")
+@patch("clients.async_baseclient._get_token", return_value="password_token")
+def test_async_base_client_auth(mock_get_token, mock_read_inifile, monkeypatch):
+    monkeypatch.delenv("KB_AUTH_TOKEN", raising=False)
+    mock_read_inifile.return_value = None
+    assert "AUTHORIZATION" not in AsyncBaseClient(url="http://catalog")._http.headers
+    assert AsyncBaseClient(url="http://catalog", token="token")._http.headers["AUTHORIZATION"] == "token"
+    assert AsyncBaseClient(url="http://catalog", user_id="user", password="pw")._http.headers["AUTHORIZATION"] == "password_token"
+    mock_read_inifile.return_value = {"token": "inifile_token"}
+    assert AsyncBaseClient(url="http://catalog")._http.headers["AUTHORIZATION"] == "inifile_token"
+    mock_read_inifile.return_value = {"user_id": "user", "password": "pw"}
+    assert AsyncBaseClient(url="http://catalog")._http.headers["AUTHORIZATION"] == "password_token"
+    assert "AUTHORIZATION" not in AsyncBaseClient(url="http://catalog", ignore_authrc=True)._http.headers
+    monkeypatch.setenv("KB_AUTH_TOKEN", "env_token")
+    assert AsyncBaseClient(url="http://catalog")._http.headers["AUTHORIZATION"] == "env_token"
+
+
+@pytest.mark.parametrize(
+    "kwargs, error",
+    [({}, "A url is required"), ({"url": "ftp://catalog"}, "isn't a valid http url"), ({"url": "http://catalog", "timeout": 0}, "at least 1 second")],
+)
+def test_async_base_client_invalid_arguments(kwargs, error):
+    with pytest.raises(ValueError, match=error):
+        AsyncBaseClient(**kwargs)
@@ -1,11 +1,12 @@
 from unittest.mock import patch, Mock
 
 import pytest
+import requests
 from cacheout import LRUCache
 from fastapi import HTTPException
 
 from clients.CachedAuthClient import CachedAuthClient, UserAuthRoles
-from configs.settings import get_settings
+from configs.settings import CircuitBreakerPolicy, get_settings
 
 
 @pytest.fixture
@@ -106,3 +107,18 @@ def test_get_user_auth_roles_with_invalid_token(client):
             client.get_user_auth_roles(token="invalid_token")
         assert excinfo.value.status_code == 401
         assert excinfo.value.detail == "Invalid token"
+
+
+def test_auth_service_errors_open_the_circuit(client):
+    client.breaker.policy = CircuitBreakerPolicy(failure_threshold=2, reset_timeout=60, call_timeout=2.5)
+    with patch("requests.get", return_value=Mock(status_code=502, raise_for_status=Mock(side_effect=requests.HTTPError("502 Bad Gateway")))) as mock_get:
+        for _ in range(2):
+            with pytest.raises(HTTPException) as excinfo:
+                client.validate_and_get_username_auth_roles("token")
+            assert excinfo.value.status_code == 500
+        with pytest.raises(HTTPException) as excinfo:
+            client.validate_and_get_username_auth_roles("token")
+        assert excinfo.value.status_code == 503
+        assert "auth is unavailable" in excinfo.value.detail
+        assert mock_get.call_count == 2
+        assert mock_get.call_args.kwargs["timeout"] == 2.5
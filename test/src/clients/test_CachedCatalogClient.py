@@ -1,26 +1,31 @@
+import dataclasses
 import hashlib
+import threading
+import time
 from unittest.mock import Mock
 
 import pytest
+import requests
 
-from clients.CachedCatalogClient import CachedCatalogClient, get_module_name_hash, _get_key, _clean_version
+from clients.CachedCatalogClient import CachedCatalogClient, get_module_name_hash, _get_key, _clean_version, is_git_commit_hash
 from clients.CatalogClient import Catalog
-from configs.settings import get_settings
+from clients.bulkhead import BulkheadFullError
+from clients.circuit_breaker import CircuitOpenError
+from clients.deadline import deadline_scope
+from configs.settings import get_settings, BulkheadPolicy, CachePolicy, CircuitBreakerPolicy, HedgePolicy
 
 
 @pytest.fixture
 def mocked_catalog():
-    return Mock()
+    catalog = Mock()
+    catalog.get_module_version.return_value = {"module_name": "test_module", "git_commit_hash": "abcdef123456", "dynamic_service": 1}
+    catalog.get_module_info.return_value = {"owners": ["user1"]}
+    return catalog
 
 
 @pytest.fixture
 def client(mocked_catalog):
-    ccc = CachedCatalogClient(settings=get_settings(), catalog=mocked_catalog)
-    ccc.module_hash_mappings_cache.clear()
-    ccc.module_info_cache.clear()
-    ccc.module_volume_mount_cache.clear()
-    ccc.secure_config_cache.clear()
-    return ccc
+    return CachedCatalogClient(settings=get_settings(), catalog=mocked_catalog)
 
 
 def test_get_combined_module_info(client, mocked_catalog):
@@ -53,6 +58,44 @@ def test_get_hash_to_name_mappings(client, mocked_catalog):
     assert result == {get_module_name_hash("test_module"): "test_module"}
 
 
+def test_get_hash_to_name_mappings_is_read_only(client, mocked_catalog):
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "test_module", "dynamic_service": 1}, {"module_name": "no_flag_module"}]
+
+    result = client.get_hash_to_name_mappings()
+    with pytest.raises(TypeError):
+        result["new_hash"] = "new_module"
+    assert client.get_hash_to_name_mappings() == {get_module_name_hash("test_module"): "test_module"}
+    mocked_catalog.list_basic_module_info.assert_called_once()
+
+
+def test_get_hash_to_name_mappings_single_rebuild(client, mocked_catalog):
+    def slow_list_basic_module_info(params):
+        time.sleep(0.05)
+        return [{"module_name": "test_module", "dynamic_service": 1}]
+
+    mocked_catalog.list_basic_module_info.side_effect = slow_list_basic_module_info
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_hash_to_name_mappings())) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert mocked_catalog.list_basic_module_info.call_count == 1
+    assert all(r == {get_module_name_hash("test_module"): "test_module"} for r in results)
+
+
+def test_caches_are_instance_scoped(mocked_catalog):
+    settings = dataclasses.replace(get_settings(), cache_policies={"catalog_module_info": CachePolicy(ttl=0, maxsize=7)})
+    first = CachedCatalogClient(settings=settings, catalog=mocked_catalog)
+    second = CachedCatalogClient(settings=settings, catalog=mocked_catalog)
+
+    first.module_info_cache.set("key", "value")
+    assert second.module_info_cache.get("key") is None
+    assert first.module_info_cache.maxsize == 7
+    assert first.module_tag_cache.maxsize == CachePolicy().maxsize
+
+
 def test_get_combined_module_info_not_dynamic_service(client, mocked_catalog):
     mocked_catalog.get_module_version.return_value = {"module_name": "test_module", "git_commit_hash": "abcdef123456", "dynamic_service": 0}
     mocked_catalog.get_module_info.return_value = {"owners": ["user1", "user2"]}
@@ -63,10 +106,12 @@ def test_get_combined_module_info_not_dynamic_service(client, mocked_catalog):
 
 def test_get_combined_module_info_cached(client, mocked_catalog):
     cached_info = {"module_name": "cached_module", "git_commit_hash": "abcdef123456", "dynamic_service": 1, "owners": ["user1", "user2"]}
-    client.module_info_cache.set(key="cached_module-release", value=cached_info)
+    client.module_tag_cache.set(key="cached_module-release", value="abcdef123456")
+    client.module_info_cache.set(key="cached_module-abcdef123456", value=cached_info)
 
     result = client.get_combined_module_info(module_name="cached_module", version="release")
     assert result == cached_info
+    mocked_catalog.get_module_version.assert_not_called()
 
 
 def test_list_service_volume_mounts_no_mounts(client, mocked_catalog):
@@ -77,7 +122,8 @@ def test_list_service_volume_mounts_no_mounts(client, mocked_catalog):
 
 def test_list_service_volume_mounts_cached(client, mocked_catalog):
     cached_mounts = [{"path": "/cached_data"}]
-    client.module_volume_mount_cache.set(key="cached_module-release", value=cached_mounts)
+    client.module_tag_cache.set(key="cached_module-release", value="abcdef123456")
+    client.module_volume_mount_cache.set(key="cached_module-abcdef123456", value=cached_mounts)
 
     result = client.list_service_volume_mounts(module_name="cached_module", version="release")
     assert result == cached_mounts
@@ -85,18 +131,133 @@ def test_list_service_volume_mounts_cached(client, mocked_catalog):
 
 def test_get_secure_params_cached(client, mocked_catalog):
     cached_params = {"param1": "cached_value1", "param2": "cached_value2"}
-    client.secure_config_cache.set(key="cached_module-release", value=cached_params)
+    client.module_tag_cache.set(key="cached_module-release", value="abcdef123456")
+    client.secure_config_cache.set(key="cached_module-abcdef123456", value=cached_params)
 
     result = client.get_secure_params(module_name="cached_module", version="release")
     assert result == cached_params
 
 
 def test_get_hash_to_name_mappings_cached(client, mocked_catalog):
-    cached_mappings = {get_module_name_hash("cached_module"): "cached_module"}
-    client.module_hash_mappings_cache.set(key="module_hash_mappings", value=cached_mappings)
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "cached_module", "dynamic_service": 1}]
+
+    first = client.get_hash_to_name_mappings()
+    assert client.get_hash_to_name_mappings() is first
+    assert first == {get_module_name_hash("cached_module"): "cached_module"}
+    mocked_catalog.list_basic_module_info.assert_called_once()
+
+
+def test_get_dynamic_service_module_names(client, mocked_catalog):
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "test_module", "dynamic_service": 1}, {"module_name": "another_module", "dynamic_service": 0}]
+
+    assert client.get_dynamic_service_module_names() == frozenset({"test_module"})
+    mocked_catalog.list_basic_module_info.assert_called_once_with({"include_released": 1, "include_unreleased": 1})
+
+
+def _wait_for_refresh(client):
+    # The background refresh holds the lock until it has published the new set
+    with client._dynamic_service_modules_lock:
+        pass
+
+
+def test_get_dynamic_service_module_names_refreshes_in_background(client, mocked_catalog):
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "old_module", "dynamic_service": 1}]
+    assert client.get_dynamic_service_module_names() == frozenset({"old_module"})
+
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "new_module", "dynamic_service": 1}]
+    client.dynamic_service_modules_refresh_seconds = 0
+    # The stale set is served while the refresh runs
+    assert client.get_dynamic_service_module_names() == frozenset({"old_module"})
+    _wait_for_refresh(client)
+    client.dynamic_service_modules_refresh_seconds = 60
+    assert client.get_dynamic_service_module_names() == frozenset({"new_module"})
+    assert client.get_hash_to_name_mappings() == {get_module_name_hash("new_module"): "new_module"}
+    assert mocked_catalog.list_basic_module_info.call_count == 2
 
-    result = client.get_hash_to_name_mappings()
-    assert result == cached_mappings
+
+def test_get_dynamic_service_module_names_not_stale(client, mocked_catalog):
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "test_module", "dynamic_service": 1}]
+    for _ in range(3):
+        client.get_dynamic_service_module_names()
+    mocked_catalog.list_basic_module_info.assert_called_once()
+
+
+def test_get_dynamic_service_module_names_refresh_failure_keeps_stale_set(client, mocked_catalog, caplog):
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "test_module", "dynamic_service": 1}]
+    client.get_dynamic_service_module_names()
+
+    mocked_catalog.list_basic_module_info.side_effect = Exception("Catalog is down")
+    client.dynamic_service_modules_refresh_seconds = 0
+    client.get_dynamic_service_module_names()
+    _wait_for_refresh(client)
+
+    assert client.get_dynamic_service_module_names() == frozenset({"test_module"})
+    assert "Failed to refresh the dynamic service modules" in caplog.text
+
+
+def test_get_dynamic_service_module_names_single_background_refresh(client, mocked_catalog):
+    mocked_catalog.list_basic_module_info.return_value = [{"module_name": "test_module", "dynamic_service": 1}]
+    client.get_dynamic_service_module_names()
+
+    client.dynamic_service_modules_refresh_seconds = 0
+    with client._dynamic_service_modules_lock:
+        # A refresh is already running, so no new one is started
+        client.get_dynamic_service_module_names()
+        client.get_dynamic_service_module_names()
+    mocked_catalog.list_basic_module_info.assert_called_once()
+
+
+def test_tag_aliases_share_commit_hash_entries(client, mocked_catalog):
+    git_commit_hash = "a" * 40
+    mocked_catalog.get_module_version.return_value = {"module_name": "test_module", "git_commit_hash": git_commit_hash, "dynamic_service": 1}
+    mocked_catalog.get_module_info.return_value = {"owners": ["user1"]}
+    mocked_catalog.list_volume_mounts.return_value = []
+    mocked_catalog.get_secure_config_params.return_value = []
+
+    for version in ["release", "beta", "dev", git_commit_hash]:
+        assert client.get_combined_module_info(module_name="test_module", version=version)["owners"] == ["user1"]
+        assert client.list_service_volume_mounts(module_name="test_module", version=version) == []
+        assert client.get_secure_params(module_name="test_module", version=version) == []
+
+    # One tag lookup per tag, but the payloads are fetched once for the commit
+    assert mocked_catalog.get_module_version.call_count == 3
+    assert mocked_catalog.get_module_info.call_count == 1
+    assert mocked_catalog.list_volume_mounts.call_count == 1
+    assert mocked_catalog.get_secure_config_params.call_count == 1
+    assert client.module_tag_cache.get("test_module-release") == git_commit_hash
+    # The payloads are fetched for the commit they are cached under, not for the tag that was requested first
+    assert mocked_catalog.list_volume_mounts.call_args.kwargs["filter"]["version"] == git_commit_hash
+    mocked_catalog.get_secure_config_params.assert_called_once_with({"module_name": "test_module", "version": git_commit_hash})
+
+
+def test_tag_change_refreshes_only_tag_lookup(client, mocked_catalog):
+    old_hash, new_hash = "a" * 40, "b" * 40
+    mocked_catalog.get_module_version.return_value = {"module_name": "test_module", "git_commit_hash": old_hash, "dynamic_service": 1}
+    mocked_catalog.get_module_info.return_value = {"owners": ["user1"]}
+    assert client.get_combined_module_info(module_name="test_module", version="release")["git_commit_hash"] == old_hash
+
+    # The release tag moves to a new commit once the short lived tag entry expires
+    client.module_tag_cache.clear()
+    mocked_catalog.get_module_version.return_value = {"module_name": "test_module", "git_commit_hash": new_hash, "dynamic_service": 1}
+    assert client.get_combined_module_info(module_name="test_module", version="release")["git_commit_hash"] == new_hash
+    assert client.module_info_cache.get(f"test_module-{old_hash}")["git_commit_hash"] == old_hash
+    assert client.module_info_cache.expire_times().get(f"test_module-{new_hash}") is None  # commit entries never expire
+
+
+def test_get_combined_module_info_commit_hash_evicted(client, mocked_catalog):
+    mocked_catalog.get_module_version.return_value = {"module_name": "test_module", "git_commit_hash": "a" * 40, "dynamic_service": 1}
+    mocked_catalog.get_module_info.return_value = {"owners": ["user1"]}
+    client.module_tag_cache.set(key="test_module-release", value="a" * 40)
+
+    assert client.get_combined_module_info(module_name="test_module", version="release")["owners"] == ["user1"]
+    mocked_catalog.get_module_version.assert_called_once_with({"module_name": "test_module", "version": "release"})
+
+
+def test_is_git_commit_hash():
+    assert is_git_commit_hash("0123456789abcdef0123456789abcdef01234567")
+    assert not is_git_commit_hash("release")
+    assert not is_git_commit_hash("0123456")
+    assert not is_git_commit_hash(None)
 
 
 def test_clean_version():
@@ -123,3 +284,73 @@ def test_cached_catalog_client_default_init(mocked_catalog):
 def test_cached_catalog_client_custom_catalog(mocked_catalog):
     ccc = CachedCatalogClient(settings=get_settings(), catalog=mocked_catalog)
     assert ccc.cc == mocked_catalog
+
+
+def test_catalog_calls_fail_fast_when_the_bulkhead_is_full(mocked_catalog):
+    settings = dataclasses.replace(get_settings(), bulkhead_policies={"catalog": BulkheadPolicy(max_concurrency=1, max_queue=0)})
+    client = CachedCatalogClient(settings=settings, catalog=mocked_catalog)
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_module_version(params):
+        entered.set()
+        release.wait(5)
+        return {"module_name": params["module_name"], "git_commit_hash": "a" * 40, "dynamic_service": 1}
+
+    mocked_catalog.get_module_version.side_effect = slow_module_version
+    thread = threading.Thread(target=client.get_combined_module_info, args=("slow_module", "release"))
+    thread.start()
+    assert entered.wait(5)
+    with pytest.raises(BulkheadFullError, match="catalog"):
+        client.get_secure_params("other_module", "a" * 40)
+    mocked_catalog.get_secure_config_params.assert_not_called()
+    release.set()
+    thread.join()
+
+
+def test_stale_tags_are_used_while_the_catalog_circuit_is_open(mocked_catalog):
+    settings = dataclasses.replace(
+        get_settings(),
+        cache_policies={"catalog_module_tags": CachePolicy(ttl=1), "catalog_module_info": CachePolicy(ttl=0)},
+        circuit_breaker_policies={"catalog": CircuitBreakerPolicy(failure_threshold=1, reset_timeout=60)},
+    )
+    client = CachedCatalogClient(settings=settings, catalog=mocked_catalog)
+    assert client.get_combined_module_info("test_module", "release")["git_commit_hash"] == "abcdef123456"
+
+    client.module_tag_cache.clear()
+    mocked_catalog.get_module_version.side_effect = requests.ConnectionError("catalog is down")
+    with pytest.raises(requests.ConnectionError):
+        client.get_combined_module_info("test_module", "release")
+    # The breaker is open now, the last known commit of the tag is used without calling the catalog
+    assert client.get_combined_module_info("test_module", "release")["git_commit_hash"] == "abcdef123456"
+    assert mocked_catalog.get_module_version.call_count == 2
+    # Modules not seen before fail fast
+    with pytest.raises(CircuitOpenError, match="catalog is unavailable"):
+        client.get_combined_module_info("other_module", "release")
+    assert mocked_catalog.get_module_version.call_count == 2
+
+
+def test_catalog_call_timeout_is_shortened_to_the_deadline():
+    client = CachedCatalogClient(settings=get_settings())
+    assert client.cc._client.timeout == 15
+    assert client.cc._client.call_timeout() == 15
+    with deadline_scope(3):
+        assert client.cc._client.call_timeout() <= 3
+
+
+def test_slow_catalog_reads_are_hedged(fake_catalog_server):
+    settings = dataclasses.replace(get_settings(), catalog_url=fake_catalog_server.url, catalog_hedge_policies={"get_module_version": HedgePolicy(budget=1, min_delay=0.01)})
+    client = CachedCatalogClient(settings=settings)
+    client.hedger.min_samples = 5
+    module_name = next(iter(fake_catalog_server.modules))
+    for _ in range(5):
+        client._call_catalog(client.cc.get_module_version, {"module_name": module_name, "version": "release"})
+    fake_catalog_server.latency = lambda method: 2.0 if fake_catalog_server.calls["Catalog.get_module_version"] == 6 else 0.0
+
+    start = time.monotonic()
+    module_version = client._call_catalog(client.cc.get_module_version, {"module_name": module_name, "version": "release"})
+    assert time.monotonic() - start < 1.5
+    assert module_version["module_name"] == module_name
+    assert fake_catalog_server.calls["Catalog.get_module_version"] == 7
+    # Other methods have no budget
+    client._call_catalog(client.cc.get_module_info, {"module_name": module_name})
+    assert client.hedger.delay("get_module_info") is None
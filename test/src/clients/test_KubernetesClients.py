@@ -87,11 +87,24 @@ def test_k8s_clients_config_load_errors(settings):
     with pytest.raises(kubernetes.config.config_exception.ConfigException, match="Invalid kube-config file. No configuration found."):
         settings.use_incluster_config = False
         settings.kubeconfig = "/invalid_path/to/kubeconfig"
-        K8sClients(settings)
+        K8sClients(settings).core_client
 
     with pytest.raises(kubernetes.config.config_exception.ConfigException, match="Service host/port is not set."):
         settings.use_incluster_config = True
-        K8sClients(settings)
+        K8sClients(settings).app_client
+
+
+def test_k8s_clients_load_config_on_first_use(settings):
+    settings.use_incluster_config = False
+    with patch("kubernetes.config.load_kube_config") as load_kube_config:
+        with patch("kubernetes.client.CoreV1Api", return_value=Mock(spec=CoreV1Api)) as core_v1_api:
+            client = K8sClients(settings=settings)
+            load_kube_config.assert_not_called()
+
+            assert client.core_client is client.core_client
+            client.app_client, client.network_client, client.custom_objects_client
+            load_kube_config.assert_called_once_with(config_file=settings.kubeconfig)
+            core_v1_api.assert_called_once()
 
 
 def test_getter_functions(mock_request):
@@ -0,0 +1,26 @@
+import pytest
+import requests
+
+from clients.PrometheusClient import PrometheusClient
+
+
+def test_query(requests_mock):
+    result = [{"metric": {"service": "s-module-abcdefg-s"}, "value": [1700000000, "1.5"]}]
+    requests_mock.get("http://prometheus:9090/api/v1/query", json={"status": "success", "data": {"resultType": "vector", "result": result}})
+
+    assert PrometheusClient("http://prometheus:9090/").query("up") == result
+    assert requests_mock.last_request.qs["query"] == ["up"]
+
+
+def test_query_by_label(requests_mock):
+    result = [{"metric": {"service": "s-a-s"}, "value": [0, "2"]}, {"metric": {}, "value": [0, "3"]}]
+    requests_mock.get("http://prometheus:9090/api/v1/query", json={"data": {"result": result}})
+
+    assert PrometheusClient("http://prometheus:9090").query_by_label("rate(x[1m])", "service") == {"s-a-s": 2.0}
+
+
+def test_query_error(requests_mock):
+    requests_mock.get("http://prometheus:9090/api/v1/query", status_code=503)
+
+    with pytest.raises(requests.HTTPError):
+        PrometheusClient("http://prometheus:9090").query("up")
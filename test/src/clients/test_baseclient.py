@@ -0,0 +1,73 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from clients import baseclient
+from clients.baseclient import BaseClient, ServerError, _dumps, _loads
+
+URL = "http://catalog/rpc"
+
+
+@pytest.fixture(params=["orjson", "json"])
+def codec(request):
+    """Run the test with orjson, and with the json fallback used when orjson is not installed"""
+    if request.param == "json":
+        with patch.object(baseclient, "_orjson", None):
+            yield request.param
+    else:
+        yield request.param
+
+
+def test_codec_round_trip(codec):
+    body = _dumps({"params": [{"modules": {"b", "a"}, "owners": frozenset(["x"]), 1: "non string key", "name": "Ünïcode"}]})
+    assert isinstance(body, bytes)
+    params = _loads(body)["params"][0]
+    assert sorted(params["modules"]) == ["a", "b"]
+    assert params["owners"] == ["x"]
+    assert params["1"] == "non string key"
+    assert params["name"] == "Ünïcode"
+    with pytest.raises(TypeError):
+        _dumps({"params": [object()]})
+
+
+def test_call(codec, requests_mock):
+    requests_mock.post(URL, json={"version": "1.1", "result": [[{"module_name": "a"}, {"module_name": "b"}]]})
+    client = BaseClient(URL, token="token")
+    assert client._call(URL, "Catalog.list_basic_module_info", [{}], context={"service_ver": "release"}) == [{"module_name": "a"}, {"module_name": "b"}]
+    first = json.loads(requests_mock.last_request.body)
+    assert first["method"] == "Catalog.list_basic_module_info"
+    assert first["context"] == {"service_ver": "release"}
+    # Every call gets a new id
+    client._call(URL, "Catalog.version", [])
+    assert int(json.loads(requests_mock.last_request.body)["id"]) > int(first["id"])
+    assert requests_mock.last_request.headers["AUTHORIZATION"] == "token"
+
+
+@pytest.mark.parametrize("result, expected", [([], None), (["a"], "a"), (["a", "b"], ["a", "b"])])
+def test_call_results(codec, requests_mock, result, expected):
+    requests_mock.post(URL, json={"version": "1.1", "result": result})
+    assert BaseClient(URL, token="token")._call(URL, "Catalog.version", []) == expected
+
+
+@pytest.mark.parametrize(
+    "status, text, content_type, error",
+    [
+        (500, '{"error": {"name": "JSONRPCError", "code": -32601, "message": "no method"}}', "application/json", "JSONRPCError: -32601. no method"),
+        (500, '{"version": "1.1"}', "application/json", "Unknown: 0. "),
+        (500, "Internal Server Error", "text/plain", "Unknown: 0. Internal Server Error"),
+        (200, '{"version": "1.1"}', "application/json", "Unknown: 0. An unknown server error occurred"),
+    ],
+)
+def test_call_errors(codec, requests_mock, status, text, content_type, error):
+    requests_mock.post(URL, status_code=status, text=text, headers={"content-type": content_type})
+    with pytest.raises(ServerError) as e:
+        BaseClient(URL, token="token")._call(URL, "Catalog.version", [])
+    assert str(e.value).startswith(error)
+
+
+def test_call_http_error(requests_mock):
+    requests_mock.post(URL, status_code=502, text="Bad Gateway")
+    with pytest.raises(requests.HTTPError):
+        BaseClient(URL, token="token")._call(URL, "Catalog.version", [])
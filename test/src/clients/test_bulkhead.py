@@ -0,0 +1,97 @@
+import dataclasses
+import threading
+
+import pytest
+from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api
+from prometheus_client import REGISTRY
+
+from clients.KubernetesClients import K8sClients
+from clients.bulkhead import UPSTREAM_BUSY_CODE, Bulkhead, BulkheadFullError, k8s_bulkhead_name
+from configs.settings import BulkheadPolicy, get_settings
+
+
+def _hold_slots(bulkhead: Bulkhead, count: int) -> tuple[threading.Event, list[threading.Thread]]:
+    """Occupy `count` slots of the bulkhead from other threads until the returned event is set"""
+    release, entered = threading.Event(), threading.Semaphore(0)
+
+    def hold():
+        with bulkhead.limit():
+            entered.release()
+            release.wait(5)
+
+    threads = [threading.Thread(target=hold, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for _ in threads:
+        assert entered.acquire(timeout=5)
+    return release, threads
+
+
+def test_bulkhead_queue_full():
+    bulkhead = Bulkhead("test_bulkhead_queue_full", BulkheadPolicy(max_concurrency=2, max_queue=0, queue_timeout=5))
+    release, threads = _hold_slots(bulkhead, 2)
+    with pytest.raises(BulkheadFullError, match="Too many concurrent requests to test_bulkhead_queue_full \\(queue full\\)") as e:
+        with bulkhead.limit():
+            pass
+    assert e.value.code == UPSTREAM_BUSY_CODE
+    release.set()
+    for thread in threads:
+        thread.join()
+    with bulkhead.limit():
+        pass
+    assert REGISTRY.get_sample_value("service_wizard_upstream_rejected_total", {"upstream": "test_bulkhead_queue_full", "reason": "queue full"}) == 1
+    assert REGISTRY.get_sample_value("service_wizard_upstream_queue_wait_seconds_count", {"upstream": "test_bulkhead_queue_full"}) == 3
+    assert REGISTRY.get_sample_value("service_wizard_upstream_in_flight", {"upstream": "test_bulkhead_queue_full"}) == 0
+
+
+def test_bulkhead_queue_timeout():
+    bulkhead = Bulkhead("test_bulkhead_queue_timeout", BulkheadPolicy(max_concurrency=1, max_queue=1, queue_timeout=0.05))
+    release, threads = _hold_slots(bulkhead, 1)
+    with pytest.raises(BulkheadFullError, match="queue timeout"):
+        with bulkhead.limit():
+            pass
+    release.set()
+    threads[0].join()
+    assert REGISTRY.get_sample_value("service_wizard_upstream_queued", {"upstream": "test_bulkhead_queue_timeout"}) == 0
+
+
+def test_bulkhead_queued_call_gets_a_freed_slot():
+    bulkhead = Bulkhead("test_bulkhead_queued_call", BulkheadPolicy(max_concurrency=1, max_queue=1, queue_timeout=5))
+    release, threads = _hold_slots(bulkhead, 1)
+    threading.Timer(0.05, release.set).start()
+    with bulkhead.limit():
+        pass
+    threads[0].join()
+    wait_sum = REGISTRY.get_sample_value("service_wizard_upstream_queue_wait_seconds_sum", {"upstream": "test_bulkhead_queued_call"})
+    assert wait_sum >= 0.04
+
+
+@pytest.mark.parametrize(
+    "path, name",
+    [
+        ("/api/v1/namespaces/{namespace}/services", "k8s_core"),
+        ("/apis/apps/v1/namespaces/{namespace}/deployments", "k8s_apps"),
+        ("/apis/networking.k8s.io/v1/namespaces/{namespace}/ingresses/{name}", "k8s_networking"),
+        ("/apis/metrics.k8s.io/v1beta1/namespaces/{namespace}/pods", "k8s_metrics"),
+        ("/apis/coordination.k8s.io/v1/namespaces/{namespace}/leases/{name}", "k8s_coordination"),
+    ],
+)
+def test_k8s_bulkhead_name(path, name):
+    assert k8s_bulkhead_name(path) == name
+
+
+def test_k8s_clients_limit_each_api_group(fake_k8s_server):
+    settings = dataclasses.replace(get_settings(), bulkhead_policies={"k8s_apps": BulkheadPolicy(max_concurrency=1, max_queue=0)})
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    k8s_clients.app_client.list_namespaced_deployment(settings.namespace)
+    k8s_clients.core_client.list_namespaced_service(settings.namespace)
+    assert set(k8s_clients.bulkheads) == {"k8s_apps", "k8s_core"}
+
+    release, threads = _hold_slots(k8s_clients.bulkheads["k8s_apps"], 1)
+    with pytest.raises(BulkheadFullError, match="k8s_apps"):
+        k8s_clients.app_client.list_namespaced_deployment(settings.namespace)
+    # Other API groups are not affected
+    k8s_clients.core_client.list_namespaced_service(settings.namespace)
+    release.set()
+    threads[0].join()
@@ -0,0 +1,32 @@
+from prometheus_client import REGISTRY
+
+from clients.caches import InstrumentedLRUCache, build_cache
+from configs.settings import CachePolicy
+
+
+def test_build_cache_uses_policy():
+    cache = build_cache("test_build_cache", CachePolicy(ttl=5, maxsize=3))
+    assert isinstance(cache, InstrumentedLRUCache)
+    assert cache.name == "test_build_cache"
+    assert cache.ttl == 5
+    assert cache.maxsize == 3
+
+
+def test_hit_ratio():
+    cache = build_cache("test_hit_ratio", CachePolicy())
+    assert cache.hit_ratio == 0.0
+    assert cache.get("missing", default="default") == "default"
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert cache.get("key") == "value"
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_ratio == 2 / 3
+
+
+def test_cache_metrics_exported():
+    cache = build_cache("test_cache_metrics_exported", CachePolicy())
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("other")
+    assert REGISTRY.get_sample_value("service_wizard_cache_size", {"cache": "test_cache_metrics_exported"}) == 1
+    assert REGISTRY.get_sample_value("service_wizard_cache_hit_ratio", {"cache": "test_cache_metrics_exported"}) == 0.5
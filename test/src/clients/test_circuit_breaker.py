@@ -0,0 +1,111 @@
+import dataclasses
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from kubernetes.client import ApiClient, AppsV1Api, Configuration, CoreV1Api, NetworkingV1Api
+from prometheus_client import REGISTRY
+
+from clients.KubernetesClients import K8sClients
+from clients.circuit_breaker import CLOSED, HALF_OPEN, OPEN, UPSTREAM_UNAVAILABLE_CODE, CircuitBreaker, CircuitOpenError
+from clients.bulkhead import BulkheadFullError
+from configs.settings import CircuitBreakerPolicy, get_settings
+
+
+def _call(breaker: CircuitBreaker, error: Exception | None = None):
+    with breaker.guard():
+        if error:
+            raise error
+
+
+def _state(name: str) -> float:
+    return REGISTRY.get_sample_value("service_wizard_circuit_breaker_state", {"upstream": name})
+
+
+@patch("clients.circuit_breaker.time.monotonic")
+def test_circuit_breaker_opens_and_recovers(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker("test_breaker_recovers", CircuitBreakerPolicy(failure_threshold=3, reset_timeout=10))
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            _call(breaker, ValueError("timed out"))
+    # A success resets the consecutive failures
+    _call(breaker)
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            _call(breaker, ValueError("timed out"))
+    assert breaker.state == OPEN
+    assert _state("test_breaker_recovers") == 2
+
+    with pytest.raises(CircuitOpenError, match="test_breaker_recovers is unavailable after repeated failures, try again in 10 seconds") as e:
+        _call(breaker)
+    assert e.value.code == UPSTREAM_UNAVAILABLE_CODE
+
+    # After the reset timeout a failed trial call opens it again
+    mock_monotonic.return_value = 110.0
+    with pytest.raises(ValueError):
+        _call(breaker, ValueError("still timing out"))
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        _call(breaker)
+
+    # And a successful one closes it
+    mock_monotonic.return_value = 120.0
+    _call(breaker)
+    assert breaker.state == CLOSED
+    assert _state("test_breaker_recovers") == 0
+    assert REGISTRY.get_sample_value("service_wizard_circuit_breaker_transitions_total", {"upstream": "test_breaker_recovers", "state": "open"}) == 2
+    assert REGISTRY.get_sample_value("service_wizard_circuit_breaker_rejected_total", {"upstream": "test_breaker_recovers"}) == 2
+
+
+@patch("clients.circuit_breaker.time.monotonic")
+def test_circuit_breaker_half_open_allows_one_trial_call(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    breaker = CircuitBreaker("test_breaker_trial", CircuitBreakerPolicy(failure_threshold=1, reset_timeout=10))
+    with pytest.raises(ValueError):
+        _call(breaker, ValueError("timed out"))
+    mock_monotonic.return_value = 110.0
+    with breaker.guard():
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            _call(breaker)
+    assert breaker.state == CLOSED
+
+    # A trial call rejected by a bulkhead does not count, the next call is the trial
+    with pytest.raises(ValueError):
+        _call(breaker, ValueError("timed out"))
+    mock_monotonic.return_value = 120.0
+    with pytest.raises(BulkheadFullError):
+        _call(breaker, BulkheadFullError("test_breaker_trial", "queue full"))
+    assert breaker.state == HALF_OPEN
+    _call(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_circuit_breaker_ignores_errors_that_are_not_failures():
+    breaker = CircuitBreaker("test_breaker_ignores", CircuitBreakerPolicy(failure_threshold=1), is_failure=lambda e: isinstance(e, requests.RequestException))
+    with pytest.raises(ValueError):
+        _call(breaker, ValueError("Module not found"))
+    assert breaker.state == CLOSED
+    with pytest.raises(requests.ConnectionError):
+        _call(breaker, requests.ConnectionError())
+    assert breaker.state == OPEN
+
+
+def test_k8s_clients_break_the_circuit_per_api_group():
+    settings = dataclasses.replace(get_settings(), circuit_breaker_policies={"k8s_apps": CircuitBreakerPolicy(failure_threshold=2, call_timeout=3)})
+    configuration = Configuration(host="http://127.0.0.1:9")
+    configuration.retries = False
+    api_client = ApiClient(configuration)
+    call_api = api_client.call_api = Mock(side_effect=api_client.call_api)
+    k8s_clients = K8sClients(settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+
+    for _ in range(2):
+        with pytest.raises(Exception) as e:
+            k8s_clients.app_client.list_namespaced_deployment(settings.namespace)
+        assert not isinstance(e.value, CircuitOpenError)
+    assert call_api.call_args.kwargs["_request_timeout"] == 3
+    with pytest.raises(CircuitOpenError, match="k8s_apps"):
+        k8s_clients.app_client.list_namespaced_deployment(settings.namespace)
+    assert call_api.call_count == 2
+    assert k8s_clients.circuit_breakers["k8s_apps"].state == OPEN
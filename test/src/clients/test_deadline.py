@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from clients import deadline
+from clients.bulkhead import Bulkhead
+from clients.circuit_breaker import CLOSED, HALF_OPEN, CircuitBreaker
+from clients.deadline import DEADLINE_EXCEEDED_CODE, DeadlineExceededError, deadline_scope
+from configs.settings import BulkheadPolicy, CircuitBreakerPolicy
+
+
+def test_deadline_scope():
+    assert deadline.remaining() is None
+    assert deadline.call_timeout(15, "catalog") == 15
+    with deadline_scope(5):
+        assert 4.9 < deadline.remaining() <= 5
+        assert deadline.call_timeout(15, "catalog") <= 5
+        assert deadline.call_timeout(2, "catalog") == 2
+        with deadline_scope(None):
+            assert deadline.remaining() is None
+    assert deadline.remaining() is None
+
+    with deadline_scope(0):
+        with pytest.raises(DeadlineExceededError, match="The request deadline of 0 seconds passed before catalog") as e:
+            deadline.call_timeout(15, "catalog")
+    assert e.value.code == DEADLINE_EXCEEDED_CODE
+
+
+def test_deadline_is_per_thread():
+    seen = []
+    with deadline_scope(5):
+        thread = threading.Thread(target=lambda: seen.append(deadline.remaining()))
+        thread.start()
+        thread.join()
+    assert seen == [None]
+
+
+def test_bound_turns_errors_after_the_deadline_into_deadline_exceeded():
+    with deadline_scope(0.05):
+        with pytest.raises(ValueError):
+            with deadline.bound("catalog"):
+                raise ValueError("Module not found")
+        with pytest.raises(DeadlineExceededError) as e:
+            with deadline.bound("catalog"):
+                time.sleep(0.06)
+                raise requests.Timeout()
+        assert isinstance(e.value.__cause__, requests.Timeout)
+        # Nothing is called once the deadline passed
+        with pytest.raises(DeadlineExceededError):
+            with deadline.bound("catalog"):
+                pytest.fail("Called after the deadline")
+
+
+def test_bulkhead_queue_waits_until_the_deadline():
+    bulkhead = Bulkhead("test_bulkhead_deadline", BulkheadPolicy(max_concurrency=1, max_queue=1, queue_timeout=10))
+    release, entered = threading.Event(), threading.Event()
+
+    def hold():
+        with bulkhead.limit():
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold, daemon=True)
+    thread.start()
+    assert entered.wait(5)
+    started = time.monotonic()
+    with deadline_scope(0.1):
+        with pytest.raises(DeadlineExceededError, match="test_bulkhead_deadline"):
+            with bulkhead.limit():
+                pass
+    assert time.monotonic() - started < 1
+    release.set()
+    thread.join()
+
+
+def test_deadline_exceeded_is_not_an_upstream_failure():
+    breaker = CircuitBreaker("test_breaker_deadline", CircuitBreakerPolicy(failure_threshold=1, reset_timeout=0))
+    with deadline_scope(0):
+        with pytest.raises(DeadlineExceededError):
+            with breaker.guard(), deadline.bound("test_breaker_deadline"):
+                pass
+    assert breaker.state == CLOSED
+
+    # Nor a success of the trial call
+    with pytest.raises(requests.ConnectionError):
+        with breaker.guard():
+            raise requests.ConnectionError()
+    with deadline_scope(0.01):
+        with pytest.raises(DeadlineExceededError):
+            with breaker.guard(), deadline.bound("test_breaker_deadline"):
+                time.sleep(0.02)
+                raise requests.Timeout()
+    assert breaker.state == HALF_OPEN
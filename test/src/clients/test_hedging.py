@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+
+from clients import deadline
+from clients.hedging import Hedger
+from configs.settings import HedgePolicy
+
+
+def _hedger(name: str, budget: float = 1.0, min_samples: int = 5) -> Hedger:
+    hedger = Hedger(name, {"get_module_version": HedgePolicy(budget=budget, min_delay=0.01)}, max_workers=4, min_samples=min_samples)
+    for _ in range(min_samples):
+        hedger.call("get_module_version", lambda: "fast")
+    return hedger
+
+
+def _first_call_hangs(release: threading.Event):
+    """A call that hangs the first time until `release` is set, and returns right away after that"""
+    calls = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            calls.append(threading.current_thread().name)
+            number = len(calls)
+        if number == 1:
+            release.wait(5)
+            return "first"
+        return "hedge"
+
+    return call, calls
+
+
+def _hedges(upstream: str, outcome: str) -> float:
+    return REGISTRY.get_sample_value("service_wizard_hedged_requests_total", {"upstream": upstream, "method": "get_module_version", "outcome": outcome}) or 0
+
+
+def test_methods_without_a_budget_are_not_hedged():
+    hedger = Hedger("test_no_budget", {"get_module_version": HedgePolicy()}, max_workers=4, min_samples=1)
+    names = [hedger.call(method, lambda: threading.current_thread().name) for method in ("get_module_version", "get_module_version", "other")]
+    assert names == [threading.current_thread().name] * 3
+    assert hedger.delay("get_module_version") is None
+    assert hedger._pool is None
+
+
+def test_calls_are_not_hedged_before_there_are_enough_samples():
+    hedger = Hedger("test_min_samples", {"get_module_version": HedgePolicy(budget=1)}, max_workers=4, min_samples=5)
+    for _ in range(4):
+        assert hedger.call("get_module_version", lambda: threading.current_thread().name) == threading.current_thread().name
+    assert hedger.delay("get_module_version") is None
+    hedger.call("get_module_version", lambda: "fast")
+    # The delay is the quantile of the recent latencies, but at least min_delay
+    assert hedger.delay("get_module_version") == 0.05
+    assert REGISTRY.get_sample_value("service_wizard_hedge_delay_seconds", {"upstream": "test_min_samples", "method": "get_module_version"}) == 0.05
+
+
+def test_slow_call_is_hedged():
+    hedger = _hedger("test_hedged")
+    release = threading.Event()
+    call, calls = _first_call_hangs(release)
+    assert hedger.call("get_module_version", call) == "hedge"
+    assert len(calls) == 2
+    assert _hedges("test_hedged", "won") == 1
+    release.set()
+
+
+def test_first_call_wins_if_it_returns_before_the_hedge():
+    hedger = _hedger("test_lost")
+    release, hedge_release = threading.Event(), threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            return "first"
+        release.set()
+        hedge_release.wait(5)
+        return "hedge"
+
+    assert hedger.call("get_module_version", call) == "first"
+    assert _hedges("test_lost", "lost") == 1
+    hedge_release.set()
+
+
+def test_hedges_are_bounded_by_the_budget():
+    # 5 samples and the call itself earn 0.6 hedges
+    hedger = _hedger("test_budget", budget=0.1)
+    release = threading.Event()
+    call, calls = _first_call_hangs(release)
+    threading.Timer(0.1, release.set).start()
+    assert hedger.call("get_module_version", call) == "first"
+    # Without a hedge left, the call is not handed to the pool
+    assert calls == [threading.current_thread().name]
+
+
+def test_error_of_the_first_call_is_raised_if_both_fail():
+    hedger = _hedger("test_both_fail")
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            raise ValueError("first")
+        release.set()
+        raise ValueError("hedge")
+
+    with pytest.raises(ValueError, match="first"):
+        hedger.call("get_module_version", call)
+    assert _hedges("test_both_fail", "failed") == 1
+
+
+def test_failed_first_call_waits_for_the_hedge():
+    hedger = _hedger("test_first_fails")
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            raise ValueError("first")
+        release.set()
+        return "hedge"
+
+    assert hedger.call("get_module_version", call) == "hedge"
+
+
+def test_hedged_calls_run_within_the_request_deadline():
+    hedger = _hedger("test_deadline")
+    release = threading.Event()
+    call, _ = _first_call_hangs(release)
+    with deadline.deadline_scope(30):
+        assert hedger.call("get_module_version", lambda: (call(), deadline.remaining())[1]) <= 30
+    release.set()
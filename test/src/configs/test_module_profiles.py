@@ -0,0 +1,88 @@
+import pytest
+
+from configs.module_profiles import DEFAULT_PROBES, ModuleProfile, ModuleProfiles, ProbeSpec, load_module_profiles, parse_module_profiles
+
+PROFILES = {
+    "default_profile": "small",
+    "profiles": {
+        "small": {"requests": {"cpu": "100m", "memory": "256Mi"}, "limits": {"memory": "512Mi"}},
+        "large": {"requests": {"cpu": 1, "memory": "2Gi"}, "limits": {"cpu": 2, "memory": "4Gi"}},
+    },
+    "modules": {"NarrativeService": "large"},
+}
+
+
+def test_parse_module_profiles():
+    profiles = parse_module_profiles(PROFILES)
+
+    assert profiles.profiles["small"] == ModuleProfile(name="small", requests={"cpu": "100m", "memory": "256Mi"}, limits={"memory": "512Mi"})
+    assert profiles.profiles["large"].limits == {"cpu": "2", "memory": "4Gi"}
+    assert profiles.modules == {"narrativeservice": "large"}
+
+
+def test_profile_for():
+    profiles = parse_module_profiles(PROFILES)
+
+    assert profiles.profile_for("narrativeService").name == "large"
+    assert profiles.profile_for("OtherModule").name == "small"
+    # The catalog selection wins, unknown selections fall through
+    assert profiles.profile_for("NarrativeService", catalog_profile="small").name == "small"
+    assert profiles.profile_for("NarrativeService", catalog_profile="huge").name == "large"
+    assert ModuleProfiles().profile_for("NarrativeService") is None
+
+
+@pytest.mark.parametrize(
+    "document, message",
+    [
+        ({"profiles": {"bad": {"requests": {"cpu": "lots"}}}}, "Profile 'bad' requests.cpu is not a valid quantity, got lots"),
+        ({"profiles": {"bad": {"limits": {"gpu": 1}}}}, "Profile 'bad' limits must be a mapping with cpu and/or memory"),
+        ({"profiles": {"bad": {"requests": {"memory": "1Gi"}, "limits": {"memory": "512Mi"}}}}, "Profile 'bad' requests more memory than its limit"),
+        ({"profiles": {}, "modules": {"NarrativeService": "large"}}, "Profile 'large' is used but not defined"),
+    ],
+)
+def test_parse_module_profiles_invalid(document, message):
+    with pytest.raises(ValueError, match=message):
+        parse_module_profiles(document)
+
+
+def test_load_module_profiles(tmp_path):
+    assert load_module_profiles(None) == ModuleProfiles()
+
+    profiles_file = tmp_path / "profiles.yaml"
+    profiles_file.write_text("profiles:\n  small:\n    requests:\n      cpu: 100m\nmodules:\n  NarrativeService: small\n")
+    assert load_module_profiles(str(profiles_file)).profile_for("NarrativeService").requests == {"cpu": "100m"}
+
+    with pytest.raises(ValueError, match="Could not read module profiles"):
+        load_module_profiles(str(tmp_path / "missing.yaml"))
+
+
+def test_probes_for():
+    profiles = parse_module_profiles(
+        {
+            "probes": {"liveness": {"type": "tcp", "period_seconds": 30}},
+            "profiles": {"slow": {"probes": {"readiness": {"type": "http", "path": "/status", "initial_delay_seconds": 60}}}},
+            "modules": {"SlowModule": "slow", "QuietModule": {"probes": {"liveness": "none"}}, "BigModule": {"profile": "slow", "probes": {"liveness": None}}},
+        }
+    )
+
+    assert profiles.probes_for("OtherModule") == {"readiness": ProbeSpec(type="tcp"), "liveness": ProbeSpec(type="tcp", period_seconds=30)}
+    slow = profiles.probes_for("SlowModule", profiles.profile_for("SlowModule"))
+    assert slow["readiness"] == ProbeSpec(type="http", path="/status", initial_delay_seconds=60)
+    assert slow["liveness"] == ProbeSpec(type="tcp", period_seconds=30)
+    assert profiles.probes_for("QuietModule") == {"readiness": ProbeSpec(type="tcp"), "liveness": None}
+    assert profiles.probes_for("bigmodule", profiles.profile_for("BigModule"))["liveness"] is None
+    assert ModuleProfiles().probes_for("AnyModule") == DEFAULT_PROBES
+
+
+@pytest.mark.parametrize(
+    "probes, message",
+    [
+        ({"startup": {"type": "tcp"}}, "probes must be a mapping with readiness and/or liveness"),
+        ({"readiness": {"type": "exec"}}, "readiness probe type must be http or tcp, got exec"),
+        ({"readiness": {"type": "http", "url": "/"}}, "readiness probe has unknown fields"),
+        ({"liveness": {"type": "tcp", "period_seconds": -1}}, "liveness probe port, delay, period, timeout and threshold must be non-negative integers"),
+    ],
+)
+def test_parse_probes_invalid(probes, message):
+    with pytest.raises(ValueError, match=message):
+        parse_module_profiles({"modules": {"SomeModule": {"probes": probes}}})
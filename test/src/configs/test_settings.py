@@ -2,7 +2,21 @@ import os
 
 import pytest
 
-from configs.settings import get_settings, EnvironmentVariableError
+from configs.settings import (
+    get_settings,
+    EnvironmentVariableError,
+    BulkheadPolicy,
+    CachePolicy,
+    CircuitBreakerPolicy,
+    HedgePolicy,
+    RateLimitPolicy,
+    default_bulkhead_policies,
+    default_cache_policies,
+    default_catalog_hedge_policies,
+    default_circuit_breaker_policies,
+    default_rate_limit_policies,
+    default_request_deadlines,
+)
 
 
 @pytest.fixture
@@ -117,3 +131,263 @@ def test_missing_kube_config_or_incluster_config():
         os.environ["KUBECONFIG"] = original_kubeconfig
     if original_use_incluster_config:
         os.environ["USE_INCLUSTER_CONFIG"] = original_use_incluster_config
+
+
+def test_cache_policies_default(cleared_settings):
+    assert cleared_settings.cache_policies == default_cache_policies()
+    assert cleared_settings.cache_policy("catalog_module_tags") == CachePolicy(ttl=10, maxsize=256)
+    assert cleared_settings.cache_policy("catalog_module_info") == CachePolicy(ttl=0, maxsize=1024)
+    assert cleared_settings.cache_policy("not_a_cache") == CachePolicy()
+
+
+def test_cache_policies_from_env(monkeypatch):
+    monkeypatch.setenv("CACHE_CATALOG_MODULE_INFO_TTL", "60")
+    monkeypatch.setenv("CACHE_CATALOG_MODULE_INFO_MAXSIZE", "1000")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.cache_policy("catalog_module_info") == CachePolicy(ttl=60, maxsize=1000)
+    assert settings.cache_policy("auth_valid_tokens") == CachePolicy(ttl=10, maxsize=256)
+    get_settings.cache_clear()
+
+
+def test_cache_policies_invalid_env(monkeypatch):
+    monkeypatch.setenv("CACHE_AUTH_VALID_TOKENS_TTL", "ten")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="CACHE_AUTH_VALID_TOKENS_TTL must be an integer, got ten"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_dynamic_service_modules_refresh_seconds(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().dynamic_service_modules_refresh_seconds == 60
+    monkeypatch.setenv("CATALOG_DYNAMIC_SERVICE_MODULES_REFRESH_SECONDS", "5")
+    get_settings.cache_clear()
+    assert get_settings().dynamic_service_modules_refresh_seconds == 5
+    get_settings.cache_clear()
+
+
+def test_autoscaler_module_replica_bounds(monkeypatch):
+    monkeypatch.setenv("AUTOSCALER_MODULE_REPLICA_BOUNDS", "HotModule=2:8, ColdModule=1:1")
+    monkeypatch.setenv("AUTOSCALER_TARGET_LATENCY_SECONDS", "0.5")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.autoscaler_replica_bounds("HotModule") == (2, 8)
+    assert settings.autoscaler_replica_bounds("coldmodule") == (1, 1)
+    assert settings.autoscaler_replica_bounds("OtherModule") == (1, 3)
+    assert settings.autoscaler_target_latency_seconds == 0.5
+    get_settings.cache_clear()
+
+
+@pytest.mark.parametrize("bounds", ["HotModule=8:2", "HotModule=two:8", "=1:2", "HotModule"])
+def test_autoscaler_module_replica_bounds_invalid(monkeypatch, bounds):
+    monkeypatch.setenv("AUTOSCALER_MODULE_REPLICA_BOUNDS", bounds)
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="AUTOSCALER_MODULE_REPLICA_BOUNDS entries must look like ModuleName=min:max"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_autoscaler_requires_prometheus(monkeypatch):
+    monkeypatch.setenv("AUTOSCALER_ENABLED", "true")
+    monkeypatch.delenv("PROMETHEUS_URL", raising=False)
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="PROMETHEUS_URL must be set"):
+        get_settings()
+    monkeypatch.setenv("AUTOSCALER_TARGET_REQUESTS_PER_SECOND", "many")
+    monkeypatch.setenv("PROMETHEUS_URL", "http://prometheus:9090")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="AUTOSCALER_TARGET_REQUESTS_PER_SECOND must be a number, got many"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_module_profiles_file(monkeypatch, tmp_path):
+    profiles_file = tmp_path / "profiles.yaml"
+    profiles_file.write_text("default_profile: small\nprofiles:\n  small:\n    requests: {cpu: 100m, memory: 256Mi}\n")
+    monkeypatch.setenv("MODULE_PROFILES_FILE", str(profiles_file))
+    get_settings.cache_clear()
+    assert get_settings().module_profiles.profile_for("AnyModule").requests == {"cpu": "100m", "memory": "256Mi"}
+
+    profiles_file.write_text("default_profile: missing\n")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="MODULE_PROFILES_FILE is not valid: Profile 'missing' is used but not defined"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_image_prepull_settings(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().image_prepull_enabled is False
+    monkeypatch.setenv("IMAGE_PREPULL_ENABLED", "true")
+    monkeypatch.setenv("IMAGE_PREPULL_MAX_IMAGES", "5")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.image_prepull_enabled is True
+    assert settings.image_prepull_max_images == 5
+    assert settings.image_prepull_pause_image == "registry.k8s.io/pause:3.9"
+    get_settings.cache_clear()
+
+
+def test_warmup_settings(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().warmup_enabled is False
+    monkeypatch.setenv("WARMUP_ENABLED", "true")
+    monkeypatch.setenv("WARMUP_DEADLINE_SECONDS", "15")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.warmup_enabled is True
+    assert settings.warmup_deadline_seconds == 15
+    get_settings.cache_clear()
+
+
+def test_leader_election_settings(monkeypatch):
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.leader_election_enabled is False
+    assert (settings.leader_election_lease_seconds, settings.leader_election_renew_seconds) == (15, 5)
+    monkeypatch.setenv("LEADER_ELECTION_ENABLED", "true")
+    monkeypatch.setenv("LEADER_ELECTION_LEASE_NAME", "sw2-leader")
+    monkeypatch.setenv("LEADER_ELECTION_LEASE_SECONDS", "30")
+    monkeypatch.setenv("LEADER_ELECTION_RENEW_SECONDS", "10")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.leader_election_enabled is True
+    assert settings.leader_election_lease_name == "sw2-leader"
+    assert (settings.leader_election_lease_seconds, settings.leader_election_renew_seconds) == (30, 10)
+
+    monkeypatch.setenv("LEADER_ELECTION_RENEW_SECONDS", "30")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="LEADER_ELECTION_RENEW_SECONDS"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+@pytest.mark.parametrize("multi_process_env", [("LEADER_ELECTION_ENABLED", "true"), ("WEB_CONCURRENCY", "2")])
+def test_per_process_controllers_with_several_processes(monkeypatch, multi_process_env):
+    monkeypatch.delenv("PROMETHEUS_URL", raising=False)
+    for controller in ("IDLE_REAPER_ENABLED", "RELEASE_WATCHER_ENABLED", "IMAGE_PREPULL_ENABLED"):
+        monkeypatch.setenv(controller, "true")
+    get_settings.cache_clear()
+    assert get_settings().idle_reaper_enabled is True
+
+    monkeypatch.setenv(*multi_process_env)
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="PROMETHEUS_URL must be set to read request metrics when IDLE_REAPER_ENABLED is true"):
+        get_settings()
+    monkeypatch.delenv("IDLE_REAPER_ENABLED")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="PROMETHEUS_URL must be set to read request metrics when RELEASE_WATCHER_ENABLED is true"):
+        get_settings()
+    monkeypatch.setenv("PROMETHEUS_URL", "http://prometheus:9090")
+    get_settings.cache_clear()
+    settings = get_settings()
+    # The image pre-puller counts starts from the deployments, which every process sees
+    assert (settings.release_watcher_enabled, settings.image_prepull_enabled) == (True, True)
+    get_settings.cache_clear()
+
+
+def test_bulkhead_policies(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().bulkhead_policies == default_bulkhead_policies()
+    monkeypatch.setenv("BULKHEAD_CATALOG_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("BULKHEAD_CATALOG_MAX_QUEUE", "8")
+    monkeypatch.setenv("BULKHEAD_CATALOG_QUEUE_TIMEOUT", "0.5")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.bulkhead_policy("catalog") == BulkheadPolicy(max_concurrency=4, max_queue=8, queue_timeout=0.5)
+    assert settings.bulkhead_policy("k8s_other") == BulkheadPolicy()
+
+    monkeypatch.setenv("BULKHEAD_CATALOG_MAX_CONCURRENCY", "0")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="BULKHEAD_CATALOG_MAX_CONCURRENCY must be at least 1"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_rate_limit_policies(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().rate_limit_policies == default_rate_limit_policies()
+    monkeypatch.setenv("RATE_LIMIT_START_RATE", "0.5")
+    monkeypatch.setenv("RATE_LIMIT_START_BURST", "3")
+    monkeypatch.setenv("RATE_LIMIT_START_KEY", "token, module")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.rate_limit_policy("ServiceWizard.start") == RateLimitPolicy(rate=0.5, burst=3, key=("token", "module"))
+    assert settings.rate_limit_policy("ServiceWizard.version") == RateLimitPolicy()
+
+    monkeypatch.setenv("RATE_LIMIT_START_KEY", "user")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="RATE_LIMIT_START_KEY must be a comma separated list of token, ip, module"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_rate_limits_are_off_by_default_and_ip_keys_need_forwarded_ips(monkeypatch):
+    monkeypatch.delenv("FORWARDED_ALLOW_IPS", raising=False)
+    get_settings.cache_clear()
+    assert all(policy.rate == 0 for policy in get_settings().rate_limit_policies.values())
+
+    monkeypatch.setenv("RATE_LIMIT_GET_SERVICE_STATUS_RATE", "5")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="FORWARDED_ALLOW_IPS must be set to the IPs of the ingress controller when RATE_LIMIT_GET_SERVICE_STATUS_KEY"):
+        get_settings()
+    monkeypatch.setenv("FORWARDED_ALLOW_IPS", "10.0.0.0/8")
+    get_settings.cache_clear()
+    assert get_settings().rate_limit_policy("get_service_status") == RateLimitPolicy(rate=5, burst=20, key=("ip", "module"))
+    get_settings.cache_clear()
+
+
+def test_circuit_breaker_policies(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().circuit_breaker_policies == default_circuit_breaker_policies()
+    monkeypatch.setenv("CIRCUIT_BREAKER_CATALOG_FAILURE_THRESHOLD", "3")
+    monkeypatch.setenv("CIRCUIT_BREAKER_CATALOG_RESET_TIMEOUT", "5")
+    monkeypatch.setenv("CIRCUIT_BREAKER_CATALOG_CALL_TIMEOUT", "2.5")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.circuit_breaker_policy("catalog") == CircuitBreakerPolicy(failure_threshold=3, reset_timeout=5, call_timeout=2.5)
+    assert settings.circuit_breaker_policy("k8s_other") == CircuitBreakerPolicy()
+
+    monkeypatch.setenv("CIRCUIT_BREAKER_CATALOG_CALL_TIMEOUT", "0")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="CIRCUIT_BREAKER_CATALOG_CALL_TIMEOUT must be positive"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_request_deadlines(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().request_deadlines == default_request_deadlines()
+    monkeypatch.setenv("REQUEST_DEADLINE_START_SECONDS", "45")
+    monkeypatch.setenv("REQUEST_DEADLINE_STATUS_SECONDS", "0")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.request_deadline("ServiceWizard.start") == 45
+    assert settings.request_deadline("ServiceWizard.status") is None
+    assert settings.request_deadline("ServiceWizard.unknown") is None
+
+    monkeypatch.setenv("REQUEST_DEADLINE_START_SECONDS", "-1")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="REQUEST_DEADLINE_START_SECONDS must not be negative"):
+        get_settings()
+    get_settings.cache_clear()
+
+
+def test_catalog_hedge_policies(monkeypatch):
+    get_settings.cache_clear()
+    assert get_settings().catalog_hedge_policies == default_catalog_hedge_policies()
+    monkeypatch.setenv("CATALOG_HEDGE_GET_MODULE_VERSION_BUDGET", "0.05")
+    monkeypatch.setenv("CATALOG_HEDGE_GET_MODULE_VERSION_QUANTILE", "0.9")
+    monkeypatch.setenv("CATALOG_HEDGE_GET_MODULE_VERSION_MIN_DELAY", "0.2")
+    get_settings.cache_clear()
+    settings = get_settings()
+    assert settings.catalog_hedge_policy("get_module_version") == HedgePolicy(budget=0.05, quantile=0.9, min_delay=0.2)
+    assert settings.catalog_hedge_policy("list_basic_module_info").budget == 0
+    assert settings.catalog_hedge_policy("unknown") == HedgePolicy()
+
+    monkeypatch.setenv("CATALOG_HEDGE_GET_MODULE_VERSION_QUANTILE", "1")
+    get_settings.cache_clear()
+    with pytest.raises(EnvironmentVariableError, match="CATALOG_HEDGE_GET_MODULE_VERSION_QUANTILE between 0 and 1"):
+        get_settings()
+    get_settings.cache_clear()
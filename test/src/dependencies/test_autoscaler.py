@@ -0,0 +1,152 @@
+import dataclasses
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api
+
+from clients.KubernetesClients import K8sClients
+from clients.PrometheusClient import PrometheusClient
+from configs.settings import get_settings
+from dependencies.autoscaler import Autoscaler, PrometheusIngressMetricsSource, ServiceLoad
+from dependencies.background import background_request
+from dependencies.k8_wrapper import create_and_launch_deployment, sanitize_deployment_name
+from factory import create_app
+
+HOT_MODULE = ("HotModule", "d" * 40)
+STOPPED_MODULE = ("StoppedModule", "e" * 40)
+
+
+@pytest.fixture
+def autoscaler_settings():
+    return dataclasses.replace(
+        get_settings(),
+        prometheus_url="http://prometheus:9090",
+        autoscaler_scale_up_window_seconds=0,
+        autoscaler_scale_down_window_seconds=300,
+        autoscaler_target_requests_per_second=10.0,
+        autoscaler_target_latency_seconds=1.0,
+        autoscaler_min_replicas=1,
+        autoscaler_max_replicas=3,
+        autoscaler_module_replica_bounds={"hotmodule": (1, 5)},
+        k8s_list_page_size=1,
+    )
+
+
+@pytest.fixture
+def autoscaler_app(fake_k8s_server, autoscaler_settings):
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(autoscaler_settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    app = create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=k8s_clients, settings=autoscaler_settings)
+    request = background_request(app)
+    for module_name, git_commit_hash in (HOT_MODULE, STOPPED_MODULE):
+        labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+        annotations = {"module_name": module_name, "git_commit_hash": git_commit_hash}
+        create_and_launch_deployment(request, module_name, git_commit_hash, image="image", labels=labels, annotations=annotations, env={}, mounts=[])
+    stopped_name, _ = sanitize_deployment_name(*STOPPED_MODULE)
+    k8s_clients.app_client.patch_namespaced_deployment(name=stopped_name, namespace=autoscaler_settings.namespace, body={"spec": {"replicas": 0}})
+    return app
+
+
+def _load(module, requests_per_second, latency_seconds=None):
+    return {sanitize_deployment_name(*module)[1]: ServiceLoad(requests_per_second, latency_seconds)}
+
+
+def _replicas(fake_k8s_server, settings, module):
+    return fake_k8s_server.deployments[(settings.namespace, sanitize_deployment_name(*module)[0])]["spec"]["replicas"]
+
+
+def test_autoscaler_scales_up_immediately_and_down_after_window(autoscaler_app, autoscaler_settings, fake_k8s_server):
+    metrics_source = Mock()
+    autoscaler = Autoscaler(app=autoscaler_app, settings=autoscaler_settings, metrics_source=metrics_source)
+
+    metrics_source.sample.return_value = _load(HOT_MODULE, 35.0)
+    decisions = autoscaler.run_once(now=1000)
+    metrics_source.sample.assert_called_with(autoscaler_settings.autoscaler_metrics_window_seconds)
+    assert [(d.module_name, d.current_replicas, d.desired_replicas) for d in decisions] == [("HotModule", 1, 4)]
+    assert _replicas(fake_k8s_server, autoscaler_settings, HOT_MODULE) == 4
+    # The stopped service is left for start to wake up
+    assert _replicas(fake_k8s_server, autoscaler_settings, STOPPED_MODULE) == 0
+
+    # The load dropped, but not for the whole scale-down window yet
+    metrics_source.sample.return_value = {}
+    assert autoscaler.run_once(now=1100) == []
+    assert autoscaler.run_once(now=1299) == []
+    assert _replicas(fake_k8s_server, autoscaler_settings, HOT_MODULE) == 4
+
+    decisions = autoscaler.run_once(now=1301)
+    assert [(d.current_replicas, d.desired_replicas) for d in decisions] == [(4, 1)]
+    assert _replicas(fake_k8s_server, autoscaler_settings, HOT_MODULE) == 1
+
+
+def test_autoscaler_respects_max_replicas(autoscaler_app, autoscaler_settings, fake_k8s_server):
+    autoscaler = Autoscaler(app=autoscaler_app, settings=autoscaler_settings, metrics_source=Mock(sample=Mock(return_value=_load(HOT_MODULE, 1000.0))))
+
+    autoscaler.run_once(now=0)
+    assert _replicas(fake_k8s_server, autoscaler_settings, HOT_MODULE) == 5
+
+
+def test_autoscaler_stops_scaling_when_stopped(autoscaler_app, autoscaler_settings, fake_k8s_server):
+    autoscaler = Autoscaler(app=autoscaler_app, settings=autoscaler_settings, metrics_source=Mock(sample=Mock(return_value=_load(HOT_MODULE, 1000.0))))
+    autoscaler.stop()
+
+    assert autoscaler.run_once(now=0) == []
+    assert _replicas(fake_k8s_server, autoscaler_settings, HOT_MODULE) == 1
+
+
+def test_autoscaler_skips_run_without_metrics(autoscaler_app, autoscaler_settings, fake_k8s_server, caplog):
+    autoscaler = Autoscaler(app=autoscaler_app, settings=autoscaler_settings, metrics_source=Mock(sample=Mock(side_effect=Exception("Prometheus is down"))))
+
+    assert autoscaler.run_once() == []
+    assert "skipping this autoscaler run" in caplog.text
+
+
+def test_recommend(autoscaler_settings):
+    autoscaler = Autoscaler(app=Mock(), settings=autoscaler_settings, metrics_source=Mock())
+
+    assert autoscaler.recommend("OtherModule", 1, None) == 1
+    assert autoscaler.recommend("OtherModule", 1, ServiceLoad(25.0)) == 3
+    assert autoscaler.recommend("OtherModule", 1, ServiceLoad(100.0)) == 3
+    # Slow responses add a replica even when the request rate is under the target
+    assert autoscaler.recommend("HotModule", 2, ServiceLoad(5.0, latency_seconds=2.5)) == 3
+    assert autoscaler.recommend("HotModule", 2, ServiceLoad(5.0, latency_seconds=0.5)) == 1
+
+
+def test_stabilize_scale_up_window(autoscaler_settings):
+    autoscaler = Autoscaler(app=Mock(), settings=dataclasses.replace(autoscaler_settings, autoscaler_scale_up_window_seconds=60), metrics_source=Mock())
+
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 1, 3, now=0) == 1
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 1, 3, now=30) == 1
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 1, 3, now=61) == 3
+    # A dip in the window holds the scale-up back
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 1, 1, now=90) == 1
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 1, 2, now=120) == 1
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 1, 2, now=151) == 2
+
+
+def test_stabilize_waits_for_scale_down_window_after_startup(autoscaler_settings):
+    autoscaler = Autoscaler(app=Mock(), settings=autoscaler_settings, metrics_source=Mock())
+
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 4, 1, now=0) == 4
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 4, 1, now=299) == 4
+    assert autoscaler.stabilize("d-hot-ddddddd-d", 4, 1, now=300) == 1
+
+
+def test_prometheus_ingress_metrics_source(requests_mock):
+    def respond(request, context):
+        if "histogram_quantile" in request.qs["query"][0]:
+            return {"data": {"result": [{"metric": {"service": "s-hot-s"}, "value": [0, "0.25"]}, {"metric": {"service": "s-idle-s"}, "value": [0, "NaN"]}]}}
+        return {"data": {"result": [{"metric": {"service": "s-hot-s"}, "value": [0, "12.5"]}, {"metric": {"service": "s-idle-s"}, "value": [0, "0"]}]}}
+
+    requests_mock.get("http://prometheus:9090/api/v1/query", json=respond)
+    source = PrometheusIngressMetricsSource(PrometheusClient("http://prometheus:9090"), namespace="staging-dynamic-services")
+
+    assert source.sample(120) == {"s-hot-s": ServiceLoad(12.5, 0.25), "s-idle-s": ServiceLoad(0.0, None)}
+
+
+def test_autoscaler_started_by_lifespan(autoscaler_app, autoscaler_settings):
+    autoscaler_app.state.settings = dataclasses.replace(autoscaler_settings, autoscaler_enabled=True)
+    with TestClient(autoscaler_app):
+        autoscaler = autoscaler_app.state.background_tasks[0]
+        assert isinstance(autoscaler, Autoscaler)
+        assert isinstance(autoscaler.metrics_source, PrometheusIngressMetricsSource)
@@ -0,0 +1,104 @@
+import threading
+
+from fastapi import FastAPI
+
+from dependencies.background import PeriodicTask, background_request
+
+
+class CountingTask(PeriodicTask):
+    name = "counting-task"
+
+    def __init__(self, fail: bool = False):
+        super().__init__(interval_seconds=0.01)
+        self.runs = 0
+        self.fail = fail
+        self.ran = threading.Event()
+
+    def run_once(self):
+        self.runs += 1
+        self.ran.set()
+        if self.fail:
+            raise RuntimeError("boom")
+
+
+def test_background_request():
+    app = FastAPI()
+    app.state.settings = "settings"
+    assert background_request(app).app.state.settings == "settings"
+
+
+def test_periodic_task_runs_until_stopped():
+    task = CountingTask()
+    task.start()
+    assert task.ran.wait(timeout=5)
+    task.stop()
+    runs = task.runs
+    assert runs >= 1
+    assert task.stopping
+    assert task._thread is None
+    assert task.runs == runs
+
+
+def test_periodic_task_keeps_running_after_failures(caplog):
+    task = CountingTask(fail=True)
+    task.start()
+    assert task.ran.wait(timeout=5)
+    task.ran.clear()
+    assert task.ran.wait(timeout=5)
+    task.stop()
+    assert task.runs >= 2
+    assert "counting-task failed" in caplog.text
+
+
+class BlockingTask(PeriodicTask):
+    name = "blocking-task"
+
+    def __init__(self):
+        super().__init__(interval_seconds=0.01)
+        self.running = threading.Event()
+        self.release = threading.Event()
+        self.concurrent_runs = 0
+        self.max_concurrent_runs = 0
+
+    def run_once(self):
+        self.concurrent_runs += 1
+        self.max_concurrent_runs = max(self.max_concurrent_runs, self.concurrent_runs)
+        self.running.set()
+        self.release.wait(timeout=5)
+        self.concurrent_runs -= 1
+
+
+def test_periodic_task_restarted_while_finishing_a_run_keeps_its_thread(caplog):
+    task = BlockingTask()
+    task.start()
+    assert task.running.wait(timeout=5)
+    task.stop(timeout=0.05)
+    assert "blocking-task is still running after 0.05 seconds" in caplog.text
+    thread = task._thread
+    assert thread.is_alive()
+
+    # Starting again resumes the thread that is still running instead of starting a second one
+    task.start()
+    assert not task.stopping
+    assert task._thread is thread
+    task.running.clear()
+    task.release.set()
+    assert task.running.wait(timeout=5)
+    assert task._thread is thread
+    task.stop()
+    assert task._thread is None
+    assert not thread.is_alive()
+    assert task.max_concurrent_runs == 1
+
+
+def test_periodic_task_started_again_after_its_thread_exited():
+    task = CountingTask()
+    task.start()
+    assert task.ran.wait(timeout=5)
+    task.stop()
+    task.ran.clear()
+    task.start()
+    assert task.ran.wait(timeout=5)
+    assert task._thread.is_alive()
+    task.stop()
+    assert task._thread is None
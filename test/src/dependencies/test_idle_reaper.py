@@ -0,0 +1,172 @@
+import dataclasses
+import time
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from kubernetes.client import (
+    AppsV1Api,
+    CoreV1Api,
+    NetworkingV1Api,
+    V1Container,
+    V1Deployment,
+    V1DeploymentSpec,
+    V1LabelSelector,
+    V1PodSpec,
+    V1PodTemplateSpec,
+    V1ResourceRequirements,
+)
+
+from clients.KubernetesClients import K8sClients
+from clients.PrometheusClient import PrometheusClient
+from configs.settings import get_settings
+from dependencies.background import background_request
+from dependencies.idle_reaper import ActivityTracker, IdleReaper, PrometheusIngressActivitySource, record_module_activity, requested_resources
+from dependencies.k8_wrapper import create_and_launch_deployment, sanitize_deployment_name
+from factory import create_app
+
+IDLE_MODULE = ("IdleModule", "a" * 40)
+BUSY_MODULE = ("BusyModule", "b" * 40)
+
+
+@pytest.fixture
+def reaper_settings():
+    # One deployment per page, so the reaper has to page through the deployments
+    return dataclasses.replace(get_settings(), idle_reaper_idle_seconds=3600, idle_reaper_interval_seconds=3600, k8s_list_page_size=1)
+
+
+@pytest.fixture
+def reaper_app(fake_k8s_server, reaper_settings):
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(reaper_settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    app = create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=k8s_clients, settings=reaper_settings)
+    request = background_request(app)
+    for module_name, git_commit_hash in (IDLE_MODULE, BUSY_MODULE):
+        labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+        annotations = {"module_name": module_name, "git_commit_hash": git_commit_hash}
+        create_and_launch_deployment(request, module_name, git_commit_hash, image="image", labels=labels, annotations=annotations, env={}, mounts=[])
+        deployment = fake_k8s_server.deployments[(reaper_settings.namespace, sanitize_deployment_name(module_name, git_commit_hash)[0])]
+        deployment["metadata"]["creationTimestamp"] = "2020-01-01T00:00:00Z"
+        deployment["spec"]["template"]["spec"]["containers"][0]["resources"] = {"requests": {"cpu": "500m", "memory": "256Mi"}}
+    return app
+
+
+def _replicas(fake_k8s_server, settings, module):
+    return fake_k8s_server.deployments[(settings.namespace, sanitize_deployment_name(*module)[0])]["spec"]["replicas"]
+
+
+def test_idle_reaper_scales_idle_services_to_zero(reaper_app, reaper_settings, fake_k8s_server):
+    reaper = IdleReaper(app=reaper_app, settings=reaper_settings)
+    reaper.started_at = time.time() - 7200
+    record_module_activity(background_request(reaper_app), *BUSY_MODULE)
+
+    reclaimed = reaper.run_once()
+
+    assert [r.module_name for r in reclaimed] == ["IdleModule"]
+    assert reclaimed[0].cpu_cores == Decimal("0.5")
+    assert reclaimed[0].memory_bytes == 256 * 1024 * 1024
+    assert _replicas(fake_k8s_server, reaper_settings, IDLE_MODULE) == 0
+    assert _replicas(fake_k8s_server, reaper_settings, BUSY_MODULE) == 1
+    # Services that are already scaled down are not reclaimed twice
+    assert [r.module_name for r in reaper.run_once()] == []
+
+
+def test_idle_reaper_stops_scaling_when_stopped(reaper_app, reaper_settings, fake_k8s_server):
+    reaper = IdleReaper(app=reaper_app, settings=reaper_settings)
+    reaper.started_at = time.time() - 7200
+    reaper.stop()
+
+    assert reaper.run_once() == []
+    assert _replicas(fake_k8s_server, reaper_settings, IDLE_MODULE) == 1
+
+
+def test_idle_reaper_skips_services_requested_during_the_run(reaper_app, reaper_settings, fake_k8s_server):
+    idle_deployment_name = sanitize_deployment_name(*IDLE_MODULE)[0]
+    looked_up = []
+
+    def last_requested(deployment_name):
+        # Idle when the run decides what to scale down, and requested right before it is scaled down
+        looked_up.append(deployment_name)
+        return time.time() if looked_up.count(idle_deployment_name) > 1 else None
+
+    reaper_app.state.activity_tracker = Mock(last_requested=Mock(side_effect=last_requested))
+    reaper = IdleReaper(app=reaper_app, settings=reaper_settings)
+    reaper.started_at = time.time() - 7200
+
+    assert [r.module_name for r in reaper.run_once()] == ["BusyModule"]
+    assert _replicas(fake_k8s_server, reaper_settings, IDLE_MODULE) == 1
+
+
+def test_idle_reaper_waits_after_startup(reaper_app, reaper_settings, fake_k8s_server):
+    reaper = IdleReaper(app=reaper_app, settings=reaper_settings)
+
+    assert reaper.run_once() == []
+    assert _replicas(fake_k8s_server, reaper_settings, IDLE_MODULE) == 1
+
+
+def test_idle_reaper_uses_ingress_activity(reaper_app, reaper_settings, fake_k8s_server):
+    activity_source = Mock()
+    activity_source.active_services.return_value = {sanitize_deployment_name(*IDLE_MODULE)[1]}
+    reaper = IdleReaper(app=reaper_app, settings=reaper_settings, activity_source=activity_source)
+    reaper.started_at = time.time() - 7200
+
+    reclaimed = reaper.run_once()
+
+    activity_source.active_services.assert_called_once_with(3600)
+    assert [r.module_name for r in reclaimed] == ["BusyModule"]
+    assert _replicas(fake_k8s_server, reaper_settings, IDLE_MODULE) == 1
+
+
+def test_idle_reaper_skips_run_without_ingress_activity(reaper_app, reaper_settings, fake_k8s_server, caplog):
+    activity_source = Mock()
+    activity_source.active_services.side_effect = requests.ConnectionError("Prometheus is down")
+    reaper = IdleReaper(app=reaper_app, settings=reaper_settings, activity_source=activity_source)
+    reaper.started_at = time.time() - 7200
+
+    assert reaper.run_once() == []
+    assert _replicas(fake_k8s_server, reaper_settings, IDLE_MODULE) == 1
+    assert "skipping this idle reaper run" in caplog.text
+
+
+def test_idle_reaper_started_by_lifespan(reaper_app, reaper_settings):
+    reaper_app.state.settings = dataclasses.replace(reaper_settings, idle_reaper_enabled=True, prometheus_url="http://prometheus:9090")
+    with TestClient(reaper_app):
+        reaper = reaper_app.state.background_tasks[0]
+        assert isinstance(reaper, IdleReaper)
+        assert isinstance(reaper.activity_source, PrometheusIngressActivitySource)
+        assert reaper._thread.is_alive()
+    assert reaper._thread is None
+
+
+def test_prometheus_ingress_activity_source(requests_mock):
+    requests_mock.get(
+        "http://prometheus:9090/api/v1/query",
+        json={
+            "data": {"result": [{"metric": {"service": "s-busy-s"}, "value": [0, "3"]}, {"metric": {"service": "s-idle-s"}, "value": [0, "0"]}, {"metric": {}, "value": [0, "1"]}]}
+        },
+    )
+    source = PrometheusIngressActivitySource(PrometheusClient("http://prometheus:9090/"), namespace="staging-dynamic-services")
+
+    assert source.active_services(600) == {"s-busy-s"}
+    query = requests_mock.last_request.qs["query"][0]
+    assert 'exported_namespace="staging-dynamic-services"' in query
+    assert "[600s]" in query
+
+
+def test_requested_resources_falls_back_to_limits():
+    containers = [
+        V1Container(name="a", resources=V1ResourceRequirements(limits={"cpu": "2", "memory": "1Gi"}, requests={"cpu": "250m"})),
+        V1Container(name="b", resources=None),
+    ]
+    deployment = V1Deployment(spec=V1DeploymentSpec(replicas=2, selector=V1LabelSelector(), template=V1PodTemplateSpec(spec=V1PodSpec(containers=containers))))
+
+    assert requested_resources(deployment) == (Decimal("0.5"), 2 * 1024**3)
+
+
+def test_activity_tracker():
+    tracker = ActivityTracker()
+    assert tracker.last_requested("d-module-abcdefg-d") is None
+    tracker.record("d-module-abcdefg-d", when=123.0)
+    assert tracker.last_requested("d-module-abcdefg-d") == 123.0
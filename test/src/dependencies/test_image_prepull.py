@@ -0,0 +1,142 @@
+import dataclasses
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+import pytest
+from kubernetes.client import (
+    ApiException,
+    V1Container,
+    V1Deployment,
+    V1DeploymentList,
+    V1DeploymentSpec,
+    V1LabelSelector,
+    V1ListMeta,
+    V1ObjectMeta,
+    V1PodSpec,
+    V1PodTemplateSpec,
+)
+from prometheus_client import REGISTRY
+
+from configs.settings import get_settings
+from dependencies.image_prepull import PREPULLER_NAME, ImagePrePuller, ImageStartTracker, daemonset_images, deployment_starts, prepuller_daemonset
+from dependencies.wakeup import START_REQUESTED_AT_ANNOTATION
+from factory import create_app
+
+NOW = 1_000_000.0
+
+
+@pytest.fixture
+def prepull_settings():
+    return dataclasses.replace(get_settings(), image_prepull_window_seconds=3600, image_prepull_min_starts=2, image_prepull_max_images=2)
+
+
+@pytest.fixture
+def prepull_app(prepull_settings):
+    app = create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=Mock(), settings=prepull_settings)
+    app.state.k8s_clients.app_client.read_namespaced_daemon_set.side_effect = ApiException(status=404)
+    _list_deployments(app)
+    return app
+
+
+def _deployment(name, image, created, woken=None):
+    annotations = {START_REQUESTED_AT_ANNOTATION: datetime.fromtimestamp(woken, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")} if woken else None
+    return V1Deployment(
+        metadata=V1ObjectMeta(name=name, creation_timestamp=datetime.fromtimestamp(created, timezone.utc), annotations=annotations),
+        spec=V1DeploymentSpec(selector=V1LabelSelector(), template=V1PodTemplateSpec(spec=V1PodSpec(containers=[V1Container(name=name, image=image)]))),
+    )
+
+
+def _list_deployments(app, *deployments):
+    app.state.k8s_clients.app_client.list_namespaced_deployment.return_value = V1DeploymentList(items=list(deployments), metadata=V1ListMeta())
+
+
+def _starts(result):
+    return REGISTRY.get_sample_value("service_wizard_image_prepull_starts_total", {"result": result}) or 0
+
+
+def test_hot_images():
+    tracker = ImageStartTracker()
+    for image, times in (("hot", 3), ("warm", 2), ("cold", 1)):
+        for _ in range(times):
+            tracker.record(image, when=NOW)
+    tracker.record("old", when=NOW - 7200)
+    tracker.record("old", when=NOW - 7200)
+
+    assert tracker.hot_images(window_seconds=3600, min_starts=2, limit=5, now=NOW) == ["hot", "warm"]
+    assert tracker.hot_images(window_seconds=3600, min_starts=1, limit=1, now=NOW) == ["hot"]
+    # Starts older than the window are forgotten
+    assert "old" not in tracker._starts
+
+
+def test_deployment_starts():
+    assert deployment_starts(_deployment("d-a-d", "a:1", created=NOW - 100)) == [NOW - 100]
+    assert deployment_starts(_deployment("d-a-d", "a:1", created=NOW - 100, woken=NOW)) == [NOW - 100, NOW]
+    deployment = _deployment("d-a-d", "a:1", created=NOW - 100)
+    deployment.metadata.annotations = {START_REQUESTED_AT_ANNOTATION: "yesterday"}
+    assert deployment_starts(deployment) == [NOW - 100]
+
+
+def test_image_prepuller_counts_starts_from_deployments(prepull_app, prepull_settings):
+    tracker = prepull_app.state.image_tracker
+    prepuller = ImagePrePuller(app=prepull_app, settings=prepull_settings)
+    hits, misses = _starts("hit"), _starts("miss")
+    # Created and woken up in the window, created before the window and woken up in it, created in the window
+    _list_deployments(
+        prepull_app,
+        _deployment("d-a-d", "a:1", created=NOW - 600, woken=NOW - 60),
+        _deployment("d-b-d", "b:1", created=NOW - 7200, woken=NOW - 60),
+        _deployment("d-c-d", "c:1", created=NOW),
+    )
+
+    assert prepuller.run_once(now=NOW) == ["a:1"]
+    # Starts seen before the first run are not counted as hits or misses
+    assert (_starts("hit"), _starts("miss")) == (hits, misses)
+
+    # Starts already counted are not counted again, new wake-ups are counted once
+    _list_deployments(prepull_app, _deployment("d-a-d", "a:1", created=NOW - 600, woken=NOW + 60), _deployment("d-b-d", "b:1", created=NOW - 7200, woken=NOW + 60))
+    assert prepuller.run_once(now=NOW + 120) == ["a:1", "b:1"]
+    assert prepuller.run_once(now=NOW + 180) == ["a:1", "b:1"]
+    assert len(tracker._starts["a:1"]) == 3
+    assert (_starts("hit"), _starts("miss")) == (hits + 1, misses + 1)
+
+
+def test_image_prepuller_creates_updates_and_deletes_daemonset(prepull_app, prepull_settings):
+    apps_v1_api = prepull_app.state.k8s_clients.app_client
+    tracker = prepull_app.state.image_tracker
+    prepuller = ImagePrePuller(app=prepull_app, settings=prepull_settings)
+    for image in ("b:1", "a:1", "a:1", "a:1", "b:1", "c:1"):
+        tracker.record(image, when=NOW)
+
+    assert prepuller.run_once(now=NOW) == ["a:1", "b:1"]
+    body = apps_v1_api.create_namespaced_daemon_set.call_args.kwargs["body"]
+    assert daemonset_images(body) == ["a:1", "b:1"]
+    assert body.spec.template.spec.tolerations[0].key == prepull_settings.namespace
+    assert tracker.prepulled == {"a:1", "b:1"}
+
+    # Unchanged images leave the DaemonSet alone
+    apps_v1_api.read_namespaced_daemon_set.side_effect = None
+    apps_v1_api.read_namespaced_daemon_set.return_value = body
+    tracker.record("c:1", when=NOW)
+    assert prepuller.run_once(now=NOW) == ["a:1", "b:1"]
+    apps_v1_api.replace_namespaced_daemon_set.assert_not_called()
+
+    # A hotter image replaces the least started one
+    tracker.record("c:1", when=NOW)
+    tracker.record("c:1", when=NOW)
+    assert prepuller.run_once(now=NOW) == ["a:1", "c:1"]
+    assert daemonset_images(apps_v1_api.replace_namespaced_daemon_set.call_args.kwargs["body"]) == ["a:1", "c:1"]
+
+    # Once nothing was started in the window, the DaemonSet is deleted
+    assert prepuller.run_once(now=NOW + 7200) == []
+    apps_v1_api.delete_namespaced_daemon_set.assert_called_once_with(name=PREPULLER_NAME, namespace=prepull_settings.namespace)
+
+
+def test_image_prepuller_keeps_existing_images_after_restart(prepull_app, prepull_settings):
+    apps_v1_api = prepull_app.state.k8s_clients.app_client
+    apps_v1_api.read_namespaced_daemon_set.side_effect = None
+    apps_v1_api.read_namespaced_daemon_set.return_value = prepuller_daemonset(prepull_settings, ["a:1"])
+    prepuller = ImagePrePuller(app=prepull_app, settings=prepull_settings)
+
+    assert prepuller.run_once(now=NOW) == ["a:1"]
+    apps_v1_api.replace_namespaced_daemon_set.assert_not_called()
+    apps_v1_api.delete_namespaced_daemon_set.assert_not_called()
@@ -1,3 +1,4 @@
+import json
 import time
 from unittest.mock import call, patch, MagicMock
 
@@ -18,6 +19,8 @@ from kubernetes.client import (
     V1LabelSelector,
 )
 
+from clients.deadline import deadline_scope
+from configs.module_profiles import ProbeSpec
 from configs.settings import get_settings
 from dependencies.k8_wrapper import (
     get_pods_in_namespace,
@@ -27,14 +30,22 @@ from dependencies.k8_wrapper import (
     update_ingress_to_point_to_service,
     path_exists_in_ingress,
     create_and_launch_deployment,
+    v1_probe_factory,
     query_k8s_deployment_status,
     get_k8s_deployment_status_from_label,
-    get_k8s_deployments,
+    iter_k8s_deployments,
+    get_k8s_deployment_records,
+    list_k8s_deployment_records_page,
+    deployment_record_from_table_row,
+    deployment_record_from_dict,
+    deployment_record_from_model,
     delete_deployment,
     scale_replicas,
     DuplicateLabelsException,
     get_logs_for_first_pod_in_deployment,
 )
+from models import DeploymentRecord
+from test.src.dependencies.test_helpers import create_sample_deployment
 
 # Import the necessary Kubernetes client classes if not already imported
 
@@ -296,6 +307,19 @@ def test_create_and_launch_deployment(mock_v1_volume_mount_factory, mock_sanitiz
     assert actual_deployment_body.metadata.labels == sample_labels
     assert actual_deployment_body.metadata.annotations == sample_annotations
     assert actual_deployment_body.spec.template.spec.containers[0].image == sample_image
+    assert actual_deployment_body.spec.template.spec.containers[0].resources is None
+
+
+def test_v1_probe_factory():
+    assert v1_probe_factory(None) is None
+
+    tcp = v1_probe_factory(ProbeSpec(type="tcp", period_seconds=5))
+    assert tcp.tcp_socket.port == 5000 and tcp.http_get is None
+    assert (tcp.period_seconds, tcp.timeout_seconds, tcp.failure_threshold) == (5, 1, 3)
+
+    http = v1_probe_factory(ProbeSpec(type="http", path="/status", port=8080, initial_delay_seconds=30))
+    assert (http.http_get.path, http.http_get.port, http.tcp_socket) == ("/status", 8080, None)
+    assert http.initial_delay_seconds == 30
 
 
 @patch("dependencies.k8_wrapper._get_deployment_status")
@@ -317,35 +341,79 @@ def test_get_k8s_deployment_status_from_label(mock_get_deployment_status, mock_r
     mock_get_deployment_status.assert_called_once_with(mock_request, expected_label_selector)
 
 
-@patch("dependencies.k8_wrapper.get_k8s_all_service_status_cache")
-def test_get_k8s_deployments(mock_get_k8s_all_service_status_cache, mock_request):
+def test_iter_k8s_deployments(mock_request):
     expected_label_selector = "us.kbase.dynamicservice=true"
-    all_service_status_cache = MagicMock(spec=LRUCache)
-    mock_request.app.state.k8s_clients.all_service_status_cache = all_service_status_cache
-    mock_get_k8s_all_service_status_cache.return_value = all_service_status_cache
+    list_namespaced_deployment = mock_request.app.state.k8s_clients.app_client.list_namespaced_deployment
+
+    # No deployments matching label
+    list_namespaced_deployment.return_value.metadata._continue = None
+    list_namespaced_deployment.return_value.items = []
+    assert list(iter_k8s_deployments(mock_request)) == []
+    list_namespaced_deployment.assert_called_with(
+        mock_request.app.state.settings.namespace, label_selector=expected_label_selector, limit=mock_request.app.state.settings.k8s_list_page_size, _continue=None
+    )
 
-    # Scenario 1: Deployments are in the cache
+    # One or more deployments matching label
     example_deployments = ["deployment1", "deployment2"]
-    all_service_status_cache.get.return_value = example_deployments
+    list_namespaced_deployment.return_value.items = example_deployments
+    assert list(iter_k8s_deployments(mock_request)) == example_deployments
 
-    assert get_k8s_deployments(mock_request) == example_deployments
 
-    all_service_status_cache.get.assert_called_with(expected_label_selector, None)
+@patch("dependencies.k8_wrapper.get_k8s_all_service_status_cache")
+@patch("dependencies.k8_wrapper.list_k8s_deployment_records_page")
+def test_get_k8s_deployment_records(mock_list_k8s_deployment_records_page, mock_get_k8s_all_service_status_cache, mock_request):
+    expected_label_selector = "us.kbase.dynamicservice=true"
+    all_service_status_cache = MagicMock(spec=LRUCache)
+    mock_get_k8s_all_service_status_cache.return_value = all_service_status_cache
 
+    # Records are in the cache
+    example_records = [DeploymentRecord("deployment1", "module1", "hash1"), DeploymentRecord("deployment2", "module2", "hash2")]
+    all_service_status_cache.get.return_value = example_records
+    assert get_k8s_deployment_records(mock_request) == example_records
+    all_service_status_cache.get.assert_called_with(expected_label_selector, None)
     assert all_service_status_cache.set.call_count == 0
 
-    # Scenario 2: Deployments not in cache, fetch from K8s with no deployments matching label
+    # Records not in cache, fetched page by page
     all_service_status_cache.get.return_value = None
-    get_k8s_deployments(mock_request)
-    mock_request.app.state.k8s_clients.app_client.list_namespaced_deployment.assert_called_with(mock_request.app.state.settings.namespace, label_selector=expected_label_selector)
-    all_service_status_cache.set.assert_called_with(expected_label_selector, mock_request.app.state.k8s_clients.app_client.list_namespaced_deployment().items)
+    mock_list_k8s_deployment_records_page.side_effect = [([example_records[0]], "1"), ([example_records[1]], None)]
+    assert get_k8s_deployment_records(mock_request) == example_records
+    mock_list_k8s_deployment_records_page.assert_called_with(mock_request, label_selector=expected_label_selector, cursor="1")
+    all_service_status_cache.set.assert_called_with(expected_label_selector, example_records)
 
-    # Scenario 3: Deployments not in cache, fetch from K8s with one or more deployments matching label
-    all_service_status_cache.get.return_value = None
-    mock_request.app.state.k8s_clients.app_client.list_namespaced_deployment.return_value.items = example_deployments
-    get_k8s_deployments(mock_request)
-    assert get_k8s_deployments(mock_request) == example_deployments
-    all_service_status_cache.set.assert_called_with(expected_label_selector, example_deployments)
+
+def test_list_k8s_deployment_records_page_is_bounded_by_the_deadline(mock_request):
+    call_api = mock_request.app.state.k8s_clients.app_client.api_client.call_api
+    call_api.return_value.data = json.dumps({"kind": "DeploymentList", "items": [], "metadata": {}})
+    call_timeout = mock_request.app.state.settings.circuit_breaker_policy("k8s_apps").call_timeout
+
+    assert list_k8s_deployment_records_page(mock_request) == ([], None)
+    assert call_api.call_args.kwargs["_request_timeout"] == call_timeout
+
+    with deadline_scope(call_timeout / 2):
+        list_k8s_deployment_records_page(mock_request)
+    assert call_api.call_args.kwargs["_request_timeout"] <= call_timeout / 2
+
+
+def test_deployment_record_from_table_row():
+    columns = ["Name", "Ready", "Up-to-date", "Available", "Age"]
+    row = {
+        "cells": ["d-test-module-1234567-d", "1/3", 3, 2, "5m"],
+        "object": {"metadata": {"name": "d-test-module-1234567-d", "annotations": {"module_name": "test_module", "git_commit_hash": "1234567"}}},
+    }
+    assert deployment_record_from_table_row(columns, row) == DeploymentRecord(
+        "d-test-module-1234567-d", "test_module", "1234567", replicas=3, updated_replicas=3, ready_replicas=1, available_replicas=2, unavailable_replicas=1
+    )
+    # Without the metadata of the row, the annotations are unknown
+    assert deployment_record_from_table_row(columns, {"cells": ["d-other-d", "0/0", 0, 0, "5m"]}) == DeploymentRecord("d-other-d", None, None)
+
+
+def test_deployment_record_from_dict():
+    deployment = {
+        "metadata": {"name": "d-test-module-1234567-d", "annotations": {"module_name": "test_module", "git_commit_hash": "1234567"}},
+        "spec": {"replicas": 2, "template": {"spec": {"containers": [{"name": "c", "env": [{"name": "SECRET", "value": "s"}]}]}}},
+        "status": {"updatedReplicas": 2, "unavailableReplicas": 2},
+    }
+    assert deployment_record_from_dict(deployment) == DeploymentRecord("d-test-module-1234567-d", "test_module", "1234567", replicas=2, updated_replicas=2, unavailable_replicas=2)
 
 
 @patch("dependencies.k8_wrapper.sanitize_deployment_name", return_value=("mock_deployment_name", "mock_service_name"))
@@ -361,12 +429,32 @@ def test_delete_deployment(mock_sanitize_deployment_name, mock_request):
 @patch("dependencies.k8_wrapper.query_k8s_deployment_status")
 def test_scale_replicas(mock_query_deployment_status, mock_request):
     desired_replicas = 3
-    mock_query_deployment_status.return_value = sample_deployment
-    scale_replicas(mock_request, sample_module_name, sample_git_commit_hash, desired_replicas)
+    mock_query_deployment_status.return_value = DeploymentRecord("mock_deployment_name", sample_module_name, sample_git_commit_hash, replicas=1)
+    patch_namespaced_deployment = mock_request.app.state.k8s_clients.app_client.patch_namespaced_deployment
+    patch_namespaced_deployment.return_value = sample_deployment
+    assert scale_replicas(mock_request, sample_module_name, sample_git_commit_hash, desired_replicas) == deployment_record_from_model(sample_deployment)
     mock_query_deployment_status.assert_called_once_with(mock_request, sample_module_name, sample_git_commit_hash)
-    mock_request.app.state.k8s_clients.app_client.replace_namespaced_deployment.assert_called_once_with(
-        name="mock_deployment_name", namespace=mock_request.app.state.settings.namespace, body=sample_deployment
+    patch_namespaced_deployment.assert_called_once_with(
+        name="mock_deployment_name", namespace=mock_request.app.state.settings.namespace, body={"spec": {"replicas": desired_replicas}}
+    )
+
+
+def test_deployment_record_from_model():
+    deployment = create_sample_deployment("d-test-module-1234567-d", replicas=2, ready_replicas=1, available_replicas=1, unavailable_replicas=1)
+    deployment.metadata.resource_version = "42"
+    assert deployment_record_from_model(deployment) == DeploymentRecord(
+        "d-test-module-1234567-d",
+        "test_module",
+        "test_version",
+        replicas=2,
+        updated_replicas=2,
+        ready_replicas=1,
+        available_replicas=1,
+        unavailable_replicas=1,
+        resource_version="42",
     )
+    # A deployment without a status yet
+    assert deployment_record_from_model(sample_deployment) == DeploymentRecord("mock_deployment_name", None, None, replicas=1)
 
 
 @patch("dependencies.k8_wrapper.check_service_status_cache")
@@ -376,7 +464,7 @@ def test__get_deployment_status(mock_get_k8s_all_service_status_cache, mock_chec
     mock_request.app.state.k8s_clients.service_status_cache = MagicMock()
     #
     # # Scenario 1: Deployment is in the cache
-    mock_check_service_status_cache.return_value = sample_deployment
+    mock_check_service_status_cache.return_value = deployment_record_from_model(sample_deployment)
     scale_replicas(mock_request, sample_module_name, sample_git_commit_hash, 123)
 
     # # Scenario 2: Deployment is not in the cache, need to look up k8 api
@@ -0,0 +1,134 @@
+import asyncio
+import dataclasses
+import os
+import time
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api
+
+from clients.KubernetesClients import K8sClients
+from configs.settings import get_settings
+from dependencies.idle_reaper import IdleReaper
+from dependencies.leader_election import LeaderElector, default_identity
+from factory import create_app
+
+
+@pytest.fixture
+def election_settings():
+    return dataclasses.replace(get_settings(), leader_election_lease_name="sw2-test-leader", leader_election_lease_seconds=2, leader_election_renew_seconds=1)
+
+
+@pytest.fixture
+def election_app(fake_k8s_server, election_settings):
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(election_settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    return create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=k8s_clients, settings=election_settings)
+
+
+def _elector(app, identity):
+    return LeaderElector(app, app.state.settings, on_started_leading=Mock(), on_stopped_leading=Mock(), identity=identity)
+
+
+def _lease(fake_k8s_server, settings):
+    return fake_k8s_server.leases[(settings.namespace, settings.leader_election_lease_name)]
+
+
+def test_default_identity():
+    assert default_identity().endswith(f"_{os.getpid()}")
+
+
+def test_only_one_leader(election_app, fake_k8s_server, election_settings):
+    first, second = _elector(election_app, "first"), _elector(election_app, "second")
+    first.run_once()
+    second.run_once()
+    assert first.is_leader() and not second.is_leader()
+    first.on_started_leading.assert_called_once_with()
+    second.on_started_leading.assert_not_called()
+    assert _lease(fake_k8s_server, election_settings)["spec"]["holderIdentity"] == "first"
+
+    # Renewing keeps the lease, the other process keeps waiting
+    renewed_at = _lease(fake_k8s_server, election_settings)["spec"]["renewTime"]
+    time.sleep(0.01)
+    first.run_once()
+    second.run_once()
+    assert first.is_leader() and not second.is_leader()
+    assert _lease(fake_k8s_server, election_settings)["spec"]["renewTime"] != renewed_at
+    first.on_started_leading.assert_called_once_with()
+
+    # A released lease is taken over right away
+    first.release()
+    second.run_once()
+    assert second.is_leader()
+    assert _lease(fake_k8s_server, election_settings)["spec"]["holderIdentity"] == "second"
+    assert _lease(fake_k8s_server, election_settings)["spec"]["leaseTransitions"] == 1
+    # The previous leader finds out on its next renewal and stops its controllers
+    first.run_once()
+    assert not first.is_leader()
+    first.on_stopped_leading.assert_called_once_with()
+
+
+def test_expired_lease_is_taken_over(election_app, fake_k8s_server, election_settings):
+    first, second = _elector(election_app, "first"), _elector(election_app, "second")
+    first.run_once()
+    second.run_once()
+    assert not second.is_leader()
+    # The leader stops renewing, e.g. because its pod was killed
+    time.sleep(election_settings.leader_election_lease_seconds + 0.1)
+    second.run_once()
+    assert second.is_leader()
+    assert _lease(fake_k8s_server, election_settings)["spec"]["holderIdentity"] == "second"
+
+
+def test_leader_stops_leading_when_renewals_fail(election_app, election_settings):
+    elector = _elector(election_app, "first")
+    elector.run_once()
+    assert elector.is_leader()
+
+    elector.try_acquire_or_renew = Mock(side_effect=Exception("API server unreachable"))
+    # A failed renewal within the renew deadline keeps the leadership
+    elector.run_once()
+    assert elector.is_leader()
+    elector._renewed_at -= election_settings.leader_election_lease_seconds - election_settings.leader_election_renew_seconds
+    elector.run_once()
+    assert not elector.is_leader()
+    elector.on_stopped_leading.assert_called_once_with()
+
+
+def test_background_tasks_only_run_in_the_leader(election_app, fake_k8s_server, election_settings):
+    other = _elector(election_app, "other")
+    other.run_once()
+    settings = dataclasses.replace(election_settings, leader_election_enabled=True, idle_reaper_enabled=True)
+    app = create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=election_app.state.k8s_clients, settings=settings)
+
+    with TestClient(app):
+        time.sleep(0.2)
+        # Another process holds the lease
+        assert not app.state.leader_elector.is_leader()
+        assert app.state.background_tasks == []
+
+        other.release()
+        deadline = time.monotonic() + 5
+        while not app.state.background_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert app.state.leader_elector.is_leader()
+        reaper = app.state.background_tasks[0]
+        assert isinstance(reaper, IdleReaper)
+        assert reaper._thread.is_alive()
+    # Shutting down stops the controllers and releases the lease
+    assert reaper._thread is None
+    assert reaper.stopping
+    assert app.state.background_tasks == [reaper]
+    assert _lease(fake_k8s_server, election_settings)["spec"].get("holderIdentity") is None
+
+
+def test_lifespan_stops_the_leader_elector_off_the_event_loop(election_app):
+    def stop():
+        with pytest.raises(RuntimeError, match="no running event loop"):
+            asyncio.get_running_loop()
+
+    election_app.state.leader_elector = Mock(stop=Mock(side_effect=stop))
+    with TestClient(election_app):
+        election_app.state.leader_elector.start.assert_called_once_with()
+    election_app.state.leader_elector.stop.assert_called_once_with()
@@ -1,3 +1,4 @@
+import dataclasses
 import logging
 import re
 from unittest.mock import patch
@@ -7,7 +8,10 @@ from fastapi import HTTPException
 from kubernetes.client import ApiException
 
 from clients.baseclient import ServerError
+from configs.module_profiles import SIZING_PROFILE_SECURE_PARAM, ModuleProfile, ProbeSpec, parse_module_profiles
+from configs.settings import get_settings
 from dependencies import lifecycle
+from dependencies.k8_wrapper import deployment_record_from_model
 from models import ServiceStatus, DynamicServiceStatus
 from test.src.dependencies import test_helpers as tlh
 
@@ -22,6 +26,17 @@ def test_simple_get_volume_mounts(mock_request):
     assert result == expected_result
 
 
+def test_get_sizing_profile(mock_request):
+    mock_request.app.state.settings = dataclasses.replace(
+        get_settings(), module_profiles=parse_module_profiles({"default_profile": "small", "profiles": {"small": {}, "large": {}}})
+    )
+    mock_request.app.state.catalog_client.get_secure_params.return_value = [{"param_name": "SOME_PARAM", "param_value": "large"}]
+    assert lifecycle.get_sizing_profile(mock_request, "test_module", "dev").name == "small"
+
+    mock_request.app.state.catalog_client.get_secure_params.return_value = [{"param_name": SIZING_PROFILE_SECURE_PARAM, "param_value": "large"}]
+    assert lifecycle.get_sizing_profile(mock_request, "test_module", "dev").name == "large"
+
+
 def test_simple_setup_metadata():
     module_name = "test_module"
     requested_module_version = "1.0"
@@ -60,6 +75,7 @@ def test_simple_get_env(mock_request):
         assert expected_environ_map[item] == envs[item]
 
 
+@patch("dependencies.lifecycle.query_k8s_deployment_status", return_value=None)
 @patch("dependencies.lifecycle.scale_replicas")
 @patch("dependencies.lifecycle.get_service_status_with_retries")
 @patch("dependencies.lifecycle._create_cluster_ip_service_helper")
@@ -73,6 +89,7 @@ def test_start_deployment(
     _create_cluster_ip_service_helper_mock,
     get_service_status_with_retries_mock,
     scale_replicas_mock,
+    query_k8s_deployment_status_mock,
     mock_request,
 ):
     # Test Deployment Does Not Already exist, no need to scale replicas
@@ -90,6 +107,72 @@ def test_start_deployment(
     scale_replicas_mock.assert_called_once()  #
 
 
+MODULE_INFO = {"git_commit_hash": "hash123", "docker_img_name": "image", "version": "1.0", "git_url": "https://github.com/test/repo"}
+
+
+@patch("dependencies.lifecycle.get_dynamic_service_status_helper")
+@patch("dependencies.lifecycle._update_ingress_for_service_helper")
+@patch("dependencies.lifecycle._create_cluster_ip_service_helper")
+@patch("dependencies.lifecycle.wake_deployment")
+@patch("dependencies.lifecycle.query_k8s_deployment_status")
+@patch("dependencies.lifecycle._create_and_launch_deployment_helper")
+def test_start_deployment_wakes_existing_deployment(
+    _create_and_launch_deployment_helper_mock,
+    query_k8s_deployment_status_mock,
+    wake_deployment_mock,
+    _create_cluster_ip_service_helper_mock,
+    _update_ingress_for_service_helper_mock,
+    get_dynamic_service_status_helper_mock,
+    mock_request,
+):
+    stopped_deployment = tlh.create_sample_deployment(deployment_name="tester", replicas=0, ready_replicas=0, available_replicas=0, unavailable_replicas=0)
+    query_k8s_deployment_status_mock.return_value = stopped_deployment
+    mock_request.app.state.catalog_client.get_combined_module_info.return_value = MODULE_INFO
+    get_dynamic_service_status_helper_mock.return_value = tlh.get_running_deployment_status("tester")
+
+    rv = lifecycle.start_deployment(request=mock_request, module_name="test_module", module_version="dev")
+
+    assert rv == tlh.get_running_deployment_status("tester")
+    wake_deployment_mock.assert_called_once_with(mock_request, "test_module", "hash123", stopped_deployment, replicas=1)
+    _create_and_launch_deployment_helper_mock.assert_not_called()
+    mock_request.app.state.catalog_client.get_secure_params.assert_not_called()
+    # A Service or Ingress that is missing, e.g. after a failed start, is created again
+    labels = _create_cluster_ip_service_helper_mock.call_args.args[3]
+    assert labels["us.kbase.module.git_commit_hash"] == "hash123"
+    _update_ingress_for_service_helper_mock.assert_called_once_with(mock_request, "test_module", "hash123")
+
+
+@patch("dependencies.lifecycle.get_service_status_with_retries")
+@patch("dependencies.lifecycle._update_ingress_for_service_helper")
+@patch("dependencies.lifecycle._create_cluster_ip_service_helper")
+@patch("dependencies.lifecycle.wake_deployment", side_effect=ApiException(status=404))
+@patch("dependencies.lifecycle.query_k8s_deployment_status")
+@patch("dependencies.lifecycle._create_and_launch_deployment_helper", return_value=False)
+def test_start_deployment_creates_deleted_cached_deployment(
+    _create_and_launch_deployment_helper_mock,
+    query_k8s_deployment_status_mock,
+    wake_deployment_mock,
+    _create_cluster_ip_service_helper_mock,
+    _update_ingress_for_service_helper_mock,
+    get_service_status_with_retries_mock,
+    mock_request,
+):
+    query_k8s_deployment_status_mock.return_value = deployment_record_from_model(
+        tlh.create_sample_deployment(deployment_name="tester", replicas=0, ready_replicas=0, available_replicas=0, unavailable_replicas=0)
+    )
+    mock_request.app.state.catalog_client.get_combined_module_info.return_value = MODULE_INFO
+    get_service_status_with_retries_mock.return_value = tlh.get_running_deployment_status("tester")
+
+    assert lifecycle.start_deployment(request=mock_request, module_name="test_module", module_version="dev") == tlh.get_running_deployment_status("tester")
+    _create_and_launch_deployment_helper_mock.assert_called_once()
+    _create_cluster_ip_service_helper_mock.assert_called_once()
+    _update_ingress_for_service_helper_mock.assert_called_once()
+
+    wake_deployment_mock.side_effect = ApiException(status=500)
+    with pytest.raises(ApiException):
+        lifecycle.start_deployment(request=mock_request, module_name="test_module", module_version="dev")
+
+
 @patch("dependencies.lifecycle.create_and_launch_deployment")
 def test__create_and_launch_deployment_helper(mock_create_and_launch, mock_request):
     # Test truthiness based on api exception
@@ -126,6 +209,30 @@ def test__create_and_launch_deployment_helper(mock_create_and_launch, mock_reque
     assert e.value.status_code == 500
 
 
+@patch("dependencies.lifecycle.create_and_launch_deployment")
+def test__create_and_launch_deployment_helper_sizes_and_probes(mock_create_and_launch, mock_request):
+    profile = ModuleProfile(name="small", requests={"cpu": "100m"})
+    probes = {"readiness": ProbeSpec(type="http", path="/status"), "liveness": None}
+
+    lifecycle._create_and_launch_deployment_helper(
+        annotations={},
+        env={},
+        image="test_image",
+        labels={},
+        module_git_commit_hash="hash123",
+        module_name="test_module",
+        mounts=[],
+        request=mock_request,
+        profile=profile,
+        probes=probes,
+    )
+
+    kwargs = mock_create_and_launch.call_args.kwargs
+    assert kwargs["resources"].requests == {"cpu": "100m"} and kwargs["resources"].limits is None
+    assert kwargs["readiness_probe"].http_get.path == "/status"
+    assert kwargs["liveness_probe"] is None
+
+
 @patch("dependencies.lifecycle.create_clusterip_service")
 @patch.object(logging, "warning")
 def test__create_cluster_ip_service_helper(mock_logging_warning, mock_create_clusterip_service, mock_request):
@@ -192,7 +299,7 @@ def test_stop_deployment(mock_scale_replicas, mock_request):
 
     deployment = tlh.create_sample_deployment(deployment_name="test_deployment_name", replicas=0, ready_replicas=0, available_replicas=0, unavailable_replicas=0)
 
-    mock_scale_replicas.return_value = deployment
+    mock_scale_replicas.return_value = deployment_record_from_model(deployment)
 
     rv = lifecycle.stop_deployment(request=mock_request, module_name="test_module", module_version="test_version")
 
@@ -0,0 +1,108 @@
+import dataclasses
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api
+
+from clients.KubernetesClients import K8sClients
+from configs.settings import get_settings
+from dependencies.background import background_request
+from dependencies.k8_wrapper import create_and_launch_deployment, sanitize_deployment_name
+from dependencies.release_watcher import ReleaseChange, ReleaseWatcher
+from factory import create_app
+
+MODULE_NAME = "ReleasedModule"
+OLD_HASH, NEW_HASH, DEV_HASH = "a" * 40, "b" * 40, "c" * 40
+NOW = 1_000_000.0
+
+
+@pytest.fixture
+def watcher_settings():
+    return dataclasses.replace(get_settings(), release_watcher_drain_seconds=3600, prometheus_url=None, k8s_list_page_size=1)
+
+
+def _deploy(request, git_commit_hash, tag):
+    labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": MODULE_NAME.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+    annotations = {"module_name": MODULE_NAME, "git_commit_hash": git_commit_hash, "module_version_from_request": tag}
+    create_and_launch_deployment(request, MODULE_NAME, git_commit_hash, image="image", labels=labels, annotations=annotations, env={}, mounts=[])
+
+
+@pytest.fixture
+def watcher_app(fake_k8s_server, watcher_settings):
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(watcher_settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    app = create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=k8s_clients, settings=watcher_settings)
+    app.state.catalog_client.resolve_git_commit_hash.side_effect = lambda module_name, tag: {"release": NEW_HASH, "dev": "d" * 40}[tag]
+    request = background_request(app)
+    _deploy(request, OLD_HASH, "release")
+    _deploy(request, DEV_HASH, "dev")
+    return app
+
+
+def _replicas(fake_k8s_server, settings, git_commit_hash):
+    return fake_k8s_server.deployments[(settings.namespace, sanitize_deployment_name(MODULE_NAME, git_commit_hash)[0])]["spec"]["replicas"]
+
+
+def test_release_watcher_predeploys_then_reaps_superseded_version(watcher_app, watcher_settings, fake_k8s_server):
+    watcher = ReleaseWatcher(app=watcher_app, settings=watcher_settings)
+
+    with patch("dependencies.release_watcher.start_deployment", side_effect=lambda request, module_name, tag: _deploy(request, NEW_HASH, tag)) as start_deployment:
+        changes = watcher.run_once(now=NOW)
+        # Dev versions are not watched
+        assert changes == [ReleaseChange(MODULE_NAME, "release", OLD_HASH, NEW_HASH)]
+        start_deployment.assert_called_once()
+        assert start_deployment.call_args.args[1:] == (MODULE_NAME, "release")
+
+        # The new version is deployed, the old one keeps serving until its traffic drained
+        assert watcher.run_once(now=NOW + 60) == changes
+        start_deployment.assert_called_once()
+    assert _replicas(fake_k8s_server, watcher_settings, OLD_HASH) == 1
+
+    # Requests for the old version restart the drain period
+    watcher_app.state.activity_tracker.record(sanitize_deployment_name(MODULE_NAME, OLD_HASH)[0], when=NOW + 1800)
+    watcher.run_once(now=NOW + 3600)
+    assert _replicas(fake_k8s_server, watcher_settings, OLD_HASH) == 1
+
+    watcher.run_once(now=NOW + 5400)
+    assert _replicas(fake_k8s_server, watcher_settings, OLD_HASH) == 0
+    assert _replicas(fake_k8s_server, watcher_settings, NEW_HASH) == 1
+    assert _replicas(fake_k8s_server, watcher_settings, DEV_HASH) == 1
+    assert watcher.run_once(now=NOW + 5460) == []
+
+
+def test_release_watcher_stops_deploying_when_stopped(watcher_app, watcher_settings):
+    watcher = ReleaseWatcher(app=watcher_app, settings=watcher_settings)
+    watcher.stop()
+
+    with patch("dependencies.release_watcher.start_deployment") as start_deployment:
+        assert watcher.run_once(now=NOW) == [ReleaseChange(MODULE_NAME, "release", OLD_HASH, NEW_HASH)]
+    start_deployment.assert_not_called()
+
+
+def test_release_watcher_waits_for_ingress_traffic_to_drain(watcher_app, watcher_settings, fake_k8s_server):
+    _deploy(background_request(watcher_app), NEW_HASH, "release")
+    activity_source = Mock()
+    activity_source.active_services.return_value = {sanitize_deployment_name(MODULE_NAME, OLD_HASH)[1]}
+    watcher = ReleaseWatcher(app=watcher_app, settings=watcher_settings, activity_source=activity_source)
+
+    watcher.run_once(now=NOW)
+    watcher.run_once(now=NOW + 7200)
+    assert _replicas(fake_k8s_server, watcher_settings, OLD_HASH) == 1
+
+    activity_source.active_services.side_effect = requests.ConnectionError("Prometheus is down")
+    watcher.run_once(now=NOW + 7200)
+    assert _replicas(fake_k8s_server, watcher_settings, OLD_HASH) == 1
+
+    activity_source.active_services.side_effect = None
+    activity_source.active_services.return_value = set()
+    watcher.run_once(now=NOW + 7200)
+    assert _replicas(fake_k8s_server, watcher_settings, OLD_HASH) == 0
+
+
+def test_release_watcher_skips_unresolvable_tags(watcher_app, watcher_settings, caplog):
+    watcher_app.state.catalog_client.resolve_git_commit_hash.side_effect = ValueError("No release version")
+    watcher = ReleaseWatcher(app=watcher_app, settings=watcher_settings)
+
+    assert watcher.run_once(now=NOW) == []
+    assert "Failed to look up the release version of ReleasedModule" in caplog.text
@@ -0,0 +1,79 @@
+from unittest.mock import Mock
+
+import pytest
+from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api, V1ResourceRequirements
+
+from clients.KubernetesClients import K8sClients
+from clients.baseclient import ServerError
+from configs.module_profiles import SIZING_PROFILE_ANNOTATION
+from configs.settings import get_settings
+from dependencies.background import background_request
+from dependencies.k8_wrapper import create_and_launch_deployment
+from dependencies.resource_usage import get_resource_usage
+from factory import create_app
+
+SIZED_MODULE = ("SizedModule", "a" * 40)
+UNSIZED_MODULE = ("UnsizedModule", "b" * 40)
+
+
+def _pod_metrics(module_name, git_commit_hash, cpu, memory):
+    labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+    return {"metadata": {"name": f"{module_name}-pod", "labels": labels}, "containers": [{"name": "c", "usage": {"cpu": cpu, "memory": memory}}]}
+
+
+@pytest.fixture
+def usage_request(fake_k8s_server):
+    settings = get_settings()
+    api_client = fake_k8s_server.api_client()
+    custom_objects_client = Mock()
+    k8s_clients = K8sClients(
+        settings,
+        k8s_core_client=CoreV1Api(api_client),
+        k8s_app_client=AppsV1Api(api_client),
+        k8s_network_client=NetworkingV1Api(api_client),
+        k8s_custom_objects_client=custom_objects_client,
+    )
+    request = background_request(create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=k8s_clients, settings=settings))
+    request.state.user_auth_roles = Mock(is_admin=True)
+    for (module_name, git_commit_hash), resources, annotations in (
+        (SIZED_MODULE, V1ResourceRequirements(requests={"cpu": "500m", "memory": "1Gi"}), {SIZING_PROFILE_ANNOTATION: "medium"}),
+        (UNSIZED_MODULE, None, {}),
+    ):
+        labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+        annotations.update({"module_name": module_name, "git_commit_hash": git_commit_hash})
+        create_and_launch_deployment(request, module_name, git_commit_hash, image="image", labels=labels, annotations=annotations, env={}, mounts=[], resources=resources)
+    custom_objects_client.list_namespaced_custom_object.return_value = {
+        "items": [_pod_metrics(*SIZED_MODULE, cpu="125000000n", memory="256Mi"), _pod_metrics(*UNSIZED_MODULE, cpu="10m", memory="64Mi")]
+    }
+    return request
+
+
+def test_get_resource_usage(usage_request):
+    report = {usage.module_name: usage for usage in get_resource_usage(usage_request)}
+
+    sized = report["SizedModule"]
+    assert sized.sizing_profile == "medium"
+    assert (sized.replicas, sized.pods_with_metrics) == (1, 1)
+    assert (sized.cpu_requested_cores, sized.cpu_used_cores, sized.cpu_usage_ratio) == (0.5, 0.125, 0.25)
+    assert (sized.memory_requested_bytes, sized.memory_used_bytes, sized.memory_usage_ratio) == (1024**3, 256 * 1024**2, 0.25)
+    # Usage is still reported for services without requests, there is just nothing to compare it to
+    unsized = report["UnsizedModule"]
+    assert (unsized.sizing_profile, unsized.cpu_requested_cores, unsized.cpu_used_cores, unsized.cpu_usage_ratio) == (None, 0, 0.01, None)
+
+    kwargs = usage_request.app.state.k8s_clients.custom_objects_client.list_namespaced_custom_object.call_args.kwargs
+    assert (kwargs["group"], kwargs["version"], kwargs["plural"]) == ("metrics.k8s.io", "v1beta1", "pods")
+
+
+def test_get_resource_usage_for_one_module(usage_request):
+    usage_request.app.state.k8s_clients.custom_objects_client.list_namespaced_custom_object.return_value = {"items": []}
+
+    report = get_resource_usage(usage_request, module_name="sizedmodule")
+
+    assert [usage.module_name for usage in report] == ["SizedModule"]
+    assert report[0].cpu_used_cores is None and report[0].cpu_usage_ratio is None
+
+
+def test_get_resource_usage_requires_admin(usage_request):
+    usage_request.state.user_auth_roles = Mock(is_admin=False)
+    with pytest.raises(ServerError, match="Only admins can view resource usage"):
+        get_resource_usage(usage_request)
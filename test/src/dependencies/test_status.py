@@ -1,10 +1,17 @@
-from unittest.mock import patch
+import dataclasses
+import time
+from unittest.mock import Mock, patch
 
 import pytest
 from fastapi import HTTPException
+from kubernetes.client import ApiException, AppsV1Api, CoreV1Api, NetworkingV1Api
 
 import clients.baseclient
-from dependencies.k8_wrapper import DuplicateLabelsException
+from clients.KubernetesClients import K8sClients
+from clients.deadline import DeadlineExceededError, deadline_scope
+from configs.settings import get_settings
+from dependencies.background import background_request
+from dependencies.k8_wrapper import DuplicateLabelsException, create_and_launch_deployment, deployment_record_from_model, get_k8s_deployment_records, iter_k8s_deployments
 from dependencies.status import (
     lookup_module_info,
     get_service_status_one_try,
@@ -13,8 +20,10 @@ from dependencies.status import (
     get_status,
     get_version,
     get_all_dynamic_service_statuses,
+    get_dynamic_service_statuses_page,
 )
-from models import CatalogModuleInfo
+from factory import create_app
+from models import CatalogModuleInfo, DeploymentRecord
 from test.src.dependencies.test_helpers import assert_exception_correct, get_running_deployment_status, sample_catalog_module_info, create_sample_deployment
 
 sample_module_name = "test_module"
@@ -111,12 +120,25 @@ def test_get_service_status_with_retries(
     assert rv.replicas == 0
 
 
+@patch("dependencies.status.get_dynamic_service_status_helper")
+@patch("dependencies.status.lookup_module_info")
+def test_get_service_status_with_retries_stops_at_the_deadline(mock_lookup_module_info, mock_get_dynamic_service_status_helper, mock_request):
+    mock_get_dynamic_service_status_helper.side_effect = Exception("Not even one replica is ready")
+    started = time.monotonic()
+    with deadline_scope(0.3):
+        with pytest.raises(DeadlineExceededError, match="The request deadline of 0.3 seconds passed before get_service_status"):
+            get_service_status_with_retries(mock_request, sample_module_name, sample_git_commit, retries=10)
+    # Slept until the deadline instead of the full 2 seconds
+    assert time.monotonic() - started < 1
+    assert mock_get_dynamic_service_status_helper.call_count == 1
+
+
 @patch("dependencies.status.lookup_module_info")
 @patch("dependencies.status.query_k8s_deployment_status")
 def test_get_dynamic_service_status_helper(mock_query_k8s_deployment_status, mock_lookup_module_info, mock_request):
     # Found it!
     mock_lookup_module_info.return_value = sample_catalog_module_info()
-    mock_query_k8s_deployment_status.return_value = create_sample_deployment("test", 1, 1, 1, 0)
+    mock_query_k8s_deployment_status.return_value = deployment_record_from_model(create_sample_deployment("test", 1, 1, 1, 0))
     rv = get_dynamic_service_status_helper(mock_request, sample_module_name, sample_git_commit)
     expected_dss = get_running_deployment_status("test")
     assert rv == expected_dss
@@ -131,7 +153,7 @@ def test_get_dynamic_service_status_helper(mock_query_k8s_deployment_status, moc
     assert_exception_correct(e.value, expected_exception)
 
 
-@patch("dependencies.status.get_k8s_deployments")
+@patch("dependencies.status.get_k8s_deployment_records")
 def test_get_all_dynamic_service_statuses(mock_get_k8s_deployments, mock_request):
     # No Deployments found
     mock_get_k8s_deployments.return_value = []
@@ -147,15 +169,13 @@ def test_get_all_dynamic_service_statuses(mock_get_k8s_deployments, mock_request
     assert_exception_correct(e.value, expected_exception)
 
     # Get running deployment
-    mock_get_k8s_deployments.return_value = [create_sample_deployment("test", 1, 1, 1, 0)]
+    mock_get_k8s_deployments.return_value = [DeploymentRecord("test", "test_module", "test_version", replicas=1, updated_replicas=1, ready_replicas=1, available_replicas=1)]
     rv = get_all_dynamic_service_statuses(mock_request, sample_module_name, sample_git_commit)
     expected_dss = get_running_deployment_status("test")
     assert rv == [expected_dss]
 
     # Inject a bad key
-    mock_get_k8s_deployments.return_value = [create_sample_deployment("test", 1, 1, 1, 0)]
-    mock_get_k8s_deployments.return_value[0].metadata.annotations["module_name"] = None
-    mock_get_k8s_deployments.return_value[0].metadata.annotations["git_commit_hash"] = None
+    mock_get_k8s_deployments.return_value = [DeploymentRecord("test", None, None, replicas=1, updated_replicas=1, ready_replicas=1, available_replicas=1)]
     with pytest.raises(HTTPException) as e:
         get_all_dynamic_service_statuses(mock_request, sample_module_name, sample_git_commit)
 
@@ -170,7 +190,7 @@ def test_get_all_dynamic_service_statuses(mock_get_k8s_deployments, mock_request
     assert_exception_correct(e.value, expected_exception)
 
     # NO dynamic services found in the catalog
-    mock_request.app.state.catalog_client.get_hash_to_name_mappings.return_value = None
+    mock_request.app.state.catalog_client.get_dynamic_service_module_names.return_value = frozenset()
     with pytest.raises(HTTPException) as e:
         get_all_dynamic_service_statuses(mock_request, sample_module_name, sample_git_commit)
     expected_exception = HTTPException(status_code=404, detail="No dynamic services found in catalog!")
@@ -203,3 +223,66 @@ def test_get_version(mock_request):
 
     result_with_params = get_version(mock_request, module_name="some_module", version="some_version")
     assert result_with_params == expected
+
+
+@pytest.fixture
+def paged_request(fake_k8s_server):
+    settings = dataclasses.replace(get_settings(), k8s_list_page_size=2)
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    catalog_client = Mock()
+    catalog_client.get_combined_module_info.side_effect = lambda module_name, git_commit_hash: {
+        "module_name": module_name,
+        "git_commit_hash": git_commit_hash,
+        "version": "1.0.0",
+        "release_tags": ["release"],
+        "owners": ["owner"],
+    }
+    request = background_request(create_app(catalog_client=catalog_client, auth_client=Mock(), k8s_clients=k8s_clients, settings=settings))
+    for i in range(5):
+        module_name, git_commit_hash = f"PagedModule{i}", f"{i}" * 40
+        labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+        # One deployment was not created by the service wizard and has no annotations
+        annotations = {"module_name": module_name, "git_commit_hash": git_commit_hash} if i != 3 else {}
+        create_and_launch_deployment(request, module_name, git_commit_hash, image="image", labels=labels, annotations=annotations, env={}, mounts=[])
+    return request
+
+
+def test_iter_k8s_deployments_pages_through_the_api_server(paged_request, fake_k8s_server):
+    fake_k8s_server.calls.clear()
+
+    assert len(list(iter_k8s_deployments(paged_request))) == 5
+    assert sum(count for call, count in fake_k8s_server.calls.items() if call.startswith("GET")) == 3
+
+
+def test_get_k8s_deployment_records_lists_a_table_projection(paged_request, fake_k8s_server):
+    fake_k8s_server.calls.clear()
+    records = get_k8s_deployment_records(paged_request)
+
+    assert [r.module_name for r in records] == ["PagedModule0", "PagedModule1", "PagedModule2", None, "PagedModule4"]
+    assert records[0] == DeploymentRecord(
+        records[0].name, "PagedModule0", "0" * 40, replicas=1, updated_replicas=1, ready_replicas=1, available_replicas=1, resource_version=records[0].resource_version
+    )
+    assert records[0].resource_version
+    assert sum(count for call, count in fake_k8s_server.calls.items() if call.startswith("GET")) == 3
+    # Cached
+    assert get_k8s_deployment_records(paged_request) is records
+    assert sum(count for call, count in fake_k8s_server.calls.items() if call.startswith("GET")) == 3
+
+
+def test_get_dynamic_service_statuses_page(paged_request):
+    page = get_dynamic_service_statuses_page(paged_request, None, None)
+    assert [s.module_name for s in page.statuses] == ["PagedModule0", "PagedModule1"]
+
+    page = get_dynamic_service_statuses_page(paged_request, None, None, cursor=page.cursor, page_size=3)
+    assert [s.module_name for s in page.statuses] == ["PagedModule2", "PagedModule4"]
+    assert page.cursor is None
+
+    with pytest.raises(clients.baseclient.ServerError, match="page_size must be an integer between 1 and 500"):
+        get_dynamic_service_statuses_page(paged_request, None, None, page_size=0)
+
+
+def test_get_dynamic_service_statuses_page_expired_cursor(mock_request):
+    mock_request.app.state.k8s_clients.app_client.api_client.call_api.side_effect = ApiException(status=410)
+    with pytest.raises(clients.baseclient.ServerError, match="The cursor expired"):
+        get_dynamic_service_statuses_page(mock_request, None, None, cursor="expired")
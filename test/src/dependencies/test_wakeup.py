@@ -0,0 +1,193 @@
+import dataclasses
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api
+
+from clients import deadline
+from clients.deadline import DeadlineExceededError
+from clients.KubernetesClients import K8sClients, check_service_status_cache
+from configs.settings import get_settings
+from dependencies.background import background_request
+from dependencies.k8_wrapper import create_and_launch_deployment, deployment_label_selector, deployment_record_from_model, sanitize_deployment_name
+from dependencies.wakeup import START_REQUESTED_AT_ANNOTATION, WakeCoordinator, WakeTimeoutError, wake_deployment
+from factory import create_app
+
+MODULE_NAME = "SleepyModule"
+GIT_COMMIT_HASH = "c" * 40
+
+
+@pytest.fixture
+def wake_request(fake_k8s_server):
+    settings = dataclasses.replace(get_settings(), wake_timeout_seconds=10)
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    request = background_request(create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=k8s_clients, settings=settings))
+    labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": MODULE_NAME.lower(), "us.kbase.module.git_commit_hash": GIT_COMMIT_HASH}
+    annotations = {"module_name": MODULE_NAME, "git_commit_hash": GIT_COMMIT_HASH}
+    create_and_launch_deployment(request, MODULE_NAME, GIT_COMMIT_HASH, image="image", labels=labels, annotations=annotations, env={}, mounts=[])
+    return request
+
+
+def _stopped_deployment(request):
+    deployment_name, _ = sanitize_deployment_name(MODULE_NAME, GIT_COMMIT_HASH)
+    apps_v1_api = request.app.state.k8s_clients.app_client
+    return deployment_record_from_model(
+        apps_v1_api.patch_namespaced_deployment(name=deployment_name, namespace=request.app.state.settings.namespace, body={"spec": {"replicas": 0}})
+    )
+
+
+def test_wake_deployment_scales_up_and_waits_for_readiness(wake_request, fake_k8s_server):
+    deployment = _stopped_deployment(wake_request)
+    fake_k8s_server.ready_delay = 0.3
+    fake_k8s_server.calls.clear()
+
+    woken = wake_deployment(wake_request, MODULE_NAME, GIT_COMMIT_HASH, deployment)
+
+    assert woken.replicas == 1
+    assert woken.available_replicas == 1
+    assert START_REQUESTED_AT_ANNOTATION in fake_k8s_server.deployments[(wake_request.app.state.settings.namespace, woken.name)]["metadata"]["annotations"]
+    assert check_service_status_cache(wake_request, deployment_label_selector(MODULE_NAME, GIT_COMMIT_HASH)) is woken
+    # Only the deployment was patched and watched, the Service and Ingress were not touched
+    assert all("/deployments" in call for call in fake_k8s_server.calls)
+    assert sum(count for call, count in fake_k8s_server.calls.items() if call.startswith("PATCH")) == 1
+
+
+def test_wake_deployment_concurrent_callers_share_one_wake(wake_request, fake_k8s_server):
+    deployment = _stopped_deployment(wake_request)
+    fake_k8s_server.ready_delay = 0.5
+    fake_k8s_server.calls.clear()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(wake_deployment(wake_request, MODULE_NAME, GIT_COMMIT_HASH, deployment))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(results) == 5
+    assert all(r.available_replicas == 1 for r in results)
+    assert sum(count for call, count in fake_k8s_server.calls.items() if call.startswith("PATCH")) == 1
+    assert wake_request.app.state.wake_coordinator.in_flight() == 0
+
+
+def test_wake_deployment_already_available(wake_request, fake_k8s_server):
+    deployment_name, _ = sanitize_deployment_name(MODULE_NAME, GIT_COMMIT_HASH)
+    deployment = deployment_record_from_model(wake_request.app.state.k8s_clients.app_client.read_namespaced_deployment(deployment_name, wake_request.app.state.settings.namespace))
+    fake_k8s_server.calls.clear()
+
+    assert wake_deployment(wake_request, MODULE_NAME, GIT_COMMIT_HASH, deployment) is deployment
+    assert not fake_k8s_server.calls
+
+
+def test_wake_deployment_timeout(wake_request, fake_k8s_server):
+    wake_request.app.state.settings = dataclasses.replace(wake_request.app.state.settings, wake_timeout_seconds=1)
+    deployment = _stopped_deployment(wake_request)
+    fake_k8s_server.ready_delay = 30
+
+    with pytest.raises(WakeTimeoutError, match="did not become available within 1 seconds"):
+        wake_deployment(wake_request, MODULE_NAME, GIT_COMMIT_HASH, deployment)
+    assert wake_request.app.state.wake_coordinator.in_flight() == 0
+
+
+def test_wake_coordinator_shares_exceptions():
+    coordinator = WakeCoordinator()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+    wakes = []
+
+    def failing_wake():
+        wakes.append(1)
+        started.set()
+        release.wait(timeout=5)
+        raise WakeTimeoutError("d-module-ccccccc-d", 1)
+
+    def call():
+        try:
+            coordinator.run("d-module-ccccccc-d", failing_wake, 10)
+        except WakeTimeoutError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(timeout=5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert len(wakes) == 1
+    assert coordinator.in_flight() == 0
+
+
+def _run_in_thread(fn) -> tuple[list, threading.Thread]:
+    outcome = []
+
+    def target():
+        try:
+            outcome.append(fn())
+        except Exception as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return outcome, thread
+
+
+def _blocking_wake(started: threading.Event, release: threading.Event, result=None, error: Exception | None = None):
+    def wake():
+        started.set()
+        release.wait(timeout=5)
+        if error is not None:
+            raise error
+        return result
+
+    return wake
+
+
+def test_wake_coordinator_waiters_time_out():
+    coordinator = WakeCoordinator()
+    started, release = threading.Event(), threading.Event()
+    leader, leader_thread = _run_in_thread(lambda: coordinator.run("d-module-ccccccc-d", _blocking_wake(started, release, "woken"), 10))
+    assert started.wait(timeout=5)
+
+    # Without a deadline the waiter gives up after the wake timeout
+    with pytest.raises(WakeTimeoutError, match="did not become available within 0.1 seconds"):
+        coordinator.run("d-module-ccccccc-d", Mock(), 0.1)
+    # With a deadline the waiter gives up at the deadline, also if it already passed
+    for timeout in (0.1, 0):
+        with deadline.deadline_scope(timeout), pytest.raises(DeadlineExceededError, match="before wake-up"):
+            coordinator.run("d-module-ccccccc-d", Mock(), 10)
+
+    release.set()
+    leader_thread.join()
+    assert leader == ["woken"]
+
+
+def test_wake_coordinator_retries_when_the_leader_ran_out_of_its_deadline():
+    coordinator = WakeCoordinator()
+    started, release = threading.Event(), threading.Event()
+
+    def leader_wake():
+        with deadline.deadline_scope(0):
+            return _blocking_wake(started, release, error=DeadlineExceededError(1, "wake-up"))()
+
+    leader, leader_thread = _run_in_thread(lambda: coordinator.run("d-module-ccccccc-d", leader_wake, 10))
+    assert started.wait(timeout=5)
+    waiter_wake = Mock(return_value="woken")
+    waiter, waiter_thread = _run_in_thread(lambda: coordinator.run("d-module-ccccccc-d", waiter_wake, 10))
+    time.sleep(0.1)
+    release.set()
+    leader_thread.join()
+    waiter_thread.join()
+
+    assert isinstance(leader[0], DeadlineExceededError)
+    # The waiter had no deadline, so it woke the deployment itself
+    assert waiter == ["woken"]
+    waiter_wake.assert_called_once_with()
+    assert coordinator.in_flight() == 0
@@ -0,0 +1,92 @@
+import dataclasses
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from kubernetes.client import AppsV1Api, CoreV1Api, NetworkingV1Api
+
+from clients.KubernetesClients import K8sClients, check_service_status_cache
+from configs.settings import get_settings
+from dependencies.background import background_request
+from dependencies.k8_wrapper import create_and_launch_deployment, deployment_label_selector, sanitize_deployment_name
+from dependencies.warmup import WarmUp, get_readiness
+from factory import create_app
+
+MODULES = (("RunningModule", "a" * 40, 1), ("StoppedModule", "b" * 40, 0))
+
+
+@pytest.fixture
+def warmup_app(fake_k8s_server):
+    settings = dataclasses.replace(get_settings(), warmup_enabled=True, warmup_deadline_seconds=10)
+    api_client = fake_k8s_server.api_client()
+    k8s_clients = K8sClients(settings, k8s_core_client=CoreV1Api(api_client), k8s_app_client=AppsV1Api(api_client), k8s_network_client=NetworkingV1Api(api_client))
+    app = create_app(catalog_client=Mock(), auth_client=Mock(), k8s_clients=k8s_clients, settings=settings)
+    request = background_request(app)
+    for module_name, git_commit_hash, replicas in MODULES:
+        labels = {"us.kbase.dynamicservice": "true", "us.kbase.module.module_name": module_name.lower(), "us.kbase.module.git_commit_hash": git_commit_hash}
+        annotations = {"module_name": module_name, "git_commit_hash": git_commit_hash}
+        create_and_launch_deployment(request, module_name, git_commit_hash, image="image", labels=labels, annotations=annotations, env={}, mounts=[])
+        if not replicas:
+            k8s_clients.app_client.patch_namespaced_deployment_scale(sanitize_deployment_name(module_name, git_commit_hash)[0], settings.namespace, {"spec": {"replicas": 0}})
+    return app
+
+
+def test_warm_up_fills_the_caches(warmup_app, fake_k8s_server):
+    fake_k8s_server.calls.clear()
+    warm_up = WarmUp(warmup_app)
+    request = background_request(warmup_app)
+    assert get_readiness(request) == (False, {"ready": False, "warm_up": {}})
+
+    warm_up.start()
+    assert warm_up.wait(timeout=10)
+
+    assert warm_up.steps == {"dynamic_service_modules": "ok", "deployments": "ok", "module_info": "ok"}
+    assert warm_up.ready()
+    catalog_client = warmup_app.state.catalog_client
+    catalog_client.get_dynamic_service_module_names.assert_called_once_with()
+    # Only running deployments are looked up in the catalog
+    catalog_client.get_combined_module_info.assert_called_once_with("RunningModule", "a" * 40)
+    for module_name, git_commit_hash, replicas in MODULES:
+        assert check_service_status_cache(request, deployment_label_selector(module_name, git_commit_hash)).replicas == replicas
+    # The deployment index was listed once, the deployments and module info steps share it
+    assert sum(count for call, count in fake_k8s_server.calls.items() if call.startswith("GET")) == 1
+
+
+def test_warm_up_failed_step(warmup_app):
+    warmup_app.state.catalog_client.get_combined_module_info.side_effect = Exception("Catalog is down")
+    warm_up = WarmUp(warmup_app)
+    warm_up.start()
+    assert warm_up.wait(timeout=10)
+
+    assert warm_up.steps["deployments"] == "ok"
+    assert warm_up.steps["module_info"] == "1 of 1 module info lookups failed and 0 did not finish before the deadline"
+    assert warm_up.ready()
+
+
+def test_warm_up_ready_at_deadline(warmup_app):
+    release = threading.Event()
+    warmup_app.state.catalog_client.get_dynamic_service_module_names.side_effect = lambda: release.wait(timeout=5)
+    warmup_app.state.settings = dataclasses.replace(warmup_app.state.settings, warmup_deadline_seconds=0.2)
+    warm_up = WarmUp(warmup_app)
+    warm_up.start()
+
+    assert not warm_up.ready()
+    time.sleep(0.3)
+    # Still running, but the deadline passed
+    assert not warm_up.wait(timeout=0)
+    assert warm_up.ready()
+    release.set()
+    assert warm_up.wait(timeout=5)
+    assert warm_up.steps == {"dynamic_service_modules": "ok", "deployments": "skipped", "module_info": "skipped"}
+
+
+def test_warm_up_disabled(warmup_app, fake_k8s_server):
+    warmup_app.state.settings = dataclasses.replace(warmup_app.state.settings, warmup_enabled=False)
+    fake_k8s_server.calls.clear()
+    warm_up = WarmUp(warmup_app)
+    warm_up.start()
+
+    assert warm_up.ready()
+    assert warm_up.steps == {}
+    assert not fake_k8s_server.calls
@@ -0,0 +1,613 @@
+"""
+Local stand-in servers for the KBase Catalog, the KBase Auth service and the Kubernetes API.
+These are used by the benchmark harness in test/benchmarks and by tests that want to exercise
+real HTTP clients instead of MagicMocks. Each server runs in a daemon thread on a random local port.
+"""
+
+import copy
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def send_json(self, status: int, payload, content_type: str = "application/json"):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, status: int, text: str):
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeServer:
+    """
+    Base class that runs a ThreadingHTTPServer in a background thread.
+    Subclasses implement handle(handler, verb) and can be used as context managers.
+    """
+
+    def __init__(self):
+        fake = self
+
+        class Handler(_QuietHandler):
+            def do_GET(self):
+                fake.handle(self, "GET")
+
+            def do_POST(self):
+                fake.handle(self, "POST")
+
+            def do_PUT(self):
+                fake.handle(self, "PUT")
+
+            def do_PATCH(self):
+                fake.handle(self, "PATCH")
+
+            def do_DELETE(self):
+                fake.handle(self, "DELETE")
+
+        self.calls = Counter()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, handler: _QuietHandler, verb: str):  # pragma: no cover
+        raise NotImplementedError
+
+
+def fake_commit_hash(*parts: str) -> str:
+    return hashlib.sha1("-".join(parts).encode()).hexdigest()
+
+
+def long_tail_latency(base: float, tail: float, tail_probability: float) -> Callable[[str], float]:
+    """
+    Latency function for the fake catalog: most calls take `base` seconds, a `tail_probability` fraction take `tail` seconds.
+    """
+
+    def latency(method: str) -> float:
+        return tail if random.random() < tail_probability else base
+
+    return latency
+
+
+class FakeCatalogServer(FakeServer):
+    """
+    A fake KBase Catalog JSON-RPC server with a configurable number of modules and configurable latency.
+    Every module is a dynamic service unless listed in non_dynamic, and release/beta/dev all point to the same commit
+    until release() is called.
+    """
+
+    def __init__(self, module_names: list[str] | None = None, latency: float | Callable[[str], float] = 0.0, owners: list[str] | None = None, non_dynamic: set[str] | None = None):
+        super().__init__()
+        self.latency = latency
+        self.owners = owners or ["fake_owner"]
+        self.modules = {}
+        self.lock = threading.Lock()
+        for name in module_names or make_module_names(10):
+            self.add_module(name, dynamic_service=name not in (non_dynamic or set()))
+
+    def add_module(self, module_name: str, dynamic_service: bool = True, secure_params: list[dict] | None = None, volume_mounts: list[dict] | None = None):
+        git_commit_hash = fake_commit_hash(module_name, "1")
+        with self.lock:
+            self.modules[module_name] = {
+                "module_name": module_name,
+                "dynamic_service": 1 if dynamic_service else 0,
+                "tags": {"dev": git_commit_hash, "beta": git_commit_hash, "release": git_commit_hash},
+                "versions": {git_commit_hash: "1.0.0"},
+                "secure_params": secure_params or [],
+                "volume_mounts": volume_mounts or [],
+            }
+        return git_commit_hash
+
+    def release(self, module_name: str, tags: tuple[str, ...] = ("dev", "beta", "release")) -> str:
+        """Register a new commit for a module and point the given tags at it."""
+        with self.lock:
+            module = self.modules[module_name]
+            version = f"1.0.{len(module['versions'])}"
+            git_commit_hash = fake_commit_hash(module_name, version)
+            module["versions"][git_commit_hash] = version
+            for tag in tags:
+                module["tags"][tag] = git_commit_hash
+        return git_commit_hash
+
+    def _module_version(self, module_name: str, version: str) -> dict:
+        module = self.modules.get(module_name)
+        if module is None:
+            raise KeyError(f"Module {module_name} not found")
+        git_commit_hash = module["tags"].get(version, version)
+        if git_commit_hash not in module["versions"]:
+            raise KeyError(f"Version {version} of {module_name} not found")
+        return {
+            "module_name": module_name,
+            "version": module["versions"][git_commit_hash],
+            "git_commit_hash": git_commit_hash,
+            "git_url": f"https://github.com/kbasetest/{module_name}",
+            "release_tags": [tag for tag, h in module["tags"].items() if h == git_commit_hash],
+            "docker_img_name": f"dockerhub-ci.kbase.us/kbase:{module_name.lower()}.{git_commit_hash}",
+            "dynamic_service": module["dynamic_service"],
+        }
+
+    def dispatch(self, method: str, params: list):
+        arg = params[0] if params else {}
+        if method == "Catalog.version":
+            return "fake"
+        if method == "Catalog.get_module_version":
+            return self._module_version(arg["module_name"], str(arg.get("version") or "release"))
+        if method == "Catalog.get_module_info":
+            if arg["module_name"] not in self.modules:
+                raise KeyError(f"Module {arg['module_name']} not found")
+            return {"module_name": arg["module_name"], "owners": list(self.owners)}
+        if method == "Catalog.list_volume_mounts":
+            module = self.modules.get(arg.get("module_name"))
+            if not module or not module["volume_mounts"]:
+                return []
+            return [{"module_name": arg["module_name"], "volume_mounts": module["volume_mounts"]}]
+        if method == "Catalog.get_secure_config_params":
+            module = self.modules.get(arg.get("module_name"))
+            return list(module["secure_params"]) if module else []
+        if method == "Catalog.list_basic_module_info":
+            return [{"module_name": m["module_name"], "dynamic_service": m["dynamic_service"]} for m in self.modules.values()]
+        raise LookupError(f"Method {method} not supported by the fake catalog")
+
+    def handle(self, handler: _QuietHandler, verb: str):
+        payload = json.loads(handler.read_body() or b"{}")
+        method = payload.get("method", "")
+        self.calls[method] += 1
+        delay = self.latency(method) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        try:
+            with self.lock:
+                result = copy.deepcopy(self.dispatch(method, payload.get("params", [])))
+        except Exception as e:
+            handler.send_json(500, {"version": "1.1", "id": payload.get("id"), "error": {"name": "JSONRPCError", "code": -32500, "message": str(e), "error": ""}})
+            return
+        handler.send_json(200, {"version": "1.1", "id": payload.get("id"), "result": [result]})
+
+
+def make_module_names(count: int) -> list[str]:
+    return [f"FakeModule{i:04d}" for i in range(count)]
+
+
+class FakeAuthServer(FakeServer):
+    """
+    A fake KBase Auth2 server that only implements /api/V2/me.
+    tokens maps a token to a (username, customroles) tuple.
+    """
+
+    def __init__(self, tokens: dict[str, tuple[str, list[str]]] | None = None, latency: float = 0.0):
+        super().__init__()
+        self.tokens = tokens or {}
+        self.latency = latency
+
+    @property
+    def me_url(self) -> str:
+        return f"{self.url}/api/V2/me"
+
+    def handle(self, handler: _QuietHandler, verb: str):
+        self.calls[urlparse(handler.path).path] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if urlparse(handler.path).path != "/api/V2/me":
+            handler.send_json(404, {"error": "Not Found"})
+            return
+        user = self.tokens.get(handler.headers.get("Authorization"))
+        if user is None:
+            handler.send_json(401, {"error": "10020 Invalid token"})
+            return
+        handler.send_json(200, {"user": user[0], "customroles": list(user[1])})
+
+
+def _merge_patch(target: dict, patch: dict) -> dict:
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_patch(target[key], value)
+        else:
+            target[key] = value
+    return target
+
+
+def _matches_selector(obj: dict, label_selector: str | None, field_selector: str | None) -> bool:
+    labels = obj.get("metadata", {}).get("labels") or {}
+    for term in filter(None, (label_selector or "").split(",")):
+        key, _, value = term.partition("=")
+        if labels.get(key) != value:
+            return False
+    for term in filter(None, (field_selector or "").split(",")):
+        key, _, value = term.partition("=")
+        if key == "metadata.name" and obj["metadata"]["name"] != value:
+            return False
+    return True
+
+
+class FakeKubernetesServer(FakeServer):
+    """
+    A fake Kubernetes API server supporting the calls the service wizard makes:
+    list (also as a Table)/watch/create/read/replace/patch deployments (and the scale subresource), create/list services,
+    read/create/replace ingresses, list pods and pod logs, and read/create/replace leases (with resourceVersion conflicts).
+    Deployments become available `ready_delay` seconds after they are created or scaled.
+    """
+
+    _DEPLOYMENT_PATH = re.compile(r"^/apis/apps/v1/namespaces/(?P<ns>[^/]+)/deployments(?:/(?P<name>[^/]+))?(?:/(?P<sub>scale))?$")
+    _SERVICE_PATH = re.compile(r"^/api/v1/namespaces/(?P<ns>[^/]+)/services(?:/(?P<name>[^/]+))?$")
+    _INGRESS_PATH = re.compile(r"^/apis/networking.k8s.io/v1/namespaces/(?P<ns>[^/]+)/ingresses(?:/(?P<name>[^/]+))?$")
+    _POD_PATH = re.compile(r"^/api/v1/namespaces/(?P<ns>[^/]+)/pods(?:/(?P<name>[^/]+)(?:/(?P<sub>log))?)?$")
+    _LEASE_PATH = re.compile(r"^/apis/coordination.k8s.io/v1/namespaces/(?P<ns>[^/]+)/leases(?:/(?P<name>[^/]+))?$")
+
+    def __init__(self, ready_delay: float = 0.0, latency: float = 0.0):
+        super().__init__()
+        self.ready_delay = ready_delay
+        self.latency = latency
+        self.deployments: dict[tuple[str, str], dict] = {}
+        self.services: dict[tuple[str, str], dict] = {}
+        self.ingresses: dict[tuple[str, str], dict] = {}
+        self.leases: dict[tuple[str, str], dict] = {}
+        self._resource_version = itertools.count(1)
+        self._events: list[tuple[int, str, str, dict]] = []
+        self._changed = threading.Condition()
+
+    def api_client(self):
+        """Build a kubernetes ApiClient that talks to this server."""
+        from kubernetes.client import ApiClient, Configuration
+
+        configuration = Configuration()
+        configuration.host = self.url
+        return ApiClient(configuration)
+
+    # Object bookkeeping
+
+    def _stamp(self, obj: dict, namespace: str, kind: str, api_version: str) -> dict:
+        metadata = obj.setdefault("metadata", {})
+        metadata.setdefault("uid", hashlib.md5(f"{namespace}/{metadata['name']}".encode()).hexdigest())
+        metadata.setdefault("creationTimestamp", datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+        metadata["namespace"] = namespace
+        metadata["resourceVersion"] = str(next(self._resource_version))
+        obj["kind"] = kind
+        obj["apiVersion"] = api_version
+        return obj
+
+    def _deployment_view(self, deployment: dict) -> dict:
+        view = copy.deepcopy(deployment)
+        replicas = view["spec"].get("replicas", 1)
+        ready = time.monotonic() - deployment["_scaled_at"] >= self.ready_delay
+        view.pop("_scaled_at", None)
+        view["status"] = {"observedGeneration": view["metadata"].get("generation", 1), "replicas": replicas, "updatedReplicas": replicas}
+        if replicas and ready:
+            view["status"].update(readyReplicas=replicas, availableReplicas=replicas)
+        elif replicas:
+            view["status"]["unavailableReplicas"] = replicas
+        return view
+
+    def _record(self, event_type: str, namespace: str, deployment: dict):
+        with self._changed:
+            rv = int(deployment["metadata"]["resourceVersion"])
+            self._events.append((rv, event_type, namespace, deployment))
+            self._changed.notify_all()
+
+    def _save_deployment(self, namespace: str, deployment: dict, event_type: str, scaled: bool):
+        previous = self.deployments.get((namespace, deployment["metadata"]["name"]))
+        deployment["metadata"]["generation"] = (previous["metadata"].get("generation", 0) if previous else 0) + 1
+        deployment["_scaled_at"] = time.monotonic() if scaled or previous is None else previous["_scaled_at"]
+        self._stamp(deployment, namespace, "Deployment", "apps/v1")
+        self.deployments[(namespace, deployment["metadata"]["name"])] = deployment
+        self._record(event_type, namespace, deployment)
+        if self.ready_delay and deployment["spec"].get("replicas", 1):
+            # Emit a MODIFIED event once the deployment becomes available so watchers wake up
+            timer = threading.Timer(self.ready_delay, self._mark_ready, args=(namespace, deployment["metadata"]["name"], deployment["metadata"]["resourceVersion"]))
+            timer.daemon = True
+            timer.start()
+        return self._deployment_view(deployment)
+
+    def _mark_ready(self, namespace: str, name: str, resource_version: str):
+        with self._changed:
+            deployment = self.deployments.get((namespace, name))
+            if deployment is None or deployment["metadata"]["resourceVersion"] != resource_version:
+                return
+            deployment["metadata"]["resourceVersion"] = str(next(self._resource_version))
+        self._record("MODIFIED", namespace, deployment)
+
+    def set_available(self, namespace: str, name: str):
+        """Mark a deployment as available immediately, regardless of ready_delay."""
+        deployment = self.deployments[(namespace, name)]
+        deployment["_scaled_at"] = time.monotonic() - self.ready_delay
+        self._mark_ready(namespace, name, deployment["metadata"]["resourceVersion"])
+
+    def pods_for(self, namespace: str) -> list[dict]:
+        pods = []
+        for (ns, name), deployment in sorted(self.deployments.items()):
+            view = self._deployment_view(deployment)
+            if ns != namespace:
+                continue
+            for i in range(view["status"].get("availableReplicas") or 0):
+                labels = deployment["spec"]["template"]["metadata"].get("labels", {})
+                pods.append({"apiVersion": "v1", "kind": "Pod", "metadata": {"name": f"{name}-{i}", "namespace": ns, "labels": labels}, "status": {"phase": "Running"}})
+        return pods
+
+    # Request handling
+
+    def handle(self, handler: _QuietHandler, verb: str):
+        parsed = urlparse(handler.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        self.calls[f"{verb} {parsed.path}"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body = handler.read_body()
+        payload = json.loads(body) if body else None
+
+        for pattern, route in (
+            (self._DEPLOYMENT_PATH, self._handle_deployments),
+            (self._SERVICE_PATH, self._handle_services),
+            (self._INGRESS_PATH, self._handle_ingresses),
+            (self._POD_PATH, self._handle_pods),
+            (self._LEASE_PATH, self._handle_leases),
+        ):
+            match = pattern.match(parsed.path)
+            if not match:
+                continue
+            if (query.get("watch") or "").lower() in ("true", "1"):
+                self._watch_deployments(handler, match.group("ns"), query)
+                return
+            with self._changed:
+                route(handler, verb, match.groupdict(), query, payload)
+            return
+        handler.send_json(404, _status(404, "NotFound", f"{parsed.path} not found"))
+
+    def _handle_deployments(self, handler, verb, path, query, payload):
+        namespace, name = path["ns"], path["name"]
+        key = (namespace, name)
+        if name is None and verb == "GET":
+            items = [self._deployment_view(d) for (ns, _), d in sorted(self.deployments.items()) if ns == namespace]
+            items = [d for d in items if _matches_selector(d, query.get("labelSelector"), query.get("fieldSelector"))]
+            # Chunked lists: the continue token is the offset of the next item, a real API server answers 410 once it expired
+            offset = int(query.get("continue") or 0)
+            limit = int(query.get("limit") or 0) or len(items)
+            end = offset + limit
+            if "as=Table" in (handler.headers.get("Accept") or ""):
+                page = _deployment_table(items[offset:end], next(self._resource_version), query.get("includeObject") or "Metadata")
+            else:
+                page = _list("DeploymentList", "apps/v1", items[offset:end], next(self._resource_version))
+            if end < len(items):
+                page["metadata"]["continue"] = str(end)
+            handler.send_json(200, page)
+            return
+        if name is None and verb == "POST":
+            if (namespace, payload["metadata"]["name"]) in self.deployments:
+                handler.send_json(409, _status(409, "AlreadyExists", f'deployments.apps "{payload["metadata"]["name"]}" already exists'))
+                return
+            handler.send_json(201, self._save_deployment(namespace, payload, "ADDED", scaled=True))
+            return
+        if key not in self.deployments:
+            handler.send_json(404, _status(404, "NotFound", f'deployments.apps "{name}" not found'))
+            return
+        current = self.deployments[key]
+        replicas = current["spec"].get("replicas", 1)
+        if path["sub"] == "scale":
+            if verb in ("PATCH", "PUT"):
+                new_replicas = (payload.get("spec") or {}).get("replicas", replicas)
+                updated = copy.deepcopy(current)
+                updated["spec"]["replicas"] = new_replicas
+                self._save_deployment(namespace, updated, "MODIFIED", scaled=new_replicas != replicas)
+                replicas = new_replicas
+            view = self._deployment_view(self.deployments[key])
+            scale = {
+                "apiVersion": "autoscaling/v1",
+                "kind": "Scale",
+                "metadata": {"name": name, "namespace": namespace, "resourceVersion": view["metadata"]["resourceVersion"]},
+                "spec": {"replicas": replicas},
+                "status": {"replicas": view["status"].get("availableReplicas") or 0},
+            }
+            handler.send_json(200, scale)
+            return
+        if verb == "GET":
+            handler.send_json(200, self._deployment_view(current))
+        elif verb == "PUT":
+            payload.pop("status", None)
+            handler.send_json(200, self._save_deployment(namespace, payload, "MODIFIED", scaled=payload["spec"].get("replicas", 1) != replicas))
+        elif verb == "PATCH":
+            updated = _merge_patch(copy.deepcopy(current), payload)
+            handler.send_json(200, self._save_deployment(namespace, updated, "MODIFIED", scaled=updated["spec"].get("replicas", 1) != replicas))
+        elif verb == "DELETE":
+            deployment = self.deployments.pop(key)
+            deployment["metadata"]["resourceVersion"] = str(next(self._resource_version))
+            self._record("DELETED", namespace, deployment)
+            handler.send_json(200, _status(200, "Success", "deleted"))
+
+    def _watch_deployments(self, handler, namespace, query):
+        timeout = float(query.get("timeoutSeconds") or 30)
+        deadline = time.monotonic() + timeout
+        label_selector, field_selector = query.get("labelSelector"), query.get("fieldSelector")
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def send(event_type, deployment):
+            view = self._deployment_view(deployment)
+            if not _matches_selector(view, label_selector, field_selector):
+                return
+            line = json.dumps({"type": event_type, "object": view}).encode() + b"\n"
+            handler.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            handler.wfile.flush()
+
+        with self._changed:
+            since = int(query.get("resourceVersion") or 0)
+            if not since:
+                for (ns, _), deployment in sorted(self.deployments.items()):
+                    if ns == namespace:
+                        send("ADDED", deployment)
+                since = max((e[0] for e in self._events), default=0)
+        try:
+            while True:
+                with self._changed:
+                    pending = [e for e in self._events if e[0] > since and e[2] == namespace]
+                    if not pending:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._changed.wait(timeout=remaining)
+                        continue
+                for rv, event_type, _, deployment in pending:
+                    send(event_type, deployment)
+                    since = rv
+            handler.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _handle_services(self, handler, verb, path, query, payload):
+        namespace = path["ns"]
+        if verb == "POST":
+            key = (namespace, payload["metadata"]["name"])
+            if key in self.services:
+                handler.send_json(409, _status(409, "AlreadyExists", f'services "{key[1]}" already exists'))
+                return
+            self.services[key] = self._stamp(payload, namespace, "Service", "v1")
+            handler.send_json(201, payload)
+            return
+        items = [s for (ns, _), s in sorted(self.services.items()) if ns == namespace]
+        handler.send_json(200, _list("ServiceList", "v1", items, next(self._resource_version)))
+
+    def _handle_ingresses(self, handler, verb, path, query, payload):
+        namespace, name = path["ns"], path["name"]
+        if verb == "POST":
+            key = (namespace, payload["metadata"]["name"])
+            if key in self.ingresses:
+                handler.send_json(409, _status(409, "AlreadyExists", f'ingresses "{key[1]}" already exists'))
+                return
+            self.ingresses[key] = self._stamp(payload, namespace, "Ingress", "networking.k8s.io/v1")
+            handler.send_json(201, payload)
+            return
+        key = (namespace, name)
+        if key not in self.ingresses:
+            handler.send_json(404, _status(404, "NotFound", f'ingresses "{name}" not found'))
+            return
+        if verb == "PUT":
+            self.ingresses[key] = self._stamp(payload, namespace, "Ingress", "networking.k8s.io/v1")
+        handler.send_json(200, self.ingresses[key])
+
+    def _handle_pods(self, handler, verb, path, query, payload):
+        namespace, name = path["ns"], path["name"]
+        pods = self.pods_for(namespace)
+        if name is None:
+            items = [p for p in pods if _matches_selector(p, query.get("labelSelector"), query.get("fieldSelector"))]
+            handler.send_json(200, _list("PodList", "v1", items, next(self._resource_version)))
+            return
+        if path["sub"] == "log" and any(p["metadata"]["name"] == name for p in pods):
+            handler.send_text(200, f"2023-01-01T00:00:00Z {name} started\n2023-01-01T00:00:01Z {name} listening on 5000\n")
+            return
+        handler.send_json(404, _status(404, "NotFound", f'pods "{name}" not found'))
+
+    def _handle_leases(self, handler, verb, path, query, payload):
+        namespace, name = path["ns"], path["name"]
+        if verb == "POST":
+            key = (namespace, payload["metadata"]["name"])
+            if key in self.leases:
+                handler.send_json(409, _status(409, "AlreadyExists", f'leases.coordination.k8s.io "{key[1]}" already exists'))
+                return
+            self.leases[key] = self._stamp(payload, namespace, "Lease", "coordination.k8s.io/v1")
+            handler.send_json(201, payload)
+            return
+        key = (namespace, name)
+        if key not in self.leases:
+            handler.send_json(404, _status(404, "NotFound", f'leases.coordination.k8s.io "{name}" not found'))
+            return
+        if verb == "PUT":
+            # Optimistic concurrency, like the API server: the update must be based on the current version
+            if payload["metadata"].get("resourceVersion") != self.leases[key]["metadata"]["resourceVersion"]:
+                handler.send_json(409, _status(409, "Conflict", f'Operation cannot be fulfilled on leases.coordination.k8s.io "{name}": the object has been modified'))
+                return
+            self.leases[key] = self._stamp(payload, namespace, "Lease", "coordination.k8s.io/v1")
+        handler.send_json(200, self.leases[key])
+
+
+def _list(kind: str, api_version: str, items: list, resource_version: int) -> dict:
+    return {"kind": kind, "apiVersion": api_version, "metadata": {"resourceVersion": str(resource_version)}, "items": items}
+
+
+_DEPLOYMENT_COLUMNS = (("Name", "string"), ("Ready", "string"), ("Up-to-date", "integer"), ("Available", "integer"), ("Age", "string"))
+
+
+def _deployment_table(deployments: list, resource_version: int, include_object: str) -> dict:
+    """The Table projection of a deployment list, with the columns kubectl get deployments shows"""
+    columns = [{"name": name, "type": kind, "format": "name" if name == "Name" else "", "description": "", "priority": 0} for name, kind in _DEPLOYMENT_COLUMNS]
+    rows = []
+    for deployment in deployments:
+        status, replicas = deployment["status"], deployment["spec"].get("replicas", 1)
+        cells = [deployment["metadata"]["name"], f"{status.get('readyReplicas') or 0}/{replicas}", status.get("updatedReplicas") or 0, status.get("availableReplicas") or 0, "1m"]
+        row = {"cells": cells}
+        if include_object == "Metadata":
+            row["object"] = {"kind": "PartialObjectMetadata", "apiVersion": "meta.k8s.io/v1", "metadata": deployment["metadata"]}
+        elif include_object == "Object":
+            row["object"] = deployment
+        rows.append(row)
+    return {"kind": "Table", "apiVersion": "meta.k8s.io/v1", "metadata": {"resourceVersion": str(resource_version)}, "columnDefinitions": columns, "rows": rows}
+
+
+def _status(code: int, reason: str, message: str) -> dict:
+    return {"kind": "Status", "apiVersion": "v1", "metadata": {}, "status": "Failure" if code >= 400 else "Success", "message": message, "reason": reason, "code": code}
+
+
+@pytest.fixture
+def fake_catalog_server():
+    with FakeCatalogServer() as server:
+        yield server
+
+
+@pytest.fixture
+def fake_auth_server():
+    with FakeAuthServer() as server:
+        yield server
+
+
+@pytest.fixture
+def fake_k8s_server():
+    with FakeKubernetesServer() as server:
+        yield server
@@ -4,7 +4,7 @@ from unittest.mock import patch
 import pytest
 from fastapi.testclient import TestClient
 
-from clients import KubernetesClients
+from clients import KubernetesClients, deadline
 from clients.CachedAuthClient import CachedAuthClient
 from clients.CachedCatalogClient import CachedCatalogClient
 from factory import create_app
@@ -130,3 +130,13 @@ def test_authenticated_route(test_client):
                     response = test_client.post("/rpc", json={"jsonrpc": "2.0", "method": method, "id": 1})
                     assert response.status_code == 200
                     assert response.json() == {"result": "mocked_response"}
+
+
+def test_request_function_runs_within_the_request_deadline(test_client):
+    remaining = []
+    with patch.dict("rpc.handlers.json_rpc_handler.known_methods", {"ServiceWizard.status": lambda *args: remaining.append(deadline.remaining()) or {"result": "ok"}}):
+        test_client.post("/rpc", json={"method": "ServiceWizard.status", "params": [], "id": 1})
+        test_client.post("/rpc", json={"method": "ServiceWizard.status", "params": [], "id": 1}, headers={"X-Request-Timeout": "2"})
+    assert 9 < remaining[0] <= 10
+    assert 1 < remaining[1] <= 2
+    assert deadline.remaining() is None
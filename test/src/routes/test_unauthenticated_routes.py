@@ -21,3 +21,12 @@ def test_version(app):
     response = client.get("/version")
     assert response.status_code == 200
     assert response.json() == ["unknown"]  # 'None' in pycharm
+
+
+def test_ready(app):
+    # Not ready until the lifespan started the warm-up, which finishes right away when it is disabled
+    assert TestClient(app).get("/ready").status_code == 503
+    with TestClient(app) as client:
+        response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json() == {"ready": True, "warm_up": {}}
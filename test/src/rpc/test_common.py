@@ -5,7 +5,10 @@ import pytest
 from fastapi import HTTPException
 
 from clients.baseclient import ServerError
-from rpc.common import validate_rpc_request, validate_rpc_response, get_user_auth_roles, handle_rpc_request
+from clients.bulkhead import BulkheadFullError
+from clients.circuit_breaker import CircuitOpenError
+from configs.settings import get_settings
+from rpc.common import validate_rpc_request, validate_rpc_response, get_user_auth_roles, handle_rpc_request, get_request_deadline
 from rpc.models import JSONRPCResponse, ErrorResponse
 
 
@@ -67,6 +70,28 @@ def test_handle_rpc_request_server_error():
     assert isinstance(response.error, ErrorResponse)
 
 
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (
+            BulkheadFullError("catalog", "queue full"),
+            ErrorResponse(message="Too many concurrent requests to catalog (queue full), try again later", code=-32001, name="Upstream busy"),
+        ),
+        (
+            CircuitOpenError("catalog", 12.3),
+            ErrorResponse(message="catalog is unavailable after repeated failures, try again in 12 seconds", code=-32003, name="Upstream unavailable"),
+        ),
+    ],
+)
+def test_handle_rpc_request_upstream_fail_fast(error, expected):
+    request = MagicMock()
+    action = MagicMock()
+    action.__name__ = "test_action"
+    action.side_effect = error
+    response = handle_rpc_request(request, [{"module_name": "test_module", "version": "1.0"}], "1", action)
+    assert response.error == expected
+
+
 def test_handle_rpc_request_success():
     request = MagicMock()
     action = MagicMock(return_value="test_result")
@@ -76,6 +101,14 @@ def test_handle_rpc_request_success():
     assert response.result == ["test_result"]
 
 
+def test_handle_rpc_request_extra_params():
+    request = MagicMock()
+    action = MagicMock(return_value="test_result")
+    action.__name__ = "test_action"
+    handle_rpc_request(request, [{"cursor": "abc", "ignored": 1}], "1", action, extra_params=("cursor", "page_size"))
+    action.assert_called_once_with(request, None, None, cursor="abc")
+
+
 def mock_action(request, module_name, module_version):
     return {"test": "data"}
 
@@ -116,3 +149,28 @@ def test_validate_rpc_request_invalid_method_and_params():
     assert error.code == -32600
     assert error.name == "Invalid Request"
     assert "`method` must be a valid SW1 method string. Params must be a dictionary." in error.message
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, 120),
+        ("30", 30),
+        ("2.5", 2.5),
+        ("3600", 300),
+        ("soon", 120),
+        ("-1", 120),
+    ],
+)
+def test_get_request_deadline(header, expected):
+    request = MagicMock()
+    request.app.state.settings = get_settings()
+    request.headers = {"X-Request-Timeout": header} if header else {}
+    assert get_request_deadline(request, "ServiceWizard.start") == expected
+
+
+def test_get_request_deadline_without_a_default():
+    request = MagicMock()
+    request.app.state.settings = get_settings()
+    request.headers = {}
+    assert get_request_deadline(request, "ServiceWizard.unknown") is None
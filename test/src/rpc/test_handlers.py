@@ -4,7 +4,7 @@ from fastapi.requests import Request
 
 from rpc.handlers import authenticated_handlers, unauthenticated_handlers
 
-from dependencies import logs, status, lifecycle
+from dependencies import logs, status, lifecycle, resource_usage
 from dependencies.lifecycle import stop_deployment
 
 # Mocking the Request object
@@ -33,12 +33,24 @@ def test_get_service_log_web_socket(mock_handle_rpc):
     mock_handle_rpc.assert_called_once_with(mock_request, mock_params, mock_jrpc_id, logs.get_service_log_web_socket)
 
 
+@patch("rpc.handlers.authenticated_handlers.handle_rpc_request")
+def test_get_resource_usage(mock_handle_rpc):
+    authenticated_handlers.get_resource_usage(mock_request, mock_params, mock_jrpc_id)
+    mock_handle_rpc.assert_called_once_with(mock_request, mock_params, mock_jrpc_id, resource_usage.get_resource_usage)
+
+
 @patch("rpc.handlers.unauthenticated_handlers.handle_rpc_request")
 def test_list_service_status(mock_handle_rpc):
     unauthenticated_handlers.list_service_status(mock_request, mock_params, mock_jrpc_id)
     mock_handle_rpc.assert_called_once_with(mock_request, mock_params, mock_jrpc_id, status.get_all_dynamic_service_statuses)
 
 
+@patch("rpc.handlers.unauthenticated_handlers.handle_rpc_request")
+def test_list_service_status_page(mock_handle_rpc):
+    unauthenticated_handlers.list_service_status_page(mock_request, mock_params, mock_jrpc_id)
+    mock_handle_rpc.assert_called_once_with(mock_request, mock_params, mock_jrpc_id, status.get_dynamic_service_statuses_page, extra_params=("cursor", "page_size"))
+
+
 @patch("rpc.handlers.unauthenticated_handlers.handle_rpc_request")
 def test_get_service_status_without_restart(mock_handle_rpc):
     unauthenticated_handlers.get_service_status_without_restart(mock_request, mock_params, mock_jrpc_id)
@@ -0,0 +1,105 @@
+import dataclasses
+import hashlib
+import re
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from clients import KubernetesClients
+from clients.CachedAuthClient import CachedAuthClient
+from clients.CachedCatalogClient import CachedCatalogClient
+from configs.settings import RateLimitPolicy, get_settings
+from factory import create_app
+from rpc.rate_limiter import RateLimiter, rate_limit_key
+
+
+def _request(host="10.0.0.1", headers=None, cookies=None):
+    request = Mock()
+    request.client.host = host
+    request.headers = headers or {}
+    request.cookies = cookies or {}
+    return request
+
+
+def _limiter(max_keys=10000, **policies):
+    return RateLimiter(dataclasses.replace(get_settings(), rate_limit_policies=policies, rate_limit_max_keys=max_keys))
+
+
+def test_rate_limit_key():
+    params = [{"module_name": "NarrativeService", "version": "release"}]
+    policy = RateLimitPolicy(rate=1, key=("token", "ip", "module"))
+    assert rate_limit_key(_request(headers={"Authorization": "abc"}), "ServiceWizard.start", params, policy) == (
+        "ServiceWizard.start",
+        f"token:{hashlib.sha256(b'abc').hexdigest()}",
+        "10.0.0.1",
+        "narrativeservice",
+    )
+    # Without a token the client IP is used
+    assert rate_limit_key(_request(), "ServiceWizard.start", params, RateLimitPolicy(key=("token",))) == ("ServiceWizard.start", "ip:10.0.0.1")
+    assert rate_limit_key(_request(cookies={"kbase_session": "def"}), "ServiceWizard.start", {}, RateLimitPolicy(key=("token", "module"))) == (
+        "ServiceWizard.start",
+        f"token:{hashlib.sha256(b'def').hexdigest()}",
+        None,
+    )
+
+
+def test_rate_limit_key_module_from_sw1_service_param():
+    policy = RateLimitPolicy(key=("module",))
+    params = [{"service": {"module_name": "NarrativeService", "version": "release"}}]
+    assert rate_limit_key(_request(), "ServiceWizard.get_service_log", params, policy) == ("ServiceWizard.get_service_log", "narrativeservice")
+    assert rate_limit_key(_request(), "ServiceWizard.get_service_log", [{"service": "NarrativeService"}], policy) == ("ServiceWizard.get_service_log", None)
+
+
+@patch("rpc.rate_limiter.time.monotonic")
+def test_token_bucket(mock_monotonic):
+    mock_monotonic.return_value = 100.0
+    limiter = _limiter(start=RateLimitPolicy(rate=2, burst=3, key=("ip",)))
+    assert [limiter.check(_request(), "ServiceWizard.start", []) for _ in range(3)] == [0, 0, 0]
+    assert limiter.check(_request(), "ServiceWizard.start", []) == pytest.approx(0.5)
+    # Other clients have their own bucket
+    assert limiter.check(_request(host="10.0.0.2"), "ServiceWizard.start", []) == 0
+    # Refills at the rate, up to the burst
+    mock_monotonic.return_value = 100.25
+    assert limiter.check(_request(), "ServiceWizard.start", []) == pytest.approx(0.25)
+    mock_monotonic.return_value = 100.5
+    assert limiter.check(_request(), "ServiceWizard.start", []) == 0
+    mock_monotonic.return_value = 200.0
+    assert [limiter.check(_request(), "ServiceWizard.start", []) for _ in range(4)] == [0, 0, 0, pytest.approx(0.5)]
+    assert REGISTRY.get_sample_value("service_wizard_rate_limited_total", {"method": "ServiceWizard.start"}) >= 3
+
+
+def test_unlimited_methods_are_not_tracked():
+    limiter = _limiter()
+    assert all(limiter.check(_request(), "ServiceWizard.version", []) == 0 for _ in range(100))
+    assert len(limiter._buckets) == 0
+
+
+def test_buckets_are_bounded():
+    limiter = _limiter(max_keys=2, start=RateLimitPolicy(rate=1, burst=1, key=("ip",)))
+    for host in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        limiter.check(_request(host=host), "ServiceWizard.start", [])
+    assert list(limiter._buckets) == [("ServiceWizard.start", "10.0.0.2"), ("ServiceWizard.start", "10.0.0.3")]
+
+
+def test_rpc_rate_limited():
+    settings = dataclasses.replace(get_settings(), rate_limit_policies={"status": RateLimitPolicy(rate=0.5, burst=2)})
+    with patch.dict("rpc.handlers.json_rpc_handler.known_methods", {"ServiceWizard.status": lambda *args: {"result": "ok"}}):
+        app = create_app(
+            auth_client=MagicMock(autospec=CachedAuthClient),
+            catalog_client=MagicMock(autospec=CachedCatalogClient),
+            k8s_clients=MagicMock(autospec=KubernetesClients.K8sClients),
+            settings=settings,
+        )
+        test_client = TestClient(app)
+        payload = {"method": "ServiceWizard.status", "params": [], "version": "1.1", "id": 7}
+        assert [test_client.post("/rpc", json=payload).status_code for _ in range(2)] == [200, 200]
+        response = test_client.post("/rpc", json=payload)
+    assert response.status_code == 500
+    assert response.headers["Retry-After"] == "2"
+    error = response.json()["error"]
+    assert error["code"] == -32002
+    assert error["name"] == "Rate limited"
+    assert re.fullmatch(r"Rate limit exceeded for ServiceWizard.status, retry after [12]\.\d\d seconds", error["message"])
+    assert response.json()["id"] == 7